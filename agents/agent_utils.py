@@ -5,9 +5,30 @@ Shared utility functions for all agents to ensure consistent behavior
 and reduce code duplication.
 """
 
+import io
 import json
+import base64
 import ast
-from typing import Any, Dict, List, Optional, Union
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import polars as pl
+
+
+# Read options used by most agents; frames parsed with these options are
+# shared across every agent that receives the same DatasetContext.
+DEFAULT_READ_OPTIONS: Dict[str, Any] = {
+    "ignore_errors": True,
+    "infer_schema_length": 10000,
+}
+
+# Number of values date format detection looks at before parsing a column.
+DATE_FORMAT_SAMPLE_SIZE = 1000
+
+# Rows per batch when a dataset is processed chunk by chunk (e.g. sketches).
+DEFAULT_BATCH_ROWS = 250_000
 
 
 def parse_parameter(
@@ -221,3 +242,464 @@ def normalize_column_names(
                 normalized.append(col_map[col_clean])
     
     return normalized
+
+
+class DatasetContext:
+    """
+    Parsed view of one input file, shared by all agents in a tool run.
+
+    Transformers build one context per file key and pass it to every agent,
+    so a CSV is parsed once per distinct set of read options instead of once
+    per agent. The raw bytes stay available for agents (and downloads) that
+    still work on bytes.
+
+    A context can also wrap a frame handed off by a chained cleaning or
+    mastering agent. Such a context has no bytes; CSV is only produced if
+    something asks for `content` (normally once, for the final download).
+
+    Large inputs are spooled to a local file instead of being held as bytes
+    (see `from_path`). Agents that only need aggregates use `scan()` to run
+    lazy queries over the file with streaming collection, so the whole
+    dataset never has to fit in worker memory.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        content: Optional[bytes] = None,
+        frame: Optional[pl.DataFrame] = None,
+        path: Optional[str] = None
+    ):
+        if content is None and frame is None and path is None:
+            raise ValueError("DatasetContext requires content, frame or path")
+        
+        self.filename = filename
+        self._content = content
+        self._source_frame = frame
+        self._path = path
+        self._frames: Dict[tuple, pl.DataFrame] = {}
+        self._fingerprint: Optional[str] = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_bytes(cls, content: bytes, filename: str) -> "DatasetContext":
+        """Create a context from raw CSV bytes (parsed lazily on first use)."""
+        return cls(filename, content=content)
+
+    @classmethod
+    def from_frame(cls, frame: pl.DataFrame, filename: str) -> "DatasetContext":
+        """Create a context from an in-memory frame produced by an agent."""
+        return cls(filename, frame=frame)
+
+    @classmethod
+    def from_path(cls, path: str, filename: str) -> "DatasetContext":
+        """Create a context from a CSV spooled to local disk (read or scanned on use)."""
+        return cls(filename, path=path)
+
+    @staticmethod
+    def _options_key(options: Dict[str, Any]) -> tuple:
+        return tuple(sorted(options.items()))
+
+    @property
+    def is_frame_backed(self) -> bool:
+        """True if the context wraps a handed-off frame rather than CSV bytes."""
+        return self._source_frame is not None
+
+    @property
+    def is_spooled(self) -> bool:
+        """True if the context reads from a local spool file rather than bytes."""
+        return self._path is not None
+
+    @property
+    def path(self) -> Optional[str]:
+        """Local spool file the context reads from, if any."""
+        return self._path
+
+    @property
+    def content(self) -> bytes:
+        """
+        Raw CSV bytes.
+        
+        Frame-backed and spooled contexts produce the bytes on every call
+        and do not keep them, so the dataset is not held in memory twice.
+        """
+        if self._content is not None:
+            return self._content
+        if self._path is not None:
+            with open(self._path, "rb") as f:
+                return f.read()
+        if self._source_frame is None:
+            raise ValueError(f"Dataset '{self.filename}' has been released")
+        
+        buffer = io.BytesIO()
+        self._source_frame.write_csv(buffer)
+        return buffer.getvalue()
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Content hash of the dataset, used to key cached agent results.
+        
+        Bytes and spooled files are hashed with sha256 (spool files in
+        chunks). Handed-off frames are normally given the fingerprint of
+        the agent run that produced them; otherwise their row hashes are
+        digested.
+        """
+        if self._fingerprint is None:
+            with self._lock:
+                if self._fingerprint is None:
+                    self._fingerprint = self._compute_fingerprint()
+        return self._fingerprint
+
+    @fingerprint.setter
+    def fingerprint(self, value: str) -> None:
+        self._fingerprint = value
+
+    def _compute_fingerprint(self) -> str:
+        digest = hashlib.sha256()
+        if self._content is not None:
+            digest.update(self._content)
+        elif self._path is not None:
+            with open(self._path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+        elif self._source_frame is not None:
+            digest.update(f"polars-{pl.__version__}:{self._source_frame.schema}".encode("utf-8"))
+            digest.update(self._source_frame.hash_rows(seed=0).to_numpy().tobytes())
+        else:
+            raise ValueError(f"Dataset '{self.filename}' has been released")
+        return digest.hexdigest()
+
+    @property
+    def frame(self) -> pl.DataFrame:
+        """Frame parsed with DEFAULT_READ_OPTIONS."""
+        return self.get_frame()
+
+    @property
+    def schema(self) -> Dict[str, pl.DataType]:
+        """Inferred schema of the default frame."""
+        return dict(self.frame.schema)
+
+    def get_frame(self, **read_options: Any) -> pl.DataFrame:
+        """
+        Get the parsed frame for the given read options.
+        
+        Each distinct option set is parsed at most once and cached. Polars
+        frames are never mutated in place by agents, so the cached frame can
+        be shared between them.
+        
+        For frame-backed contexts the handed-off frame is already typed, so
+        it is returned as-is; only an all-string read (infer_schema_length=0)
+        gets a cast view instead of a CSV round-trip.
+        
+        Args:
+            **read_options: Keyword arguments for pl.read_csv
+                (defaults to DEFAULT_READ_OPTIONS when omitted)
+        
+        Returns:
+            Parsed Polars DataFrame
+        """
+        options = read_options or DEFAULT_READ_OPTIONS
+        
+        if self._source_frame is not None:
+            if options.get("infer_schema_length") == 0:
+                return self._source_frame.with_columns(pl.all().cast(pl.Utf8))
+            return self._source_frame
+        
+        key = self._options_key(options)
+        frame = self._frames.get(key)
+        if frame is None:
+            with self._lock:
+                frame = self._frames.get(key)
+                if frame is None:
+                    source = self._path if self._path is not None else io.BytesIO(self.content)
+                    frame = pl.read_csv(source, **options)
+                    self._frames[key] = frame
+        return frame
+
+    def scan(self, **read_options: Any) -> pl.LazyFrame:
+        """
+        Get a lazy query over the dataset for the given read options.
+        
+        Spooled files are scanned from disk with pl.scan_csv, so queries
+        collected with `collect_streaming` only hold the columns and rows
+        they need (a frame parsed earlier for the same options is reused).
+        Bytes and handed-off frames are already in memory, so the query runs
+        over the cached frame via `.lazy()` instead of re-reading the CSV.
+        
+        Args:
+            **read_options: Keyword arguments for pl.scan_csv
+                (defaults to DEFAULT_READ_OPTIONS when omitted)
+        
+        Returns:
+            Polars LazyFrame
+        """
+        options = read_options or DEFAULT_READ_OPTIONS
+        
+        if self._path is not None and self._options_key(options) not in self._frames:
+            return pl.scan_csv(self._path, **options)
+        return self.get_frame(**options).lazy()
+
+    def iter_batches(self, batch_rows: int = DEFAULT_BATCH_ROWS, **read_options: Any) -> Iterator[pl.DataFrame]:
+        """
+        Iterate over the dataset in frames of about `batch_rows` rows.
+        
+        Spooled files are read batch by batch with pl.read_csv_batched, so
+        only one batch is in memory at a time. A frame that is already in
+        memory (or bytes, which are parsed and cached) is sliced instead.
+        
+        Args:
+            batch_rows: Rows per batch
+            **read_options: Keyword arguments for pl.read_csv_batched
+                (defaults to DEFAULT_READ_OPTIONS when omitted)
+        """
+        options = read_options or DEFAULT_READ_OPTIONS
+        
+        frame = self._source_frame if self._source_frame is not None else self._frames.get(self._options_key(options))
+        if frame is None and self._path is not None:
+            reader = pl.read_csv_batched(self._path, batch_size=batch_rows, **options)
+            while True:
+                batches = reader.next_batches(1)
+                if not batches:
+                    return
+                yield from batches
+        
+        if frame is None:
+            frame = self.get_frame(**options)
+        yield from frame.iter_slices(n_rows=batch_rows)
+
+    def release(self) -> None:
+        """Drop the bytes and parsed frames once a newer dataset supersedes this one."""
+        with self._lock:
+            self._content = None
+            self._source_frame = None
+            self._path = None
+            self._frames.clear()
+
+
+def load_dataframe(
+    file_contents: Optional[bytes],
+    dataset: Optional[DatasetContext] = None,
+    **read_options: Any
+) -> pl.DataFrame:
+    """
+    Load an agent's input frame, reusing the shared DatasetContext if given.
+    
+    Agents keep their bytes-based signatures; when a transformer passes a
+    DatasetContext the already-parsed frame is returned, otherwise the bytes
+    are parsed directly with pl.read_csv.
+    
+    Args:
+        file_contents: Raw CSV bytes (used when no dataset is supplied)
+        dataset: Shared dataset context for the current tool run
+        **read_options: Keyword arguments for pl.read_csv
+    
+    Returns:
+        Parsed Polars DataFrame
+    """
+    if dataset is not None:
+        return dataset.get_frame(**read_options)
+    return pl.read_csv(io.BytesIO(file_contents), **read_options)
+
+
+def scan_dataframe(
+    file_contents: Optional[bytes],
+    dataset: Optional[DatasetContext] = None,
+    **read_options: Any
+) -> pl.LazyFrame:
+    """
+    Get an agent's input as a lazy query, reusing the shared DatasetContext if given.
+    
+    Aggregate-only agents build their statistics on this LazyFrame and
+    collect with `collect_streaming`, so large spooled inputs are processed
+    in batches instead of being materialized.
+    
+    Args:
+        file_contents: Raw CSV bytes (used when no dataset is supplied)
+        dataset: Shared dataset context for the current tool run
+        **read_options: Keyword arguments for pl.scan_csv
+    
+    Returns:
+        Polars LazyFrame
+    """
+    if dataset is not None:
+        return dataset.scan(**read_options)
+    return pl.scan_csv(io.BytesIO(file_contents), **read_options)
+
+
+def iter_dataframe_batches(
+    file_contents: Optional[bytes],
+    dataset: Optional[DatasetContext] = None,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    **read_options: Any
+) -> Iterator[pl.DataFrame]:
+    """
+    Iterate over an agent's input in batches, reusing the shared DatasetContext if given.
+    
+    Args:
+        file_contents: Raw CSV bytes (used when no dataset is supplied)
+        dataset: Shared dataset context for the current tool run
+        batch_rows: Rows per batch
+        **read_options: Keyword arguments for the CSV reader
+    
+    Returns:
+        Iterator of Polars DataFrames with the same schema
+    """
+    if dataset is None:
+        dataset = DatasetContext.from_bytes(file_contents, "input.csv")
+    return dataset.iter_batches(batch_rows, **read_options)
+
+
+def collect_streaming(query: pl.LazyFrame) -> pl.DataFrame:
+    """
+    Collect a lazy query with Polars' streaming engine.
+    
+    Operations the streaming engine does not support fall back to the
+    in-memory engine transparently.
+    """
+    return query.collect(engine="streaming")
+
+
+def build_cleaned_file(
+    df: pl.DataFrame,
+    filename: str,
+    prefix: str = "cleaned_",
+    dataset: Optional[DatasetContext] = None
+) -> Dict[str, Any]:
+    """
+    Build the `cleaned_file` payload returned by chained cleaning/mastering agents.
+    
+    When the agent runs with a shared DatasetContext (i.e. inside a
+    transformer chain) the frame itself is handed to the next agent and no
+    CSV is written here; the transformer serializes the final file once for
+    download. Direct callers without a context get the base64 CSV as before.
+    
+    Args:
+        df: Output dataframe
+        filename: Input filename
+        prefix: Filename prefix for the output file ("cleaned_" or "mastered_")
+        dataset: Shared dataset context the agent was called with
+    
+    Returns:
+        cleaned_file dictionary
+    """
+    cleaned_file: Dict[str, Any] = {
+        "filename": f"{prefix}{filename}",
+        "format": filename.split('.')[-1].lower()
+    }
+    
+    if dataset is not None:
+        cleaned_file["frame"] = df
+        return cleaned_file
+    
+    output = io.BytesIO()
+    df.write_csv(output)
+    file_bytes = output.getvalue()
+    cleaned_file["content"] = base64.b64encode(file_bytes).decode('utf-8')
+    cleaned_file["size_bytes"] = len(file_bytes)
+    return cleaned_file
+
+
+# =============================================================================
+# DATE PARSING
+# =============================================================================
+
+
+@lru_cache(maxsize=None)
+def _strptime_guard(fmt: str) -> str:
+    """
+    Regex accepting the strings datetime.strptime accepts for fmt.
+    
+    Polars (chrono) is more lenient than Python: %Y takes 1-3 digit years,
+    %B takes abbreviated month names and second 60 rolls over to the next
+    minute. The pattern comes from Python's own strptime regex builder, with
+    %S narrowed to 0-59 (Python's regex also takes 60 and 61 and rejects
+    them later, when building the datetime).
+    
+    Checks Python makes after matching are left to chrono, which rejects
+    out-of-range days (Feb 30) as well; _date_format_expr maps chrono's
+    two-digit years onto Python's. This only covers the directives used in
+    the agents' format lists (%Y %y %m %d %b %B %H %M %S): %f, %z, %Z, %j,
+    %U, %W and weekday directives are not reconciled and may still parse
+    differently from datetime.strptime.
+    """
+    from _strptime import TimeRE
+    time_re = TimeRE()
+    time_re["S"] = r"(?P<S>[0-5]\d|\d)"
+    return f"(?i)^(?:{time_re.pattern(fmt)})$"
+
+
+def _date_format_expr(value: pl.Expr, fmt: str) -> pl.Expr:
+    """Parse value with one strptime format natively (null where it does not match)."""
+    parsed = value.str.strptime(pl.Datetime("us"), fmt, strict=False)
+    if "%y" in fmt:
+        # chrono maps '69' to 2069, Python to 1969 (other two-digit years agree)
+        parsed = pl.when(parsed.dt.year() == 2069).then(parsed.dt.offset_by("-100y")).otherwise(parsed)
+    return pl.when(value.str.contains(_strptime_guard(fmt))).then(parsed)
+
+
+def _matching_date_formats(values: pl.Series, formats: List[str]) -> List[str]:
+    """Formats (in the given order) that parse at least one of the values."""
+    if values.len() == 0 or not formats:
+        return []
+    value = pl.col("value")
+    matches = pl.DataFrame({"value": values}).select([
+        _date_format_expr(value, fmt).is_not_null().any().alias(str(idx))
+        for idx, fmt in enumerate(formats)
+    ]).row(0)
+    return [fmt for fmt, matched in zip(formats, matches) if matched]
+
+
+def parse_dates(
+    series: pl.Series,
+    formats: List[str],
+    sample_size: int = DATE_FORMAT_SAMPLE_SIZE
+) -> Tuple[pl.Series, pl.Series]:
+    """
+    Parse a string column with a list of strptime formats, natively in Polars.
+    
+    Values are stripped (empty strings become null) and each value takes the
+    first format in `formats` that parses it, as with a datetime.strptime
+    loop. Instead of trying every format per cell in Python, the formats
+    seen in a sample of the column are applied as a coalesce of strptime
+    expressions. Values the sampled formats miss are checked against the
+    remaining formats, so formats that only occur outside the sample are
+    still used.
+    
+    Args:
+        series: Column to parse
+        formats: strptime formats in priority order
+        sample_size: Number of values used to detect candidate formats
+        
+    Returns:
+        Tuple of (Datetime series, series with the format that matched each row)
+    """
+    frame = pl.DataFrame({"value": series.cast(pl.Utf8)}).select(
+        pl.when(pl.col("value").str.strip_chars() != "").then(pl.col("value").str.strip_chars()).alias("value")
+    )
+    values = frame["value"]
+    non_null = values.drop_nulls()
+    
+    def _parse(candidates: List[str]) -> pl.DataFrame:
+        value = pl.col("value")
+        parsed_exprs = [_date_format_expr(value, fmt) for fmt in candidates]
+        return frame.select(
+            pl.coalesce([*parsed_exprs, pl.repeat(None, pl.len(), dtype=pl.Datetime("us"))]).alias("parsed"),
+            pl.coalesce([
+                *(pl.when(parsed.is_not_null()).then(pl.lit(fmt)) for parsed, fmt in zip(parsed_exprs, candidates)),
+                pl.repeat(None, pl.len(), dtype=pl.Utf8)
+            ]).alias("format")
+        )
+    
+    sample = non_null.gather_every(max(1, non_null.len() // max(1, sample_size))).head(sample_size)
+    candidates = _matching_date_formats(sample.unique(), formats)
+    result = _parse(candidates)
+    
+    remaining = [fmt for fmt in formats if fmt not in candidates]
+    if remaining:
+        unparsed = values.filter(values.is_not_null() & result["parsed"].is_null())
+        extra = _matching_date_formats(unparsed.unique(), remaining)
+        if extra:
+            result = _parse([fmt for fmt in formats if fmt in candidates or fmt in extra])
+    
+    return result["parsed"].alias(series.name), result["format"].alias(series.name)
@@ -0,0 +1,117 @@
+"""
+Artifacts
+
+File-backed content of a download (cleaned CSV, Excel report, JSON report).
+
+An Artifact holds its content in a spooled temporary file (in memory while
+small, on disk beyond ARTIFACT_SPOOL_MAX_BYTES) or refers to a local file,
+together with its MIME type, size and a sha256 checksum computed on first
+use. Uploaders stream it with open(), so the content never exists as a
+base64 string; to_base64() is only for the legacy inline /analyze response.
+"""
+
+import io
+import os
+import json
+import base64
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Iterator, Optional
+
+import polars as pl
+
+
+# Artifacts up to this size stay in memory; larger ones roll over to a temp file
+ARTIFACT_SPOOL_MAX_BYTES = int(os.getenv("ARTIFACT_SPOOL_MAX_MB", "16")) * 1024 * 1024
+CHECKSUM_CHUNK_BYTES = 1024 * 1024
+
+CSV_MIME_TYPE = "text/csv"
+JSON_MIME_TYPE = "application/json"
+XLSX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def new_spool(suffix: str = "") -> tempfile.SpooledTemporaryFile:
+    """Create the spooled temporary file an artifact is written to."""
+    return tempfile.SpooledTemporaryFile(max_size=ARTIFACT_SPOOL_MAX_BYTES, suffix=suffix)
+
+
+class Artifact:
+    """Download content backed by a (spooled) file or a local path."""
+
+    def __init__(self, mime_type: str, file: Optional[BinaryIO] = None, path: Optional[str] = None):
+        if (file is None) == (path is None):
+            raise ValueError("Artifact requires exactly one of file or path")
+        self.mime_type = mime_type
+        self.path = path
+        self._file = file
+        self._checksum: Optional[str] = None
+
+    @classmethod
+    def from_file(cls, file: BinaryIO, mime_type: str) -> "Artifact":
+        """Wrap an open binary file (the artifact owns and closes it)."""
+        return cls(mime_type, file=file)
+
+    @classmethod
+    def from_path(cls, path: str, mime_type: str) -> "Artifact":
+        """Refer to a local file; it must exist until the artifact is uploaded."""
+        return cls(mime_type, path=path)
+
+    @classmethod
+    def from_bytes(cls, content: bytes, mime_type: str) -> "Artifact":
+        output = new_spool()
+        output.write(content)
+        return cls(mime_type, file=output)
+
+    @classmethod
+    def from_frame(cls, frame: pl.DataFrame) -> "Artifact":
+        """Write a frame as CSV straight into a spooled file."""
+        output = new_spool(".csv")
+        frame.write_csv(output)
+        return cls(CSV_MIME_TYPE, file=output)
+
+    @classmethod
+    def from_json(cls, data: Any, **dump_options: Any) -> "Artifact":
+        """Serialize data as UTF-8 JSON straight into a spooled file."""
+        output = new_spool(".json")
+        writer = io.TextIOWrapper(output, encoding="utf-8")
+        json.dump(data, writer, **dump_options)
+        writer.flush()
+        writer.detach()
+        return cls(JSON_MIME_TYPE, file=output)
+
+    @property
+    def size_bytes(self) -> int:
+        if self._file is None:
+            return os.path.getsize(self.path)
+        return self._file.seek(0, os.SEEK_END)
+
+    @property
+    def checksum(self) -> str:
+        """sha256 hex digest of the content (read in chunks, computed once)."""
+        if self._checksum is None:
+            digest = hashlib.sha256()
+            with self.open() as f:
+                for chunk in iter(lambda: f.read(CHECKSUM_CHUNK_BYTES), b""):
+                    digest.update(chunk)
+            self._checksum = digest.hexdigest()
+        return self._checksum
+
+    @contextmanager
+    def open(self) -> Iterator[BinaryIO]:
+        """Open the content for reading from the start."""
+        if self._file is not None:
+            self._file.seek(0)
+            yield self._file
+        else:
+            with open(self.path, "rb") as f:
+                yield f
+
+    def to_base64(self) -> str:
+        with self.open() as f:
+            return base64.b64encode(f.read()).decode("utf-8")
+
+    def close(self) -> None:
+        """Release the spooled file (a referenced path is left in place)."""
+        if self._file is not None:
+            self._file.close()
@@ -15,15 +15,15 @@ Output: Impact assessment with before/after comparison and risk analysis
 
 import polars as pl
 import numpy as np
-import io
 import time
 from typing import Dict, Any, Optional, List, Tuple
-from agents.agent_utils import safe_get_list
+from agents.agent_utils import safe_get_list, DatasetContext, load_dataframe
 
 def execute_cleanse_previewer(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Preview the impact of data cleaning operations before execution.
@@ -32,6 +32,7 @@ def execute_cleanse_previewer(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters from tool.json
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary with impact assessment
@@ -66,7 +67,7 @@ def execute_cleanse_previewer(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True)
         except Exception as e:
              return {
                 "status": "error",
@@ -25,16 +25,16 @@ Output: Validation report with comprehensive cleansing manifest and integrity ve
 
 import polars as pl
 import numpy as np
-import io
 import time
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
-from agents.agent_utils import safe_get_dict
+from agents.agent_utils import safe_get_dict, DatasetContext, load_dataframe
 
 def execute_cleanse_writeback(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Execute cleanse writeback with integrity verification and manifest finalization.
@@ -43,6 +43,7 @@ def execute_cleanse_writeback(
         file_contents: File bytes (read as binary) - should be the cleaned data
         filename: Original filename (used to detect format)
         parameters: Agent parameters from tool.json
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary with integrity report and finalized manifest
@@ -80,7 +81,7 @@ def execute_cleanse_writeback(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True)
         except Exception as e:
              return {
                 "status": "error",
@@ -23,20 +23,19 @@ Output: Enforcement results with violations, transformations applied, and compli
 
 import polars as pl
 import numpy as np
-import io
 import time
 import re
-import base64
 import json
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
-from agents.agent_utils import safe_get_dict
+from agents.agent_utils import safe_get_dict, DatasetContext, load_dataframe, build_cleaned_file
 
 
 def execute_contract_enforcer(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Enforce data contract on dataset.
@@ -45,6 +44,7 @@ def execute_contract_enforcer(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters including contract definition
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary with enforcement results
@@ -82,7 +82,7 @@ def execute_contract_enforcer(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000, truncate_ragged_lines=True)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000, truncate_ragged_lines=True)
         except Exception as e:
             return {
                 "status": "error",
@@ -481,24 +481,27 @@ def execute_contract_enforcer(
                 violations.append(violation)
                 critical_violations.append(violation)
                 
-                # Add row-level issues for duplicates
-                dup_values = duplicates[unique_col].to_list()[:10]
-                df_with_index = df.with_row_index("row_index")
-                for dup_val in dup_values:
-                    if dup_val is None:
-                        dup_rows = df_with_index.filter(pl.col(unique_col).is_null())
-                    else:
-                        dup_rows = df_with_index.filter(pl.col(unique_col) == dup_val)
-                    for row in dup_rows.iter_rows(named=True):
-                        if len(row_level_issues) < 1000:
-                            row_level_issues.append({
-                                "row_index": int(row["row_index"]),
-                                "column": unique_col,
-                                "issue_type": "duplicate_value",
-                                "severity": "critical",
-                                "message": f"Duplicate value '{dup_val}' in column requiring uniqueness",
-                                "value": str(dup_val)
-                            })
+                # Add row-level issues for the rows of the first 10 duplicated values,
+                # found with one join instead of a filter per value
+                remaining = 1000 - len(row_level_issues)
+                if remaining > 0:
+                    dup_values = duplicates.head(10).select(unique_col).with_row_index("__dup_rank__")
+                    dup_rows = (
+                        df.select(unique_col)
+                        .with_row_index("row_index")
+                        .join(dup_values, on=unique_col, how="inner", nulls_equal=True)
+                        .sort(["__dup_rank__", "row_index"])
+                        .head(remaining)
+                    )
+                    for row_index, dup_val in dup_rows.select("row_index", unique_col).iter_rows():
+                        row_level_issues.append({
+                            "row_index": int(row_index),
+                            "column": unique_col,
+                            "issue_type": "duplicate_value",
+                            "severity": "critical",
+                            "message": f"Duplicate value '{dup_val}' in column requiring uniqueness",
+                            "value": str(dup_val)
+                        })
         
         # Cap row-level issues
         row_level_issues = row_level_issues[:1000]
@@ -812,10 +815,6 @@ def execute_contract_enforcer(
             "timeline": "3 weeks"
         })
 
-        # Generate cleaned file (CSV format)
-        cleaned_file_bytes = _generate_cleaned_file(df, filename)
-        cleaned_file_base64 = base64.b64encode(cleaned_file_bytes).decode('utf-8')
-
         return {
             "status": "success",
             "agent_id": "contract-enforcer",
@@ -839,12 +838,7 @@ def execute_contract_enforcer(
             "ai_analysis_text": ai_analysis_text,
             "row_level_issues": row_level_issues,
             "issue_summary": issue_summary,
-            "cleaned_file": {
-                "filename": f"mastered_{filename}",
-                "content": cleaned_file_base64,
-                "size_bytes": len(cleaned_file_bytes),
-                "format": filename.split('.')[-1].lower()
-            }
+            "cleaned_file": build_cleaned_file(df, filename, "mastered_", dataset)
         }
 
     except Exception as e:
@@ -977,19 +971,3 @@ def _generate_failure_response(
             "affected_columns": []
         }
     }
-
-
-def _generate_cleaned_file(df: pl.DataFrame, original_filename: str) -> bytes:
-    """
-    Generate cleaned data file in CSV format.
-    
-    Args:
-        df: Cleaned dataframe
-        original_filename: Original filename to determine format
-        
-    Returns:
-        File contents as bytes
-    """
-    output = io.BytesIO()
-    df.write_csv(output)
-    return output.getvalue()
@@ -9,7 +9,6 @@ Output: Segmentation summaries, per-customer segment assignments (sampled),
         alerts/issues/recommendations following Agensium agent response standard.
 """
 
-import io
 import time
 from datetime import date, datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
@@ -17,7 +16,7 @@ from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 import polars as pl
 
-from .agent_utils import normalize_column_names, validate_required_parameters
+from .agent_utils import normalize_column_names, validate_required_parameters, DatasetContext, load_dataframe
 
 
 def _convert_numpy_types(obj: Any) -> Any:
@@ -187,7 +186,8 @@ def _segment_labels(segment_count: int, mode: str) -> Tuple[List[str], List[str]
 def execute_customer_segmentation_agent(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """Execute customer segmentation analysis."""
 
@@ -277,7 +277,7 @@ def execute_customer_segmentation_agent(
         # Load CSV
         # ----------------------------
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
         except Exception as e:
             return {
                 "status": "error",
@@ -8,17 +8,31 @@ Output: Uniform drift detection structure matching API specification
 
 import polars as pl
 import numpy as np
-import io
 import time
 from typing import Dict, Any, Optional
 from scipy.stats import ks_2samp, wasserstein_distance
+from agents.agent_utils import DatasetContext, DEFAULT_READ_OPTIONS, load_dataframe
+from agents.drift_kernels import (
+    summary_statistics,
+    histogram_drift,
+    categorical_psi,
+    sample_for_tests,
+    profile_histogram_drift,
+    profile_two_sample_tests,
+    profile_categorical_psi,
+    profile_quantile
+)
+
+NUMERIC_DTYPES = [pl.Float64, pl.Int64, pl.Float32, pl.Int32]
 
 def execute_drift_detector(
     baseline_contents: bytes,
     baseline_filename: str,
     current_contents: bytes,
     current_filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    baseline_dataset: Optional[DatasetContext] = None,
+    current_dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Detect drift between baseline and current datasets.
@@ -28,7 +42,11 @@ def execute_drift_detector(
         baseline_filename: Baseline filename
         current_contents: Current file bytes (primary)
         current_filename: Current filename
-        parameters: Agent parameters matching tool.json (statistical_test, significance_level, min_sample_size)
+        parameters: Agent parameters matching tool.json (statistical_test, significance_level, min_sample_size).
+            `baseline_profile` (a stored profile resolved from baseline_profile_id)
+            replaces the baseline file.
+        baseline_dataset: Optional shared DatasetContext for the baseline file
+        current_dataset: Optional shared DatasetContext for the current file
         
     Returns:
         Uniform output structure matching API_SPECIFICATION.js response format
@@ -41,17 +59,35 @@ def execute_drift_detector(
     statistical_test = parameters.get("statistical_test", "kolmogorov_smirnov")
     significance_level = parameters.get("significance_level", 0.05)
     min_sample_size = parameters.get("min_sample_size", 100)
+    baseline_profile_id = parameters.get("baseline_profile_id")
+    baseline_profile = parameters.get("baseline_profile")
+    approximate_statistics = parameters.get("approximate_statistics", False)
     
     try:
+        if baseline_profile_id and baseline_profile is None:
+            return {
+                "status": "error",
+                "agent_id": "drift-detector",
+                "error": f"Baseline profile '{baseline_profile_id}' not found",
+                "execution_time_ms": int((time.time() - start_time) * 1000)
+            }
+        if baseline_profile is None and baseline_contents is None and baseline_dataset is None:
+            return {
+                "status": "error",
+                "agent_id": "drift-detector",
+                "error": "Drift Detector requires a 'baseline' file or a baseline_profile_id",
+                "execution_time_ms": int((time.time() - start_time) * 1000)
+            }
+        
         # Read files - CSV only
-        def read_file(contents, filename):
+        def read_file(contents, filename, dataset):
             if not filename.endswith('.csv'):
                  raise ValueError(f"Unsupported file format: {filename}. Only CSV is supported.")
-            return pl.read_csv(io.BytesIO(contents), ignore_errors=True)
+            return load_dataframe(contents, dataset, **DEFAULT_READ_OPTIONS)
         
         try:
-            baseline_df = read_file(baseline_contents, baseline_filename)
-            current_df = read_file(current_contents, current_filename)
+            baseline_df = read_file(baseline_contents, baseline_filename, baseline_dataset) if baseline_profile is None else None
+            current_df = read_file(current_contents, current_filename, current_dataset)
         except Exception as e:
              return {
                 "status": "error",
@@ -69,7 +105,7 @@ def execute_drift_detector(
         psi_scores = []
         
         # Check for missing/new columns
-        baseline_cols = set(baseline_df.columns)
+        baseline_cols = set(baseline_df.columns) if baseline_profile is None else set(baseline_profile["columns"])
         current_cols = set(current_df.columns)
         missing_cols = baseline_cols - current_cols
         new_cols = current_cols - baseline_cols
@@ -77,29 +113,57 @@ def execute_drift_detector(
         # Common columns - check for data distribution drift
         common_cols = baseline_cols & current_cols
         
+        # Non-null counts of every common column, one query per file
+        if baseline_profile is None:
+            baseline_non_null = baseline_df.select([pl.col(c).count() for c in common_cols]).row(0, named=True) if common_cols else {}
+            baseline_numeric = {c for c in common_cols if baseline_df[c].dtype in NUMERIC_DTYPES}
+        else:
+            baseline_non_null = {c: baseline_profile["columns"][c]["non_null_count"] for c in common_cols}
+            baseline_numeric = {c for c in common_cols if baseline_profile["columns"][c]["kind"] == "numeric"}
+        current_non_null = current_df.select([pl.col(c).count() for c in common_cols]).row(0, named=True) if common_cols else {}
+        
+        # Batched statistics and histograms for all numeric columns with enough data
+        numeric_cols = [
+            c for c in common_cols
+            if c in baseline_numeric
+            and baseline_non_null[c] >= min_sample_size and current_non_null[c] >= min_sample_size
+        ]
+        current_stats = summary_statistics(current_df, numeric_cols, approximate_statistics)
+        if baseline_profile is None:
+            baseline_stats = summary_statistics(baseline_df, numeric_cols, approximate_statistics)
+        else:
+            baseline_stats = {c: baseline_profile["columns"][c]["statistics"] for c in numeric_cols}
+        try:
+            if baseline_profile is None:
+                histogram_scores = histogram_drift(baseline_df, current_df, numeric_cols, baseline_stats, current_stats)
+            else:
+                histogram_scores = profile_histogram_drift(baseline_profile, current_df, numeric_cols, current_stats)
+        except Exception:
+            histogram_scores = {}
+        
         for col in common_cols:
-            # Drop nulls for analysis
-            baseline_col = baseline_df[col].drop_nulls()
-            current_col = current_df[col].drop_nulls()
-            
             # Skip if insufficient sample size
-            if len(baseline_col) < min_sample_size or len(current_col) < min_sample_size:
+            if baseline_non_null[col] < min_sample_size or current_non_null[col] < min_sample_size:
                 continue
             
+            # Drop nulls for analysis
+            baseline_col = baseline_df[col].drop_nulls() if baseline_profile is None else None
+            current_col = current_df[col].drop_nulls()
+            
             # Get statistics
-            if baseline_col.dtype in [pl.Float64, pl.Int64, pl.Float32, pl.Int32]:
+            if col in baseline_stats:
                 # Numeric field drift detection
-                baseline_mean = float(baseline_col.mean())
-                baseline_median = float(baseline_col.median())
-                baseline_std = float(baseline_col.std())
-                baseline_min = float(baseline_col.min())
-                baseline_max = float(baseline_col.max())
+                baseline_mean = baseline_stats[col]["mean"]
+                baseline_median = baseline_stats[col]["median"]
+                baseline_std = baseline_stats[col]["stddev"]
+                baseline_min = baseline_stats[col]["min"]
+                baseline_max = baseline_stats[col]["max"]
                 
-                current_mean = float(current_col.mean())
-                current_median = float(current_col.median())
-                current_std = float(current_col.std())
-                current_min = float(current_col.min())
-                current_max = float(current_col.max())
+                current_mean = current_stats[col]["mean"]
+                current_median = current_stats[col]["median"]
+                current_std = current_stats[col]["stddev"]
+                current_min = current_stats[col]["min"]
+                current_max = current_stats[col]["max"]
                 
                 # Calculate statistical metrics
                 change_in_mean = abs(current_mean - baseline_mean)
@@ -110,26 +174,40 @@ def execute_drift_detector(
                 drift_score = 0
                 p_value = 1.0
                 
-                # Convert to numpy for scipy stats
-                baseline_np = baseline_col.to_numpy()
-                current_np = current_col.to_numpy()
+                # Convert to numpy for scipy stats (sampled for very large columns)
+                current_np = sample_for_tests(current_col)
                 
-                if statistical_test == "kolmogorov_smirnov":
-                    statistic, p_value = ks_2samp(baseline_np, current_np)
-                    drift_score = float(statistic)
-                elif statistical_test == "wasserstein":
-                    drift_score = float(wasserstein_distance(baseline_np, current_np))
-                    p_value = 0.01 if drift_score > 0.3 else 0.99
+                if baseline_profile is None:
+                    baseline_np = sample_for_tests(baseline_col)
+                    baseline_sample_size = len(baseline_np)
+                    
+                    if statistical_test == "kolmogorov_smirnov":
+                        statistic, p_value = ks_2samp(baseline_np, current_np)
+                        drift_score = float(statistic)
+                    elif statistical_test == "wasserstein":
+                        drift_score = float(wasserstein_distance(baseline_np, current_np))
+                        p_value = 0.01 if drift_score > 0.3 else 0.99
+                    
+                    # Wasserstein distance
+                    wasserstein_dist = float(wasserstein_distance(baseline_np, current_np)) if len(baseline_np) > 0 and len(current_np) > 0 else 0
+                else:
+                    # Tests against the stored baseline distribution
+                    profile_tests = profile_two_sample_tests(baseline_profile["columns"][col], current_np)
+                    baseline_sample_size = baseline_non_null[col]
+                    
+                    if statistical_test == "kolmogorov_smirnov":
+                        drift_score = profile_tests["ks_statistic"]
+                        p_value = profile_tests["p_value"]
+                    elif statistical_test == "wasserstein":
+                        drift_score = profile_tests["wasserstein_distance"]
+                        p_value = 0.01 if drift_score > 0.3 else 0.99
+                    
+                    wasserstein_dist = profile_tests["wasserstein_distance"]
                 
-                # Calculate PSI (Population Stability Index)
-                psi_score = _calculate_psi(baseline_np, current_np)
+                # PSI (Population Stability Index) and JS divergence from batched histograms
+                psi_score = histogram_scores.get(col, {}).get("psi", 0.0)
                 psi_scores.append(psi_score)
-                
-                # JS Divergence approximation
-                js_divergence = _calculate_js_divergence(baseline_np, current_np)
-                
-                # Wasserstein distance
-                wasserstein_dist = float(wasserstein_distance(baseline_np, current_np)) if len(baseline_np) > 0 and len(current_np) > 0 else 0
+                js_divergence = histogram_scores.get(col, {}).get("js_divergence", 0.0)
                 
                 drift_detected = p_value < significance_level or psi_score > 0.1
                 severity = "high" if psi_score > 0.25 else "medium" if psi_score > 0.1 else "low"
@@ -171,9 +249,17 @@ def execute_drift_detector(
                         "psi_score": round(psi_score, 4),
                         "js_divergence": round(js_divergence, 6),
                         "wasserstein_distance": round(wasserstein_dist, 4),
+                        "test_sample_size": {
+                            "baseline": baseline_sample_size,
+                            "current": len(current_np)
+                        },
                         "change_in_mean": round(change_in_mean, 4),
                         "change_in_variance": round(change_in_variance, 4),
-                        "change_in_median": round(change_in_median, 4)
+                        "change_in_median": round(change_in_median, 4),
+                        "median_rank_error": {
+                            "baseline": baseline_stats[col].get("median_rank_error", 0.0),
+                            "current": current_stats[col].get("median_rank_error", 0.0)
+                        } if approximate_statistics else None
                     },
                     "drift_interpretation": {
                         "message": f"Distribution {'has shifted significantly' if drift_detected else 'is stable'} from baseline",
@@ -184,20 +270,11 @@ def execute_drift_detector(
                 })
             else:
                 # Categorical field drift detection
-                # Polars value_counts
-                baseline_counts = baseline_col.value_counts()
-                current_counts = current_col.value_counts()
-                
-                # Normalize
-                baseline_total = baseline_col.len()
-                current_total = current_col.len()
-                
-                # Convert to dict for PSI calculation
-                baseline_dist = {row[col]: row['count']/baseline_total for row in baseline_counts.to_dicts()}
-                current_dist = {row[col]: row['count']/current_total for row in current_counts.to_dicts()}
-                
-                # PSI for categorical
-                psi_score = _calculate_psi_categorical(baseline_dist, current_dist)
+                # PSI for categorical, joining baseline and current category counts
+                if baseline_profile is None:
+                    psi_score, baseline_unique, current_unique = categorical_psi(baseline_col, current_col)
+                else:
+                    psi_score, baseline_unique, current_unique = profile_categorical_psi(baseline_profile["columns"][col], current_col)
                 psi_scores.append(psi_score)
                 
                 drift_detected = psi_score > 0.1
@@ -216,11 +293,11 @@ def execute_drift_detector(
                     "field_id": col,
                     "field_name": col,
                     "baseline_statistics": {
-                        "unique_values": len(baseline_dist),
+                        "unique_values": baseline_unique,
                         "distribution": "categorical"
                     },
                     "current_statistics": {
-                        "unique_values": len(current_dist),
+                        "unique_values": current_unique,
                         "distribution": "categorical"
                     },
                     "drift_analysis": {
@@ -248,11 +325,8 @@ def execute_drift_detector(
         row_level_issues = []
         
         for col in common_cols:
-            baseline_col = baseline_df[col].drop_nulls()
-            current_col = current_df[col].drop_nulls()
-            
             # Skip if insufficient data
-            if len(baseline_col) < min_sample_size or len(current_col) < min_sample_size:
+            if baseline_non_null[col] < min_sample_size or current_non_null[col] < min_sample_size:
                 continue
             
             # Get drift analysis for this field
@@ -261,13 +335,19 @@ def execute_drift_detector(
                 continue
             
             # For numeric columns: identify rows with values outside baseline range
-            if baseline_col.dtype in [pl.Float64, pl.Int64, pl.Float32, pl.Int32]:
-                baseline_mean = baseline_col.mean()
-                baseline_std = baseline_col.std()
-                baseline_min = baseline_col.quantile(0.05)  # 5th percentile
-                baseline_max = baseline_col.quantile(0.95)  # 95th percentile
-                current_mean = current_col.mean()
-                current_std = current_col.std()
+            current_col = current_df[col].drop_nulls()
+            if col in baseline_stats:
+                baseline_mean = baseline_stats[col]["mean"]
+                baseline_std = baseline_stats[col]["stddev"]
+                if baseline_profile is None:
+                    baseline_col = baseline_df[col].drop_nulls()
+                    baseline_min = baseline_col.quantile(0.05)  # 5th percentile
+                    baseline_max = baseline_col.quantile(0.95)  # 95th percentile
+                else:
+                    baseline_min = profile_quantile(baseline_profile["columns"][col], 0.05)
+                    baseline_max = profile_quantile(baseline_profile["columns"][col], 0.95)
+                current_mean = current_stats[col]["mean"]
+                current_std = current_stats[col]["stddev"]
                 
                 # Calculate z-scores based on baseline distribution
                 # Polars expression
@@ -317,9 +397,17 @@ def execute_drift_detector(
                         })
             else:
                 # For categorical columns: identify rows with values not in baseline
-                baseline_categories = set(baseline_col.unique().to_list())
-                current_categories = set(current_df[col].drop_nulls().unique().to_list())
-                new_categories = current_categories - baseline_categories
+                current_categories = set(current_col.unique().to_list())
+                if baseline_profile is None:
+                    baseline_categories = set(baseline_df[col].drop_nulls().unique().to_list())
+                    new_categories = current_categories - baseline_categories
+                elif baseline_profile["columns"][col].get("top_values_complete", True):
+                    # Profiles store categories as strings
+                    baseline_categories = {v for v, _ in baseline_profile["columns"][col].get("top_values", [])}
+                    new_categories = {c for c in current_categories if str(c) not in baseline_categories}
+                else:
+                    # Only the top-K baseline categories are known
+                    new_categories = set()
                 
                 if new_categories:
                     for category in new_categories:
@@ -733,17 +821,22 @@ def execute_drift_detector(
                 "defaults": {
                     "statistical_test": "kolmogorov_smirnov",
                     "significance_level": 0.05,
-                    "min_sample_size": 100
+                    "min_sample_size": 100,
+                    "approximate_statistics": False
                 },
                 "overrides": {
                     "statistical_test": parameters.get("statistical_test"),
                     "significance_level": parameters.get("significance_level"),
-                    "min_sample_size": parameters.get("min_sample_size")
+                    "min_sample_size": parameters.get("min_sample_size"),
+                    "baseline_profile_id": parameters.get("baseline_profile_id"),
+                    "approximate_statistics": parameters.get("approximate_statistics")
                 },
                 "parameters": {
                     "statistical_test": statistical_test,
                     "significance_level": significance_level,
-                    "min_sample_size": min_sample_size
+                    "min_sample_size": min_sample_size,
+                    "baseline_profile_id": baseline_profile_id,
+                    "approximate_statistics": approximate_statistics
                 }
             },
             "alerts": alerts,
@@ -761,94 +854,3 @@ def execute_drift_detector(
             "error": str(e),
             "execution_time_ms": int((time.time() - start_time) * 1000)
         }
-
-def _calculate_psi(baseline, current, bins=10):
-    """Calculate Population Stability Index"""
-    def _psi_bin(baseline_bin, current_bin):
-        if current_bin == 0:
-            current_bin = 0.0001
-        if baseline_bin == 0:
-            baseline_bin = 0.0001
-        return (current_bin - baseline_bin) * np.log(current_bin / baseline_bin)
-    
-    # Use numpy histogram
-    # Determine bin edges from baseline
-    try:
-        hist_baseline, bin_edges = np.histogram(baseline, bins=bins)
-        hist_current, _ = np.histogram(current, bins=bin_edges)
-        
-        # Normalize
-        baseline_counts = hist_baseline / len(baseline)
-        current_counts = hist_current / len(current)
-        
-        psi = 0
-        for i in range(len(baseline_counts)):
-            psi += _psi_bin(baseline_counts[i], current_counts[i])
-        
-        return abs(psi)
-    except:
-        return 0.0
-
-def _calculate_psi_categorical(baseline_dist, current_dist):
-    """Calculate PSI for categorical distributions"""
-    def _psi_component(baseline_bin, current_bin):
-        if current_bin == 0:
-            current_bin = 0.0001
-        if baseline_bin == 0:
-            baseline_bin = 0.0001
-        return (current_bin - baseline_bin) * np.log(current_bin / baseline_bin)
-    
-    psi = 0
-    all_categories = set(baseline_dist.keys()) | set(current_dist.keys())
-    
-    for cat in all_categories:
-        baseline_bin = baseline_dist.get(cat, 0)
-        current_bin = current_dist.get(cat, 0)
-        psi += _psi_component(baseline_bin, current_bin)
-    
-    return abs(psi)
-
-def _calculate_js_divergence(baseline, current):
-    """Calculate Jensen-Shannon divergence"""
-    # Create bins for both distributions
-    all_data = np.concatenate([baseline, current])
-    
-    if len(all_data) == 0:
-        return 0.0
-    
-    # Create appropriate number of bins based on data characteristics
-    n_bins = min(10, int(np.sqrt(len(all_data))))
-    if n_bins < 2:
-        n_bins = 2
-    
-    try:
-        bins = np.histogram_bin_edges(all_data, bins=n_bins)
-        
-        baseline_hist, _ = np.histogram(baseline, bins=bins)
-        current_hist, _ = np.histogram(current, bins=bins)
-        
-        # Normalize to probabilities
-        baseline_hist = baseline_hist / (baseline_hist.sum() + 1e-10)
-        current_hist = current_hist / (current_hist.sum() + 1e-10)
-        
-        # Calculate JS divergence
-        m = 0.5 * (baseline_hist + current_hist)
-        
-        # KL divergence component 1
-        kl_1 = 0.0
-        for i in range(len(baseline_hist)):
-            if baseline_hist[i] > 0 and m[i] > 0:
-                kl_1 += baseline_hist[i] * np.log(baseline_hist[i] / m[i])
-        
-        # KL divergence component 2
-        kl_2 = 0.0
-        for i in range(len(current_hist)):
-            if current_hist[i] > 0 and m[i] > 0:
-                kl_2 += current_hist[i] * np.log(current_hist[i] / m[i])
-        
-        # JS divergence is sqrt of average KL divergences
-        js_div = np.sqrt(0.5 * (kl_1 + kl_2))
-        
-        return float(js_div)
-    except:
-        return 0.0
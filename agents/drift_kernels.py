@@ -0,0 +1,596 @@
+"""
+Drift Kernels
+
+Vectorized distribution comparisons for the Drift Detector.
+
+Histograms of all numeric columns are built in one batched pass: every
+column is mapped to bin indices in a single Polars select and the counts of
+all columns come from one np.bincount. PSI and JS divergence are then
+evaluated with array operations. Categorical PSI joins the baseline and
+current category counts instead of iterating over Python dicts.
+
+Two-sample tests (KS, Wasserstein) need the raw values; above
+TEST_SAMPLE_THRESHOLD rows they run on a seeded random sample whose size is
+reported with the result.
+
+A baseline can also be summarized once into a compact, JSON-serializable
+profile (build_baseline_profile, built from row batches with the sketches
+of agents.sketches): per column the schema, null counts, summary
+statistics, the PSI histogram, a percentile grid and the top-K category
+counts. Numeric columns with at most PROFILE_TOP_K distinct values
+also keep their exact value counts. The profile_* kernels compare a current
+file against such a profile. PSI is exact; JS divergence, KS and
+Wasserstein use the exact value counts when present and otherwise the
+baseline distribution interpolated from its percentile grid.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+import polars as pl
+
+from agents.agent_utils import DEFAULT_BATCH_ROWS
+from agents.sketches import FrequentValues, HyperLogLog, QuantileSketch, sketch_quantiles
+
+
+# Bins used for PSI (edges from the baseline range)
+PSI_BINS = 10
+# Upper bound on bins used for JS divergence (edges from the combined range)
+JS_MAX_BINS = 10
+# Floor applied to empty bins so PSI stays finite
+PSI_EPSILON = 0.0001
+# Rows above which two-sample tests run on a random sample
+TEST_SAMPLE_THRESHOLD = 200_000
+TEST_SAMPLE_SEED = 42
+# Percentile grid stored in baseline profiles (0, 1, ..., 100)
+PROFILE_QUANTILES = np.linspace(0.0, 1.0, 101)
+# Categories (and distinct numeric values) kept per column in baseline profiles
+PROFILE_TOP_K = 1000
+# Bump when the stored baseline profile format changes
+PROFILE_FORMAT_VERSION = 1
+# Bucket of categories outside a profile's top-K
+OTHER_CATEGORY = "__other__"
+
+
+def summary_statistics(df: pl.DataFrame, columns: List[str], approximate: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Mean, median, standard deviation, min and max of the non-null values of each column, in one query.
+
+    With approximate=True the medians come from quantile sketches built over
+    row batches instead of a full sort, and each column also reports
+    median_rank_error (worst-case normalized rank error of the median).
+    """
+    if not columns:
+        return {}
+
+    stats = {
+        "mean": lambda c: pl.col(c).mean(),
+        "stddev": lambda c: pl.col(c).std(),
+        "min": lambda c: pl.col(c).min(),
+        "max": lambda c: pl.col(c).max(),
+    }
+    if not approximate:
+        stats["median"] = lambda c: pl.col(c).median()
+    row = df.select([
+        expr(c).cast(pl.Float64).alias(f"{name}__{i}")
+        for i, c in enumerate(columns)
+        for name, expr in stats.items()
+    ]).row(0, named=True)
+
+    result = {
+        c: {name: float(row[f"{name}__{i}"]) if row[f"{name}__{i}"] is not None else float("nan") for name in stats}
+        for i, c in enumerate(columns)
+    }
+    if approximate:
+        sketches = sketch_quantiles(df.select(columns).iter_slices(n_rows=DEFAULT_BATCH_ROWS), columns)
+        for c, sketch in sketches.items():
+            median = sketch.quantiles([0.5])[0]
+            result[c]["median"] = float(median) if median is not None else float("nan")
+            result[c]["median_rank_error"] = round(sketch.rank_error, 6)
+    return result
+
+
+def histogram_drift(
+    baseline_df: pl.DataFrame,
+    current_df: pl.DataFrame,
+    columns: List[str],
+    baseline_stats: Dict[str, Dict[str, float]],
+    current_stats: Dict[str, Dict[str, float]]
+) -> Dict[str, Dict[str, float]]:
+    """
+    PSI and JS divergence of each numeric column.
+
+    PSI uses PSI_BINS equal-width bins over the baseline range; JS divergence
+    uses up to JS_MAX_BINS bins over the combined range. Values outside the
+    edges are not counted, as with np.histogram.
+    """
+    if not columns:
+        return {}
+
+    psi_edges = []
+    js_edges = []
+    for c in columns:
+        psi_edges.append(_bin_range(baseline_stats[c]["min"], baseline_stats[c]["max"]) + (PSI_BINS,))
+        total = baseline_df[c].count() + current_df[c].count()
+        n_bins = max(2, min(JS_MAX_BINS, int(np.sqrt(total))))
+        js_edges.append(_bin_range(
+            min(baseline_stats[c]["min"], current_stats[c]["min"]),
+            max(baseline_stats[c]["max"], current_stats[c]["max"])
+        ) + (n_bins,))
+
+    baseline_psi = _batched_histograms(baseline_df, columns, psi_edges)
+    current_psi = _batched_histograms(current_df, columns, psi_edges)
+    baseline_js = _batched_histograms(baseline_df, columns, js_edges)
+    current_js = _batched_histograms(current_df, columns, js_edges)
+
+    results = {}
+    for i, c in enumerate(columns):
+        n_baseline = baseline_df[c].count()
+        n_current = current_df[c].count()
+        psi = psi_from_proportions(baseline_psi[i] / n_baseline, current_psi[i] / n_current)
+        js = js_divergence_from_counts(baseline_js[i], current_js[i])
+        results[c] = {"psi": psi, "js_divergence": js}
+
+    return results
+
+
+def psi_from_proportions(baseline: np.ndarray, current: np.ndarray) -> float:
+    """Population Stability Index of two aligned proportion vectors."""
+    baseline = np.where(baseline == 0, PSI_EPSILON, baseline)
+    current = np.where(current == 0, PSI_EPSILON, current)
+    return float(abs(np.sum((current - baseline) * np.log(current / baseline))))
+
+
+def js_divergence_from_counts(baseline: np.ndarray, current: np.ndarray) -> float:
+    """Jensen-Shannon distance (square root of the divergence) of two aligned count vectors."""
+    p = baseline / (baseline.sum() + 1e-10)
+    q = current / (current.sum() + 1e-10)
+    m = 0.5 * (p + q)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kl_p = np.where((p > 0) & (m > 0), p * np.log(p / m), 0.0).sum()
+        kl_q = np.where((q > 0) & (m > 0), q * np.log(q / m), 0.0).sum()
+    return float(np.sqrt(0.5 * (kl_p + kl_q)))
+
+
+def categorical_psi(baseline_col: pl.Series, current_col: pl.Series) -> Tuple[float, int, int]:
+    """
+    PSI between the category distributions of two non-null series.
+
+    Returns: (psi, baseline unique values, current unique values)
+    """
+    baseline_counts = _category_proportions(baseline_col)
+    current_counts = _category_proportions(current_col)
+    psi = _joined_psi(baseline_counts, current_counts)
+    return psi, baseline_counts.height, current_counts.height
+
+
+def sample_for_tests(col: pl.Series) -> np.ndarray:
+    """Values of a non-null series for two-sample tests, sampled above TEST_SAMPLE_THRESHOLD rows."""
+    if col.len() > TEST_SAMPLE_THRESHOLD:
+        col = col.sample(n=TEST_SAMPLE_THRESHOLD, seed=TEST_SAMPLE_SEED)
+    return col.to_numpy()
+
+
+def _bin_range(low: float, high: float) -> Tuple[float, float]:
+    """Histogram range; a constant column gets a unit-wide range like np.histogram."""
+    if low == high:
+        return low - 0.5, high + 0.5
+    return low, high
+
+
+def _batched_histograms(
+    df: pl.DataFrame,
+    columns: List[str],
+    edges: List[Tuple[float, float, int]]
+) -> List[np.ndarray]:
+    """Equal-width histograms of several columns from one bin-index query and one bincount."""
+    width = max(n_bins for _, _, n_bins in edges) + 1
+
+    index_exprs = []
+    for i, (c, (low, high, n_bins)) in enumerate(zip(columns, edges)):
+        value = pl.col(c).cast(pl.Float64)
+        in_range = value.is_not_null() & (value >= low) & (value <= high)
+        # The last bin is closed on the right
+        bin_index = ((value - low) / (high - low) * n_bins).floor().clip(0, n_bins - 1)
+        index_exprs.append(
+            pl.when(in_range).then(bin_index).otherwise(n_bins)
+            .cast(pl.Int64)
+            .alias(f"bin__{i}")
+        )
+
+    # Offset each column's bin indices so all columns share one bincount
+    indices = df.select(index_exprs).to_numpy() + np.arange(len(columns)) * width
+    counts = np.bincount(indices.ravel(), minlength=len(columns) * width).reshape(len(columns), width)
+
+    return [counts[i, :n_bins].astype(float) for i, (_, _, n_bins) in enumerate(edges)]
+
+
+def _joined_psi(baseline_counts: pl.DataFrame, current_counts: pl.DataFrame) -> float:
+    """PSI of two (category, proportion) frames joined on category."""
+    categories = pl.concat([
+        baseline_counts.select("category"),
+        current_counts.select("category")
+    ]).unique()
+    joined = (
+        categories
+        .join(baseline_counts.rename({"proportion": "baseline"}), on="category", how="left")
+        .join(current_counts.rename({"proportion": "current"}), on="category", how="left")
+        .fill_null(0.0)
+    )
+    return psi_from_proportions(joined["baseline"].to_numpy(), joined["current"].to_numpy())
+
+
+def _category_proportions(col: pl.Series) -> pl.DataFrame:
+    """Share of each category in a non-null series, keyed by its string form."""
+    total = col.len()
+    return (
+        col.cast(pl.Utf8).alias("category").to_frame()
+        .group_by("category")
+        .agg((pl.len() / total).alias("proportion"))
+    )
+
+
+# =============================================================================
+# BASELINE PROFILES
+# =============================================================================
+
+
+def build_baseline_profile(
+    batches: Callable[[], Iterable[pl.DataFrame]],
+    numeric_dtypes: List[pl.DataType],
+    source: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Summarize a baseline into a compact profile for later drift runs.
+
+    The baseline is read batch by batch, twice, so it never has to be held
+    whole: the first pass merges moments, quantile sketches and
+    frequent-value sketches per batch, and the second builds the PSI
+    histograms over the range found by the first. Later batches are cast
+    to the schema of the first. Means, standard deviations, extremes,
+    histograms, category and value counts are exact; the median and the
+    percentile grid come from the quantile sketch and the profile records
+    their worst-case rank error. Category counts are exact while a column
+    has at most PROFILE_TOP_K distinct values (otherwise lower bounds and
+    an estimated distinct count).
+
+    Args:
+        batches: Returns a new iterable of the baseline's row batches on
+            every call (e.g. DatasetContext.iter_batches)
+        numeric_dtypes: Dtypes compared as numeric distributions
+        source: Optional metadata about the profiled file (e.g. filename)
+
+    Returns:
+        JSON-serializable profile
+    """
+    schema: Dict[str, pl.DataType] = {}
+    row_count = 0
+    non_null: Dict[str, int] = {}
+    moments: Dict[str, Tuple[int, float, float, float, float]] = {}
+    quantiles: Dict[str, QuantileSketch] = {}
+    frequent: Dict[str, FrequentValues] = {}
+    distinct: Dict[str, HyperLogLog] = {}
+
+    for batch in batches():
+        if not schema:
+            schema = dict(batch.schema)
+            numeric = [c for c in schema if schema[c] in numeric_dtypes]
+            quantiles = {c: QuantileSketch() for c in numeric}
+            frequent = {c: FrequentValues(PROFILE_TOP_K) for c in schema}
+            distinct = {c: HyperLogLog() for c in schema if c not in quantiles}
+        else:
+            batch = batch.cast(schema, strict=False)
+        row_count += batch.height
+        for c, count in batch.select([pl.col(c).count() for c in schema]).row(0, named=True).items():
+            non_null[c] = non_null.get(c, 0) + count
+        if quantiles:
+            _merge_moments(moments, batch, list(quantiles))
+
+        for c in schema:
+            values = batch[c].drop_nulls()
+            if c in quantiles:
+                values = values.cast(pl.Float64)
+                quantiles[c].update(values.to_numpy())
+            else:
+                values = values.cast(pl.Utf8)
+                distinct[c].update(values)
+            if c in frequent:
+                frequent[c].update(values.alias("value"))
+                # Numeric value counts are only kept while exact
+                if c in quantiles and frequent[c].max_count_error:
+                    del frequent[c]
+
+    numeric_cols = [c for c in quantiles if non_null[c] > 0]
+    stats = {}
+    for c in numeric_cols:
+        count, mean, m2, low, high = moments[c]
+        median = quantiles[c].quantiles([0.5])[0]
+        stats[c] = {
+            "mean": mean,
+            "stddev": float(np.sqrt(m2 / (count - 1))) if count > 1 else float("nan"),
+            "min": low,
+            "max": high,
+            "median": float(median),
+            "median_rank_error": round(quantiles[c].rank_error, 6)
+        }
+
+    edges = [_bin_range(stats[c]["min"], stats[c]["max"]) + (PSI_BINS,) for c in numeric_cols]
+    histograms = [np.zeros(PSI_BINS) for _ in numeric_cols]
+    if numeric_cols:
+        for batch in batches():
+            batch_histograms = _batched_histograms(batch.cast(schema, strict=False), numeric_cols, edges)
+            for histogram, counts in zip(histograms, batch_histograms):
+                histogram += counts
+
+    columns = {}
+    for c, dtype in schema.items():
+        column = {
+            "dtype": str(dtype),
+            "kind": "numeric" if c in stats else "categorical",
+            "non_null_count": int(non_null[c]),
+            "null_count": int(row_count - non_null[c]),
+            "null_rate": round((row_count - non_null[c]) / row_count, 6) if row_count else 0.0
+        }
+
+        if c in stats:
+            i = numeric_cols.index(c)
+            column["statistics"] = stats[c]
+            column["histogram"] = {
+                "low": edges[i][0],
+                "high": edges[i][1],
+                "counts": [int(n) for n in histograms[i]]
+            }
+            column["quantiles"] = [float(q) for q in quantiles[c].quantiles(list(PROFILE_QUANTILES))]
+            column["quantile_rank_error"] = round(quantiles[c].rank_error, 6)
+            if c in frequent:
+                column["value_counts"] = sorted([float(v), int(n)] for v, n in frequent[c].top(PROFILE_TOP_K))
+        elif non_null[c] > 0:
+            counts = frequent[c].counts.sort(["count", "value"], descending=[True, False])
+            complete = frequent[c].max_count_error == 0
+            column["distinct_count"] = counts.height if complete else max(counts.height, distinct[c].estimate())
+            column["top_values"] = [[v, int(n)] for v, n in counts.head(PROFILE_TOP_K).iter_rows()]
+            column["top_values_complete"] = complete
+        else:
+            column["distinct_count"] = 0
+            column["top_values"] = []
+            column["top_values_complete"] = True
+
+        columns[c] = column
+
+    return {
+        "format_version": PROFILE_FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "source": source or {},
+        "row_count": row_count,
+        "schema": {c: str(dtype) for c, dtype in schema.items()},
+        "columns": columns
+    }
+
+
+def _merge_moments(
+    moments: Dict[str, Tuple[int, float, float, float, float]],
+    batch: pl.DataFrame,
+    columns: List[str]
+) -> None:
+    """Merge one batch's (count, mean, M2, min, max) per column into running moments (Chan et al.)."""
+    stats = {
+        "count": lambda c: pl.col(c).count(),
+        "mean": lambda c: pl.col(c).mean(),
+        "m2": lambda c: pl.col(c).var(ddof=0) * pl.col(c).count(),
+        "min": lambda c: pl.col(c).min(),
+        "max": lambda c: pl.col(c).max(),
+    }
+    row = batch.select([
+        expr(c).cast(pl.Float64).alias(f"{name}__{i}")
+        for i, c in enumerate(columns)
+        for name, expr in stats.items()
+    ]).row(0, named=True)
+
+    for i, c in enumerate(columns):
+        n_b = int(row[f"count__{i}"])
+        if n_b == 0:
+            continue
+        mean_b, m2_b, low_b, high_b = (row[f"{name}__{i}"] for name in ("mean", "m2", "min", "max"))
+        if c not in moments:
+            moments[c] = (n_b, mean_b, m2_b, low_b, high_b)
+            continue
+        n_a, mean_a, m2_a, low_a, high_a = moments[c]
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        moments[c] = (
+            n,
+            mean_a + delta * n_b / n,
+            m2_a + m2_b + delta * delta * n_a * n_b / n,
+            min(low_a, low_b),
+            max(high_a, high_b)
+        )
+
+
+def profile_histogram_drift(
+    profile: Dict[str, Any],
+    current_df: pl.DataFrame,
+    columns: List[str],
+    current_stats: Dict[str, Dict[str, float]]
+) -> Dict[str, Dict[str, float]]:
+    """
+    PSI and JS divergence of each numeric column against a baseline profile.
+
+    PSI reuses the stored baseline histogram and is exact. For JS divergence
+    the baseline counts on the combined-range bins come from the stored
+    value counts, or are estimated from the stored percentile grid.
+    """
+    if not columns:
+        return {}
+
+    profiles = [profile["columns"][c] for c in columns]
+    psi_edges = [
+        (p["histogram"]["low"], p["histogram"]["high"], len(p["histogram"]["counts"]))
+        for p in profiles
+    ]
+    js_edges = []
+    for c, p in zip(columns, profiles):
+        total = p["non_null_count"] + current_df[c].count()
+        n_bins = max(2, min(JS_MAX_BINS, int(np.sqrt(total))))
+        js_edges.append(_bin_range(
+            min(p["statistics"]["min"], current_stats[c]["min"]),
+            max(p["statistics"]["max"], current_stats[c]["max"])
+        ) + (n_bins,))
+
+    current_psi = _batched_histograms(current_df, columns, psi_edges)
+    current_js = _batched_histograms(current_df, columns, js_edges)
+
+    results = {}
+    for i, (c, p) in enumerate(zip(columns, profiles)):
+        baseline_counts = np.asarray(p["histogram"]["counts"], dtype=float)
+        psi = psi_from_proportions(baseline_counts / p["non_null_count"], current_psi[i] / current_df[c].count())
+
+        js = js_divergence_from_counts(_profile_bin_counts(p, *js_edges[i]), current_js[i])
+
+        results[c] = {"psi": psi, "js_divergence": js}
+
+    return results
+
+
+def profile_two_sample_tests(column_profile: Dict[str, Any], current: np.ndarray) -> Dict[str, float]:
+    """
+    KS statistic and p-value, and Wasserstein distance, against a baseline profile.
+
+    The baseline CDF comes from the stored value counts or is interpolated
+    from the stored percentile grid. Both CDFs are compared just below and
+    at each distinct current value, which is where the largest gap between
+    a step function and a monotone CDF lies, so ties and point masses are
+    handled like ks_2samp. The p-value uses the asymptotic two-sample
+    distribution like ks_2samp.
+    """
+    from scipy.stats import kstwo, wasserstein_distance
+
+    n_baseline = column_profile["non_null_count"]
+    n_current = len(current)
+    if n_baseline == 0 or n_current == 0:
+        return {"ks_statistic": 0.0, "p_value": 1.0, "wasserstein_distance": 0.0}
+
+    values, counts = np.unique(current, return_counts=True)
+    cumulative = np.cumsum(counts)
+    ecdf_at = cumulative / n_current
+    ecdf_below = (cumulative - counts) / n_current
+    statistic = max(
+        float(np.max(np.abs(ecdf_at - _profile_cdf(column_profile, values)))),
+        float(np.max(np.abs(ecdf_below - _profile_cdf(column_profile, values, side="left"))))
+    )
+    effective_n = max(1, int(round(n_baseline * n_current / (n_baseline + n_current))))
+    p_value = float(min(1.0, max(0.0, kstwo.sf(statistic, effective_n))))
+
+    if "value_counts" in column_profile:
+        baseline_values, baseline_counts = _profile_value_counts(column_profile)
+        wasserstein = float(wasserstein_distance(baseline_values, current, u_weights=baseline_counts))
+    else:
+        # Wasserstein-1 is the area between the two quantile functions
+        baseline_quantiles = np.asarray(column_profile["quantiles"])
+        current_quantiles = np.quantile(current, PROFILE_QUANTILES)
+        gaps = np.abs(baseline_quantiles - current_quantiles)
+        wasserstein = float(np.sum((gaps[1:] + gaps[:-1]) / 2 * np.diff(PROFILE_QUANTILES)))
+
+    return {"ks_statistic": statistic, "p_value": p_value, "wasserstein_distance": wasserstein}
+
+
+def profile_categorical_psi(column_profile: Dict[str, Any], current_col: pl.Series) -> Tuple[float, int, int]:
+    """
+    PSI between a baseline profile's category counts and a non-null current series.
+
+    If the profile only kept the top-K categories, the remaining baseline
+    mass and the current categories outside the top-K share one bucket.
+
+    Returns: (psi, baseline unique values, current unique values)
+    """
+    top_values = column_profile.get("top_values", [])
+    n_baseline = column_profile["non_null_count"]
+    baseline_counts = pl.DataFrame(
+        {
+            "category": [v for v, _ in top_values],
+            "proportion": [n / n_baseline for _, n in top_values]
+        },
+        schema={"category": pl.Utf8, "proportion": pl.Float64}
+    )
+    current_counts = _category_proportions(current_col)
+    current_unique = current_counts.height
+
+    if not column_profile.get("top_values_complete", True):
+        other = 1.0 - sum(n for _, n in top_values) / n_baseline
+        baseline_counts = pl.concat([
+            baseline_counts,
+            pl.DataFrame({"category": [OTHER_CATEGORY], "proportion": [other]})
+        ])
+        current_counts = (
+            current_counts
+            .with_columns(
+                pl.when(pl.col("category").is_in(baseline_counts["category"]))
+                .then(pl.col("category"))
+                .otherwise(pl.lit(OTHER_CATEGORY))
+                .alias("category")
+            )
+            .group_by("category")
+            .agg(pl.col("proportion").sum())
+        )
+
+    psi = _joined_psi(baseline_counts, current_counts)
+    return psi, column_profile.get("distinct_count", len(top_values)), current_unique
+
+
+def profile_quantile(column_profile: Dict[str, Any], q: float) -> float:
+    """Baseline quantile interpolated from a profile's percentile grid."""
+    return float(np.interp(q, PROFILE_QUANTILES, column_profile["quantiles"]))
+
+
+def _profile_value_counts(column_profile: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted distinct values of a profile's exact value counts and their counts."""
+    value_counts = np.asarray(column_profile["value_counts"], dtype=float).reshape(-1, 2)
+    return value_counts[:, 0], value_counts[:, 1]
+
+
+def _profile_cdf(column_profile: Dict[str, Any], x: np.ndarray, side: str = "right") -> np.ndarray:
+    """
+    Baseline CDF at x (side="right") or just below x (side="left").
+
+    Exact when the profile has value counts. Otherwise interpolated from the
+    percentile grid: a value repeated in the grid is a point mass, so the
+    CDF jumps there from the lowest to the highest percentile holding it
+    and is linear between distinct values.
+    """
+    if "value_counts" in column_profile:
+        values, counts = _profile_value_counts(column_profile)
+        cumulative = np.concatenate([[0.0], np.cumsum(counts)]) / counts.sum()
+        return cumulative[np.searchsorted(values, x, side=side)]
+
+    quantiles = np.asarray(column_profile["quantiles"])
+    values, first_index = np.unique(quantiles, return_index=True)
+    _, last_reversed = np.unique(quantiles[::-1], return_index=True)
+    below = PROFILE_QUANTILES[first_index]
+    at = PROFILE_QUANTILES[len(quantiles) - 1 - last_reversed]
+
+    # Last distinct value <= x and the next one
+    k = np.searchsorted(values, x, side="right") - 1
+    lower = np.clip(k, 0, len(values) - 1)
+    upper = np.clip(k + 1, 0, len(values) - 1)
+    span = values[upper] - values[lower]
+    fraction = np.where(span > 0, (x - values[lower]) / np.where(span > 0, span, 1.0), 0.0)
+    cdf = np.where(
+        k < 0, 0.0,
+        np.where(k >= len(values) - 1, 1.0, at[lower] + fraction * (below[upper] - at[lower]))
+    )
+    on_value = (k >= 0) & (values[lower] == x)
+    return np.where(on_value, (below if side == "left" else at)[lower], cdf)
+
+
+def _profile_bin_counts(column_profile: Dict[str, Any], low: float, high: float, n_bins: int) -> np.ndarray:
+    """Baseline counts on equal-width bins binned like _batched_histograms."""
+    if "value_counts" in column_profile:
+        values, counts = _profile_value_counts(column_profile)
+        in_range = (values >= low) & (values <= high)
+        bin_index = np.clip(np.floor((values - low) / (high - low) * n_bins), 0, n_bins - 1)
+        return np.bincount(bin_index[in_range].astype(int), weights=counts[in_range], minlength=n_bins)
+
+    # Bins are closed on the left, the last one also on the right
+    edges = np.linspace(low, high, n_bins + 1)
+    cdf = np.concatenate([_profile_cdf(column_profile, edges[:-1], side="left"), _profile_cdf(column_profile, edges[-1:])])
+    return np.diff(cdf) * column_profile["non_null_count"]
@@ -10,17 +10,16 @@ Output: Standardized duplicate resolution results with deduplication effectivene
 
 import polars as pl
 import numpy as np
-import io
 import time
 import re
-import base64
 from typing import Dict, Any, Optional, List, Set, Tuple
-from agents.agent_utils import safe_get_list
+from agents.agent_utils import safe_get_list, DatasetContext, load_dataframe, build_cleaned_file
 
 def execute_duplicate_resolver(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Detect and resolve duplicate records in data.
@@ -29,6 +28,7 @@ def execute_duplicate_resolver(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters from tool.json
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary
@@ -54,7 +54,7 @@ def execute_duplicate_resolver(
         if not filename.endswith('.csv'):
              raise ValueError(f"Unsupported file format: {filename}. Only CSV is supported.")
         
-        df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True)
+        df = load_dataframe(file_contents, dataset, ignore_errors=True)
 
         if df.height == 0:
              return {
@@ -463,12 +463,6 @@ def execute_duplicate_resolver(
                 "timeline": "2-3 weeks"
             })
 
-        # Generate cleaned file
-        output = io.BytesIO()
-        df_deduplicated.write_csv(output)
-        cleaned_file_bytes = output.getvalue()
-        cleaned_file_base64 = base64.b64encode(cleaned_file_bytes).decode('utf-8')
-
         return {
             "status": "success",
             "agent_id": "duplicate-resolver",
@@ -490,12 +484,7 @@ def execute_duplicate_resolver(
             "ai_analysis_text" : ai_analysis_text,
             "row_level_issues": row_level_issues,
             "issue_summary": issue_summary,
-            "cleaned_file": {
-                "filename": f"cleaned_{filename}",
-                "content": cleaned_file_base64,
-                "size_bytes": len(cleaned_file_bytes),
-                "format": filename.split('.')[-1].lower()
-            }
+            "cleaned_file": build_cleaned_file(df_deduplicated, filename, "cleaned_", dataset)
         }
 
     except Exception as e:
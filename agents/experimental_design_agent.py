@@ -9,16 +9,14 @@ Output: Required sample sizes for control/test groups, feasibility warnings,
         alerts/issues/recommendations following Agensium agent response standard.
 """
 
-import io
 import time
 import math
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 import numpy as np
-import polars as pl
 
-from .agent_utils import normalize_column_names
+from .agent_utils import normalize_column_names, DatasetContext, load_dataframe
 
 
 def _convert_numpy_types(obj: Any) -> Any:
@@ -183,7 +181,8 @@ def _calculate_sample_size_proportions(
 def execute_experimental_design_agent(
     file_contents: Optional[bytes],
     filename: Optional[str],
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """Execute experimental design analysis."""
 
@@ -217,10 +216,10 @@ def execute_experimental_design_agent(
         dataset_stats = {}
         row_level_issues: List[Dict[str, Any]] = []
         
-        if file_contents and filename:
+        if (file_contents or dataset is not None) and filename:
             if filename.lower().endswith(".csv"):
                 try:
-                    df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+                    df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
                     dataset_population = df.height
                     dataset_stats = {
                         "rows": df.height,
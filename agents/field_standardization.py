@@ -11,17 +11,30 @@ Output: Standardized field standardization results with effectiveness scores
 
 import polars as pl
 import numpy as np
-import io
 import time
 import re
-import base64
 from typing import Dict, Any, Optional, List, Set, Tuple
-from agents.agent_utils import safe_get_list, safe_get_dict
+from agents.agent_utils import safe_get_list, safe_get_dict, DatasetContext, load_dataframe, build_cleaned_file, parse_dates
+
+# strptime formats tried (in order) when standardizing date strings
+DATE_FORMATS = [
+    "%d-%m-%Y",       # 01-01-2025
+    "%d-%b-%y",       # 02-Jan-25
+    "%d-%b-%Y",       # 02-Jan-2025
+    "%Y-%m-%d",       # 2025-01-01
+    "%m/%d/%Y",       # 01/01/2025
+    "%d/%m/%Y",       # 14/01/2025
+    "%Y/%m/%d",       # 2025/01/01
+    "%d.%m.%Y",       # 01.01.2025
+    "%d %b %Y",       # 01 Jan 2025
+    "%d %B %Y",       # 01 January 2025
+]
 
 def execute_field_standardization(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Standardize field values in data.
@@ -30,6 +43,7 @@ def execute_field_standardization(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters from tool.json
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary
@@ -69,7 +83,7 @@ def execute_field_standardization(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
         except Exception as e:
              return {
                 "status": "error",
@@ -624,10 +638,6 @@ def execute_field_standardization(
                 "timeline": "2 weeks"
             })
 
-        # Generate cleaned file (CSV format)
-        cleaned_file_bytes = _generate_cleaned_file(df_standardized, filename)
-        cleaned_file_base64 = base64.b64encode(cleaned_file_bytes).decode('utf-8')
-
         return {
             "status": "success",
             "agent_id": "field-standardization",
@@ -648,12 +658,7 @@ def execute_field_standardization(
             "ai_analysis_text" : ai_analysis_text,
             "row_level_issues": row_level_issues,
             "issue_summary": issue_summary,
-            "cleaned_file": {
-                "filename": f"cleaned_{filename}",
-                "content": cleaned_file_base64,
-                "size_bytes": len(cleaned_file_bytes),
-                "format": filename.split('.')[-1].lower()
-            }
+            "cleaned_file": build_cleaned_file(df_standardized, filename, "cleaned_", dataset)
         }
 
     except Exception as e:
@@ -801,57 +806,42 @@ def _apply_standardization(
         # Apply basic transformations first
         df_standardized = df_standardized.with_columns(expr)
         
-        # 4. Apply synonym replacement
-        # This is tricky in Polars expressions if the map is large.
-        # We can use replace (map_dict in older versions, replace in newer)
+        # 4. Apply synonym replacement (case-insensitive lookup on the lowercased value)
         if apply_synonyms and col in synonym_mappings:
-            mapping = synonym_mappings[col]
-            # Normalize keys in mapping to match current case strategy if needed?
-            # The original code checks: if standardized_value.lower() == synonym.lower():
-            # This implies case-insensitive matching for synonyms.
-            
-            # To do this efficiently in Polars:
-            # We can use map_elements (slower) or a join.
-            # Let's use map_elements for flexibility with case insensitivity, 
-            # or better: normalize the column to lowercase temporarily for matching.
-            
-            # Let's stick to a python loop over the mapping if it's small, or map_elements.
-            # Given the complexity of "case insensitive match", map_elements is safest to replicate logic exactly.
-            
-            def apply_synonyms_func(val, mapping=mapping):
-                if val is None: return None
-                val_lower = val.lower()
-                for syn, std in mapping.items():
-                    if val_lower == syn.lower():
-                        return std
-                return val
-
-            df_standardized = df_standardized.with_columns(
-                pl.col(col).map_elements(apply_synonyms_func, return_dtype=pl.Utf8).alias(col)
-            )
+            lookup = _build_synonym_lookup(synonym_mappings[col])
+            if lookup.height > 0:
+                df_standardized = df_standardized.with_columns(
+                    pl.col(col).str.to_lowercase().replace_strict(
+                        lookup["synonym"],
+                        lookup["standard"],
+                        default=pl.col(col),
+                        return_dtype=pl.Utf8
+                    ).alias(col)
+                )
             
         # 5. Apply unit standardization
         if unit_standardization and col in unit_mappings:
-            unit_config = unit_mappings[col]
-            
-            def apply_unit_func(val, config=unit_config):
-                if val is None: return None
-                return _apply_unit_conversion(val, config)
-                
             df_standardized = df_standardized.with_columns(
-                pl.col(col).map_elements(apply_unit_func, return_dtype=pl.Utf8).alias(col)
+                _apply_unit_conversions(df_standardized[col], unit_mappings[col])
             )
 
         # 6. Apply date standardization
         if date_standardization:
             # Check if column is likely a date column
             if _is_likely_date_column(df_standardized[col]):
+                parsed, matched_formats = parse_dates(df_standardized[col], DATE_FORMATS)
+                # Unparseable values are kept (stripped); blank values become null
                 df_standardized = df_standardized.with_columns(
-                    pl.col(col).map_elements(
-                        lambda x: _standardize_date_string(x, target_date_format), 
-                        return_dtype=pl.Utf8
-                    ).alias(col)
+                    pl.when(pl.lit(parsed).is_not_null())
+                    .then(_format_dates(parsed, target_date_format))
+                    .otherwise(pl.col(col).str.strip_chars().replace("", None))
+                    .alias(col)
                 )
+                
+                format_counts = matched_formats.drop_nulls().value_counts(sort=True)
+                if format_counts.height > 0:
+                    formats_used = ", ".join(f"{fmt}: {count}" for fmt, count in format_counts.iter_rows())
+                    log.append(f"Parsed dates in column '{col}' to {target_date_format} (formats: {formats_used})")
             
         # Detect changes and log
         # We need to compare original_col with new col
@@ -889,23 +879,71 @@ def _apply_standardization(
     return df_standardized, log, row_issues
 
 
-def _apply_unit_conversion(value: str, unit_config: Dict[str, Any]) -> str:
-    """Apply unit conversion to a value string."""
-    # Example: "5 ft" -> "60 inches" using conversion rules
-    for unit_pattern, conversion in unit_config.items():
-        # Simple pattern matching for units
-        pattern = r'(\d+(?:\.\d+)?)\s*' + re.escape(unit_pattern)
-        match = re.search(pattern, value, re.IGNORECASE)
-        
-        if match:
-            number = float(match.group(1))
-            conversion_factor = conversion.get("factor", 1)
-            target_unit = conversion.get("target_unit", unit_pattern)
-            
-            converted_value = number * conversion_factor
-            return f"{converted_value} {target_unit}"
+def _build_synonym_lookup(mapping: Dict[str, Any]) -> pl.DataFrame:
+    """Compile a synonym mapping into a lowercase lookup frame (first synonym wins)."""
+    lookup: Dict[str, Optional[str]] = {}
+    for synonym, standard in mapping.items():
+        lookup.setdefault(str(synonym).lower(), None if standard is None else str(standard))
     
-    return value
+    return pl.DataFrame(
+        {"synonym": list(lookup.keys()), "standard": list(lookup.values())},
+        schema={"synonym": pl.Utf8, "standard": pl.Utf8}
+    )
+
+
+def _apply_unit_conversions(values: pl.Series, unit_config: Dict[str, Any]) -> pl.Series:
+    """
+    Apply unit conversion to a string column.
+    
+    Example: "5 ft" -> "60.0 inches" with {"ft": {"factor": 12, "target_unit": "inches"}}.
+    Each unit pattern is extracted natively into a number; the first pattern
+    (in mapping order) found in a value wins and is multiplied by its factor
+    from the factor table. Values without a known unit are kept.
+    """
+    if not unit_config or values.len() == 0:
+        return values
+    
+    units = list(unit_config.items())
+    numbers = [
+        pl.col("value").str.extract(r'(?i)(\d+(?:\.\d+)?)\s*' + re.escape(unit_pattern), 1)
+        for unit_pattern, _ in units
+    ]
+    factors = pl.DataFrame(
+        {
+            "unit_index": list(range(len(units))),
+            "factor": [float(conversion.get("factor", 1)) for _, conversion in units],
+            "target_unit": [str(conversion.get("target_unit", unit_pattern)) for unit_pattern, conversion in units]
+        },
+        schema={"unit_index": pl.Int64, "factor": pl.Float64, "target_unit": pl.Utf8}
+    )
+    
+    converted = pl.DataFrame({"value": values}).with_columns(
+        pl.coalesce([
+            pl.when(number.is_not_null()).then(pl.lit(idx, dtype=pl.Int64))
+            for idx, number in enumerate(numbers)
+        ]).alias("unit_index"),
+        pl.coalesce(numbers).cast(pl.Float64, strict=False).alias("number")
+    ).join(factors, on="unit_index", how="left", maintain_order="left").with_columns(
+        (pl.col("number") * pl.col("factor")).alias("converted")
+    )
+    
+    # Polars prints floats like Python's str() between 1e-4 and 1e16; outside
+    # that range the exponent differs (1e-5 vs 1e-05, and 1.2e18 vs 1.2e+18
+    # on some Polars versions), so those values are formatted with str()
+    converted_values = converted["converted"]
+    text = converted_values.cast(pl.Utf8)
+    magnitude = converted_values.abs()
+    exponent_form = ((magnitude < 1e-4) & (converted_values != 0)) | (magnitude >= 1e16)
+    if exponent_form.any():
+        exponent_idx = exponent_form.arg_true()
+        text = text.scatter(exponent_idx, [str(v) for v in converted_values.gather(exponent_idx)])
+    
+    return converted.select(
+        pl.when(pl.col("unit_index").is_not_null())
+        .then(pl.lit(text) + " " + pl.col("target_unit"))
+        .otherwise(pl.col("value"))
+        .alias(values.name)
+    ).to_series()
 
 
 def _is_likely_date_column(series: pl.Series) -> bool:
@@ -932,42 +970,12 @@ def _is_likely_date_column(series: pl.Series) -> bool:
     return (match_count / sample.len()) > 0.5
 
 
-def _standardize_date_string(value: Optional[str], target_format: str = "%Y-%m-%d") -> Optional[str]:
-    """
-    Parse and standardize a date string.
-    Handles formats: 01-01-2025, 02-Jan-25, 14-01-2025, 24-Jan-25
-    """
-    if value is None:
-        return None
-        
-    value = str(value).strip()
-    if not value:
-        return None
-        
-    from datetime import datetime
-    
-    # List of formats to try
-    formats = [
-        "%d-%m-%Y",       # 01-01-2025
-        "%d-%b-%y",       # 02-Jan-25
-        "%d-%b-%Y",       # 02-Jan-2025
-        "%Y-%m-%d",       # 2025-01-01
-        "%m/%d/%Y",       # 01/01/2025
-        "%d/%m/%Y",       # 14/01/2025
-        "%Y/%m/%d",       # 2025/01/01
-        "%d.%m.%Y",       # 01.01.2025
-        "%d %b %Y",       # 01 Jan 2025
-        "%d %B %Y",       # 01 January 2025
-    ]
-    
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(value, fmt)
-            return dt.strftime(target_format)
-        except ValueError:
-            continue
-            
-    return value  # Return original if parsing fails
+def _format_dates(parsed: pl.Series, target_format: str) -> pl.Series:
+    """Format parsed dates with a strftime format (Python fallback for directives Polars lacks)."""
+    try:
+        return parsed.dt.strftime(target_format)
+    except pl.exceptions.PolarsError:
+        return parsed.map_elements(lambda dt: dt.strftime(target_format), return_dtype=pl.Utf8)
 
 
 def _calculate_improvements(pre_analysis: Dict[str, Any], post_analysis: Dict[str, Any]) -> Dict[str, Any]:
@@ -1115,20 +1123,3 @@ def _calculate_standardization_score(
             "standardized_columns": len(standardized_df.columns)
         }
     }
-
-
-def _generate_cleaned_file(df: pl.DataFrame, original_filename: str) -> bytes:
-    """
-    Generate cleaned data file in CSV format.
-    
-    Args:
-        df: Cleaned dataframe
-        original_filename: Original filename to determine format
-        
-    Returns:
-        File contents as bytes
-    """
-    # Always export as CSV for consistency and compatibility
-    output = io.BytesIO()
-    df.write_csv(output)
-    return output.getvalue()
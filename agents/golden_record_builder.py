@@ -17,30 +17,42 @@ Input: CSV file (primary) with potential duplicates/related records
 Output: Golden records with trust scores, source attributions, and conflict resolutions
 """
 
-import io
 import re
 import time
-import base64
+import zlib
+import bisect
 import hashlib
+import numpy as np
 import polars as pl
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from collections import defaultdict
-from agents.agent_utils import safe_get_list, safe_get_dict
+from agents.agent_utils import safe_get_list, safe_get_dict, DatasetContext, load_dataframe, build_cleaned_file
 
 try:
     import rapidfuzz
-    from rapidfuzz import fuzz, distance
+    from rapidfuzz import fuzz, distance, process
     import jellyfish
 except ImportError:
     rapidfuzz = None
     jellyfish = None
 
+# Candidate generation (blocking) for fuzzy matching
+FUZZY_NGRAM_SIZE = 3
+FUZZY_MINHASH_BANDS = 8
+FUZZY_MINHASH_ROWS = 3
+FUZZY_SORTED_WINDOW = 10
+_MINHASH_PRIME = (1 << 31) - 1
+_minhash_rng = np.random.RandomState(7919)
+_MINHASH_A = _minhash_rng.randint(1, _MINHASH_PRIME, FUZZY_MINHASH_BANDS * FUZZY_MINHASH_ROWS).astype(np.uint64)
+_MINHASH_B = _minhash_rng.randint(0, _MINHASH_PRIME, FUZZY_MINHASH_BANDS * FUZZY_MINHASH_ROWS).astype(np.uint64)
+
 
 def execute_golden_record_builder(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Build golden records from potentially duplicate/related records.
@@ -49,6 +61,7 @@ def execute_golden_record_builder(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters including survivorship rules and match keys
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary with golden record results
@@ -70,6 +83,8 @@ def execute_golden_record_builder(
     # Fuzzy matching parameters
     enable_fuzzy_matching = parameters.get("enable_fuzzy_matching", False)
     fuzzy_threshold = parameters.get("fuzzy_threshold", 80.0)
+    fuzzy_blocking_min_records = parameters.get("fuzzy_blocking_min_records", 2000)
+    fuzzy_max_block_size = parameters.get("fuzzy_max_block_size", 500)
     
     # Scoring thresholds
     excellent_threshold = parameters.get("excellent_threshold", 90)
@@ -86,7 +101,7 @@ def execute_golden_record_builder(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000, truncate_ragged_lines=True)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000, truncate_ragged_lines=True)
         except Exception as e:
             return {
                 "status": "error",
@@ -140,7 +155,14 @@ def execute_golden_record_builder(
                )
                # IMPORTANT: Do NOT use match keys as strict blocking keys.
                # Blocking by exact equality across multiple match keys disables fuzzy matching.
-               clusters = _build_fuzzy_clusters(df, derived_fuzzy_config, fuzzy_threshold, blocking_keys=[])
+               clusters = _build_fuzzy_clusters(
+                  df,
+                  derived_fuzzy_config,
+                  fuzzy_threshold,
+                  blocking_keys=[],
+                  blocking_min_records=fuzzy_blocking_min_records,
+                  max_block_size=fuzzy_max_block_size
+               )
         else:
              clusters = _build_record_clusters(df, valid_match_keys)
         
@@ -151,21 +173,27 @@ def execute_golden_record_builder(
         values_survived = 0
         row_level_issues = []
         
-        for idx, (cluster_id, cluster_info) in enumerate(clusters.items()):
+        # Resolve every column of every cluster in one group-wise pass
+        resolved_clusters = _resolve_clusters(
+            df=df,
+            clusters=clusters,
+            survivorship_rules=survivorship_rules,
+            default_rule=default_survivorship_rule,
+            source_column=source_column,
+            source_priority=source_priority,
+            timestamp_column=timestamp_column
+        )
+        
+        for (cluster_id, cluster_info), resolved in zip(clusters.items(), resolved_clusters.iter_rows(named=True)):
             cluster_rows = cluster_info["rows"]
-            cluster_df = df.filter(pl.col("__row_index__").is_in(cluster_rows)) if "__row_index__" in df.columns else df[cluster_rows]
             
-            # Build golden record for this cluster
             golden_record, resolutions, cluster_conflicts = _build_single_golden_record(
-                cluster_df=df[cluster_rows[0]:cluster_rows[-1]+1] if len(cluster_rows) == 1 else _get_cluster_df(df, cluster_rows),
+                resolved=resolved,
+                columns=df.columns,
                 cluster_id=cluster_id,
                 survivorship_rules=survivorship_rules,
                 default_rule=default_survivorship_rule,
-                source_column=source_column,
-                source_priority=source_priority,
-                timestamp_column=timestamp_column,
-                df_full=df,
-                cluster_rows=cluster_rows
+                cluster_size=len(cluster_rows)
             )
             
             golden_record_entry = {
@@ -496,10 +524,6 @@ def execute_golden_record_builder(
             "timeline": "3 weeks"
         })
 
-        # Generate cleaned file (golden records CSV)
-        cleaned_file_bytes = _generate_golden_file(golden_df, filename)
-        cleaned_file_base64 = base64.b64encode(cleaned_file_bytes).decode('utf-8')
-
         return {
             "status": "success",
             "agent_id": "golden-record-builder",
@@ -523,12 +547,7 @@ def execute_golden_record_builder(
             "ai_analysis_text": ai_analysis_text,
             "row_level_issues": row_level_issues,
             "issue_summary": issue_summary,
-            "cleaned_file": {
-                "filename": f"mastered_{filename}",
-                "content": cleaned_file_base64,
-                "size_bytes": len(cleaned_file_bytes),
-                "format": filename.split('.')[-1].lower()
-            }
+            "cleaned_file": build_cleaned_file(golden_df, filename, "mastered_", dataset)
         }
 
     except Exception as e:
@@ -625,115 +644,253 @@ def _build_record_clusters(df: pl.DataFrame, match_keys: List[str]) -> Dict[str,
             }
         return clusters
     
-    # Group by match keys
-    cluster_map = defaultdict(list)
-    
-    for i in range(df.height):
-        row = df.row(i)
-        key_values = []
-        for col in match_keys:
-            if col in df.columns:
-                val = row[df.columns.index(col)]
-                # Normalize value: convert to string, strip whitespace, handle None
-                if val is None:
-                    key_values.append("")
-                else:
-                    key_values.append(str(val).strip())
-            else:
-                key_values.append("")
-        
-        cluster_map[tuple(key_values)].append(i)
+    # Normalize keys: None -> "", strings stripped (missing columns match everything)
+    key_exprs = []
+    for idx, col in enumerate(match_keys):
+        if col not in df.columns:
+            continue
+        if df[col].dtype == pl.Utf8:
+            key_expr = pl.col(col).fill_null("").str.strip_chars()
+        else:
+            key_expr = pl.col(col)
+        key_exprs.append(key_expr.alias(f"__match_key_{idx}__"))
+    
+    if not key_exprs:
+        return {"cluster_0": {"rows": list(range(df.height)), "match_values": {col: "" for col in match_keys}}}
+    
+    # Group by match keys in order of first appearance
+    grouped = (
+        df.lazy()
+        .with_row_index("__row_index__")
+        .group_by(key_exprs, maintain_order=True)
+        .agg(pl.col("__row_index__"))
+        .collect()
+    )
+    
+    key_columns = {}
+    for idx, col in enumerate(match_keys):
+        if col in df.columns:
+            key_columns[col] = [
+                "" if val is None else str(val).strip()
+                for val in grouped[f"__match_key_{idx}__"].to_list()
+            ]
     
     # Convert to cluster dict
-    for idx, (key_values, rows) in enumerate(cluster_map.items()):
+    for idx, rows in enumerate(grouped["__row_index__"].to_list()):
         cluster_id = f"cluster_{idx}"
         clusters[cluster_id] = {
             "rows": rows,
-            "match_values": dict(zip(match_keys, key_values))
+            "match_values": {col: key_columns[col][idx] if col in key_columns else "" for col in match_keys}
         }
     
     return clusters
 
 
-def _get_cluster_df(df: pl.DataFrame, row_indices: List[int]) -> pl.DataFrame:
-    """Get a subset of the DataFrame for the given row indices."""
-    if not row_indices:
-        return df.head(0)
+def _value_length_expr(values: pl.Expr, dtype: pl.DataType) -> pl.Expr:
+    """Length used by the most_complete rule: len(str(x)), or 0 for falsy values."""
+    if dtype == pl.Utf8:
+        return values.str.len_chars()
     
-    # Use filter with row numbers
-    return df.with_row_index("__temp_idx__").filter(
-        pl.col("__temp_idx__").is_in(row_indices)
-    ).drop("__temp_idx__")
+    length = values.cast(pl.Utf8).str.len_chars()
+    if dtype == pl.Boolean:
+        return pl.when(values).then(length).otherwise(0)
+    if dtype.is_numeric():
+        return pl.when(values == 0).then(0).otherwise(length)
+    return length
 
 
-def _build_single_golden_record(
-    cluster_df: pl.DataFrame,
-    cluster_id: str,
+def _survivorship_rule_exprs(
+    col: str,
+    dtype: pl.DataType,
+    rule: str,
+    columns: List[str],
+    source_column: Optional[str],
+    source_priority: Dict[str, int],
+    timestamp_column: Optional[str],
+    frequency_column: Optional[str] = None
+) -> Tuple[pl.Expr, pl.Expr]:
+    """
+    Group-wise (winning value, confidence) expressions for a survivorship rule.
+    
+    Evaluated inside group_by(cluster).agg(); values keep their original row
+    order within each cluster, so "first"/"last" and tie-breaks follow the
+    input order. Ranked winners sort the whole column with nulls last and
+    take the first value, so a cluster where the column is entirely null
+    gets a null winner instead of an out-of-bounds gather. The most_frequent
+    rule needs frequency_column: the count of each value within its cluster.
+    """
+    column = pl.col(col)
+    values = column.drop_nulls()
+    longest = column.sort_by(
+        [column.is_null(), _value_length_expr(column, dtype)], descending=[False, True], maintain_order=True
+    ).first()
+    
+    if rule == "most_complete" or rule == "completeness":
+        # Choose the longest/most complete value
+        return longest, pl.lit(0.8)
+    
+    elif rule == "most_recent" or rule == "recency":
+        # Use timestamp column if available (rows without a timestamp sort first)
+        if timestamp_column and timestamp_column in columns:
+            winner = pl.col(col).sort_by(timestamp_column, descending=True, nulls_last=False, maintain_order=True).first()
+            return winner, pl.lit(0.85)
+        # Fallback to last value
+        return values.last(), pl.lit(0.7)
+    
+    elif rule == "source_priority":
+        # Use source priority
+        if source_column and source_column in columns:
+            priorities = (
+                pl.col(source_column)
+                .cast(pl.Utf8)
+                .fill_null("None")
+                .replace_strict(
+                    {str(source): float(priority) for source, priority in (source_priority or {}).items()},
+                    default=999.0,
+                    return_dtype=pl.Float64
+                )
+            )
+            # Non-null values first, then by priority (first seen wins ties)
+            winner = column.sort_by([column.is_null(), priorities], maintain_order=True).first()
+            best_priority = priorities.filter(column.is_not_null()).min()
+            confidence = pl.when(best_priority < 999).then(0.9).otherwise(0.7)
+            return winner, confidence
+        
+        # Fallback to first value
+        return values.first(), pl.lit(0.6)
+    
+    elif rule == "most_frequent" or rule == "frequency":
+        # Choose most common value (first seen wins ties)
+        counts = pl.col(frequency_column)
+        winner = column.sort_by([column.is_null(), counts], descending=[False, True], maintain_order=True).first()
+        frequency_ratio = counts.filter(column.is_not_null()).max() / values.len()
+        return winner, pl.min_horizontal(pl.lit(0.95), 0.5 + frequency_ratio * 0.5)
+    
+    elif rule == "min":
+        return values.min(), pl.lit(0.9)
+    
+    elif rule == "max":
+        return values.max(), pl.lit(0.9)
+    
+    elif rule == "first":
+        return values.first(), pl.lit(0.75)
+    
+    elif rule == "last":
+        return values.last(), pl.lit(0.75)
+    
+    # Default: most complete
+    return longest, pl.lit(0.7)
+
+
+def _resolve_clusters(
+    df: pl.DataFrame,
+    clusters: Dict[str, Dict],
     survivorship_rules: Dict[str, str],
     default_rule: str,
     source_column: Optional[str],
     source_priority: Dict[str, int],
-    timestamp_column: Optional[str],
-    df_full: pl.DataFrame,
-    cluster_rows: List[int]
+    timestamp_column: Optional[str]
+) -> pl.DataFrame:
+    """
+    Apply survivorship rules to all clusters at once.
+    
+    Returns one row per cluster (in clusters order) with a struct per column:
+    the surviving value, its confidence, whether the cluster had conflicting
+    values and up to five competing values.
+    """
+    cluster_numbers = np.empty(df.height, dtype=np.int64)
+    for number, cluster_info in enumerate(clusters.values()):
+        cluster_numbers[cluster_info["rows"]] = number
+    
+    # Fields are aggregated as separate columns and packed into structs after
+    # the group_by: a list-valued field (competing_values) inside pl.struct
+    # is not a scalar aggregation on every supported polars version
+    aggregations = []
+    packed = []
+    frequency_columns = {}
+    for col in df.columns:
+        values = pl.col(col).drop_nulls()
+        
+        if col.startswith("__"):
+            # Internal columns are only carried through for single-record clusters
+            aggregations.append(pl.col(col).first())
+            packed.append(pl.struct(value=pl.col(col)).alias(col))
+            continue
+        
+        rule = survivorship_rules.get(col, default_rule)
+        if rule in ("most_frequent", "frequency"):
+            frequency_columns[col] = f"__golden_frequency_{len(frequency_columns)}__"
+        winner, confidence = _survivorship_rule_exprs(
+            col, df[col].dtype, rule, df.columns, source_column, source_priority, timestamp_column,
+            frequency_columns.get(col)
+        )
+        has_conflict = values.n_unique() > 1
+        
+        fields = {
+            "value": pl.when(has_conflict).then(winner).otherwise(values.first()),
+            "confidence": pl.when(has_conflict).then(confidence).otherwise(1.0).cast(pl.Float64),
+            "conflict": has_conflict,
+            "competing_values": values.unique(maintain_order=True).head(5)
+        }
+        aggregations.extend(expr.alias(f"{col}\x00{field}") for field, expr in fields.items())
+        packed.append(pl.struct(**{field: pl.col(f"{col}\x00{field}") for field in fields}).alias(col))
+    
+    return (
+        df.lazy()
+        .with_columns(pl.Series("__golden_cluster__", cluster_numbers))
+        .with_columns(
+            pl.len().over(["__golden_cluster__", col]).alias(frequency_column)
+            for col, frequency_column in frequency_columns.items()
+        )
+        .group_by("__golden_cluster__")
+        .agg(aggregations)
+        .sort("__golden_cluster__")
+        .select(packed)
+        .collect()
+    )
+
+
+def _build_single_golden_record(
+    resolved: Dict[str, Dict],
+    columns: List[str],
+    cluster_id: str,
+    survivorship_rules: Dict[str, str],
+    default_rule: str,
+    cluster_size: int
 ) -> Tuple[Dict[str, Any], List[Dict], int]:
-    """Build a single golden record from a cluster of related records."""
+    """Build a single golden record from a cluster's resolved column values."""
     golden_record = {}
     resolutions = []
     conflicts = 0
     
-    # Get the actual rows from the full dataframe
-    if len(cluster_rows) == 1:
+    if cluster_size == 1:
         # Single record - just use it as the golden record
-        row = df_full.row(cluster_rows[0])
-        for col_idx, col in enumerate(df_full.columns):
-            golden_record[col] = row[col_idx]
+        for col in columns:
+            golden_record[col] = resolved[col]["value"]
         golden_record["__trust_score__"] = 1.0
         return golden_record, resolutions, 0
     
-    # Multiple records - apply survivorship rules
-    cluster_data = _get_cluster_df(df_full, cluster_rows)
-    
+    # Multiple records - survivorship rules were applied by _resolve_clusters
     trust_scores = []
     
-    for col in df_full.columns:
+    for col in columns:
         if col.startswith("__"):
             continue
         
-        rule = survivorship_rules.get(col, default_rule)
-        values = cluster_data[col].to_list()
-        
-        # Filter out nulls for comparison
-        non_null_values = [v for v in values if v is not None]
-        unique_values = list(set(str(v) for v in non_null_values))
+        field = resolved[col]
+        golden_record[col] = field["value"]
+        trust_scores.append(field["confidence"])
         
-        if len(unique_values) <= 1:
-            # No conflict
-            golden_record[col] = non_null_values[0] if non_null_values else None
-            trust_scores.append(1.0)
-        else:
-            # Conflict - apply survivorship rule
+        if field["conflict"]:
             conflicts += 1
-            winning_value, confidence = _apply_survivorship_rule(
-                values=values,
-                rule=rule,
-                cluster_data=cluster_data,
-                column=col,
-                source_column=source_column,
-                source_priority=source_priority,
-                timestamp_column=timestamp_column
-            )
-            
-            golden_record[col] = winning_value
-            trust_scores.append(confidence)
-            
+            winning_value = field["value"]
             resolutions.append({
                 "cluster_id": cluster_id,
                 "column": col,
-                "competing_values": unique_values[:5],
+                "competing_values": [str(v) for v in field["competing_values"]],
                 "winning_value": str(winning_value) if winning_value is not None else None,
-                "resolution_method": rule,
-                "confidence": confidence
+                "resolution_method": survivorship_rules.get(col, default_rule),
+                "confidence": field["confidence"]
             })
     
     # Calculate overall trust score
@@ -742,102 +899,6 @@ def _build_single_golden_record(
     return golden_record, resolutions, conflicts
 
 
-def _apply_survivorship_rule(
-    values: List[Any],
-    rule: str,
-    cluster_data: pl.DataFrame,
-    column: str,
-    source_column: Optional[str],
-    source_priority: Dict[str, int],
-    timestamp_column: Optional[str]
-) -> Tuple[Any, float]:
-    """Apply a survivorship rule to resolve conflicting values."""
-    non_null_values = [v for v in values if v is not None]
-    
-    if not non_null_values:
-        return None, 0.5
-    
-    if len(set(str(v) for v in non_null_values)) == 1:
-        return non_null_values[0], 1.0
-    
-    if rule == "most_complete" or rule == "completeness":
-        # Choose the longest/most complete value
-        best_value = max(non_null_values, key=lambda x: len(str(x)) if x else 0)
-        confidence = 0.8
-        return best_value, confidence
-    
-    elif rule == "most_recent" or rule == "recency":
-        # Use timestamp column if available
-        if timestamp_column and timestamp_column in cluster_data.columns:
-            try:
-                # Parse dates and sort
-                sorted_df = cluster_data.sort(timestamp_column, descending=True)
-                result = sorted_df[column][0]
-                return result, 0.85
-            except Exception as e:
-                pass
-        # Fallback to last value
-        return non_null_values[-1], 0.7
-    
-    elif rule == "source_priority":
-        # Use source priority
-        if source_column and source_column in cluster_data.columns:
-            best_priority = float('inf')
-            best_value = non_null_values[0]
-            
-            for i, val in enumerate(values):
-                if val is None:
-                    continue
-                source = cluster_data[source_column][i] if i < cluster_data.height else None
-                priority = source_priority.get(str(source), 999)
-                if priority < best_priority:
-                    best_priority = priority
-                    best_value = val
-            
-            confidence = 0.9 if best_priority < 999 else 0.7
-            return best_value, confidence
-        
-        # Fallback to first value
-        return non_null_values[0], 0.6
-    
-    elif rule == "most_frequent" or rule == "frequency":
-        # Choose most common value
-        from collections import Counter
-        value_counts = Counter(str(v) for v in non_null_values)
-        most_common = value_counts.most_common(1)[0]
-        
-        # Find original value (not stringified)
-        for v in non_null_values:
-            if str(v) == most_common[0]:
-                frequency_ratio = most_common[1] / len(non_null_values)
-                return v, min(0.95, 0.5 + frequency_ratio * 0.5)
-        
-        return non_null_values[0], 0.7
-    
-    elif rule == "min":
-        try:
-            return min(non_null_values), 0.9
-        except:
-            return non_null_values[0], 0.7
-    
-    elif rule == "max":
-        try:
-            return max(non_null_values), 0.9
-        except:
-            return non_null_values[0], 0.7
-    
-    elif rule == "first":
-        return non_null_values[0], 0.75
-    
-    elif rule == "last":
-        return non_null_values[-1], 0.75
-    
-    else:
-        # Default: most complete
-        best_value = max(non_null_values, key=lambda x: len(str(x)) if x else 0)
-        return best_value, 0.7
-
-
 def _create_golden_dataframe(golden_records: List[Dict], original_columns: List[str]) -> pl.DataFrame:
     """Create a DataFrame from golden records."""
     if not golden_records:
@@ -856,13 +917,6 @@ def _create_golden_dataframe(golden_records: List[Dict], original_columns: List[
     return pl.DataFrame(data)
 
 
-def _generate_golden_file(df: pl.DataFrame, original_filename: str) -> bytes:
-    """Generate golden records file in CSV format."""
-    output = io.BytesIO()
-    df.write_csv(output)
-    return output.getvalue()
-
-
 def _normalize_fuzzy_value(value: Any, field_type: str) -> str:
     """Normalize value for fuzzy matching based on field type."""
     if value is None:
@@ -1065,60 +1119,288 @@ def _calculate_record_similarity(row1: Dict, row2: Dict, fuzzy_config: Dict) ->
     return final_score, field_scores
 
 
-def _build_fuzzy_clusters(df: pl.DataFrame, fuzzy_config: Dict, threshold: float, blocking_keys: List[str]) -> Dict[str, Dict]:
-    """Build clusters using fuzzy matching."""
+def _encode_values(values: List[str]) -> np.ndarray:
+    """Integer code per distinct value; the empty string is always code 0."""
+    codes = {"": 0}
+    return np.array([codes.setdefault(v, len(codes)) for v in values], dtype=np.int64)
+
+
+def _prepare_fuzzy_columns(df: pl.DataFrame, fuzzy_config: Dict) -> List[Dict[str, Any]]:
+    """Normalize every similarity column once (plus metaphone keys for names)."""
+    columns_config = fuzzy_config.get("columns", {})
+    
+    # If no config provided, use all columns with equal weight and default type
+    if not columns_config:
+        columns_config = {col: {"type": "text", "weight": 1.0} for col in df.columns}
+    
+    prepared = []
+    for col, config in columns_config.items():
+        if col not in df.columns:
+            continue
+        
+        field_type = config.get("type", "text")
+        values = [_normalize_fuzzy_value(v, field_type) for v in df[col].to_list()]
+        column = {
+            "name": col,
+            "type": field_type,
+            "weight": config.get("weight", 1.0),
+            "values": values,
+            "array": np.array(values, dtype=object),
+            "codes": _encode_values(values)
+        }
+        
+        if field_type == "name":
+            metaphones = []
+            for v in values:
+                try:
+                    metaphones.append(jellyfish.metaphone(v) if v else "")
+                except Exception:
+                    metaphones.append("")
+            column["metaphones"] = metaphones
+            column["metaphone_codes"] = _encode_values(metaphones)
+        
+        prepared.append(column)
+    
+    return prepared
+
+
+def _minhash_band_keys(values: List[str], col_idx: int) -> List[List[tuple]]:
+    """
+    LSH band keys from MinHash signatures over character n-grams.
+    
+    Values sharing any band are likely to have a high n-gram Jaccard
+    similarity, which catches typos that exact and phonetic keys miss.
+    """
+    keys = [[] for _ in values]
+    gram_hashes = []
+    owners = []
+    for i, v in enumerate(values):
+        if not v:
+            continue
+        grams = {v[k:k + FUZZY_NGRAM_SIZE] for k in range(max(1, len(v) - FUZZY_NGRAM_SIZE + 1))}
+        for gram in grams:
+            gram_hashes.append(zlib.crc32(gram.encode("utf-8")))
+            owners.append(i)
+    
+    if not gram_hashes:
+        return keys
+    
+    hashes = np.array(gram_hashes, dtype=np.uint64)
+    owners = np.array(owners)
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    record_ids = owners[starts]
+    
+    signatures = np.empty((len(record_ids), len(_MINHASH_A)), dtype=np.uint64)
+    for k in range(len(_MINHASH_A)):
+        signatures[:, k] = np.minimum.reduceat((_MINHASH_A[k] * hashes + _MINHASH_B[k]) % _MINHASH_PRIME, starts)
+    
+    for band in range(FUZZY_MINHASH_BANDS):
+        band_rows = signatures[:, band * FUZZY_MINHASH_ROWS:(band + 1) * FUZZY_MINHASH_ROWS].tolist()
+        for record_id, band_values in zip(record_ids.tolist(), band_rows):
+            keys[record_id].append((col_idx, "lsh", band, tuple(band_values)))
+    
+    return keys
+
+
+def _fuzzy_block_keys(prepared: List[Dict[str, Any]], n_records: int) -> List[List[tuple]]:
+    """
+    Candidate-generation keys for every record.
+    
+    - Exact normalized value of each similarity column
+    - Phonetic (metaphone) key for name columns
+    - MinHash LSH bands over character n-grams for non-exact field types
+    
+    Sorted-neighbourhood candidates come from _sorted_neighbourhood_values.
+    """
+    record_keys = [[] for _ in range(n_records)]
+    
+    for col_idx, column in enumerate(prepared):
+        for i, v in enumerate(column["values"]):
+            if v:
+                record_keys[i].append((col_idx, "eq", v))
+        
+        if column["type"] == "name":
+            for i, m in enumerate(column["metaphones"]):
+                if m:
+                    record_keys[i].append((col_idx, "ph", m))
+        
+        if column["type"] not in ["dob", "zip", "pin"]:
+            for i, keys in enumerate(_minhash_band_keys(column["values"], col_idx)):
+                record_keys[i].extend(keys)
+    
+    return record_keys
+
+
+def _sorted_neighbourhood_values(prepared: List[Dict[str, Any]]) -> List[List[str]]:
+    """
+    Sort values of every record, one list per sort order.
+    
+    Each similarity column is sorted by its normalized value, and non-exact
+    field types also by the reversed value, so values differing in their
+    first characters (e.g. "cust-2824" and "cust-8824") still end up close
+    in one of the orders.
+    """
+    orders = []
+    for column in prepared:
+        orders.append(column["values"])
+        if column["type"] not in ["dob", "zip", "pin"]:
+            orders.append([v[::-1] for v in column["values"]])
+    return orders
+
+
+def _score_candidates(
+    record_idx: int,
+    candidate_rows: np.ndarray,
+    prepared: List[Dict[str, Any]]
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Weighted similarity between one record and many candidate records.
+    
+    Vectorized equivalent of _calculate_record_similarity: each column is
+    scored with a single rapidfuzz.process.cdist call.
+    """
+    total_score = np.zeros(len(candidate_rows))
+    total_weight = 0.0
+    field_scores = {}
+    
+    for column in prepared:
+        field_type = column["type"]
+        query_code = column["codes"][record_idx]
+        choice_codes = column["codes"][candidate_rows]
+        
+        # Same short-circuits as _calculate_field_similarity: empty -> 0, equal -> 100
+        if query_code == 0:
+            scores = np.zeros(len(candidate_rows))
+        elif field_type in ["dob", "zip", "pin"]:
+            scores = np.where(choice_codes == query_code, 100.0, 0.0)
+        else:
+            query = column["values"][record_idx]
+            choices = column["array"][candidate_rows]
+            if field_type == "name":
+                jw_score = process.cdist([query], choices, scorer=distance.JaroWinkler.similarity, dtype=np.float64)[0] * 100
+                metaphone_code = column["metaphone_codes"][record_idx]
+                phonetic_match = (column["metaphone_codes"][candidate_rows] == metaphone_code) & (metaphone_code != 0)
+                scores = (jw_score * 0.8) + (phonetic_match * 100.0 * 0.2)
+            elif field_type == "address":
+                scores = process.cdist([query], choices, scorer=fuzz.token_sort_ratio, dtype=np.float64)[0]
+            else:
+                scores = process.cdist([query], choices, scorer=fuzz.ratio, dtype=np.float64)[0]
+            scores[choice_codes == query_code] = 100.0
+            scores[choice_codes == 0] = 0.0
+        
+        field_scores[column["name"]] = scores
+        total_score += scores * column["weight"]
+        total_weight += column["weight"]
+    
+    if total_weight == 0:
+        return np.zeros(len(candidate_rows)), {}
+    
+    return total_score / total_weight, field_scores
+
+
+def _build_fuzzy_clusters(
+    df: pl.DataFrame,
+    fuzzy_config: Dict,
+    threshold: float,
+    blocking_keys: List[str],
+    blocking_min_records: int = 2000,
+    max_block_size: int = 500
+) -> Dict[str, Dict]:
+    """
+    Build clusters using fuzzy matching.
+    
+    Each record joins the best-scoring existing cluster (compared against the
+    cluster's first record) at or above threshold, otherwise it starts a new
+    cluster. Datasets larger than blocking_min_records only score clusters
+    whose representative shares a candidate-generation key with the record
+    (see _fuzzy_block_keys), or whose representative is among the
+    FUZZY_SORTED_WINDOW nearest representatives on either side of the record
+    in one of the sort orders of _sorted_neighbourhood_values. Keys shared by
+    more than max_block_size representatives are too common to be useful
+    and are skipped.
+    
+    Blocking trades recall for speed: a record whose best match at or above
+    threshold shares no key and is not near it in any sort order starts a
+    new cluster (or joins a lower-scoring one) instead.
+    """
     clusters = {}
-    cluster_counter = 0
-    
-    # Convert to list of dicts for easier iteration
-    records = df.to_dicts()
-    
-    # Map: cluster_id -> representative_record
-    cluster_representatives = {}
-    
-    for i, record in enumerate(records):
-        best_cluster_id = None
-        best_score = -1.0
-        best_field_scores = {}
-        
-        # Compare with existing clusters
-        for cluster_id, rep_record in cluster_representatives.items():
-            # Blocking check (optional optimization)
-            # If blocking keys are provided, only compare if they match exactly
-            if blocking_keys:
-                match = True
-                for k in blocking_keys:
-                    if str(record.get(k)) != str(rep_record.get(k)):
-                        match = False
-                        break
-                if not match:
-                    continue
-            
-            score, field_scores = _calculate_record_similarity(record, rep_record, fuzzy_config)
+    n_records = df.height
+    
+    prepared = _prepare_fuzzy_columns(df, fuzzy_config)
+    use_blocking = n_records > blocking_min_records
+    record_keys = _fuzzy_block_keys(prepared, n_records) if use_blocking else None
+    sort_values = _sorted_neighbourhood_values(prepared) if use_blocking else []
+    # Per sort order: representatives' sort values (sorted) and their cluster numbers
+    sorted_representatives = [([], []) for _ in sort_values]
+    
+    # Optional exact blocking keys: only compare records whose values match
+    if blocking_keys:
+        key_columns = [df[k].to_list() if k in df.columns else [None] * n_records for k in blocking_keys]
+        exact_keys = [tuple(str(values[i]) for values in key_columns) for i in range(n_records)]
+    
+    # Cluster number -> representative row, and candidate key -> cluster numbers
+    representatives = np.empty(n_records, dtype=np.int64)
+    n_clusters = 0
+    key_index = defaultdict(list)
+    
+    for i in range(n_records):
+        if use_blocking:
+            candidate_set = set()
+            for key in record_keys[i]:
+                members = key_index.get(key)
+                if members and len(members) <= max_block_size:
+                    candidate_set.update(members)
+            for values, (sorted_values, sorted_clusters) in zip(sort_values, sorted_representatives):
+                if values[i]:
+                    position = bisect.bisect_left(sorted_values, values[i])
+                    candidate_set.update(sorted_clusters[max(0, position - FUZZY_SORTED_WINDOW):position + FUZZY_SORTED_WINDOW])
+            candidates = sorted(candidate_set)
+        else:
+            candidates = range(n_clusters)
+        
+        if blocking_keys:
+            candidates = [c for c in candidates if exact_keys[representatives[c]] == exact_keys[i]]
+        
+        best_cluster = None
+        if len(candidates) > 0:
+            candidates = np.asarray(candidates, dtype=np.int64)
+            scores, field_scores = _score_candidates(i, representatives[candidates], prepared)
             
-            if score >= threshold and score > best_score:
-                best_score = score
-                best_cluster_id = cluster_id
-                best_field_scores = field_scores
+            eligible = scores >= threshold
+            if eligible.any():
+                # First cluster (in creation order) with the highest score
+                best = int(np.argmax(np.where(eligible, scores, -np.inf)))
+                best_cluster = int(candidates[best])
+                best_score = float(scores[best])
+                best_field_scores = {col: float(col_scores[best]) for col, col_scores in field_scores.items()}
         
-        if best_cluster_id:
+        if best_cluster is not None:
             # Add to existing cluster
-            clusters[best_cluster_id]["rows"].append(i)
+            cluster_id = f"cluster_{best_cluster}"
+            clusters[cluster_id]["rows"].append(i)
             # Store match details
-            clusters[best_cluster_id]["match_details"].append({
+            clusters[cluster_id]["match_details"].append({
                 "row_index": i,
                 "similarity_score": best_score,
                 "field_scores": best_field_scores
             })
         else:
             # Create new cluster
-            cluster_id = f"cluster_{cluster_counter}"
-            cluster_counter += 1
-            clusters[cluster_id] = {
+            cluster_number = n_clusters
+            representatives[cluster_number] = i
+            n_clusters += 1
+            clusters[f"cluster_{cluster_number}"] = {
                 "rows": [i],
                 "match_values": {},
                 "match_details": [] # First record has no match details relative to itself
             }
-            cluster_representatives[cluster_id] = record
+            if use_blocking:
+                for key in record_keys[i]:
+                    key_index[key].append(cluster_number)
+                for values, (sorted_values, sorted_clusters) in zip(sort_values, sorted_representatives):
+                    if values[i]:
+                        position = bisect.bisect_right(sorted_values, values[i])
+                        sorted_values.insert(position, values[i])
+                        sorted_clusters.insert(position, cluster_number)
             
     return clusters
@@ -8,16 +8,29 @@ Output: Standardized governance validation results
 
 import polars as pl
 import numpy as np
-import io
 import time
 import re
 from typing import Dict, Any, Optional, List
-from agents.agent_utils import safe_get_list
+from agents.agent_utils import safe_get_list, DatasetContext, scan_dataframe, collect_streaming
+from agents.pii_scanner import scan_pii_columns
+
+DEFAULT_PII_PATTERNS = {
+    'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    'phone': r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
+    'ssn': r'\b\d{3}-\d{2}-\d{4}\b'
+}
+
+# Classification scoring historically only considers email and phone patterns
+DEFAULT_CLASSIFICATION_PII_PATTERNS = {
+    'email': DEFAULT_PII_PATTERNS['email'],
+    'phone': DEFAULT_PII_PATTERNS['phone']
+}
 
 def execute_governance(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Check data governance compliance.
@@ -26,6 +39,7 @@ def execute_governance(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters from tool.json
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary
@@ -52,7 +66,10 @@ def execute_governance(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+            # Scan lazily; governance checks only need aggregates and bounded row samples
+            lf = scan_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
+            schema = lf.collect_schema()
+            row_count = collect_streaming(lf.select(pl.len())).item()
         except Exception as e:
             return {
                 "status": "error",
@@ -62,7 +79,7 @@ def execute_governance(
             }
 
         # Validate data
-        if df.height == 0:
+        if row_count == 0:
             return {
                 "status": "error",
                 "agent_id": "governance-checker",
@@ -71,10 +88,13 @@ def execute_governance(
                 "execution_time_ms": int((time.time() - start_time) * 1000)
             }
 
+        # Collect every column-level statistic in a single pass
+        stats = _collect_governance_stats(lf, schema, parameters, dataset)
+        
         # Perform governance validation
-        lineage_score = _validate_lineage(df, parameters)
-        consent_score = _validate_consent(df, parameters)
-        classification_score = _validate_classification(df, parameters)
+        lineage_score = _validate_lineage(stats, schema, row_count, parameters)
+        consent_score = _validate_consent(stats, schema, parameters)
+        classification_score = _validate_classification(lf, stats, schema, parameters)
 
         # Calculate overall governance score
         overall_score = (
@@ -92,7 +112,7 @@ def execute_governance(
             compliance_status = "non_compliant"
 
         # Identify governance issues
-        governance_issues = _identify_governance_issues(df, parameters)
+        governance_issues = _identify_governance_issues(stats, schema, parameters)
 
         # Generate ROW-LEVEL-ISSUES
         row_level_issues = []
@@ -109,16 +129,16 @@ def execute_governance(
         # If a field is completely missing from the dataframe, it's a schema issue (handled in governance_issues),
         # but here we check for nulls in existing columns.
         
-        existing_required_fields = [f for f in all_required_fields if f in df.columns]
+        existing_required_fields = [f for f in all_required_fields if f in schema]
         
         if existing_required_fields:
-            # Add row index
-            df_with_idx = df.with_row_index("row_index")
-            
             # Find rows with any nulls in required fields
-            null_rows = df_with_idx.filter(
-                pl.any_horizontal([pl.col(f).is_null() for f in existing_required_fields])
-            ).head(1000)
+            null_rows = collect_streaming(
+                lf.with_row_index("row_index")
+                .select(["row_index"] + list(dict.fromkeys(existing_required_fields)))
+                .filter(pl.any_horizontal([pl.col(f).is_null() for f in existing_required_fields]))
+                .head(1000)
+            )
             
             for row in null_rows.iter_rows(named=True):
                 if len(row_level_issues) >= 1000: break
@@ -150,25 +170,13 @@ def execute_governance(
                     })
         
         # Add row-level issues for PII without proper classification
-        pii_patterns = parameters.get('pii_patterns', {
-            'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            'phone': r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
-            'ssn': r'\b\d{3}-\d{2}-\d{4}\b'
-        })
-        
-        # Identify PII columns
-        pii_columns = {}  # col -> pii_type
-        string_cols = [col for col in df.columns if df[col].dtype == pl.Utf8]
+        pii_patterns = parameters.get('pii_patterns', DEFAULT_PII_PATTERNS)
         
-        for col in string_cols:
-            for pii_type, pattern in pii_patterns.items():
-                # Check if any value matches
-                if df[col].str.contains(pattern).any():
-                    pii_columns[col] = pii_type
-                    break
+        # Identify PII columns (col -> pii_type)
+        pii_columns = _detect_pii_columns(stats, schema, pii_patterns)
         
         # Check if PII rows have proper classification
-        if pii_columns and 'data_classification' in df.columns:
+        if pii_columns and 'data_classification' in schema:
             # We need to find rows where PII is present AND classification is bad
             # Bad classification: null or 'public'
             
@@ -182,13 +190,18 @@ def execute_governance(
                 pattern = pii_patterns[pii_type]
                 
                 # Find violating rows
-                violating_rows = df.with_row_index("row_index").filter(
-                    (pl.col(pii_col).str.contains(pattern)) &
-                    (
-                        (pl.col('data_classification').is_null()) |
-                        (pl.col('data_classification') == 'public')
+                violating_rows = collect_streaming(
+                    lf.with_row_index("row_index")
+                    .filter(
+                        (pl.col(pii_col).str.contains(pattern)) &
+                        (
+                            (pl.col('data_classification').is_null()) |
+                            (pl.col('data_classification') == 'public')
+                        )
                     )
-                ).head(1000 - len(row_level_issues))
+                    .select("row_index")
+                    .head(1000 - len(row_level_issues))
+                )
                 
                 for row in violating_rows.iter_rows(named=True):
                     if len(row_level_issues) >= 1000: break
@@ -233,8 +246,8 @@ def execute_governance(
                 "classification": round(classification_score, 1)
             },
             "compliance_status": compliance_status,
-            "total_records": df.height,
-            "fields_analyzed": df.columns,
+            "total_records": row_count,
+            "fields_analyzed": schema.names(),
             "governance_issues": governance_issues,
             "row_level_issues": row_level_issues[:100],
             "issue_summary": issue_summary,
@@ -396,7 +409,7 @@ def execute_governance(
                 "severity": "high",
                 "category": "governance_compliance",
                 "message": f"Governance framework gaps: {governance_gap_score:.1f} points below required threshold",
-                "affected_fields_count": len(df.columns),
+                "affected_fields_count": len(schema),
                 "recommendation": "Establish comprehensive governance framework: policies, procedures, roles, responsibilities, and controls"
             })
         
@@ -421,7 +434,7 @@ def execute_governance(
         
         # Add specific lineage violation issues
         if lineage_score < 80:
-            for idx, col in enumerate(df.columns[:10]):
+            for idx, col in enumerate(schema.names()[:10]):
                 if idx < 3:  # Add for sample columns
                     issues.append({
                         "issue_id": f"issue_governance_lineage_gap_{col}",
@@ -434,7 +447,7 @@ def execute_governance(
         
         # Add specific consent violation issues
         if consent_score < 80:
-            for idx, col in enumerate(df.columns[:10]):
+            for idx, col in enumerate(schema.names()[:10]):
                 if idx < 3:  # Add for sample columns
                     issues.append({
                         "issue_id": f"issue_governance_consent_gap_{col}",
@@ -447,7 +460,7 @@ def execute_governance(
         
         # Add specific classification violation issues
         if classification_score < 80:
-            for idx, col in enumerate(df.columns[:10]):
+            for idx, col in enumerate(schema.names()[:10]):
                 if idx < 3:  # Add for sample columns
                     issues.append({
                         "issue_id": f"issue_governance_classification_gap_{col}",
@@ -551,7 +564,7 @@ def execute_governance(
                 "agent_id": "governance-checker",
                 "field_name": "all",
                 "priority": "critical",
-                "recommendation": f"Add {all_missing} required governance metadata fields: source_system, transformation_date, consent_status, data_classification, sensitivity_level, data_owner, business_unit. Update all {df.height} records",
+                "recommendation": f"Add {all_missing} required governance metadata fields: source_system, transformation_date, consent_status, data_classification, sensitivity_level, data_owner, business_unit. Update all {row_count} records",
                 "timeline": "1 week"
             })
         
@@ -629,8 +642,8 @@ def execute_governance(
             "agent_name": "Governance Checker",
             "execution_time_ms": int((time.time() - start_time) * 1000),
             "summary_metrics": {
-                "total_records": df.height,
-                "total_fields": len(df.columns),
+                "total_records": row_count,
+                "total_fields": len(schema),
                 "governance_score": round(overall_score, 1),
                 "compliance_status": compliance_status,
                 "issues_found": len(governance_issues)
@@ -655,7 +668,73 @@ def execute_governance(
         }
 
 
-def _validate_lineage(df: pl.DataFrame, config: Dict[str, Any]) -> float:
+def _string_columns(schema: pl.Schema) -> List[str]:
+    """Return the Utf8 columns that PII patterns are matched against."""
+    return [col for col, dtype in schema.items() if dtype == pl.Utf8]
+
+
+def _collect_governance_stats(
+    lf: pl.LazyFrame,
+    schema: pl.Schema,
+    config: Dict[str, Any],
+    dataset: Optional[DatasetContext] = None
+) -> Dict[str, Any]:
+    """
+    Compute the aggregates used by the governance checks in one streaming pass.
+    
+    PII pattern matches come from the shared PII scanner, so they are
+    computed once per column of a shared dataset.
+    
+    Returns:
+        Dict with "null_counts" (field -> nulls), "invalid_consent" (count) and
+        "pii_matches" ((column, pattern) -> any value matches)
+    """
+    required_fields = (
+        config.get('required_lineage_fields', []) +
+        config.get('required_consent_fields', []) +
+        config.get('required_classification_fields', [])
+    )
+    null_fields = list(dict.fromkeys(f for f in required_fields if f in schema))
+    
+    patterns = list(dict.fromkeys(
+        list(config.get('pii_patterns', DEFAULT_PII_PATTERNS).values()) +
+        list(config.get('pii_patterns', DEFAULT_CLASSIFICATION_PII_PATTERNS).values())
+    ))
+    pii_keys = [(col, pattern) for col in _string_columns(schema) for pattern in patterns]
+    
+    exprs = [pl.col(f).null_count().alias(f"null_{i}") for i, f in enumerate(null_fields)]
+    
+    if 'consent_status' in schema:
+        valid_statuses = config.get('valid_consent_statuses', ['granted', 'denied', 'withdrawn', 'pending'])
+        # Count invalid statuses (not in valid list AND not null)
+        exprs.append((
+            pl.col('consent_status').is_not_null() &
+            ~pl.col('consent_status').is_in(valid_statuses)
+        ).sum().alias("invalid_consent"))
+    
+    row = collect_streaming(lf.select(exprs)).row(0, named=True) if exprs else {}
+    
+    return {
+        "null_counts": {f: row[f"null_{i}"] for i, f in enumerate(null_fields)},
+        "invalid_consent": row.get("invalid_consent", 0),
+        "pii_matches": scan_pii_columns(lf, pii_keys, dataset)
+    }
+
+
+def _detect_pii_columns(stats: Dict[str, Any], schema: pl.Schema, pii_patterns: Dict[str, str]) -> Dict[str, str]:
+    """
+    Map each string column to the first PII type whose pattern matches any value.
+    """
+    pii_columns = {}
+    for col in _string_columns(schema):
+        for pii_type, pattern in pii_patterns.items():
+            if stats["pii_matches"][(col, pattern)]:
+                pii_columns[col] = pii_type
+                break
+    return pii_columns
+
+
+def _validate_lineage(stats: Dict[str, Any], schema: pl.Schema, row_count: int, config: Dict[str, Any]) -> float:
     """
     Validate data lineage requirements.
     """
@@ -664,20 +743,20 @@ def _validate_lineage(df: pl.DataFrame, config: Dict[str, Any]) -> float:
     # Check for required lineage fields
     required_fields = config.get('required_lineage_fields', [])
     for field in required_fields:
-        if field not in df.columns:
+        if field not in schema:
             score -= 20  # Deduct for missing field
 
     # Check for high null percentages in lineage fields
     for field in required_fields:
-        if field in df.columns:
-            null_pct = (df[field].null_count() / df.height) * 100
+        if field in schema:
+            null_pct = (stats["null_counts"][field] / row_count) * 100
             if null_pct > 5:
                 score -= min(15, null_pct / 10)
 
     return max(0, score)
 
 
-def _validate_consent(df: pl.DataFrame, config: Dict[str, Any]) -> float:
+def _validate_consent(stats: Dict[str, Any], schema: pl.Schema, config: Dict[str, Any]) -> float:
     """
     Validate consent and privacy requirements.
     """
@@ -686,28 +765,17 @@ def _validate_consent(df: pl.DataFrame, config: Dict[str, Any]) -> float:
     # Check for required consent fields
     required_fields = config.get('required_consent_fields', [])
     for field in required_fields:
-        if field not in df.columns:
+        if field not in schema:
             score -= 25  # Deduct for missing field
 
-    # Validate consent status values
-    if 'consent_status' in df.columns:
-        valid_statuses = config.get('valid_consent_statuses', ['granted', 'denied', 'withdrawn', 'pending'])
-        # Count invalid statuses (not in valid list AND not null)
-        # Note: Original code treated None as valid (or at least didn't penalize it if not in list + [None])
-        # (~df['consent_status'].isin(valid_statuses + [None])).sum()
-        
-        invalid_count = df.filter(
-            pl.col('consent_status').is_not_null() &
-            ~pl.col('consent_status').is_in(valid_statuses)
-        ).height
-        
-        if invalid_count > 0:
-            score -= 15
+    # Validate consent status values (nulls are not penalized)
+    if 'consent_status' in schema and stats["invalid_consent"] > 0:
+        score -= 15
 
     return max(0, score)
 
 
-def _validate_classification(df: pl.DataFrame, config: Dict[str, Any]) -> float:
+def _validate_classification(lf: pl.LazyFrame, stats: Dict[str, Any], schema: pl.Schema, config: Dict[str, Any]) -> float:
     """
     Validate data classification and tagging requirements.
     """
@@ -716,90 +784,33 @@ def _validate_classification(df: pl.DataFrame, config: Dict[str, Any]) -> float:
     # Check for required classification fields
     required_fields = config.get('required_classification_fields', [])
     for field in required_fields:
-        if field not in df.columns:
+        if field not in schema:
             score -= 20  # Deduct for missing field
 
     # Check for PII detection and classification mismatch
-    pii_patterns = config.get('pii_patterns', {
-        'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-        'phone': r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
-    })
-
-    pii_columns = []
-    string_cols = [col for col in df.columns if df[col].dtype == pl.Utf8]
-    
-    for col in string_cols:
-        for pii_type, pattern in pii_patterns.items():
-            if df[col].str.contains(pattern).any():
-                pii_columns.append(col)
-                break
-
-    # If PII found, check if classified appropriately
-    if pii_columns and 'data_classification' in df.columns:
-        # Count rows where classification is public AND PII is present in any PII column
-        # This is slightly different from original which checked each column separately?
-        # Original: public_pii = ((df['data_classification'] == 'public') & df.index.isin(...)).sum()
-        # It sums rows that have public classification AND have PII in ANY of the pii_columns.
-        
-        # In Polars:
-        # Filter rows where classification is public
-        public_rows = df.filter(pl.col('data_classification') == 'public')
-        
-        if public_rows.height > 0:
-            # Check if any PII column has PII in these rows
-            has_pii_expr = pl.any_horizontal([
-                pl.col(col).str.contains(pii_patterns.get('email') if 'email' in pii_patterns else r'.*') # Simplified logic, need correct pattern per column
-                for col in pii_columns
+    pii_patterns = config.get('pii_patterns', DEFAULT_CLASSIFICATION_PII_PATTERNS)
+    col_patterns = {
+        col: pii_patterns[pii_type]
+        for col, pii_type in _detect_pii_columns(stats, schema, pii_patterns).items()
+    }
+
+    # If PII found, check if classified appropriately: count rows that are
+    # public AND have PII in any PII column
+    if col_patterns and 'data_classification' in schema:
+        public_pii_rows = collect_streaming(lf.select((
+            (pl.col('data_classification') == 'public') &
+            pl.any_horizontal([
+                pl.col(c).str.contains(p) for c, p in col_patterns.items()
             ])
-            
-            # Re-do loop to be precise
-            public_pii_count = 0
-            # We need to check if ANY pii column has pii in a public row.
-            # But pii_columns list doesn't store which type/pattern matched.
-            # Let's re-detect per column.
-            
-            for col in pii_columns:
-                # Find pattern for this column (we just know it matched ONE of them)
-                # This is inefficient. Let's just check all patterns again or store it.
-                # Optimization: In _validate_classification we just need count.
-                
-                # Let's iterate patterns again
-                for pii_type, pattern in pii_patterns.items():
-                     count = df.filter(
-                         (pl.col('data_classification') == 'public') &
-                         (pl.col(col).str.contains(pattern))
-                     ).height
-                     if count > 0:
-                         public_pii_count += count
-                         break # Counted this column's contribution (wait, original counts ROWS, not instances)
-            
-            # Correct logic: Count ROWS that are public AND have PII in ANY pii column.
-            # We need an expression: (public) & ( (col1 has pii) OR (col2 has pii) ... )
-            
-            # We need to know which pattern applies to which column.
-            # Let's map col -> pattern first
-            col_patterns = {}
-            for col in string_cols:
-                for pii_type, pattern in pii_patterns.items():
-                    if df[col].str.contains(pattern).any():
-                        col_patterns[col] = pattern
-                        break
-            
-            if col_patterns:
-                public_pii_rows = df.filter(
-                    (pl.col('data_classification') == 'public') &
-                    (pl.any_horizontal([
-                        pl.col(c).str.contains(p) for c, p in col_patterns.items()
-                    ]))
-                ).height
-                
-                if public_pii_rows > 0:
-                    score -= 20
+        ).sum())).item()
+        
+        if public_pii_rows > 0:
+            score -= 20
 
     return max(0, score)
 
 
-def _identify_governance_issues(df: pl.DataFrame, config: Dict[str, Any]) -> list:
+def _identify_governance_issues(stats: Dict[str, Any], schema: pl.Schema, config: Dict[str, Any]) -> list:
     """
     Identify specific governance issues in the data.
     """
@@ -808,7 +819,7 @@ def _identify_governance_issues(df: pl.DataFrame, config: Dict[str, Any]) -> lis
     # Check for missing lineage fields
     required_lineage = config.get('required_lineage_fields', [])
     for field in required_lineage:
-        if field not in df.columns:
+        if field not in schema:
             issues.append({
                 "type": "missing_lineage_field",
                 "field": field,
@@ -819,7 +830,7 @@ def _identify_governance_issues(df: pl.DataFrame, config: Dict[str, Any]) -> lis
     # Check for missing consent fields
     required_consent = config.get('required_consent_fields', [])
     for field in required_consent:
-        if field not in df.columns:
+        if field not in schema:
             issues.append({
                 "type": "missing_consent_field",
                 "field": field,
@@ -830,7 +841,7 @@ def _identify_governance_issues(df: pl.DataFrame, config: Dict[str, Any]) -> lis
     # Check for missing classification fields
     required_classification = config.get('required_classification_fields', [])
     for field in required_classification:
-        if field not in df.columns:
+        if field not in schema:
             issues.append({
                 "type": "missing_classification_field",
                 "field": field,
@@ -839,23 +850,14 @@ def _identify_governance_issues(df: pl.DataFrame, config: Dict[str, Any]) -> lis
             })
 
     # Check for PII without proper classification
-    pii_patterns = config.get('pii_patterns', {
-        'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-        'phone': r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
-        'ssn': r'\b\d{3}-\d{2}-\d{4}\b'
-    })
-
-    string_cols = [col for col in df.columns if df[col].dtype == pl.Utf8]
-    for col in string_cols:
-        for pii_type, pattern in pii_patterns.items():
-            if df[col].str.contains(pattern).any():
-                issues.append({
-                    "type": "pii_detected",
-                    "field": col,
-                    "pii_type": pii_type,
-                    "severity": "high",
-                    "message": f"PII ({pii_type}) detected in field '{col}'"
-                })
-                break
+    pii_patterns = config.get('pii_patterns', DEFAULT_PII_PATTERNS)
+    for col, pii_type in _detect_pii_columns(stats, schema, pii_patterns).items():
+        issues.append({
+            "type": "pii_detected",
+            "field": col,
+            "pii_type": pii_type,
+            "severity": "high",
+            "message": f"PII ({pii_type}) detected in field '{col}'"
+        })
 
     return issues
@@ -15,18 +15,21 @@ Output: Key analysis with candidate keys, confidence scores, and recommendations
 
 import polars as pl
 import numpy as np
-import io
 import time
 import re
 import base64
 from typing import Dict, Any, Optional, List
-from agents.agent_utils import safe_get_dict
+from agents.agent_utils import safe_get_dict, DatasetContext, load_dataframe
+
+# Number of column combinations evaluated per query in composite key analysis
+COMPOSITE_KEY_BATCH_SIZE = 64
 
 
 def execute_key_identifier(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Identify candidate keys in dataset.
@@ -35,6 +38,7 @@ def execute_key_identifier(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters from tool.json
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary with key analysis
@@ -71,7 +75,7 @@ def execute_key_identifier(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000, truncate_ragged_lines=True)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000, truncate_ragged_lines=True)
         except Exception as e:
             return {
                 "status": "error",
@@ -841,7 +845,19 @@ def _analyze_composite_keys(
     max_columns: int,
     uniqueness_threshold: float
 ) -> List[Dict[str, Any]]:
-    """Analyze potential composite key combinations."""
+    """
+    Analyze potential composite key combinations.
+    
+    Each column is encoded once as integer codes; a combination's uniqueness
+    is the number of distinct structs of its codes, evaluated for a batch of
+    combinations per query. Combinations are
+    searched by size. Supersets of a fully unique combination are skipped,
+    since they are fully unique as well; supersets of a combination that only
+    passes the threshold are still evaluated, as they can be more unique.
+    Combinations that cannot pass because the product of their column
+    cardinalities is too small or one column already has too many nulls are
+    skipped too.
+    """
     composite_candidates = []
     
     # Get columns sorted by key score (exclude already identified PKs)
@@ -857,29 +873,70 @@ def _analyze_composite_keys(
     if len(top_cols) < 2:
         return composite_candidates
     
-    # Try 2-column combinations first
     from itertools import combinations
     
     total_rows = df.height
+    if total_rows == 0:
+        return composite_candidates
+    
+    # Per-column codes (1..n distinct values, 0 for null) and null masks, computed once
+    codes = df.select(
+        [_dense_code_expr(df, c).alias(f"code_{i}") for i, c in enumerate(top_cols)] +
+        [pl.col(c).is_null().alias(f"null_{i}") for i, c in enumerate(top_cols)]
+    )
+    column_stats = codes.select(
+        [pl.col(f"code_{i}").n_unique().alias(f"unique_{i}") for i in range(len(top_cols))] +
+        [pl.col(f"null_{i}").sum().alias(f"nulls_{i}") for i in range(len(top_cols))]
+    ).row(0, named=True)
+    unique_counts = [column_stats[f"unique_{i}"] for i in range(len(top_cols))]
+    null_counts = [column_stats[f"nulls_{i}"] for i in range(len(top_cols))]
+    
+    unique_keys: List[frozenset] = []
     
     for combo_size in range(2, min(len(top_cols), max_columns) + 1):
-        for combo in combinations(top_cols, combo_size):
-            # Calculate uniqueness of the combination
-            combo_cols = list(combo)
+        pending = []
+        for combo in combinations(range(len(top_cols)), combo_size):
+            # Supersets of a fully unique key are fully unique too
+            if any(key <= frozenset(combo) for key in unique_keys):
+                continue
+            
+            # Cardinality bound: distinct combinations <= product of distinct values
+            max_unique = 1
+            for i in combo:
+                max_unique = min(total_rows, max_unique * unique_counts[i])
+            if max_unique / total_rows * 100 < uniqueness_threshold:
+                continue
+            
+            # Null bound: a combination has at least as many nulls as any of its columns
+            if max(null_counts[i] for i in combo) / total_rows * 100 >= 5:
+                continue
             
-            # Create composite key by concatenating columns
+            pending.append(combo)
+        
+        for batch_start in range(0, len(pending), COMPOSITE_KEY_BATCH_SIZE):
+            batch = pending[batch_start:batch_start + COMPOSITE_KEY_BATCH_SIZE]
             try:
-                composite_df = df.select(combo_cols)
-                unique_combos = composite_df.unique().height
-                null_combos = composite_df.filter(
-                    pl.any_horizontal([pl.col(c).is_null() for c in combo_cols])
-                ).height
-                
-                uniqueness_pct = (unique_combos / total_rows * 100) if total_rows > 0 else 0
-                null_pct = (null_combos / total_rows * 100) if total_rows > 0 else 0
+                row = codes.select(
+                    [
+                        pl.struct([f"code_{i}" for i in combo]).n_unique().alias(f"unique_{n}")
+                        for n, combo in enumerate(batch)
+                    ] + [
+                        pl.any_horizontal([f"null_{i}" for i in combo]).sum().alias(f"nulls_{n}")
+                        for n, combo in enumerate(batch)
+                    ]
+                ).row(0, named=True)
+            except Exception:
+                continue
+            
+            for n, combo in enumerate(batch):
+                combo_cols = [top_cols[i] for i in combo]
+                uniqueness_pct = row[f"unique_{n}"] / total_rows * 100
+                null_pct = row[f"nulls_{n}"] / total_rows * 100
                 
                 if uniqueness_pct >= uniqueness_threshold and null_pct < 5:
                     confidence = uniqueness_pct * 0.6 + (100 - null_pct) * 0.4
+                    if row[f"unique_{n}"] == total_rows:
+                        unique_keys.append(frozenset(combo))
                     
                     composite_candidates.append({
                         "columns": combo_cols,
@@ -892,7 +949,18 @@ def _analyze_composite_keys(
                             f"Null rate: {null_pct:.1f}%"
                         ]
                     })
-            except Exception:
-                continue
     
     return composite_candidates
+
+
+def _dense_code_expr(df: pl.DataFrame, col: str) -> pl.Expr:
+    """Encode a column as integer codes (0 for null) for composite key analysis."""
+    try:
+        df.select(pl.col(col).head(1).rank("dense"))
+        codes = pl.col(col).rank("dense")
+    except Exception:
+        # Types without an ordering are ranked by their hash instead
+        codes = pl.col(col).hash(seed=0).rank("dense")
+        codes = pl.when(pl.col(col).is_not_null()).then(codes)
+    return codes.cast(pl.UInt64).fill_null(0)
+
@@ -16,7 +16,6 @@ Input: CSV file (primary) + Optional agent execution context
 Output: Lineage tracking results with execution trail, transformations, and source mappings
 """
 
-import io
 import re
 import time
 import base64
@@ -24,13 +23,14 @@ import hashlib
 import polars as pl
 from typing import Dict, Any, Optional, List
 from datetime import datetime
-from agents.agent_utils import safe_get_list, safe_get_dict
+from agents.agent_utils import safe_get_list, safe_get_dict, DatasetContext, load_dataframe
 
 
 def execute_lineage_tracer(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Trace data lineage and build execution audit trail.
@@ -39,6 +39,7 @@ def execute_lineage_tracer(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters including execution context and lineage history
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary with lineage tracking results
@@ -71,7 +72,7 @@ def execute_lineage_tracer(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
         except Exception as e:
             return {
                 "status": "error",
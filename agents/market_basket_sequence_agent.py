@@ -9,17 +9,15 @@ Output: Frequent itemsets, association rules, sequence transitions, alerts/issue
         recommendations following Agensium agent response standard.
 """
 
-import io
 import time
 from datetime import datetime
-from itertools import combinations
 from typing import Any, Dict, List, Optional, Tuple
 from collections import Counter, defaultdict
 
 import numpy as np
 import polars as pl
 
-from .agent_utils import normalize_column_names, validate_required_parameters
+from .agent_utils import normalize_column_names, validate_required_parameters, DatasetContext, load_dataframe
 
 
 def _convert_numpy_types(obj: Any) -> Any:
@@ -94,10 +92,104 @@ def _parse_datetime_series(expr: pl.Expr) -> pl.Expr:
     )
 
 
+def _fp_growth(
+    transactions: List[Tuple[List[int], int]],
+    min_count: int,
+    max_len: int,
+    suffix: Tuple[int, ...] = (),
+    out: Optional[Dict[Tuple[int, ...], int]] = None
+) -> Dict[Tuple[int, ...], int]:
+    """Mine frequent itemsets from weighted transactions of integer item ids with FP-Growth."""
+    if out is None:
+        out = {}
+
+    counts: Dict[int, int] = defaultdict(int)
+    for items, weight in transactions:
+        for item in items:
+            counts[item] += weight
+    frequent = {item: count for item, count in counts.items() if count >= min_count}
+    if not frequent:
+        return out
+
+    # FP-tree nodes are [item, count, parent, children]; the header links nodes per item
+    root: List[Any] = [None, 0, None, {}]
+    header: Dict[int, List[List[Any]]] = defaultdict(list)
+    for items, weight in transactions:
+        node = root
+        for item in sorted((i for i in items if i in frequent), key=lambda i: (-frequent[i], i)):
+            child = node[3].get(item)
+            if child is None:
+                child = [item, 0, node, {}]
+                node[3][item] = child
+                header[item].append(child)
+            child[1] += weight
+            node = child
+
+    for item in sorted(frequent, key=lambda i: (frequent[i], i)):
+        itemset = tuple(sorted(suffix + (item,)))
+        out[itemset] = frequent[item]
+        if len(itemset) >= max_len:
+            continue
+
+        conditional: List[Tuple[List[int], int]] = []
+        for node in header[item]:
+            path = []
+            parent = node[2]
+            while parent is not None and parent[0] is not None:
+                path.append(parent[0])
+                parent = parent[2]
+            if path:
+                conditional.append((path, node[1]))
+        if conditional:
+            _fp_growth(conditional, min_count, max_len, itemset, out)
+
+    return out
+
+
+def _apriori(
+    transactions: List[List[int]],
+    min_count: int,
+    max_len: int
+) -> Dict[Tuple[int, ...], int]:
+    """Mine frequent itemsets level by level over per-item transaction bitsets."""
+    bitsets: Dict[Tuple[int, ...], int] = {}
+    for tx_index, items in enumerate(transactions):
+        bit = 1 << tx_index
+        for item in items:
+            key = (item,)
+            bitsets[key] = bitsets.get(key, 0) | bit
+
+    level = {k: v for k, v in bitsets.items() if v.bit_count() >= min_count}
+    out = {k: v.bit_count() for k, v in level.items()}
+
+    size = 1
+    while level and size < max_len:
+        keys = sorted(level)
+        next_level: Dict[Tuple[int, ...], int] = {}
+        for a_index, a in enumerate(keys):
+            for b in keys[a_index + 1:]:
+                if a[:-1] != b[:-1]:
+                    break
+                candidate = a + (b[-1],)
+                # Every subset of a frequent itemset must be frequent
+                if any(candidate[:i] + candidate[i + 1:] not in level for i in range(len(candidate) - 2)):
+                    continue
+                bitset = level[a] & level[b]
+                count = bitset.bit_count()
+                if count >= min_count:
+                    next_level[candidate] = bitset
+                    out[candidate] = count
+        level = next_level
+        size += 1
+
+    return out
+
+
 def execute_market_basket_sequence_agent(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """Execute Market Basket & Sequence analysis."""
 
@@ -171,7 +263,7 @@ def execute_market_basket_sequence_agent(
         # Load CSV
         # ----------------------------
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
         except Exception as e:
             return {
                 "status": "error",
@@ -461,20 +553,15 @@ def execute_market_basket_sequence_agent(
             })
 
         if mode == "within_basket":
-            baskets = (
-                valid.select(["transaction_id", "product_id"])
-                .group_by("transaction_id")
-                .agg(pl.col("product_id").alias("products"))
+            # Distinct (transaction, product) pairs, keeping transactions with enough items
+            pairs = valid.select(["transaction_id", "product_id"]).unique()
+            kept = (
+                pairs.group_by("transaction_id")
+                .agg(pl.len().alias("n_items"))
+                .filter(pl.col("n_items") >= min_items_per_transaction)
             )
-
-            # Convert to list of unique product lists
-            baskets_list = [
-                _unique_sorted(row["products"]) for row in baskets.iter_rows(named=True)
-            ]
-
-            # Filter by min_items_per_transaction
-            baskets_list = [b for b in baskets_list if len(b) >= min_items_per_transaction]
-            total_transactions = len(baskets_list)
+            pairs = pairs.join(kept.select("transaction_id"), on="transaction_id", how="semi")
+            total_transactions = kept.height
 
             if total_transactions == 0:
                 return {
@@ -485,44 +572,54 @@ def execute_market_basket_sequence_agent(
                     "execution_time_ms": int((time.time() - start_time) * 1000),
                 }
 
-            item_counts: Counter = Counter()
-            itemset_counts: Counter = Counter()
+            # Encode products as integer ids in name order so sorted ids are sorted names
+            item_table = (
+                pairs.group_by("product_id")
+                .agg(pl.len().alias("count"))
+                .sort("product_id")
+                .with_row_index("item_id")
+            )
+            item_names = item_table["product_id"].to_list()
+            unique_products = item_table.height
 
-            for items in baskets_list:
-                if not items:
-                    continue
-                for item in items:
-                    item_counts[(item,)] += 1
-                max_len = min(max_itemset_length, len(items))
-                for size in range(2, max_len + 1):
-                    for combo in combinations(items, size):
-                        itemset_counts[combo] += 1
+            min_count = max(1, int(np.ceil((support - 1e-12) * total_transactions)))
+            frequent_items = item_table.filter(pl.col("count") >= min_count)
+            transactions = (
+                pairs.join(frequent_items.select(["product_id", "item_id"]), on="product_id")
+                .group_by("transaction_id")
+                .agg(pl.col("item_id"))
+                .get_column("item_id")
+                .to_list()
+            )
+
+            if algorithm == "apriori":
+                itemset_ids = _apriori(transactions, min_count, max_itemset_length)
+            else:
+                itemset_ids = _fp_growth([(items, 1) for items in transactions], min_count, max_itemset_length)
 
-            all_counts = Counter()
-            all_counts.update(item_counts)
-            all_counts.update(itemset_counts)
+            all_counts: Dict[Tuple[str, ...], int] = {
+                tuple(item_names[i] for i in ids): count for ids, count in itemset_ids.items()
+            }
 
             frequent_itemsets = []
             for itemset, count in all_counts.items():
                 support_value = count / float(total_transactions)
-                if support_value + 1e-12 >= support:
-                    frequent_itemsets.append({
-                        "items": _format_itemset(itemset),
-                        "size": len(itemset),
-                        "count": int(count),
-                        "support": round(float(support_value), 6),
-                    })
+                frequent_itemsets.append({
+                    "items": _format_itemset(itemset),
+                    "size": len(itemset),
+                    "count": int(count),
+                    "support": round(float(support_value), 6),
+                })
 
             frequent_itemsets.sort(key=lambda x: (x["support"], x["count"]), reverse=True)
 
+            # Rules come from frequent itemsets only; their subsets are frequent too
             rules = []
-            for itemset, count in itemset_counts.items():
+            for itemset, count in all_counts.items():
                 size = len(itemset)
                 if size < 2:
                     continue
                 support_itemset = count / float(total_transactions)
-                if support_itemset + 1e-12 < support:
-                    continue
                 for consequent in itemset:
                     antecedent = tuple(sorted(i for i in itemset if i != consequent))
                     antecedent_count = all_counts.get(antecedent, 0)
@@ -549,8 +646,6 @@ def execute_market_basket_sequence_agent(
             rules.sort(key=lambda x: (x["lift"], x["confidence"], x["support"]), reverse=True)
             rules = rules[:top_n_rules]
 
-            unique_products = len(item_counts)
-
             data["within_basket"] = {
                 "transactions": int(total_transactions),
                 "unique_products": int(unique_products),
@@ -19,19 +19,19 @@ Output: Final mastered CSV file with complete audit trail
 import io
 import re
 import time
-import base64
 import hashlib
 import polars as pl
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from collections import defaultdict
-from agents.agent_utils import safe_get_list, safe_get_dict
+from agents.agent_utils import safe_get_list, safe_get_dict, DatasetContext, load_dataframe, build_cleaned_file
 
 
 def execute_master_writeback_agent(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Create the final mastered output file consolidating all agent results.
@@ -40,6 +40,7 @@ def execute_master_writeback_agent(
         file_contents: File bytes (read as binary)
         filename: Original filename
         parameters: Agent parameters including output configuration
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary with final mastered file
@@ -75,7 +76,7 @@ def execute_master_writeback_agent(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
         except Exception as e:
             return {
                 "status": "error",
@@ -513,10 +514,6 @@ def execute_master_writeback_agent(
             "timeline": "1 month"
         })
 
-        # Generate final output file
-        mastered_file_bytes = _generate_mastered_file(clean_df, filename)
-        mastered_file_base64 = base64.b64encode(mastered_file_bytes).decode('utf-8')
-
         return {
             "status": "success",
             "agent_id": "master-writeback-agent",
@@ -540,13 +537,7 @@ def execute_master_writeback_agent(
             "ai_analysis_text": ai_analysis_text,
             "row_level_issues": row_level_issues,
             "issue_summary": issue_summary,
-            "cleaned_file": {
-                # "filename": f"mastered_{version_suffix}_{filename}",
-                "filename": f"mastered_{filename}",
-                "content": mastered_file_base64,
-                "size_bytes": len(mastered_file_bytes),
-                "format": filename.split('.')[-1].lower()
-            }
+            "cleaned_file": build_cleaned_file(clean_df, filename, "mastered_", dataset)
         }
 
     except Exception as e:
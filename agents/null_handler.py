@@ -9,23 +9,32 @@ Output: Standardized null handling results with cleaning effectiveness scores
 
 import polars as pl
 import numpy as np
-import io
 import time
-import base64
 from typing import Dict, Any, Optional, List
-from agents.agent_utils import safe_get_dict
+from agents.agent_utils import safe_get_dict, DatasetContext, load_dataframe, build_cleaned_file
 
 try:
     from sklearn.impute import KNNImputer
+    from sklearn.neighbors import BallTree
     HAS_SKLEARN = True
 except ImportError:
     HAS_SKLEARN = False
 
+# Frames up to this many rows are imputed with sklearn's exact KNNImputer;
+# larger frames use the BallTree backend
+KNN_EXACT_MAX_ROWS = 20_000
+# Donor rows indexed by the BallTree backend (stratified sample above this)
+KNN_MAX_REFERENCE_ROWS = 50_000
+# Rows with nulls queried against the BallTree per batch
+KNN_QUERY_BATCH_SIZE = 10_000
+KNN_SAMPLE_SEED = 42
+
 
 def execute_null_handler(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Handle missing values in data.
@@ -34,6 +43,7 @@ def execute_null_handler(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters from tool.json
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary
@@ -64,7 +74,7 @@ def execute_null_handler(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
         except Exception as e:
             return {
                 "status": "error",
@@ -221,10 +231,6 @@ def execute_null_handler(
             severity = issue["severity"]
             issue_summary["by_severity"][severity] = issue_summary["by_severity"].get(severity, 0) + 1
         
-        # Generate cleaned file (CSV format)
-        cleaned_file_bytes = _generate_cleaned_file(df_cleaned, filename)
-        cleaned_file_base64 = base64.b64encode(cleaned_file_bytes).decode('utf-8')
-        
         # Build results
         null_handling_data = {
             "cleaning_score": cleaning_score,
@@ -606,12 +612,7 @@ def execute_null_handler(
             "recommendations": agent_recommendations,
             "executive_summary" : executive_summary,
             "ai_analysis_text" : ai_analysis_text,
-            "cleaned_file": {
-                "filename": f"cleaned_{filename}",
-                "content": cleaned_file_base64,
-                "size_bytes": len(cleaned_file_bytes),
-                "format": filename.split('.')[-1].lower()
-            },
+            "cleaned_file": build_cleaned_file(df_cleaned, filename, "cleaned_", dataset),
             "row_level_issues": row_level_issues,
             "issue_summary": issue_summary
         }
@@ -746,6 +747,10 @@ def _apply_null_handling(
     df_cleaned = df.clone()
     imputation_log = []
     
+    # KNN columns are imputed together, with one fit, at the first of them
+    knn_columns = [col for col, strategy in column_strategies.items() if strategy == 'knn_imputation']
+    knn_applied = False
+    
     # Apply global strategy
     if global_strategy == 'drop_rows':
         initial_rows = df_cleaned.height
@@ -801,30 +806,10 @@ def _apply_null_handling(
                 df_cleaned = df_cleaned.with_columns(pl.col(col).fill_null(fill_value))
                 imputation_log.append(f"Filled {null_count_before} nulls in '{col}' with constant ({fill_value})")
             
-            elif strategy == 'knn_imputation':
-                # KNN requires conversion to pandas/numpy if using sklearn
-                if HAS_SKLEARN:
-                    # We only impute this column using other numeric columns
-                    numeric_cols = [c for c in df_cleaned.columns if df_cleaned[c].dtype in [pl.Float32, pl.Float64, pl.Int32, pl.Int64]]
-                    if col in numeric_cols:
-                        # Convert to pandas
-                        pdf = df_cleaned.select(numeric_cols).to_pandas()
-                        imputer = KNNImputer(n_neighbors=knn_neighbors)
-                        imputed_data = imputer.fit_transform(pdf)
-                        
-                        # Update column in Polars
-                        col_idx = numeric_cols.index(col)
-                        imputed_col = imputed_data[:, col_idx]
-                        df_cleaned = df_cleaned.with_columns(pl.Series(col, imputed_col))
-                        
-                        null_count_after = df_cleaned[col].null_count()
-                        filled_count = null_count_before - null_count_after
-                        imputation_log.append(f"KNN imputed {filled_count} nulls in '{col}'")
-                else:
-                    # Fallback to median
-                    median_val = df_cleaned[col].median()
-                    df_cleaned = df_cleaned.with_columns(pl.col(col).fill_null(median_val))
-                    imputation_log.append(f"KNN unavailable, filled {null_count_before} nulls in '{col}' with median ({median_val})")
+            elif strategy == 'knn_imputation' and not knn_applied:
+                knn_applied = True
+                df_cleaned, knn_log = _knn_impute(df_cleaned, knn_columns, knn_neighbors)
+                imputation_log.extend(knn_log)
         
         except Exception as e:
             imputation_log.append(f"Error applying {strategy} to '{col}': {str(e)}")
@@ -832,6 +817,134 @@ def _apply_null_handling(
     return df_cleaned, imputation_log
 
 
+def _knn_impute(df: pl.DataFrame, columns: List[str], knn_neighbors: int) -> tuple:
+    """
+    Impute every KNN-targeted column with a single neighbor model.
+    
+    All numeric columns are the features. Frames up to KNN_EXACT_MAX_ROWS
+    rows go through one KNNImputer fit_transform (nan-euclidean distances);
+    larger frames use _balltree_knn_impute. Target columns that are entirely
+    null have no donors and are left unchanged.
+    
+    Returns:
+        Tuple of (imputed dataframe, imputation log lines)
+    """
+    imputation_log = []
+    numeric_cols = [c for c in df.columns if df[c].dtype in [pl.Float32, pl.Float64, pl.Int32, pl.Int64]]
+    targets = [
+        c for c in dict.fromkeys(columns)
+        if c in numeric_cols and 0 < df[c].null_count() < df.height
+    ]
+    if not targets:
+        return df, imputation_log
+    null_counts = {c: df[c].null_count() for c in targets}
+    
+    if not HAS_SKLEARN:
+        # Fallback to median
+        for col in targets:
+            median_val = df[col].median()
+            df = df.with_columns(pl.col(col).fill_null(median_val))
+            imputation_log.append(f"KNN unavailable, filled {null_counts[col]} nulls in '{col}' with median ({median_val})")
+        return df, imputation_log
+    
+    features = df.select(numeric_cols).cast(pl.Float64).to_numpy()
+    target_idx = [numeric_cols.index(c) for c in targets]
+    if df.height <= KNN_EXACT_MAX_ROWS:
+        # keep_empty_features keeps column positions aligned with numeric_cols
+        imputer = KNNImputer(n_neighbors=knn_neighbors, keep_empty_features=True)
+        imputed = imputer.fit_transform(features)[:, target_idx]
+    else:
+        imputed = _balltree_knn_impute(features, target_idx, knn_neighbors)
+    
+    df = df.with_columns([pl.Series(col, imputed[:, j]) for j, col in enumerate(targets)])
+    for col in targets:
+        filled_count = null_counts[col] - df[col].null_count()
+        imputation_log.append(f"KNN imputed {filled_count} nulls in '{col}'")
+    return df, imputation_log
+
+
+def _balltree_knn_impute(features: np.ndarray, target_idx: List[int], knn_neighbors: int) -> np.ndarray:
+    """
+    Approximate KNN imputation for large frames.
+    
+    As with KNNImputer's nan-euclidean distance, a receiver (row with a
+    null in a target column) is only compared on the features it has.
+    Receivers are grouped by observed-feature pattern; for each pattern
+    and each target column it is missing, one BallTree is built over the
+    standardized observed features of the donors (rows with a value in
+    that column, capped by stratified sampling) and the receivers are
+    queried in batches of KNN_QUERY_BATCH_SIZE. Donors that have all of
+    those features are preferred; other donors' missing features are set
+    to 0 (the column mean). Each missing value is the mean of the nearest
+    knn_neighbors donors, or the column mean if the receiver has no
+    features at all.
+    
+    Returns:
+        Array of the target columns with nulls filled (rows x targets)
+    """
+    observed = ~np.isnan(features)
+    mean = np.nanmean(features, axis=0)
+    std = np.nanstd(features, axis=0)
+    mean = np.where(np.isnan(mean), 0.0, mean)
+    std = np.where(np.isnan(std) | (std == 0), 1.0, std)
+    standardized = np.where(observed, (features - mean) / std, 0.0)
+    
+    targets = features[:, target_idx]
+    column_means = np.nanmean(targets, axis=0)
+    imputed = targets.copy()
+    receivers = np.flatnonzero(np.isnan(targets).any(axis=1))
+    patterns, pattern_of = np.unique(observed[receivers], axis=0, return_inverse=True)
+    pattern_of = pattern_of.ravel()
+    target_donors = {}
+    
+    for p, pattern in enumerate(patterns):
+        rows = receivers[pattern_of == p]
+        feature_idx = np.flatnonzero(pattern)
+        for j, target in enumerate(target_idx):
+            if pattern[target]:
+                continue
+            if not len(feature_idx):
+                imputed[rows, j] = column_means[j]
+                continue
+            if j not in target_donors:
+                has_target = np.flatnonzero(observed[:, target])
+                target_donors[j] = _stratified_reference_rows(observed[has_target], has_target)
+            donors = target_donors[j]
+            complete = donors[observed[np.ix_(donors, feature_idx)].all(axis=1)]
+            if len(complete) >= knn_neighbors:
+                donors = complete
+            
+            tree = BallTree(standardized[np.ix_(donors, feature_idx)])
+            k = min(knn_neighbors, len(donors))
+            for start in range(0, len(rows), KNN_QUERY_BATCH_SIZE):
+                batch = rows[start:start + KNN_QUERY_BATCH_SIZE]
+                _, neighbors = tree.query(standardized[np.ix_(batch, feature_idx)], k=k)
+                imputed[batch, j] = targets[donors[neighbors], j].mean(axis=1)
+    return imputed
+
+
+def _stratified_reference_rows(known: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """
+    Cap the donor rows at KNN_MAX_REFERENCE_ROWS by stratified sampling.
+    
+    Rows are stratified by which features they have a value in and each
+    stratum is sampled in proportion (at least one row), so donors
+    complete on any receiver's features are kept.
+    """
+    if len(rows) <= KNN_MAX_REFERENCE_ROWS:
+        return rows
+    rng = np.random.default_rng(KNN_SAMPLE_SEED)
+    _, strata = np.unique(known, axis=0, return_inverse=True)
+    strata = strata.ravel()
+    fraction = KNN_MAX_REFERENCE_ROWS / len(rows)
+    sampled = []
+    for stratum in range(strata.max() + 1):
+        members = rows[strata == stratum]
+        size = min(len(members), max(1, int(round(len(members) * fraction))))
+        sampled.append(rng.choice(members, size=size, replace=False))
+    return np.sort(np.concatenate(sampled))
+
+
 def _calculate_cleaning_score(
     original_df: pl.DataFrame,
     cleaned_df: pl.DataFrame,
@@ -874,20 +987,3 @@ def _calculate_cleaning_score(
             "cleaned_columns": len(cleaned_df.columns)
         }
     }
-
-
-def _generate_cleaned_file(df: pl.DataFrame, original_filename: str) -> bytes:
-    """
-    Generate cleaned data file in CSV format.
-    
-    Args:
-        df: Cleaned dataframe
-        original_filename: Original filename to determine format
-        
-    Returns:
-        File contents as bytes
-    """
-    # Always export as CSV for consistency and compatibility
-    output = io.BytesIO()
-    df.write_csv(output)
-    return output.getvalue()
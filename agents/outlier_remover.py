@@ -9,15 +9,15 @@ Output: Standardized outlier handling results with cleaning effectiveness scores
 
 import polars as pl
 import numpy as np
-import io
 import time
-import base64
 from typing import Dict, Any, Optional, List
+from agents.agent_utils import DatasetContext, load_dataframe, build_cleaned_file
 
 def execute_outlier_remover(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Handle outliers in numeric data.
@@ -26,6 +26,7 @@ def execute_outlier_remover(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters from tool.json
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary
@@ -58,7 +59,7 @@ def execute_outlier_remover(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True)
         except Exception as e:
              return {
                 "status": "error",
@@ -528,12 +529,7 @@ def execute_outlier_remover(
             "recommendations": agent_recommendations,
             "executive_summary" : executive_summary,
             "ai_analysis_text" : ai_analysis_text,
-            "cleaned_file": {
-                "filename": f"cleaned_{filename}",
-                "content": base64.b64encode(_generate_cleaned_file(df_cleaned, filename)).decode('utf-8'),
-                "size_bytes": len(_generate_cleaned_file(df_cleaned, filename)),
-                "format": filename.split('.')[-1].lower()
-            },
+            "cleaned_file": build_cleaned_file(df_cleaned, filename, "cleaned_", dataset),
             "row_level_issues": row_level_issues,
             "issue_summary": issue_summary
         }
@@ -815,19 +811,3 @@ def _calculate_cleaning_score(
             "cleaned_columns": len(cleaned_df.columns)
         }
     }
-
-def _generate_cleaned_file(df: pl.DataFrame, original_filename: str) -> bytes:
-    """
-    Generate cleaned data file in CSV format.
-    
-    Args:
-        df: Cleaned dataframe
-        original_filename: Original filename to determine format
-        
-    Returns:
-        File contents as bytes
-    """
-    # Always export as CSV for consistency and compatibility
-    output = io.BytesIO()
-    df.write_csv(output)
-    return output.getvalue()
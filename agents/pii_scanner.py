@@ -0,0 +1,188 @@
+"""
+PII Scanner
+
+Shared PII detection engine for the profiling and governance agents.
+
+Value patterns are evaluated natively in Polars: all columns and patterns
+of a scan run in one query. Results are cached per column of a shared
+DatasetContext, so agents of the same tool run (e.g. Unified Profiler and
+Risk Scorer) scan each column once.
+
+Two scans are provided:
+- scan_pii_samples: match counts of every registry pattern on a seeded
+  random sample of N non-null values of each column (value-based PII typing)
+- scan_pii_columns: whether any value of a column matches a pattern
+  (governance checks over the whole column)
+"""
+
+import threading
+import weakref
+from typing import Dict, Any, Optional, List, Tuple
+
+import polars as pl
+
+from agents.agent_utils import DatasetContext, collect_streaming
+
+
+# Value patterns by PII type, checked in this order (the phone pattern also
+# matches SSNs and card numbers, so it comes after them)
+PII_PATTERNS = {
+    "email_address": r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
+    "ssn": r'^\d{3}-\d{2}-\d{4}$',
+    "credit_card": r'^\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}$',
+    "phone_number": r'^[\d\s\-\(\)\+]{10,}$',
+    "zipcode": r'^\d{5}(-\d{4})?$'
+}
+
+# Looser markers used together with column names
+PII_MARKERS = {
+    "email_marker": {"pattern": '@', "literal": True},
+    "capitalized_word": {"pattern": r'[A-Z][a-z]*', "literal": False}
+}
+
+# Every check evaluated by scan_pii_samples: check name -> (pattern, literal)
+SAMPLE_CHECKS = {
+    **{pii_type: (pattern, False) for pii_type, pattern in PII_PATTERNS.items()},
+    **{name: (marker["pattern"], marker["literal"]) for name, marker in PII_MARKERS.items()}
+}
+
+# Name-based PII detection: a column whose name is listed is flagged when
+# more than min_pct of its sampled values pass the named sample check
+PII_NAME_RULES = [
+    {"names": ['email', 'email_address', 'email_addr', 'contact_email'],
+     "check": "email_marker", "min_pct": 70, "pii_type": "email_address", "sensitivity": "high"},
+    {"names": ['phone', 'phone_number', 'contact_phone', 'mobile', 'telephone'],
+     "check": "phone_number", "min_pct": 70, "pii_type": "phone_number", "sensitivity": "high"},
+    {"names": ['ssn', 'social_security', 'social_security_number'],
+     "check": "ssn", "min_pct": 70, "pii_type": "ssn", "sensitivity": "high"},
+    {"names": ['name', 'full_name', 'first_name', 'last_name', 'person_name', 'customer_name'],
+     "check": "capitalized_word", "min_pct": 80, "pii_type": "name", "sensitivity": "high"},
+    {"names": ['credit_card', 'card_number', 'cc_number', 'payment_card'],
+     "check": "credit_card", "min_pct": 70, "pii_type": "credit_card", "sensitivity": "critical"}
+]
+
+DEFAULT_PII_SAMPLE_SIZE = 100
+PII_SAMPLE_SEED = 42
+
+
+# Scan results per shared dataset: dataset -> (lock, {cache key -> result})
+_scan_caches: "weakref.WeakKeyDictionary[DatasetContext, Tuple[threading.Lock, Dict[tuple, Any]]]" = weakref.WeakKeyDictionary()
+_scan_caches_lock = threading.Lock()
+
+
+def pii_name_rule_for(col: str) -> Optional[Dict[str, Any]]:
+    """Return the name-based PII rule that applies to a column, if any."""
+    col_lower = col.lower()
+    for rule in PII_NAME_RULES:
+        if col_lower in rule["names"]:
+            return rule
+    return None
+
+
+def _dataset_cache(dataset: Optional[DatasetContext]) -> Tuple[threading.Lock, Dict[tuple, Any]]:
+    """Get the scan cache of a dataset (a private, throwaway cache without one)."""
+    if dataset is None:
+        return threading.Lock(), {}
+    with _scan_caches_lock:
+        cache = _scan_caches.get(dataset)
+        if cache is None:
+            cache = (threading.Lock(), {})
+            _scan_caches[dataset] = cache
+        return cache
+
+
+def _cached_scan(
+    dataset: Optional[DatasetContext],
+    keys: List[tuple],
+    compute
+) -> Dict[tuple, Any]:
+    """
+    Return cached results for keys, computing the missing ones in one call.
+
+    The dataset's cache lock is held while computing, so agents running
+    concurrently on the same dataset wait for one scan instead of repeating it.
+    """
+    lock, cache = _dataset_cache(dataset)
+    with lock:
+        missing = [key for key in dict.fromkeys(keys) if key not in cache]
+        if missing:
+            cache.update(compute(missing))
+        return {key: cache[key] for key in keys}
+
+
+def scan_pii_samples(
+    lf: pl.LazyFrame,
+    columns: List[str],
+    sample_size: int = DEFAULT_PII_SAMPLE_SIZE,
+    dataset: Optional[DatasetContext] = None
+) -> Dict[str, Dict[str, int]]:
+    """
+    Count PII pattern matches on sample_size non-null values of each column.
+
+    The values are a seeded random sample of the whole column, so files
+    sorted or grouped by some key are not typed by their first rows. Values
+    are cast to strings, so numeric columns are scanned too (e.g. zip codes
+    read as integers).
+
+    Args:
+        lf: Lazy query over the dataset
+        columns: Columns to scan
+        sample_size: Number of non-null values sampled per column
+        dataset: Shared DatasetContext the query comes from (enables caching)
+
+    Returns:
+        Dictionary of column -> {"sample_len": n, <check name>: matches, ...}
+        for every check in SAMPLE_CHECKS
+    """
+    schema = lf.collect_schema()
+    keys = [("sample", col, str(schema[col]), sample_size) for col in columns]
+
+    def _compute(missing: List[tuple]) -> Dict[tuple, Any]:
+        exprs = []
+        for _, col, _, size in missing:
+            values = pl.col(col).drop_nulls()
+            sample = values.sample(n=pl.min_horizontal(values.len(), size), seed=PII_SAMPLE_SEED).cast(pl.Utf8)
+            exprs.append(pl.struct(
+                [sample.len().alias("sample_len")] + [
+                    sample.str.contains(pattern, literal=literal).sum().alias(name)
+                    for name, (pattern, literal) in SAMPLE_CHECKS.items()
+                ]
+            ).alias(col))
+        row = collect_streaming(lf.select(exprs)).row(0, named=True)
+        return {key: row[key[1]] for key in missing}
+
+    results = _cached_scan(dataset, keys, _compute)
+    return {key[1]: results[key] for key in keys}
+
+
+def scan_pii_columns(
+    lf: pl.LazyFrame,
+    checks: List[Tuple[str, str]],
+    dataset: Optional[DatasetContext] = None
+) -> Dict[Tuple[str, str], bool]:
+    """
+    Check whether any value of a column matches a PII pattern.
+
+    Args:
+        lf: Lazy query over the dataset
+        checks: (column, regex pattern) pairs
+        dataset: Shared DatasetContext the query comes from (enables caching)
+
+    Returns:
+        Dictionary of (column, pattern) -> any value matches
+    """
+    if not checks:
+        return {}
+
+    schema = lf.collect_schema()
+    keys = [("column", col, str(schema[col]), pattern) for col, pattern in checks]
+
+    def _compute(missing: List[tuple]) -> Dict[tuple, Any]:
+        row = collect_streaming(lf.select([
+            pl.col(col).str.contains(pattern).any().alias(str(i))
+            for i, (_, col, _, pattern) in enumerate(missing)
+        ])).row(0)
+        return {key: bool(matched) for key, matched in zip(missing, row)}
+
+    results = _cached_scan(dataset, keys, _compute)
+    return {(key[1], key[3]): results[key] for key in keys}
@@ -33,19 +33,18 @@ Key Features:
 
 import polars as pl
 import numpy as np
-import io
 import time
-import base64
 import json
 from typing import Dict, Any, Optional, Tuple, List
 from datetime import datetime
 import re
-from agents.agent_utils import safe_get_list, safe_get_dict
+from agents.agent_utils import safe_get_list, safe_get_dict, DatasetContext, load_dataframe, build_cleaned_file
 
 def execute_quarantine_agent(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Execute quarantine agent to identify and isolate invalid data.
@@ -54,6 +53,7 @@ def execute_quarantine_agent(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters from tool.json
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary
@@ -92,7 +92,7 @@ def execute_quarantine_agent(
         try:
             # Read as String to capture all values for validation
             # infer_schema_length=0 forces all columns to be read as String (Utf8)
-            df = pl.read_csv(io.BytesIO(file_contents), infer_schema_length=0, ignore_errors=True)
+            df = load_dataframe(file_contents, dataset, infer_schema_length=0, ignore_errors=True)
         except Exception as e:
              return {
                 "status": "error",
@@ -154,11 +154,8 @@ def execute_quarantine_agent(
         else:
             quality_status = "needs_improvement"
 
-        # Generate cleaned file (CSV format)
         # Remove row_index before export
         df_clean_export = df_clean.drop("row_index")
-        cleaned_file_bytes = _generate_cleaned_file(df_clean_export, filename)
-        cleaned_file_base64 = base64.b64encode(cleaned_file_bytes).decode('utf-8')
 
         # Build results
         quarantine_data = {
@@ -597,12 +594,7 @@ def execute_quarantine_agent(
             "recommendations": agent_recommendations,
             "executive_summary" : executive_summary,
             "ai_analysis_text" : ai_analysis_text,
-            "cleaned_file": {
-                "filename": f"cleaned_{filename}",
-                "content": cleaned_file_base64,
-                "size_bytes": len(cleaned_file_bytes),
-                "format": filename.split('.')[-1].lower()
-            },
+            "cleaned_file": build_cleaned_file(df_clean_export, filename, "cleaned_", dataset),
             "row_level_issues": row_level_issues,
             "issue_summary": issue_summary
         }
@@ -952,19 +944,3 @@ def _extract_row_level_issues(quarantined_df: pl.DataFrame, quarantine_analysis:
         })
     
     return issues
-
-
-def _generate_cleaned_file(df: pl.DataFrame, original_filename: str) -> bytes:
-    """
-    Generate cleaned data file (after quarantine removal).
-    
-    Args:
-        df: Cleaned dataframe
-        original_filename: Original filename to determine format
-        
-    Returns:
-        File contents as bytes
-    """
-    output = io.BytesIO()
-    df.write_csv(output)
-    return output.getvalue()
@@ -7,15 +7,20 @@ Output: Uniform readiness rating structure matching API specification
 """
 
 import polars as pl
-import io
 import time
 import numpy as np
 from typing import Dict, Any, Optional
+from agents.agent_utils import DatasetContext, scan_dataframe, collect_streaming, iter_dataframe_batches
+from agents.sketches import QuantileSketch, sketch_quantiles
+
+NUMERIC_DTYPES = [pl.Int8, pl.Int16, pl.Int32, pl.Int64, pl.Float32, pl.Float64]
+DATE_NAME_PATTERNS = ['date', 'time', 'created', 'updated', 'timestamp', 'datetime']
 
 def execute_readiness_rater(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Rate data readiness based on quality metrics.
@@ -24,6 +29,7 @@ def execute_readiness_rater(
         file_contents: File bytes
         filename: Original filename
         parameters: Agent parameters matching tool.json (ready_threshold, needs_review_threshold, component weights)
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
         
     Returns:
         Uniform output structure matching API_SPECIFICATION.js response format
@@ -38,6 +44,7 @@ def execute_readiness_rater(
     completeness_weight = parameters.get("completeness_weight", 0.3)
     consistency_weight = parameters.get("consistency_weight", 0.3)
     schema_health_weight = parameters.get("schema_health_weight", 0.4)
+    approximate_statistics = parameters.get("approximate_statistics", False)
     
     try:
         # Read file - CSV only
@@ -49,7 +56,10 @@ def execute_readiness_rater(
             }
             
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+            # Scan lazily; all metrics are aggregates or bounded row samples
+            lf = scan_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
+            schema = lf.collect_schema()
+            row_count = collect_streaming(lf.select(pl.len())).item()
         except Exception as e:
              return {
                 "status": "error",
@@ -57,8 +67,8 @@ def execute_readiness_rater(
                 "execution_time_ms": int((time.time() - start_time) * 1000)
             }
 
-        row_count = df.height
-        col_count = df.width
+        columns = schema.names()
+        col_count = len(columns)
         
         if row_count == 0 or col_count == 0:
              return {
@@ -67,16 +77,21 @@ def execute_readiness_rater(
                 "execution_time_ms": int((time.time() - start_time) * 1000)
             }
 
+        # Collect per-column statistics in a single pass (quartiles from
+        # per-batch quantile sketches in approximate mode)
+        sketches = None
+        if approximate_statistics:
+            numeric_cols = [col for col, dtype in schema.items() if dtype in NUMERIC_DTYPES]
+            batches = iter_dataframe_batches(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
+            sketches = sketch_quantiles(
+                (batch.select(numeric_cols).cast(pl.Float64, strict=False) for batch in batches), numeric_cols
+            )
+        stats = _collect_column_stats(lf, schema, sketches)
+        null_counts = stats["null_counts"]
+        
         # Calculate completeness score
         total_cells = row_count * col_count
-        # Calculate total nulls across all columns
-        # df.null_count() returns a 1-row DataFrame with null counts per column
-        # We sum these horizontally to get the total count
-        try:
-            missing_cells = df.select(pl.sum_horizontal(pl.all().null_count())).item()
-        except:
-            # Fallback
-            missing_cells = df.null_count().transpose().sum().item()
+        missing_cells = sum(null_counts.values())
             
         completeness_score = ((total_cells - missing_cells) / total_cells * 100) if total_cells > 0 else 0
         
@@ -89,25 +104,21 @@ def execute_readiness_rater(
         # Since we used ignore_errors=True, bad values might be null or the column might be Utf8.
         
         # Let's try to detect "numeric-looking" string columns that have non-numeric values
-        for col in df.columns:
-            if df[col].dtype == pl.Utf8:
-                # Check if it looks numeric (regex check on a sample or try cast)
-                # We'll try to cast to float. If success rate is high but not 100%, it might be inconsistent.
+        for col in columns:
+            if schema[col] == pl.Utf8:
+                # Check if it looks numeric: cast to float after stripping non-digits.
+                # If success rate is high but not 100%, it might be inconsistent.
                 # But if it's 0% success, it's just a string column.
                 
-                non_null_count = df[col].drop_nulls().len()
+                non_null_count = row_count - null_counts[col]
                 if non_null_count > 0:
-                    # Try casting to float
-                    # Use replace_all for regex replacement in newer Polars versions
-                    # Or replace with literal=False if supported, but replace_all is safer for "remove all non-digits"
-                    numeric_cast = df[col].str.replace_all(r"[^\d\.-]", "").cast(pl.Float64, strict=False)
-                    numeric_count = numeric_cast.drop_nulls().len()
+                    numeric_count = stats["numeric_counts"][col]
                     
                     # If it has some numbers but also some non-numbers (and it's not just a few, but not all)
                     # Heuristic: if > 0% and < 100% are numeric, and the column isn't just IDs or something.
                     # The original code checked: if any digit in first value, and pd.to_numeric fails.
                     
-                    first_val = df[col].drop_nulls().head(1)[0]
+                    first_val = stats["first_values"][col]
                     has_digit = any(c.isdigit() for c in str(first_val))
                     
                     if has_digit and numeric_count < non_null_count:
@@ -124,11 +135,9 @@ def execute_readiness_rater(
         unnamed_columns = 0
         inconsistent_columns = 0
         
-        null_counts = df.null_count()
-        
-        for col in df.columns:
+        for col in columns:
             # Deduct for columns with all nulls
-            if null_counts[col][0] == row_count:
+            if null_counts[col] == row_count:
                 null_columns += 1
                 schema_health -= 15
             
@@ -138,14 +147,14 @@ def execute_readiness_rater(
                 schema_health -= 8
             
             # Check for inconsistent data types within column (similar to consistency check above)
-            if df[col].dtype == pl.Utf8:
-                non_null = df[col].drop_nulls()
-                if len(non_null) > 0:
+            if schema[col] == pl.Utf8:
+                non_null_count = row_count - null_counts[col]
+                if non_null_count > 0:
                     # Try to detect mixed types
                     # Using regex to match numeric-like strings
-                    numeric_like_count = non_null.str.contains(r"^-?\d+\.?\d*$").sum()
+                    numeric_like_count = stats["numeric_like_counts"][col]
                     
-                    if 0 < numeric_like_count < len(non_null) * 0.3:
+                    if 0 < numeric_like_count < non_null_count * 0.3:
                         inconsistent_columns += 1
                         schema_health -= 5
         
@@ -174,8 +183,8 @@ def execute_readiness_rater(
         deductions = []
         
         # Check for missing values
-        for col in df.columns:
-            missing_pct = (null_counts[col][0] / row_count * 100) if row_count > 0 else 0
+        for col in columns:
+            missing_pct = (null_counts[col] / row_count * 100) if row_count > 0 else 0
             if missing_pct > 10:
                 deduction_amount = min(missing_pct / 5, 25)
                 deductions.append({
@@ -187,77 +196,32 @@ def execute_readiness_rater(
                 })
         
         # Check for format inconsistencies (date formats)
-        date_patterns = ['date', 'time', 'created', 'updated', 'timestamp', 'datetime']
-        for col in df.columns:
-            col_lower = col.lower()
-            if any(x in col_lower for x in date_patterns):
-                # Try to parse as datetime
-                if df[col].dtype != pl.Date and df[col].dtype != pl.Datetime:
-                    # It's likely a string or mixed
-                    try:
-                        # Try strict casting first
-                        df.select(pl.col(col).str.to_datetime(strict=True))
-                    except:
-                        # Failed strict parsing
-                        # Count unparseable
-                        # We can try to cast with strict=False and count nulls that weren't null before
-                        
-                        # Note: str.to_datetime requires a format or it tries to infer. 
-                        # Polars doesn't have a generic "guess format" like pandas to_datetime without arguments for mixed formats easily.
-                        # We'll use a heuristic: try to cast to datetime, count nulls.
-                        
-                        # If it's already string, we can try `str.to_datetime` with strict=False.
-                        # If it fails, it returns null.
-                        
-                        # However, Polars `str.to_datetime` usually needs a format string if it's not standard.
-                        # Let's assume standard ISO or common formats.
-                        
-                        # A better approach for "inconsistency" is checking if we can parse SOME but not ALL.
-                        
-                        non_null_original = df[col].drop_nulls()
-                        if len(non_null_original) > 0:
-                            # Try a few common formats
-                            formats = ["%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%m/%d/%Y", "%d/%m/%Y"]
-                            best_match_count = 0
-                            
-                            # This is expensive to try all, let's just try a generic cast if possible or check for mixed patterns
-                            # For simplicity and speed, we'll check if it's Utf8 and has mixed patterns
-                            
-                            if df[col].dtype == pl.Utf8:
-                                # Check if we can cast to datetime
-                                parsed = df[col].str.to_datetime(strict=False)
-                                parsed_count = parsed.drop_nulls().len()
-                                
-                                unparseable_count = len(non_null_original) - parsed_count
-                                unparseable_pct = (unparseable_count / len(non_null_original) * 100)
-                                
-                                if unparseable_pct > 0:
-                                    deduction_amount = min(unparseable_pct / 10, 12)
-                                    deductions.append({
-                                        "deduction_reason": "format_inconsistency",
-                                        "fields_affected": [col],
-                                        "deduction_amount": round(deduction_amount, 2),
-                                        "severity": "high" if unparseable_pct > 25 else "medium" if unparseable_pct > 10 else "low",
-                                        "remediation": f"Standardize date/time format. {unparseable_pct:.1f}% of values have inconsistent format"
-                                    })
+        date_checks = _check_date_formats(lf, schema)
+        for col, check in date_checks.items():
+            unparseable_count = check["non_null"] - check["parsed"]
+            unparseable_pct = (unparseable_count / check["non_null"] * 100) if check["non_null"] > 0 else 0
+            
+            if unparseable_pct > 0:
+                deduction_amount = min(unparseable_pct / 10, 12)
+                deductions.append({
+                    "deduction_reason": "format_inconsistency",
+                    "fields_affected": [col],
+                    "deduction_amount": round(deduction_amount, 2),
+                    "severity": "high" if unparseable_pct > 25 else "medium" if unparseable_pct > 10 else "low",
+                    "remediation": f"Standardize date/time format. {unparseable_pct:.1f}% of values have inconsistent format"
+                })
 
         # Check for outliers
-        numeric_cols = [col for col in df.columns if df[col].dtype in [pl.Int8, pl.Int16, pl.Int32, pl.Int64, pl.Float32, pl.Float64]]
+        numeric_cols = [col for col in columns if schema[col] in NUMERIC_DTYPES]
+        outlier_bounds = _outlier_bounds(stats, numeric_cols)
+        outlier_counts = _count_outliers(lf, outlier_bounds)
         
         for col in numeric_cols:
-            col_data = df[col].drop_nulls()
-            if len(col_data) > 0:
-                q1 = col_data.quantile(0.25)
-                q3 = col_data.quantile(0.75)
-                iqr = q3 - q1
-                
-                if iqr > 0:
-                    lower_bound = q1 - 1.5 * iqr
-                    upper_bound = q3 + 1.5 * iqr
-                    
-                    # Use Series comparison directly instead of pl.col() expression on Series
-                    outlier_count = ((col_data < lower_bound) | (col_data > upper_bound)).sum()
-                    outlier_pct = (outlier_count / len(col_data) * 100)
+            non_null_count = row_count - null_counts[col]
+            if non_null_count > 0:
+                if col in outlier_bounds:
+                    outlier_count = outlier_counts[col]
+                    outlier_pct = (outlier_count / non_null_count * 100)
                     
                     if outlier_pct > 5:
                         deduction_amount = min(outlier_pct / 20, 8)
@@ -270,7 +234,7 @@ def execute_readiness_rater(
                         })
 
         # Check for duplicate rows
-        duplicate_count = df.is_duplicated().sum()
+        duplicate_count = _duplicate_row_count(lf, columns)
         duplicate_pct = (duplicate_count / row_count * 100) if row_count > 0 else 0
         
         if duplicate_pct > 0:
@@ -347,7 +311,7 @@ def execute_readiness_rater(
                 "severity": "critical",
                 "category": "data_completeness",
                 "message": f"LOW COMPLETENESS SCORE: {completeness_score:.1f}/100 - Dataset has excessive missing data",
-                "affected_fields_count": len([f for f in df.columns if (null_counts[f][0] / row_count * 100) > 10]),
+                "affected_fields_count": len([f for f in columns if (null_counts[f] / row_count * 100) > 10]),
                 "recommendation": "Implement imputation strategy or remove incomplete records. Consider data source quality."
             })
         elif completeness_score < 80:
@@ -356,7 +320,7 @@ def execute_readiness_rater(
                 "severity": "high",
                 "category": "data_completeness",
                 "message": f"MODERATE COMPLETENESS ISSUES: {completeness_score:.1f}/100 - Some columns have significant missing data",
-                "affected_fields_count": len([f for f in df.columns if (null_counts[f][0] / row_count * 100) > 10]),
+                "affected_fields_count": len([f for f in columns if (null_counts[f] / row_count * 100) > 10]),
                 "recommendation": "Investigate missing value patterns and apply targeted remediation."
             })
             
@@ -484,10 +448,10 @@ def execute_readiness_rater(
                 
         # Add schema-related issues
         if null_columns > 0:
-            for col in df.columns:
+            for col in columns:
                 if issue_count >= 100:
                     break
-                if null_counts[col][0] == row_count:
+                if null_counts[col] == row_count:
                     issues.append({
                         "issue_id": f"issue_readiness_{len(issues)}_{col}_null",
                         "agent_id": "readiness-rater",
@@ -499,7 +463,7 @@ def execute_readiness_rater(
                     issue_count += 1
                     
         if unnamed_columns > 0:
-            for col in df.columns:
+            for col in columns:
                 if issue_count >= 100:
                     break
                 if str(col).startswith('Unnamed'):
@@ -514,37 +478,29 @@ def execute_readiness_rater(
                     issue_count += 1
                     
         # Add consistency issues
-        for col in df.columns:
+        for col in columns:
             if issue_count >= 100:
                 break
-            col_lower = col.lower()
-            if any(x in col_lower for x in ['date', 'time', 'created', 'updated', 'timestamp', 'datetime']):
-                if df[col].dtype == pl.Utf8:
-                    parsed = df[col].str.to_datetime(strict=False)
-                    parsed_count = parsed.drop_nulls().len()
-                    non_null_count = df[col].drop_nulls().len()
-                    
-                    unparseable_count = non_null_count - parsed_count
-                    
-                    if unparseable_count > 0:
-                        issues.append({
-                            "issue_id": f"issue_readiness_{len(issues)}_{col}_format",
-                            "agent_id": "readiness-rater",
-                            "field_name": col,
-                            "issue_type": "invalid_format",
-                            "severity": "high" if unparseable_count > non_null_count * 0.25 else "medium",
-                            "message": f"Column '{col}' has {unparseable_count} inconsistent date/time formats"
-                        })
-                        issue_count += 1
+            if col in date_checks:
+                parsed_count = date_checks[col]["parsed"]
+                non_null_count = date_checks[col]["non_null"]
+                
+                unparseable_count = non_null_count - parsed_count
+                
+                if unparseable_count > 0:
+                    issues.append({
+                        "issue_id": f"issue_readiness_{len(issues)}_{col}_format",
+                        "agent_id": "readiness-rater",
+                        "field_name": col,
+                        "issue_type": "invalid_format",
+                        "severity": "high" if unparseable_count > non_null_count * 0.25 else "medium",
+                        "message": f"Column '{col}' has {unparseable_count} inconsistent date/time formats"
+                    })
+                    issue_count += 1
                         
         # Add duplicate record issues (sample)
         if duplicate_count > 0 and issue_count < 100:
-            # Finding duplicate indices in Polars is a bit different.
-            # We can use is_duplicated() to get a boolean mask
-            dup_mask = df.is_duplicated()
-            # Get indices where true
-            # Polars doesn't have a direct index like pandas, we can use with_row_count
-            dup_indices = df.with_row_count("row_nr").filter(dup_mask).head(10)["row_nr"].to_list()
+            dup_indices = _duplicate_row_indices(lf, columns, 10)
             
             for idx in dup_indices:
                 if issue_count >= 100:
@@ -593,7 +549,7 @@ def execute_readiness_rater(
             
         # Completeness-specific recommendation
         if completeness_score < 95:
-            high_null_fields = [f for f in df.columns if (null_counts[f][0] / row_count * 100) > 10]
+            high_null_fields = [f for f in columns if (null_counts[f] / row_count * 100) > 10]
             field_count = len(high_null_fields)
             
             recommendations.append({
@@ -731,26 +687,21 @@ def execute_readiness_rater(
         row_level_issues = []
         
         # 1. Add issues for rows with high null percentages
-        # Polars efficient way: calculate null count per row
-        # null_count(axis=1) is not supported in Polars, use sum_horizontal(is_null())
-        null_counts_per_row = df.select(pl.sum_horizontal(pl.all().is_null())).to_series()
-        
-        # Filter rows where null % > 30
-        # We need indices.
-        
-        # Create a temporary dataframe with row index and null count
-        df_with_idx = df.with_row_count("row_nr")
-        
-        # Calculate null percentage
-        # Note: null_count(axis=1) returns a Series
-        null_pcts = (null_counts_per_row / col_count * 100)
-        
-        # Filter indices
-        high_null_indices = df_with_idx.filter(null_pcts > 30).select("row_nr").to_series().to_list()
+        # Null count per row via sum_horizontal(is_null()), filtered to > 30%
+        high_null_rows = collect_streaming(
+            lf.with_row_index("row_nr")
+            .select([
+                pl.col("row_nr"),
+                pl.sum_horizontal(pl.all().exclude("row_nr").is_null()).alias("null_count")
+            ])
+            .filter(pl.col("null_count") / col_count * 100 > 30)
+            .head(100)
+        )
         
-        for idx in high_null_indices[:100]: # Limit to 100
-            row_null_count = null_counts_per_row[idx]
-            row_null_pct = null_pcts[idx]
+        for row in high_null_rows.iter_rows(named=True):
+            idx = row["row_nr"]
+            row_null_count = row["null_count"]
+            row_null_pct = row_null_count / col_count * 100
             
             row_level_issues.append({
                 "row_index": int(idx),
@@ -763,42 +714,35 @@ def execute_readiness_rater(
             })
             
         # 2. Add issues for rows with outlier values
-        for col in numeric_cols:
-            col_data = df[col].drop_nulls()
-            if len(col_data) > 0:
-                q1 = col_data.quantile(0.25)
-                q3 = col_data.quantile(0.75)
-                iqr = q3 - q1
+        for col, (lower_bound, upper_bound) in outlier_bounds.items():
+            # Get indices of outliers
+            outlier_rows = collect_streaming(
+                lf.with_row_index("row_nr")
+                .select(["row_nr", col])
+                .filter((pl.col(col) < lower_bound) | (pl.col(col) > upper_bound))
+                .head(100)
+            )
+            
+            for row in outlier_rows.iter_rows(named=True):
+                idx = row["row_nr"]
+                val = row[col]
                 
-                if iqr > 0:
-                    lower_bound = q1 - 1.5 * iqr
-                    upper_bound = q3 + 1.5 * iqr
-                    
-                    # Get indices of outliers
-                    outlier_rows = df_with_idx.filter((pl.col(col) < lower_bound) | (pl.col(col) > upper_bound)).select(["row_nr", col]).head(100)
-                    
-                    for row in outlier_rows.iter_rows(named=True):
-                        idx = row["row_nr"]
-                        val = row[col]
-                        
-                        row_level_issues.append({
-                            "row_index": int(idx),
-                            "column": col,
-                            "issue_type": "validation_failed",
-                            "severity": "warning",
-                            "message": f"Row {idx} has outlier value in '{col}': {val}",
-                            "value": float(val) if val is not None else None,
-                            "bounds": {
-                                "lower": float(lower_bound),
-                                "upper": float(upper_bound)
-                            }
-                        })
+                row_level_issues.append({
+                    "row_index": int(idx),
+                    "column": col,
+                    "issue_type": "validation_failed",
+                    "severity": "warning",
+                    "message": f"Row {idx} has outlier value in '{col}': {val}",
+                    "value": float(val) if val is not None else None,
+                    "bounds": {
+                        "lower": float(lower_bound),
+                        "upper": float(upper_bound)
+                    }
+                })
                         
         # 3. Add issues for duplicate rows
         if duplicate_count > 0:
-            dup_rows = df_with_idx.filter(df.is_duplicated()).head(100)
-            for row in dup_rows.iter_rows(named=True):
-                idx = row["row_nr"]
+            for idx in _duplicate_row_indices(lf, columns, 100):
                 row_level_issues.append({
                     "row_index": int(idx),
                     "column": "global",
@@ -809,49 +753,42 @@ def execute_readiness_rater(
                 })
                 
         # 4. Add issues for rows with format inconsistencies
-        for col in df.columns:
-            col_lower = col.lower()
-            if any(x in col_lower for x in date_patterns):
-                if df[col].dtype == pl.Utf8:
-                    # Find rows where date parsing fails
-                    # We can use str.to_datetime(strict=False) and check for nulls where original was not null
-                    
-                    # Filter rows where original is not null AND parsed is null
-                    bad_format_rows = df_with_idx.filter(
-                        pl.col(col).is_not_null() & 
-                        pl.col(col).str.to_datetime(strict=False).is_null()
-                    ).head(100)
-                    
-                    for row in bad_format_rows.iter_rows(named=True):
-                        idx = row["row_nr"]
-                        val = row[col]
-                        
-                        row_level_issues.append({
-                            "row_index": int(idx),
-                            "column": col,
-                            "issue_type": "validation_failed",
-                            "severity": "warning",
-                            "message": f"Row {idx} has invalid date/time format in '{col}': {val}",
-                            "value": str(val)
-                        })
-                        
-                        if len(row_level_issues) >= 1000:
-                            break
+        for col, check in date_checks.items():
+            # Rows where the original is not null but the parsed value is null
+            for row in check["bad_rows"].iter_rows(named=True):
+                idx = row["row_nr"]
+                val = row[col]
+                
+                row_level_issues.append({
+                    "row_index": int(idx),
+                    "column": col,
+                    "issue_type": "validation_failed",
+                    "severity": "warning",
+                    "message": f"Row {idx} has invalid date/time format in '{col}': {val}",
+                    "value": str(val)
+                })
+                
+                if len(row_level_issues) >= 1000:
+                    break
             if len(row_level_issues) >= 1000:
                 break
                 
         # 5. Add issues for rows with type mismatches in numeric columns
         # Check string columns that look like they should be numeric (based on name)
-        for col in df.columns:
-            if df[col].dtype == pl.Utf8:
+        for col in columns:
+            if schema[col] == pl.Utf8:
                 col_lower = col.lower()
                 if any(x in col_lower for x in ['price', 'amount', 'quantity', 'count', 'value', 'rate', 'score', 'id']):
-                    # Check for non-numeric values
                     # Filter rows where casting to float fails (is null) but original is not null
-                    bad_type_rows = df_with_idx.filter(
-                        pl.col(col).is_not_null() &
-                        pl.col(col).cast(pl.Float64, strict=False).is_null()
-                    ).head(100)
+                    bad_type_rows = collect_streaming(
+                        lf.with_row_index("row_nr")
+                        .select(["row_nr", col])
+                        .filter(
+                            pl.col(col).is_not_null() &
+                            pl.col(col).cast(pl.Float64, strict=False).is_null()
+                        )
+                        .head(100)
+                    )
                     
                     for row in bad_type_rows.iter_rows(named=True):
                         idx = row["row_nr"]
@@ -924,22 +861,26 @@ def execute_readiness_rater(
                     "needs_review_threshold": 50,
                     "completeness_weight": 0.3,
                     "consistency_weight": 0.3,
-                    "schema_health_weight": 0.4
+                    "schema_health_weight": 0.4,
+                    "approximate_statistics": False
                 },
                 "overrides": {
                     "ready_threshold": parameters.get("ready_threshold"),
                     "needs_review_threshold": parameters.get("needs_review_threshold"),
                     "completeness_weight": parameters.get("completeness_weight"),
                     "consistency_weight": parameters.get("consistency_weight"),
-                    "schema_health_weight": parameters.get("schema_health_weight")
+                    "schema_health_weight": parameters.get("schema_health_weight"),
+                    "approximate_statistics": parameters.get("approximate_statistics")
                 },
                 "parameters": {
                     "ready_threshold": ready_threshold,
                     "needs_review_threshold": needs_review_threshold,
                     "completeness_weight": completeness_weight,
                     "consistency_weight": consistency_weight,
-                    "schema_health_weight": schema_health_weight
-                }
+                    "schema_health_weight": schema_health_weight,
+                    "approximate_statistics": approximate_statistics
+                },
+                "approximation": stats["approximation"] if approximate_statistics else None
             },
             "alerts": alerts,
             "issues": issues,
@@ -956,3 +897,141 @@ def execute_readiness_rater(
             "error": str(e),
             "execution_time_ms": int((time.time() - start_time) * 1000)
         }
+
+
+def _collect_column_stats(
+    lf: pl.LazyFrame,
+    schema: pl.Schema,
+    sketches: Optional[Dict[str, QuantileSketch]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute the per-column aggregates behind the readiness scores in one pass.
+    
+    With sketches (approximate mode) the quartiles of numeric columns are read
+    from their quantile sketches instead of computed exactly.
+    
+    Returns:
+        Dict with "null_counts" for every column; "numeric_counts", "first_values"
+        and "numeric_like_counts" for Utf8 columns; "quartiles" for numeric columns;
+        "approximation" (quartile rank error bounds) in approximate mode
+    """
+    exprs = []
+    for i, (col, dtype) in enumerate(schema.items()):
+        exprs.append(pl.col(col).null_count().alias(f"null_{i}"))
+        if dtype == pl.Utf8:
+            exprs += [
+                pl.col(col).str.replace_all(r"[^\d\.-]", "").cast(pl.Float64, strict=False)
+                    .is_not_null().sum().alias(f"numeric_{i}"),
+                pl.col(col).drop_nulls().first().alias(f"first_{i}"),
+                pl.col(col).str.contains(r"^-?\d+\.?\d*$").sum().alias(f"numeric_like_{i}")
+            ]
+        elif dtype in NUMERIC_DTYPES and sketches is None:
+            exprs += [
+                pl.col(col).quantile(0.25).alias(f"q1_{i}"),
+                pl.col(col).quantile(0.75).alias(f"q3_{i}")
+            ]
+    
+    row = collect_streaming(lf.select(exprs)).row(0, named=True) if exprs else {}
+    
+    stats = {
+        "null_counts": {}, "numeric_counts": {}, "first_values": {}, "numeric_like_counts": {},
+        "quartiles": {}, "approximation": {}
+    }
+    for i, (col, dtype) in enumerate(schema.items()):
+        stats["null_counts"][col] = row[f"null_{i}"]
+        if dtype == pl.Utf8:
+            stats["numeric_counts"][col] = row[f"numeric_{i}"]
+            stats["first_values"][col] = row[f"first_{i}"]
+            stats["numeric_like_counts"][col] = row[f"numeric_like_{i}"]
+        elif dtype in NUMERIC_DTYPES and sketches is not None:
+            stats["quartiles"][col] = tuple(sketches[col].quantiles([0.25, 0.75]))
+            stats["approximation"][col] = {"quartile_rank_error": round(sketches[col].rank_error, 6)}
+        elif dtype in NUMERIC_DTYPES:
+            stats["quartiles"][col] = (row[f"q1_{i}"], row[f"q3_{i}"])
+    return stats
+
+
+def _outlier_bounds(stats: Dict[str, Dict[str, Any]], numeric_cols: list) -> Dict[str, tuple]:
+    """Return IQR outlier bounds for numeric columns with a positive IQR."""
+    bounds = {}
+    for col in numeric_cols:
+        q1, q3 = stats["quartiles"][col]
+        if q1 is None or q3 is None:
+            continue
+        iqr = q3 - q1
+        if iqr > 0:
+            bounds[col] = (q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+    return bounds
+
+
+def _count_outliers(lf: pl.LazyFrame, bounds: Dict[str, tuple]) -> Dict[str, int]:
+    """Count values outside the IQR bounds for every column in one pass."""
+    if not bounds:
+        return {}
+    row = collect_streaming(lf.select([
+        ((pl.col(col) < lower) | (pl.col(col) > upper)).sum().alias(col)
+        for col, (lower, upper) in bounds.items()
+    ])).row(0, named=True)
+    return row
+
+
+def _check_date_formats(lf: pl.LazyFrame, schema: pl.Schema) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse date-like Utf8 columns and count values that fail to parse.
+    
+    The date-like columns are materialized together in one query so each
+    datetime format is inferred over the whole column, as with an eager
+    parse, while the rest of the file stays on disk.
+    
+    Returns:
+        Dict of column -> {"non_null", "parsed", "bad_rows" (first 100 failures)}
+    """
+    date_cols = [
+        col for col, dtype in schema.items()
+        if dtype == pl.Utf8 and any(x in col.lower() for x in DATE_NAME_PATTERNS)
+    ]
+    if not date_cols:
+        return {}
+    
+    date_values = collect_streaming(lf.select(date_cols))
+    checks = {}
+    for col in date_cols:
+        values = date_values[col]
+        parsed = values.str.to_datetime(strict=False)
+        bad_mask = values.is_not_null() & parsed.is_null()
+        
+        checks[col] = {
+            "non_null": values.len() - values.null_count(),
+            "parsed": parsed.len() - parsed.null_count(),
+            "bad_rows": pl.DataFrame({"row_nr": pl.arange(0, values.len(), eager=True, dtype=pl.UInt32), col: values})
+                .filter(bad_mask)
+                .head(100)
+        }
+    return checks
+
+
+def _duplicate_groups(lf: pl.LazyFrame, columns: list) -> pl.LazyFrame:
+    """Lazy frame of full-row values that occur more than once."""
+    return (
+        lf.group_by(columns)
+        .agg(pl.len().alias("_occurrences"))
+        .filter(pl.col("_occurrences") > 1)
+    )
+
+
+def _duplicate_row_count(lf: pl.LazyFrame, columns: list) -> int:
+    """Count rows that have at least one exact duplicate (all copies included)."""
+    total = collect_streaming(_duplicate_groups(lf, columns).select(pl.col("_occurrences").sum())).item()
+    return int(total or 0)
+
+
+def _duplicate_row_indices(lf: pl.LazyFrame, columns: list, limit: int) -> list:
+    """Return the first row indices that belong to a duplicated row group."""
+    duplicate_rows = collect_streaming(
+        lf.with_row_index("row_nr")
+        .join(_duplicate_groups(lf, columns).drop("_occurrences"), on=columns, how="semi", nulls_equal=True)
+        .select("row_nr")
+        .sort("row_nr")
+        .head(limit)
+    )
+    return duplicate_rows["row_nr"].to_list()
@@ -6,23 +6,13 @@ Input: CSV file (primary)
 Output: Uniform risk assessment structure matching API specification
 """
 
-import polars as pl
 import numpy as np
-import io
 import time
-import re
 from typing import Dict, Any, Optional, List
+from agents.agent_utils import DatasetContext, load_dataframe
+from agents.pii_scanner import PII_PATTERNS, scan_pii_samples
 
 
-# PII patterns
-PII_PATTERNS = {
-    "email_address": r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
-    "phone_number": r'^[\d\s\-\(\)\+]{10,}$',
-    "ssn": r'^\d{3}-\d{2}-\d{4}$',
-    "credit_card": r'^\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}$',
-    "zipcode": r'^\d{5}(-\d{4})?$'
-}
-
 PII_SENSITIVE_KEYWORDS = [
     'email', 'phone', 'ssn', 'social_security', 'credit_card', 'account_number',
     'password', 'api_key', 'token', 'secret', 'name', 'address', 'dob', 'date_of_birth'
@@ -50,7 +40,8 @@ COMPLIANCE_FRAMEWORKS = {
 def execute_score_risk(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Score risk based on PII detection, compliance requirements, and governance.
@@ -59,6 +50,7 @@ def execute_score_risk(
         file_contents: File bytes
         filename: Original filename
         parameters: Agent parameters matching tool.json
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
         
     Returns:
         Uniform output structure matching API_SPECIFICATION.js response format
@@ -86,7 +78,7 @@ def execute_score_risk(
         
         try:
             # Read CSV with Polars
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
         except Exception as e:
             return {
                 "status": "error",
@@ -103,11 +95,11 @@ def execute_score_risk(
         sensitive_fields_detected = 0
         governance_gaps = 0
         
-        # Pre-compile regex patterns
-        compiled_patterns = {k: re.compile(v) for k, v in PII_PATTERNS.items()}
+        # Scan a seeded random sample of pii_sample_size non-null values of every
+        # column for PII patterns in one pass (shared with other agents on the dataset)
+        pii_samples = scan_pii_samples(df.lazy(), df.columns, max(0, pii_sample_size), dataset) if pii_detection_enabled else {}
         
         for col in df.columns:
-            col_data = df[col]
             field_risk_score = 0
             risk_factors = []
             compliance_issues = []
@@ -127,17 +119,12 @@ def execute_score_risk(
             pii_confidence = 0
             
             if pii_detection_enabled:
-                # Sample data for PII detection
-                non_null_data = col_data.drop_nulls()
-                sample_size = min(len(non_null_data), pii_sample_size)
+                pii_sample = pii_samples[col]
+                sample_len = pii_sample["sample_len"]
                 
-                if sample_size > 0:
-                    # Take a sample and convert to python list of strings for regex matching
-                    sample = non_null_data.sample(n=sample_size, with_replacement=False, seed=42).cast(pl.Utf8).to_list()
-                    
-                    for pii_type, pattern in compiled_patterns.items():
-                        matches = sum(1 for x in sample if pattern.match(x))
-                        match_percentage = (matches / len(sample) * 100)
+                if sample_len > 0:
+                    for pii_type in PII_PATTERNS:
+                        match_percentage = (pii_sample[pii_type] / sample_len * 100)
                         
                         if match_percentage > 50:
                             detected_pii_type = pii_type
@@ -155,8 +142,7 @@ def execute_score_risk(
                     
                     # Check for email addresses even if pattern doesn't match
                     if not detected_pii_type and col_lower in ['email', 'email_address']:
-                        email_count = sum(1 for x in sample if '@' in x)
-                        if email_count / len(sample) > 0.7:
+                        if pii_sample["email_marker"] / sample_len > 0.7:
                             detected_pii_type = "email_address"
                             pii_confidence = 0.85
                             pii_fields_detected += 1
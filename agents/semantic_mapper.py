@@ -14,20 +14,19 @@ Input: CSV file (primary)
 Output: Semantic mapping results with column mappings, value mappings, and confidence scores
 """
 
-import io
 import re
 import time
-import base64
 import polars as pl
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
-from agents.agent_utils import safe_get_dict
+from agents.agent_utils import safe_get_dict, DatasetContext, load_dataframe, build_cleaned_file
 
 
 def execute_semantic_mapper(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Map columns and values to standardized semantic schema.
@@ -36,6 +35,7 @@ def execute_semantic_mapper(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters including custom mappings and thresholds
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary with semantic mapping results
@@ -69,7 +69,7 @@ def execute_semantic_mapper(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000, truncate_ragged_lines=True)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000, truncate_ragged_lines=True)
         except Exception as e:
             return {
                 "status": "error",
@@ -455,10 +455,6 @@ def execute_semantic_mapper(
             "timeline": "1 month"
         })
 
-        # Generate cleaned file (CSV format)
-        cleaned_file_bytes = _generate_cleaned_file(df, filename)
-        cleaned_file_base64 = base64.b64encode(cleaned_file_bytes).decode('utf-8')
-
         return {
             "status": "success",
             "agent_id": "semantic-mapper",
@@ -482,12 +478,7 @@ def execute_semantic_mapper(
             "ai_analysis_text": ai_analysis_text,
             "row_level_issues": row_level_issues,
             "issue_summary": issue_summary,
-            "cleaned_file": {
-                "filename": f"mastered_{filename}",
-                "content": cleaned_file_base64,
-                "size_bytes": len(cleaned_file_bytes),
-                "format": filename.split('.')[-1].lower()
-            }
+            "cleaned_file": build_cleaned_file(df, filename, "mastered_", dataset)
         }
 
     except Exception as e:
@@ -801,10 +792,3 @@ def _map_column_values(
                 result["total_unchanged"] += count
     
     return result
-
-
-def _generate_cleaned_file(df: pl.DataFrame, original_filename: str) -> bytes:
-    """Generate cleaned data file in CSV format."""
-    output = io.BytesIO()
-    df.write_csv(output)
-    return output.getvalue()
@@ -0,0 +1,353 @@
+"""
+Sketches
+
+Mergeable approximate summaries for profiling very large datasets in
+bounded memory. Each sketch is built per chunk and chunk sketches are
+merged, so a file can be summarized batch by batch (see
+DatasetContext.iter_batches) without ever holding it whole.
+
+- HyperLogLog: distinct counts (relative standard error 1.04 / sqrt(2^p))
+- QuantileSketch: KLL-style compactor hierarchy for quantiles; tracks a
+  worst-case bound on the normalized rank error of every answer
+- FrequentValues: Misra-Gries counters for top-N values; counts are lower
+  bounds, off by at most the reported max_count_error
+- Reservoir: bottom-k random sample for example values
+
+ColumnSketch bundles the sketches the profiling agents need per column and
+sketch_columns builds them over a stream of batches; sketch_quantiles builds
+only the quantile sketches.
+"""
+
+from typing import Dict, Any, Iterable, List, Optional
+
+import numpy as np
+import polars as pl
+
+
+# HyperLogLog registers: 2^14 registers, ~0.81% relative standard error
+HLL_PRECISION = 14
+HASH_SEED = 0
+# Items kept per compactor level of the quantile sketch
+QUANTILE_SKETCH_K = 2048
+# Counters kept by the frequent-values sketch
+FREQUENT_VALUES_CAPACITY = 1000
+# Example values kept per column
+RESERVOIR_SIZE = 20
+SKETCH_SEED = 42
+
+
+class HyperLogLog:
+    """Distinct-count sketch over 64-bit value hashes."""
+
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values: pl.Series) -> None:
+        """Add the non-null values of a series."""
+        hashes = values.drop_nulls().hash(seed=HASH_SEED).to_numpy().astype(np.uint64)
+        if len(hashes) == 0:
+            return
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.int64)
+        # Remaining bits with a sentinel so every word has a set bit
+        remainder = (hashes << p) | (np.uint64(1) << (p - np.uint64(1)))
+        bit_length = np.floor(np.log2(remainder.astype(np.float64))).astype(np.int64) + 1
+        rank = (64 - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+    @property
+    def relative_error(self) -> float:
+        """Relative standard error of estimate()."""
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+class QuantileSketch:
+    """
+    KLL-style quantile sketch.
+
+    Level h holds items of weight 2^h. A level over capacity is sorted and
+    every other item (random offset) moves up a level. One compaction at
+    level h shifts any rank by at most 2^h, so the sum over compactions,
+    divided by the count, bounds the normalized rank error of quantile().
+    """
+
+    def __init__(self, k: int = QUANTILE_SKETCH_K, seed: int = SKETCH_SEED):
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rank_error_weight = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray) -> None:
+        """Add numeric values (NaNs are ignored)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._rank_error_weight += other._rank_error_weight
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                even = len(items) - len(items) % 2
+                offset = int(self._rng.integers(2))
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], items[:even][offset::2]])
+                self.levels[h] = items[even:]
+                self._rank_error_weight += 1 << h
+            h += 1
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        """Approximate quantiles (q in [0, 1]); None when the sketch is empty."""
+        if self.count == 0:
+            return [None for _ in qs]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 1 << h, dtype=np.float64) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        results = []
+        for q in qs:
+            if q <= 0:
+                results.append(self.min)
+            elif q >= 1:
+                results.append(self.max)
+            else:
+                index = int(np.searchsorted(cumulative, q * cumulative[-1], side="left"))
+                results.append(float(items[min(index, len(items) - 1)]))
+        return results
+
+    @property
+    def rank_error(self) -> float:
+        """Worst-case normalized rank error of quantiles() (0 while exact)."""
+        return self._rank_error_weight / self.count if self.count else 0.0
+
+
+class FrequentValues:
+    """
+    Misra-Gries frequent-values sketch (mergeable).
+
+    At most `capacity` counters are kept. When a merge exceeds it, the
+    (capacity + 1)-th largest count is subtracted from every counter, so each
+    reported count is a lower bound that is at most max_count_error short.
+    """
+
+    def __init__(self, capacity: int = FREQUENT_VALUES_CAPACITY):
+        self.capacity = capacity
+        self.counts: Optional[pl.DataFrame] = None
+        self.max_count_error = 0
+
+    def update(self, values: pl.Series) -> None:
+        """Add the values of a series (nulls are counted as a value)."""
+        counts = values.value_counts(sort=True)
+        self._add(counts.rename({values.name: "value"}))
+
+    def merge(self, other: "FrequentValues") -> None:
+        if other.counts is not None:
+            self._add(other.counts)
+        self.max_count_error += other.max_count_error
+
+    def _add(self, counts: pl.DataFrame) -> None:
+        counts = counts.select(["value", pl.col("count").cast(pl.Int64)])
+        if self.counts is not None:
+            counts = (
+                pl.concat([self.counts, counts])
+                .group_by("value")
+                .agg(pl.col("count").sum())
+            )
+        counts = counts.sort(["count"], descending=True)
+        if counts.height > self.capacity:
+            threshold = int(counts["count"][self.capacity])
+            counts = (
+                counts.head(self.capacity)
+                .with_columns(pl.col("count") - threshold)
+                .filter(pl.col("count") > 0)
+            )
+            self.max_count_error += threshold
+        self.counts = counts
+
+    def top(self, n: int) -> List[tuple]:
+        """The n most frequent (value, count) pairs tracked."""
+        if self.counts is None:
+            return []
+        return list(self.counts.sort("count", descending=True, maintain_order=True).head(n).iter_rows())
+
+
+class Reservoir:
+    """Uniform random sample of fixed size (bottom-k of random keys, mergeable)."""
+
+    def __init__(self, size: int = RESERVOIR_SIZE, seed: int = SKETCH_SEED):
+        self.size = size
+        self.sample: Optional[pl.DataFrame] = None
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: pl.Series) -> None:
+        """Add the non-null values of a series."""
+        values = values.drop_nulls()
+        if values.len() == 0:
+            return
+        chunk = pl.DataFrame({
+            "key": self._rng.random(values.len()),
+            "value": values
+        })
+        self._add(chunk)
+
+    def merge(self, other: "Reservoir") -> None:
+        if other.sample is not None:
+            self._add(other.sample)
+
+    def _add(self, chunk: pl.DataFrame) -> None:
+        if self.sample is not None:
+            chunk = pl.concat([self.sample, chunk])
+        self.sample = chunk.bottom_k(self.size, by="key") if chunk.height > self.size else chunk
+
+    def values(self) -> List[Any]:
+        return [] if self.sample is None else self.sample.sort("key")["value"].to_list()
+
+
+class ColumnSketch:
+    """Distinct count, frequent values, example values and (numeric) quantile sketches of one column."""
+
+    def __init__(self, numeric: bool, seed: int = SKETCH_SEED):
+        self.numeric = numeric
+        self.distinct = HyperLogLog()
+        self.frequent = FrequentValues()
+        self.examples = Reservoir(seed=seed)
+        self.quantiles = QuantileSketch(seed=seed) if numeric else None
+        self.null_count = 0
+        self.count = 0
+
+    def update(self, values: pl.Series) -> None:
+        self.count += values.len()
+        self.null_count += values.null_count()
+        self.distinct.update(values)
+        self.frequent.update(values)
+        self.examples.update(values)
+        if self.quantiles is not None:
+            self.quantiles.update(values.drop_nulls().cast(pl.Float64).to_numpy())
+
+    def merge(self, other: "ColumnSketch") -> None:
+        self.count += other.count
+        self.null_count += other.null_count
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+        self.examples.merge(other.examples)
+        if self.quantiles is not None and other.quantiles is not None:
+            self.quantiles.merge(other.quantiles)
+
+    def unique_count(self) -> int:
+        """Distinct values including null (like value_counts), capped by the row count."""
+        non_null = self.count - self.null_count
+        return min(non_null, self.distinct.estimate()) + (1 if self.null_count else 0)
+
+    def entropy(self) -> float:
+        """
+        Shannon entropy (nats) of the non-null value distribution.
+
+        Tracked values contribute their counts; the remaining mass is spread
+        evenly over the remaining estimated distinct values.
+        """
+        non_null = self.count - self.null_count
+        if non_null == 0:
+            return 0.0
+        tracked = [count for value, count in self.frequent.top(self.frequent.capacity) if value is not None]
+        p = np.asarray(tracked, dtype=np.float64) / non_null
+        entropy = float(-np.sum(p * np.log(p))) if len(p) else 0.0
+        rest = max(0.0, 1.0 - p.sum())
+        if rest > 0:
+            rest_values = max(1, min(non_null, self.distinct.estimate()) - len(tracked))
+            entropy -= rest * np.log(rest / rest_values)
+        return entropy
+
+    def error_bounds(self) -> Dict[str, Any]:
+        """Error bounds of the approximate statistics of this column."""
+        bounds = {
+            "unique_count_relative_error": round(self.distinct.relative_error, 4),
+            "top_values_max_count_error": int(self.frequent.max_count_error),
+            "example_sample_size": len(self.examples.values())
+        }
+        if self.quantiles is not None:
+            bounds["quantile_rank_error"] = round(self.quantiles.rank_error, 6)
+        return bounds
+
+
+def sketch_columns(
+    batches: Iterable[pl.DataFrame],
+    numeric_dtypes: List[pl.DataType],
+    columns: Optional[List[str]] = None
+) -> Dict[str, ColumnSketch]:
+    """
+    Sketch columns over a stream of batches.
+
+    Each batch is sketched on its own and merged into the running sketches,
+    so only one batch is held in memory at a time.
+
+    Args:
+        batches: Frames with the same schema (e.g. DatasetContext.iter_batches())
+        numeric_dtypes: Dtypes that get a quantile sketch
+        columns: Columns to sketch (all columns when omitted)
+
+    Returns:
+        Dictionary of column -> ColumnSketch
+    """
+    sketches: Dict[str, ColumnSketch] = {}
+    for batch_index, batch in enumerate(batches):
+        for col in columns if columns is not None else batch.columns:
+            # Independent random streams per batch keep the merged samples uniform
+            chunk = ColumnSketch(batch[col].dtype in numeric_dtypes, seed=SKETCH_SEED + batch_index)
+            chunk.update(batch[col])
+            if col in sketches:
+                sketches[col].merge(chunk)
+            else:
+                sketches[col] = chunk
+    return sketches
+
+
+def sketch_quantiles(batches: Iterable[pl.DataFrame], columns: List[str]) -> Dict[str, QuantileSketch]:
+    """
+    Quantile sketches of numeric columns over a stream of batches.
+
+    Lighter than sketch_columns when only quantiles are needed.
+
+    Returns:
+        Dictionary of column -> QuantileSketch
+    """
+    sketches = {col: QuantileSketch() for col in columns}
+    for batch in batches:
+        for col in columns:
+            sketches[col].update(batch[col].drop_nulls().cast(pl.Float64).to_numpy())
+    return sketches
@@ -27,15 +27,13 @@ Input: CSV file with optional agent metadata
 Output: Stewardship tasks and flagged records for human review
 """
 
-import io
 import re
 import time
-import base64
 import polars as pl
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from collections import defaultdict
-from agents.agent_utils import safe_get_list, safe_get_dict
+from agents.agent_utils import safe_get_list, safe_get_dict, DatasetContext, load_dataframe, build_cleaned_file
 
 
 # ==================== ISSUE CATEGORIES ====================
@@ -92,7 +90,8 @@ DEFAULT_OUTLIER_THRESHOLDS = {
 def execute_stewardship_flagger(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Flag data issues requiring human review or intervention.
@@ -101,6 +100,7 @@ def execute_stewardship_flagger(
         file_contents: File bytes (read as binary)
         filename: Original filename
         parameters: Agent parameters including validation rules
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary with stewardship tasks
@@ -141,7 +141,7 @@ def execute_stewardship_flagger(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000, truncate_ragged_lines=True)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000, truncate_ragged_lines=True)
         except Exception as e:
             return {
                 "status": "error",
@@ -794,8 +794,6 @@ def execute_stewardship_flagger(
 
         # Generate flagged records file
         flagged_df = _generate_flagged_records_df(df, stewardship_tasks, row_level_issues)
-        flagged_file_bytes = _generate_flagged_file(flagged_df, filename)
-        flagged_file_base64 = base64.b64encode(flagged_file_bytes).decode('utf-8')
 
         return {
             "status": "success",
@@ -820,12 +818,7 @@ def execute_stewardship_flagger(
             "ai_analysis_text": ai_analysis_text,
             "row_level_issues": row_level_issues,
             "issue_summary": issue_summary,
-            "cleaned_file": {
-                "filename": f"mastered_{filename}",
-                "content": flagged_file_base64,
-                "size_bytes": len(flagged_file_bytes),
-                "format": filename.split('.')[-1].lower()
-            }
+            "cleaned_file": build_cleaned_file(flagged_df, filename, "mastered_", dataset)
         }
 
     except Exception as e:
@@ -920,10 +913,3 @@ def _generate_flagged_records_df(
     ])
     
     return result_df.drop("__row_idx__")
-
-
-def _generate_flagged_file(df: pl.DataFrame, original_filename: str) -> bytes:
-    """Generate flagged records file in CSV format."""
-    output = io.BytesIO()
-    df.write_csv(output)
-    return output.getvalue()
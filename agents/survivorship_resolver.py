@@ -22,15 +22,13 @@ Input: CSV file with potential duplicates/related records
 Output: Resolved field values with confidence scores and resolution explanations
 """
 
-import io
 import re
 import time
-import base64
 import polars as pl
 from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
-from collections import Counter, defaultdict
-from agents.agent_utils import safe_get_list, safe_get_dict
+from collections import defaultdict
+from agents.agent_utils import safe_get_list, safe_get_dict, DatasetContext, load_dataframe, build_cleaned_file
 
 
 # ==================== VALIDATION PATTERNS ====================
@@ -62,7 +60,8 @@ FIELD_TYPE_PATTERNS = {
 def execute_survivorship_resolver(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Resolve conflicting field values using hierarchical survivorship rules.
@@ -71,6 +70,7 @@ def execute_survivorship_resolver(
         file_contents: File bytes (read as binary)
         filename: Original filename
         parameters: Agent parameters including rules and thresholds
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary with resolution results
@@ -83,7 +83,6 @@ def execute_survivorship_resolver(
     match_key_columns = safe_get_list(parameters, "match_key_columns", [])
     survivorship_rules = safe_get_dict(parameters, "survivorship_rules", {})
     source_priority = safe_get_dict(parameters, "source_priority", {})
-    quality_score_columns = safe_get_dict(parameters, "quality_score_columns", {})
     field_validation_rules = safe_get_dict(parameters, "field_validation_rules", {})
     source_column = parameters.get("source_column", None)
     timestamp_column = parameters.get("timestamp_column", None)
@@ -105,7 +104,7 @@ def execute_survivorship_resolver(
             }
 
         try:
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000, truncate_ragged_lines=True)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000, truncate_ragged_lines=True)
         except Exception as e:
             return {
                 "status": "error",
@@ -152,48 +151,39 @@ def execute_survivorship_resolver(
         rules_applied = defaultdict(int)
         resolution_by_field = defaultdict(lambda: {"resolved": 0, "unresolved": 0})
         
-        for cluster_id, cluster_info in clusters.items():
+        # Resolve every field of every multi-record cluster in one lazy query
+        multi_record_clusters = [
+            (cluster_id, cluster_info) for cluster_id, cluster_info in clusters.items()
+            if len(cluster_info["rows"]) > 1
+        ]
+        resolved_clusters = _resolve_conflicts(
+            df=df,
+            cluster_rows=[cluster_info["rows"] for _, cluster_info in multi_record_clusters],
+            survivorship_rules=survivorship_rules,
+            default_rule=default_rule,
+            field_types=field_types,
+            source_column=source_column,
+            source_priority=source_priority,
+            timestamp_column=timestamp_column,
+            field_validation_rules=field_validation_rules
+        )
+        
+        for position, (cluster_id, cluster_info) in enumerate(multi_record_clusters):
             cluster_rows = cluster_info["rows"]
             
-            if len(cluster_rows) <= 1:
-                # Single record - no conflicts possible
-                continue
-            
-            # Get cluster data
-            cluster_data = _get_cluster_df(df, cluster_rows)
-            
-            for col in df.columns:
-                if col.startswith("__"):
-                    continue
-                
-                values = cluster_data[col].to_list()
-                non_null_values = [v for v in values if v is not None and str(v).strip() != '']
-                unique_values = list(set(str(v) for v in non_null_values))
-                
-                if len(unique_values) <= 1:
+            for col, resolved in resolved_clusters.items():
+                if not resolved["conflict"][position]:
                     # No conflict
                     continue
                 
+                field = {name: values[position] for name, values in resolved.items()}
                 conflicts_detected += 1
+                unique_values = [str(v) for v in field["unique_values"]]
                 
-                # Determine rule to apply
+                # Determine rule that was applied
                 rule = survivorship_rules.get(col, default_rule)
                 field_type = field_types.get(col, "unknown")
-                
-                # Apply resolution
-                result = _resolve_conflict(
-                    values=values,
-                    cluster_data=cluster_data,
-                    column=col,
-                    rule=rule,
-                    field_type=field_type,
-                    source_column=source_column,
-                    source_priority=source_priority,
-                    timestamp_column=timestamp_column,
-                    quality_score_columns=quality_score_columns,
-                    field_validation_rules=field_validation_rules,
-                    df=df
-                )
+                result = _conflict_result(field, rule, field_type, source_priority)
                 
                 resolved_fields.append({
                     "cluster_id": cluster_id,
@@ -500,8 +490,6 @@ def execute_survivorship_resolver(
 
         # Generate resolved output file
         resolved_df = _apply_resolutions_to_df(df, resolved_fields, clusters)
-        resolved_file_bytes = _generate_resolved_file(resolved_df, filename)
-        resolved_file_base64 = base64.b64encode(resolved_file_bytes).decode('utf-8')
 
         return {
             "status": "success",
@@ -527,12 +515,7 @@ def execute_survivorship_resolver(
             "ai_analysis_text": ai_analysis_text,
             "row_level_issues": row_level_issues,
             "issue_summary": issue_summary,
-            "cleaned_file": {
-                "filename": f"mastered_{filename}",
-                "content": resolved_file_base64,
-                "size_bytes": len(resolved_file_bytes),
-                "format": filename.split('.')[-1].lower()
-            }
+            "cleaned_file": build_cleaned_file(resolved_df, filename, "mastered_", dataset)
         }
 
     except Exception as e:
@@ -597,150 +580,58 @@ def _build_record_clusters(df: pl.DataFrame, match_keys: List[str]) -> Dict[str,
             clusters[f"cluster_{i}"] = {"rows": [i], "match_values": {}}
         return clusters
     
-    cluster_map = defaultdict(list)
+    # Keys compare as str(value), so a null matches the literal string "None"
+    key_exprs = []
+    for idx, col in enumerate(match_keys):
+        if col not in df.columns:
+            continue
+        key_expr = pl.col(col).fill_null("None") if df[col].dtype == pl.Utf8 else pl.col(col)
+        key_exprs.append(key_expr.alias(f"__match_key_{idx}__"))
     
-    for i in range(df.height):
-        row = df.row(i)
-        key_values = tuple(
-            str(row[df.columns.index(col)]) if col in df.columns else ""
-            for col in match_keys
-        )
-        cluster_map[key_values].append(i)
+    if not key_exprs:
+        return {"cluster_0": {"rows": list(range(df.height)), "match_values": {col: "" for col in match_keys}}}
+    
+    grouped = (
+        df.lazy()
+        .with_row_index("__row_index__")
+        .group_by(key_exprs, maintain_order=True)
+        .agg(pl.col("__row_index__"))
+        .collect()
+    )
     
-    for idx, (key_values, rows) in enumerate(cluster_map.items()):
+    key_columns = {
+        col: [str(val) for val in grouped[f"__match_key_{idx}__"].to_list()]
+        for idx, col in enumerate(match_keys) if col in df.columns
+    }
+    
+    for idx, rows in enumerate(grouped["__row_index__"].to_list()):
         cluster_id = f"cluster_{idx}"
         clusters[cluster_id] = {
             "rows": rows,
-            "match_values": dict(zip(match_keys, key_values))
+            "match_values": {col: key_columns[col][idx] if col in key_columns else "" for col in match_keys}
         }
     
     return clusters
 
 
-def _get_cluster_df(df: pl.DataFrame, row_indices: List[int]) -> pl.DataFrame:
-    """Get a subset of the DataFrame for the given row indices."""
-    if not row_indices:
-        return df.head(0)
-    
-    return df.with_row_index("__temp_idx__").filter(
-        pl.col("__temp_idx__").is_in(row_indices)
-    ).drop("__temp_idx__")
-
-
-def _resolve_conflict(
-    values: List[Any],
-    cluster_data: pl.DataFrame,
-    column: str,
-    rule: str,
-    field_type: str,
-    source_column: Optional[str],
-    source_priority: Dict[str, int],
-    timestamp_column: Optional[str],
-    quality_score_columns: Dict[str, str],
-    field_validation_rules: Dict[str, Dict],
-    df: pl.DataFrame
-) -> Dict[str, Any]:
-    """Apply survivorship rules to resolve a field conflict."""
-    non_null_values = [v for v in values if v is not None and str(v).strip() != '']
-    
-    if not non_null_values:
-        return {
-            "winner": None,
-            "rule_applied": "no_valid_values",
-            "confidence": 0.3,
-            "rationale": "No non-null values available",
-            "scores": {}
-        }
-    
-    if len(set(str(v) for v in non_null_values)) == 1:
-        return {
-            "winner": non_null_values[0],
-            "rule_applied": "unanimous",
-            "confidence": 1.0,
-            "rationale": "All non-null values are identical",
-            "scores": {}
-        }
-    
-    # Calculate quality scores for each value
-    quality_scores = []
-    for i, val in enumerate(values):
-        if val is None or str(val).strip() == '':
-            quality_scores.append(0.0)
-            continue
-        
-        score = _calculate_value_quality_score(
-            value=val,
-            field_type=field_type,
-            field_validation_rules=field_validation_rules.get(column, {})
-        )
-        quality_scores.append(score)
-    
-    # Apply the specified rule
-    result = None
-    if rule == "freshness" or rule == "most_recent" or rule == "recency":
-        result = _apply_freshness_rule(values, cluster_data, column, timestamp_column, quality_scores)
-    
-    elif rule == "quality_score" or rule == "quality":
-        result = _apply_quality_score_rule(values, quality_scores)
-    
-    elif rule == "completeness" or rule == "most_complete":
-        result = _apply_completeness_rule(values, quality_scores)
-    
-    elif rule == "source_priority":
-        result = _apply_source_priority_rule(values, cluster_data, source_column, source_priority, quality_scores)
-    
-    elif rule == "most_frequent" or rule == "frequency":
-        result = _apply_frequency_rule(values, quality_scores)
-    
-    elif rule == "longest" or rule == "richness":
-        result = _apply_richness_rule(values, quality_scores)
-    
-    elif rule == "format_valid" or rule == "validation":
-        result = _apply_validation_rule(values, field_type, quality_scores)
-    
-    elif rule == "min":
-        result = _apply_min_rule(values)
-    
-    elif rule == "max":
-        result = _apply_max_rule(values)
-    
-    elif rule == "first":
-        result = {"winner": non_null_values[0], "rule_applied": "first", "confidence": 0.6, "rationale": "First non-null value", "scores": {}}
-    
-    elif rule == "last":
-        result = {"winner": non_null_values[-1], "rule_applied": "last", "confidence": 0.6, "rationale": "Last non-null value", "scores": {}}
-    
-    else:
-        # Default: combined quality score
-        result = _apply_quality_score_rule(values, quality_scores)
-
-    # Fallback to Source Priority if primary rule fails or has low confidence
-    if (result["winner"] is None or result["confidence"] < 0.5) and rule != "source_priority" and source_priority and source_column:
-        fallback_result = _apply_source_priority_rule(values, cluster_data, source_column, source_priority, quality_scores)
-        if fallback_result["winner"] is not None:
-            fallback_result["rationale"] += f" (Fallback from {rule})"
-            return fallback_result
-
-    return result
+def _regex_match_expr(values: pl.Expr, pattern: str) -> pl.Expr:
+    """Vectorized re.match (anchored at the start); patterns the native engine rejects run through re."""
+    try:
+        pl.select(pl.lit("").str.contains(f"^(?:{pattern})"))
+        return values.str.contains(f"^(?:{pattern})").fill_null(False)
+    except Exception:
+        compiled = re.compile(pattern)
+        return values.map_elements(lambda v: bool(compiled.match(v)), return_dtype=pl.Boolean).fill_null(False)
 
 
-def _calculate_value_quality_score(
-    value: Any,
-    field_type: str,
-    field_validation_rules: Dict
-) -> float:
-    """Calculate a quality score for a single value."""
-    if value is None:
-        return 0.0
+def _quality_score_expr(column: str, field_type: str, field_validation_rules: Dict) -> pl.Expr:
+    """Quality score (0-1) of every value in a column; null and blank values score 0."""
+    str_val = pl.col(column).cast(pl.Utf8).str.strip_chars()
     
-    str_val = str(value).strip()
-    if not str_val:
-        return 0.0
-    
-    score = 0.5  # Base score
+    score = pl.lit(0.5)  # Base score
     
     # Completeness bonus
-    score += min(0.2, len(str_val) / 100)
+    score = score + pl.min_horizontal(pl.lit(0.2), str_val.str.len_chars() / 100)
     
     # Format validation
     pattern = None
@@ -752,193 +643,159 @@ def _calculate_value_quality_score(
         pattern = VALIDATION_PATTERNS["date_general"]
     
     if pattern:
-        if re.match(pattern, str_val):
-            score += 0.3
-        else:
-            score -= 0.2
+        score = score + pl.when(_regex_match_expr(str_val, pattern)).then(0.3).otherwise(-0.2)
     
     # Custom validation rules
     if field_validation_rules:
         if "pattern" in field_validation_rules:
-            if re.match(field_validation_rules["pattern"], str_val):
-                score += 0.2
-            else:
-                score -= 0.2
+            score = score + pl.when(_regex_match_expr(str_val, field_validation_rules["pattern"])).then(0.2).otherwise(-0.2)
         
         if "min_length" in field_validation_rules:
-            if len(str_val) >= field_validation_rules["min_length"]:
-                score += 0.1
+            score = score + pl.when(str_val.str.len_chars() >= field_validation_rules["min_length"]).then(0.1).otherwise(0.0)
         
         if "allowed_values" in field_validation_rules:
-            if str_val.lower() in [v.lower() for v in field_validation_rules["allowed_values"]]:
-                score += 0.2
+            allowed = [v.lower() for v in field_validation_rules["allowed_values"]]
+            score = score + pl.when(str_val.str.to_lowercase().is_in(allowed)).then(0.2).otherwise(0.0)
     
-    return min(1.0, max(0.0, score))
+    return (
+        pl.when(pl.col(column).is_null() | (str_val == ""))
+        .then(0.0)
+        .otherwise(score.clip(0.0, 1.0))
+    )
 
 
-def _apply_freshness_rule(
-    values: List[Any],
-    cluster_data: pl.DataFrame,
-    column: str,
-    timestamp_column: Optional[str],
-    quality_scores: List[float]
-) -> Dict[str, Any]:
+def _rule_outcome(winner: pl.Expr, confidence: Any, rule_applied: Any, **details: pl.Expr) -> Dict[str, pl.Expr]:
+    """Group-wise fields describing a rule's result; details feed the rationale and scores."""
+    outcome = {
+        "winner": winner,
+        "confidence": (confidence if isinstance(confidence, pl.Expr) else pl.lit(confidence)).cast(pl.Float64),
+        "rule_applied": rule_applied if isinstance(rule_applied, pl.Expr) else pl.lit(rule_applied),
+    }
+    for name in ["quality", "length", "timestamp", "source", "count", "total"]:
+        outcome[name] = details.get(name, pl.lit(None))
+    return outcome
+
+
+def _quality_score_rule(column: str, quality: pl.Expr) -> Dict[str, pl.Expr]:
+    """Apply quality score rule."""
+    best_idx = quality.arg_max()
+    return _rule_outcome(pl.col(column).get(best_idx), quality.max(), "quality_score", quality=quality.max())
+
+
+def _freshness_rule(column: str, quality: pl.Expr, columns: List[str], timestamp_column: Optional[str]) -> Dict[str, pl.Expr]:
     """Apply freshness/recency rule."""
-    if timestamp_column and timestamp_column in cluster_data.columns:
-        try:
-            # Find row with most recent timestamp
-            timestamps = cluster_data[timestamp_column].to_list()
-            valid_indices = [
-                (i, ts) for i, ts in enumerate(timestamps)
-                if ts is not None and values[i] is not None
-            ]
-            
-            if valid_indices:
-                # Sort by timestamp descending
-                sorted_indices = sorted(valid_indices, key=lambda x: str(x[1]), reverse=True)
-                winner_idx = sorted_indices[0][0]
-                
-                return {
-                    "winner": values[winner_idx],
-                    "rule_applied": "freshness",
-                    "confidence": 0.85,
-                    "rationale": f"Most recent value (timestamp: {timestamps[winner_idx]})",
-                    "scores": {"quality": quality_scores[winner_idx]}
-                }
-        except Exception:
-            pass
+    values = pl.col(column)
+    has_value = values.is_not_null()
     
     # Fallback to last non-null value
-    non_null = [(i, v) for i, v in enumerate(values) if v is not None]
-    if non_null:
-        winner_idx = non_null[-1][0]
-        return {
-            "winner": non_null[-1][1],
-            "rule_applied": "freshness_fallback",
-            "confidence": 0.6,
-            "rationale": "Last available value (no timestamp column)",
-            "scores": {"quality": quality_scores[winner_idx]}
-        }
+    fallback_winner = values.filter(has_value).last()
+    fallback_quality = quality.filter(has_value).last()
     
-    return {"winner": None, "rule_applied": "freshness", "confidence": 0.3, "rationale": "No valid values", "scores": {}}
-
-
-def _apply_quality_score_rule(values: List[Any], quality_scores: List[float]) -> Dict[str, Any]:
-    """Apply quality score rule."""
-    best_idx = max(range(len(values)), key=lambda i: quality_scores[i])
+    if not (timestamp_column and timestamp_column in columns):
+        return _rule_outcome(fallback_winner, 0.6, "freshness_fallback", quality=fallback_quality)
     
-    if values[best_idx] is None:
-        non_null = [(i, v) for i, v in enumerate(values) if v is not None]
-        if non_null:
-            best_idx = max(non_null, key=lambda x: quality_scores[x[0]])[0]
+    # Row with most recent timestamp (compared as strings, earliest row wins ties).
+    # Rows without a value or timestamp sort last instead of being filtered out,
+    # so clusters where the column is all null still sort a non-empty group.
+    valid = pl.col(timestamp_column).is_not_null() & has_value
+    sort_key = pl.col(timestamp_column).cast(pl.Utf8)
     
-    return {
-        "winner": values[best_idx],
-        "rule_applied": "quality_score",
-        "confidence": quality_scores[best_idx],
-        "rationale": f"Highest quality score ({quality_scores[best_idx]:.2f})",
-        "scores": {"quality": quality_scores[best_idx]}
-    }
+    def most_recent(expr: pl.Expr) -> pl.Expr:
+        return expr.sort_by([valid, sort_key], descending=[True, True], maintain_order=True).first()
+    
+    has_timestamp = valid.any()
+    return _rule_outcome(
+        pl.when(has_timestamp).then(most_recent(values)).otherwise(fallback_winner),
+        pl.when(has_timestamp).then(0.85).otherwise(0.6),
+        pl.when(has_timestamp).then(pl.lit("freshness")).otherwise(pl.lit("freshness_fallback")),
+        quality=pl.when(has_timestamp).then(most_recent(quality)).otherwise(fallback_quality),
+        timestamp=pl.when(has_timestamp).then(most_recent(pl.col(timestamp_column)))
+    )
 
 
-def _apply_completeness_rule(values: List[Any], quality_scores: List[float]) -> Dict[str, Any]:
-    """Apply completeness/most complete rule."""
-    non_null = [(i, v) for i, v in enumerate(values) if v is not None]
-    
-    if not non_null:
-        return {"winner": None, "rule_applied": "completeness", "confidence": 0.3, "rationale": "No valid values", "scores": {}}
+def _length_rule(column: str, quality: pl.Expr, rule_applied: str) -> Dict[str, pl.Expr]:
+    """Apply completeness or richness rule (longest non-null value)."""
+    has_value = pl.col(column).is_not_null()
+    lengths = pl.col(column).cast(pl.Utf8).str.len_chars().filter(has_value)
+    best_idx = lengths.arg_max()
+    best_length = lengths.max()
     
-    # Find longest non-null value
-    best = max(non_null, key=lambda x: len(str(x[1])))
-    best_idx = best[0]
+    if rule_applied == "completeness":
+        confidence = pl.min_horizontal(pl.lit(0.9), 0.5 + best_length / 100)
+    else:
+        confidence = 0.8
     
-    return {
-        "winner": best[1],
-        "rule_applied": "completeness",
-        "confidence": min(0.9, 0.5 + len(str(best[1])) / 100),
-        "rationale": f"Most complete value (length: {len(str(best[1]))})",
-        "scores": {"quality": quality_scores[best_idx], "length": len(str(best[1]))}
-    }
+    return _rule_outcome(
+        pl.col(column).filter(has_value).get(best_idx),
+        confidence,
+        rule_applied,
+        quality=quality.filter(has_value).get(best_idx),
+        length=best_length
+    )
 
 
-def _apply_source_priority_rule(
-    values: List[Any],
-    cluster_data: pl.DataFrame,
+def _source_priority_rule(
+    column: str,
+    quality: pl.Expr,
+    columns: List[str],
     source_column: Optional[str],
-    source_priority: Dict[str, int],
-    quality_scores: List[float]
-) -> Dict[str, Any]:
+    source_priority: Dict[str, int]
+) -> Dict[str, pl.Expr]:
     """Apply source priority rule."""
-    if not source_column or source_column not in cluster_data.columns:
-        return _apply_quality_score_rule(values, quality_scores)
-    
-    sources = cluster_data[source_column].to_list()
-    best_priority = float('inf')
-    best_idx = 0
+    if not source_column or source_column not in columns:
+        return _quality_score_rule(column, quality)
     
-    for i, (val, src) in enumerate(zip(values, sources)):
-        if val is None:
-            continue
-        priority = source_priority.get(str(src), 999)
-        if priority < best_priority:
-            best_priority = priority
-            best_idx = i
-    
-    confidence = 0.9 if best_priority < 999 else 0.6
+    has_value = pl.col(column).is_not_null()
+    priorities = (
+        pl.col(source_column)
+        .cast(pl.Utf8)
+        .fill_null("None")
+        .replace_strict(
+            {str(source): float(priority) for source, priority in source_priority.items()},
+            default=999.0,
+            return_dtype=pl.Float64
+        )
+        .filter(has_value)
+    )
+    best_idx = priorities.arg_min()
     
-    return {
-        "winner": values[best_idx],
-        "rule_applied": "source_priority",
-        "confidence": confidence,
-        "rationale": f"Highest priority source ({sources[best_idx]}, priority: {best_priority})",
-        "scores": {"quality": quality_scores[best_idx], "priority": best_priority}
-    }
+    return _rule_outcome(
+        pl.col(column).filter(has_value).get(best_idx),
+        pl.when(priorities.min() < 999).then(0.9).otherwise(0.6),
+        "source_priority",
+        quality=quality.filter(has_value).get(best_idx),
+        source=pl.col(source_column).filter(has_value).get(best_idx)
+    )
 
 
-def _apply_frequency_rule(values: List[Any], quality_scores: List[float]) -> Dict[str, Any]:
-    """Apply most frequent value rule."""
-    non_null = [str(v) for v in values if v is not None]
-    
-    if not non_null:
-        return {"winner": None, "rule_applied": "frequency", "confidence": 0.3, "rationale": "No valid values", "scores": {}}
-    
-    counter = Counter(non_null)
-    most_common = counter.most_common(1)[0]
-    frequency_ratio = most_common[1] / len(non_null)
-    
-    # Find original value
-    for i, v in enumerate(values):
-        if str(v) == most_common[0]:
-            return {
-                "winner": v,
-                "rule_applied": "frequency",
-                "confidence": min(0.95, 0.5 + frequency_ratio * 0.5),
-                "rationale": f"Most frequent value ({most_common[1]}/{len(non_null)} occurrences)",
-                "scores": {"quality": quality_scores[i], "frequency": frequency_ratio}
-            }
+def _frequency_rule(column: str, quality: pl.Expr, frequency: pl.Expr) -> Dict[str, pl.Expr]:
+    """
+    Apply most frequent value rule (first seen value wins ties).
     
-    return {"winner": most_common[0], "rule_applied": "frequency", "confidence": 0.7, "rationale": "Most frequent value", "scores": {}}
-
-
-def _apply_richness_rule(values: List[Any], quality_scores: List[float]) -> Dict[str, Any]:
-    """Apply value length/richness rule."""
-    non_null = [(i, v) for i, v in enumerate(values) if v is not None]
+    frequency is the row's count of its value within the cluster. Rows are
+    ranked by it with nulls last, so a cluster without any value gets a null
+    winner; the first ranked row is the winner's first occurrence.
+    """
+    values = pl.col(column).drop_nulls()
+    ranking = [pl.col(column).is_null(), frequency]
     
-    if not non_null:
-        return {"winner": None, "rule_applied": "richness", "confidence": 0.3, "rationale": "No valid values", "scores": {}}
+    def most_frequent(expr: pl.Expr) -> pl.Expr:
+        return expr.sort_by(ranking, descending=[False, True], maintain_order=True).first()
     
-    best = max(non_null, key=lambda x: len(str(x[1])))
+    count = frequency.filter(pl.col(column).is_not_null()).max()
+    frequency_ratio = count / values.len()
     
-    return {
-        "winner": best[1],
-        "rule_applied": "richness",
-        "confidence": 0.8,
-        "rationale": f"Richest/longest value (length: {len(str(best[1]))})",
-        "scores": {"quality": quality_scores[best[0]], "length": len(str(best[1]))}
-    }
+    return _rule_outcome(
+        most_frequent(pl.col(column)),
+        pl.min_horizontal(pl.lit(0.95), 0.5 + frequency_ratio * 0.5),
+        "frequency",
+        quality=most_frequent(quality),
+        count=count,
+        total=values.len()
+    )
 
 
-def _apply_validation_rule(values: List[Any], field_type: str, quality_scores: List[float]) -> Dict[str, Any]:
+def _validation_rule(column: str, quality: pl.Expr, field_type: str) -> Dict[str, pl.Expr]:
     """Apply format validation rule."""
     pattern = None
     if field_type == "email":
@@ -948,39 +805,232 @@ def _apply_validation_rule(values: List[Any], field_type: str, quality_scores: L
     elif field_type == "date":
         pattern = VALIDATION_PATTERNS["date_iso"]
     
-    if pattern:
-        for i, v in enumerate(values):
-            if v is not None and re.match(pattern, str(v)):
-                return {
-                    "winner": v,
-                    "rule_applied": "validation",
-                    "confidence": 0.9,
-                    "rationale": f"First value matching {field_type} format",
-                    "scores": {"quality": quality_scores[i]}
-                }
+    if not pattern:
+        return _quality_score_rule(column, quality)
+    
+    # First value matching the format, otherwise fall back to quality score
+    matches = _regex_match_expr(pl.col(column).cast(pl.Utf8), pattern)
+    has_match = matches.any()
+    fallback = _quality_score_rule(column, quality)
     
-    # Fallback to quality score
-    return _apply_quality_score_rule(values, quality_scores)
+    return _rule_outcome(
+        pl.when(has_match).then(pl.col(column).filter(matches).first()).otherwise(fallback["winner"]),
+        pl.when(has_match).then(0.9).otherwise(fallback["confidence"]),
+        pl.when(has_match).then(pl.lit("validation")).otherwise(pl.lit("quality_score")),
+        quality=pl.when(has_match).then(quality.filter(matches).first()).otherwise(fallback["quality"])
+    )
 
 
-def _apply_min_rule(values: List[Any]) -> Dict[str, Any]:
-    """Apply minimum value rule."""
-    try:
-        non_null = [v for v in values if v is not None]
-        winner = min(non_null)
-        return {"winner": winner, "rule_applied": "min", "confidence": 0.9, "rationale": "Minimum value", "scores": {}}
-    except:
-        return {"winner": values[0] if values else None, "rule_applied": "min", "confidence": 0.5, "rationale": "Could not compare values", "scores": {}}
+def _survivorship_rule_outcome(
+    column: str,
+    rule: str,
+    field_type: str,
+    quality: pl.Expr,
+    columns: List[str],
+    source_column: Optional[str],
+    source_priority: Dict[str, int],
+    timestamp_column: Optional[str],
+    frequency: Optional[pl.Expr] = None
+) -> Dict[str, pl.Expr]:
+    """
+    Group-wise expressions for the survivorship rule configured on a column.
+    
+    The frequency rule needs frequency: the count of each row's value
+    within its cluster.
+    """
+    filled = pl.col(column).filter(pl.col(column).is_not_null() & (pl.col(column).cast(pl.Utf8).str.strip_chars() != ""))
+    
+    if rule == "freshness" or rule == "most_recent" or rule == "recency":
+        return _freshness_rule(column, quality, columns, timestamp_column)
+    
+    elif rule == "quality_score" or rule == "quality":
+        return _quality_score_rule(column, quality)
+    
+    elif rule == "completeness" or rule == "most_complete":
+        return _length_rule(column, quality, "completeness")
+    
+    elif rule == "source_priority":
+        return _source_priority_rule(column, quality, columns, source_column, source_priority)
+    
+    elif rule == "most_frequent" or rule == "frequency":
+        return _frequency_rule(column, quality, frequency)
+    
+    elif rule == "longest" or rule == "richness":
+        return _length_rule(column, quality, "richness")
+    
+    elif rule == "format_valid" or rule == "validation":
+        return _validation_rule(column, quality, field_type)
+    
+    elif rule == "min":
+        return _rule_outcome(pl.col(column).min(), 0.9, "min")
+    
+    elif rule == "max":
+        return _rule_outcome(pl.col(column).max(), 0.9, "max")
+    
+    elif rule == "first":
+        return _rule_outcome(filled.first(), 0.6, "first")
+    
+    elif rule == "last":
+        return _rule_outcome(filled.last(), 0.6, "last")
+    
+    # Default: combined quality score
+    return _quality_score_rule(column, quality)
 
 
-def _apply_max_rule(values: List[Any]) -> Dict[str, Any]:
-    """Apply maximum value rule."""
-    try:
-        non_null = [v for v in values if v is not None]
-        winner = max(non_null)
-        return {"winner": winner, "rule_applied": "max", "confidence": 0.9, "rationale": "Maximum value", "scores": {}}
-    except:
-        return {"winner": values[0] if values else None, "rule_applied": "max", "confidence": 0.5, "rationale": "Could not compare values", "scores": {}}
+def _resolve_conflicts(
+    df: pl.DataFrame,
+    cluster_rows: List[List[int]],
+    survivorship_rules: Dict[str, str],
+    default_rule: str,
+    field_types: Dict[str, str],
+    source_column: Optional[str],
+    source_priority: Dict[str, int],
+    timestamp_column: Optional[str],
+    field_validation_rules: Dict[str, Dict]
+) -> Dict[str, Dict[str, List[Any]]]:
+    """
+    Apply survivorship rules to every field of every cluster in one lazy query.
+    
+    Returns {column: {field: [value per cluster]}} in cluster_rows order, where
+    the fields say whether the cluster's non-blank values conflict, list the
+    distinct competing values and describe the outcome of the column's rule.
+    When source priority is configured the outcome of the source priority
+    rule is included as well ("fallback") for low-confidence resolutions.
+    """
+    if not cluster_rows:
+        return {}
+    
+    row_indices = [row for rows in cluster_rows for row in rows]
+    cluster_numbers = [number for number, rows in enumerate(cluster_rows) for _ in rows]
+    
+    # Row-level helpers are computed once, outside the group-wise aggregation
+    row_exprs = []
+    aggregations = {}
+    for idx, col in enumerate(df.columns):
+        if col.startswith("__"):
+            continue
+        
+        rule = survivorship_rules.get(col, default_rule)
+        field_type = field_types.get(col, "unknown")
+        quality_name = f"__quality_{idx}__"
+        non_blank_name = f"__non_blank_{idx}__"
+        row_exprs.append(_quality_score_expr(col, field_type, field_validation_rules.get(col, {})).alias(quality_name))
+        row_exprs.append((pl.col(col).is_not_null() & (pl.col(col).cast(pl.Utf8).str.strip_chars() != "")).alias(non_blank_name))
+        quality = pl.col(quality_name)
+        
+        frequency = None
+        if rule in ("most_frequent", "frequency"):
+            frequency_name = f"__frequency_{idx}__"
+            row_exprs.append(pl.len().over(["__cluster_number__", col]).alias(frequency_name))
+            frequency = pl.col(frequency_name)
+        
+        non_blank = pl.col(col).filter(pl.col(non_blank_name))
+        fields = {
+            "conflict": non_blank.n_unique() > 1,
+            "unique_values": non_blank.unique(maintain_order=True),
+            **_survivorship_rule_outcome(
+                col, rule, field_type, quality, df.columns, source_column, source_priority, timestamp_column,
+                frequency
+            )
+        }
+        
+        # Fallback to Source Priority if primary rule fails or has low confidence
+        if rule != "source_priority" and source_priority and source_column:
+            fallback = _source_priority_rule(col, quality, df.columns, source_column, source_priority)
+            fields.update({f"fallback_{name}": expr for name, expr in fallback.items()})
+        
+        aggregations[col] = (idx, fields)
+    
+    resolved = (
+        df.lazy()
+        .select(pl.all().gather(row_indices))
+        .with_columns(pl.Series("__cluster_number__", cluster_numbers, dtype=pl.Int64))
+        .with_columns(row_exprs)
+        .group_by("__cluster_number__")
+        .agg([
+            expr.alias(f"__resolved_{idx}_{name}__")
+            for idx, fields in aggregations.values()
+            for name, expr in fields.items()
+        ])
+        .sort("__cluster_number__")
+        .collect()
+    )
+    
+    return {
+        col: {name: resolved[f"__resolved_{idx}_{name}__"].to_list() for name in fields}
+        for col, (idx, fields) in aggregations.items()
+    }
+
+
+def _conflict_result(
+    field: Dict[str, Any],
+    rule: str,
+    field_type: str,
+    source_priority: Dict[str, int]
+) -> Dict[str, Any]:
+    """Build the resolution (winner, confidence, rationale, scores) for one resolved conflict."""
+    result = _describe_outcome(field, field_type, source_priority)
+    
+    # Fallback to Source Priority if primary rule fails or has low confidence
+    if (result["winner"] is None or result["confidence"] < 0.5) and field.get("fallback_winner") is not None:
+        fallback = {name[len("fallback_"):]: value for name, value in field.items() if name.startswith("fallback_")}
+        fallback_result = _describe_outcome(fallback, field_type, source_priority)
+        fallback_result["rationale"] += f" (Fallback from {rule})"
+        return fallback_result
+    
+    return result
+
+
+def _describe_outcome(outcome: Dict[str, Any], field_type: str, source_priority: Dict[str, int]) -> Dict[str, Any]:
+    """Rationale and scores for a rule outcome produced by _resolve_conflicts."""
+    rule_applied = outcome["rule_applied"]
+    quality = outcome["quality"]
+    
+    if rule_applied == "freshness":
+        rationale = f"Most recent value (timestamp: {outcome['timestamp']})"
+        scores = {"quality": quality}
+    elif rule_applied == "freshness_fallback":
+        rationale = "Last available value (no timestamp column)"
+        scores = {"quality": quality}
+    elif rule_applied == "quality_score":
+        rationale = f"Highest quality score ({quality:.2f})"
+        scores = {"quality": quality}
+    elif rule_applied == "completeness":
+        rationale = f"Most complete value (length: {outcome['length']})"
+        scores = {"quality": quality, "length": outcome["length"]}
+    elif rule_applied == "richness":
+        rationale = f"Richest/longest value (length: {outcome['length']})"
+        scores = {"quality": quality, "length": outcome["length"]}
+    elif rule_applied == "source_priority":
+        priority = source_priority.get(str(outcome["source"]), 999)
+        rationale = f"Highest priority source ({outcome['source']}, priority: {priority})"
+        scores = {"quality": quality, "priority": priority}
+    elif rule_applied == "frequency":
+        rationale = f"Most frequent value ({outcome['count']}/{outcome['total']} occurrences)"
+        scores = {"quality": quality, "frequency": outcome["count"] / outcome["total"]}
+    elif rule_applied == "validation":
+        rationale = f"First value matching {field_type} format"
+        scores = {"quality": quality}
+    elif rule_applied == "min":
+        rationale = "Minimum value"
+        scores = {}
+    elif rule_applied == "max":
+        rationale = "Maximum value"
+        scores = {}
+    elif rule_applied == "first":
+        rationale = "First non-null value"
+        scores = {}
+    else:
+        rationale = "Last non-null value"
+        scores = {}
+    
+    return {
+        "winner": outcome["winner"],
+        "rule_applied": rule_applied,
+        "confidence": outcome["confidence"],
+        "rationale": rationale,
+        "scores": scores
+    }
 
 
 def _apply_resolutions_to_df(
@@ -999,41 +1049,28 @@ def _apply_resolutions_to_df(
         column = rf["column"]
         cluster_resolutions[cluster_id][column] = rf["winner"]
     
-    # Build resolved DataFrame - one row per cluster
-    resolved_data = {col: [] for col in df.columns}
-    resolved_data["__cluster_id__"] = []
-    resolved_data["__resolution_confidence__"] = []
+    # Confidences per cluster
+    cluster_confidences = defaultdict(list)
+    for rf in resolved_fields:
+        cluster_confidences[rf["cluster_id"]].append(rf["confidence"])
     
-    for cluster_id, cluster_info in clusters.items():
-        cluster_rows = cluster_info["rows"]
-        if not cluster_rows:
-            continue
-        
-        # Start with first row of cluster
-        first_row = df.row(cluster_rows[0])
-        
-        for col_idx, col in enumerate(df.columns):
-            # Use resolved value if available, otherwise use first row value
-            if cluster_id in cluster_resolutions and col in cluster_resolutions[cluster_id]:
-                resolved_data[col].append(cluster_resolutions[cluster_id][col])
-            else:
-                resolved_data[col].append(first_row[col_idx])
-        
-        resolved_data["__cluster_id__"].append(cluster_id)
-        
-        # Calculate average confidence for this cluster
-        cluster_confidences = [
-            rf["confidence"] for rf in resolved_fields
-            if rf["cluster_id"] == cluster_id
-        ]
-        avg_conf = sum(cluster_confidences) / len(cluster_confidences) if cluster_confidences else 1.0
-        resolved_data["__resolution_confidence__"].append(round(avg_conf, 3))
+    # Build resolved DataFrame - one row per cluster, starting from the first row of each cluster
+    cluster_ids = [cluster_id for cluster_id, cluster_info in clusters.items() if cluster_info["rows"]]
+    first_rows = df[[clusters[cluster_id]["rows"][0] for cluster_id in cluster_ids]]
+    
+    resolved_data = {col: first_rows[col].to_list() for col in df.columns}
+    
+    # Use resolved value if available, otherwise keep the first row value
+    positions = {cluster_id: position for position, cluster_id in enumerate(cluster_ids)}
+    for cluster_id, resolutions in cluster_resolutions.items():
+        for col, winner in resolutions.items():
+            resolved_data[col][positions[cluster_id]] = winner
+    
+    resolved_data["__cluster_id__"] = cluster_ids
+    resolved_data["__resolution_confidence__"] = [
+        round(sum(cluster_confidences[cluster_id]) / len(cluster_confidences[cluster_id]), 3)
+        if cluster_confidences[cluster_id] else 1.0
+        for cluster_id in cluster_ids
+    ]
     
     return pl.DataFrame(resolved_data)
-
-
-def _generate_resolved_file(df: pl.DataFrame, original_filename: str) -> bytes:
-    """Generate resolved data file in CSV format."""
-    output = io.BytesIO()
-    df.write_csv(output)
-    return output.getvalue()
@@ -9,15 +9,24 @@ Output: Synthetic control analysis, incremental lift measurement, match confiden
         alerts/issues/recommendations following Agensium agent response standard.
 """
 
-import io
 import time
 from datetime import date, datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import polars as pl
+from scipy.optimize import linear_sum_assignment
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
 
-from .agent_utils import normalize_column_names, validate_required_parameters
+from .agent_utils import normalize_column_names, validate_required_parameters, DatasetContext, load_dataframe
+
+# Neighbours fetched per treatment unit in the first batched KD-tree query
+MATCH_QUERY_NEIGHBOURS = 8
+# Largest treatment x neighbours block fetched by one greedy KD-tree query
+MATCH_QUERY_MAX_CELLS = 4_000_000
+# Largest treatment x control distance matrix solved with optimal assignment
+OPTIMAL_MATCH_MAX_CELLS = 4_000_000
 
 
 def _convert_numpy_types(obj: Any) -> Any:
@@ -136,11 +145,13 @@ def _aggregate_customer_features(
 def _match_synthetic_control(
     treatment_features: pl.DataFrame,
     control_pool_features: pl.DataFrame,
-    match_ratio: int = 1
+    match_ratio: int = 1,
+    method: str = "greedy"
 ) -> Tuple[pl.DataFrame, Dict[str, Any]]:
     """
     Match treatment customers to control customers based on pre-period features.
-    Uses nearest neighbor matching on normalized features.
+    Uses nearest neighbor matching on normalized features, either greedily in
+    treatment order or, for small pools, with an optimal assignment.
     
     Returns: (matched control DataFrame, matching diagnostics)
     """
@@ -163,27 +174,11 @@ def _match_synthetic_control(
     treatment_normalized = (treatment_array - means) / stds
     control_normalized = (control_array - means) / stds
     
-    # Find nearest neighbors for each treatment unit
-    matched_indices = []
-    distances = []
-    used_control_indices = set()
-    
-    for i, t_row in enumerate(treatment_normalized):
-        # Calculate Euclidean distances to all control units
-        dists = np.sqrt(np.sum((control_normalized - t_row) ** 2, axis=1))
-        
-        # Sort by distance and find best available match
-        sorted_indices = np.argsort(dists)
-        
-        matches_found = 0
-        for j in sorted_indices:
-            if matches_found >= match_ratio:
-                break
-            if j not in used_control_indices:
-                matched_indices.append(int(j))
-                distances.append(float(dists[j]))
-                used_control_indices.add(j)
-                matches_found += 1
+    if method == "optimal" and treatment_normalized.shape[0] * match_ratio * control_normalized.shape[0] <= OPTIMAL_MATCH_MAX_CELLS:
+        matched_indices, distances = _assign_optimal(treatment_normalized, control_normalized, match_ratio)
+    else:
+        method = "greedy"
+        matched_indices, distances = _assign_greedy(treatment_normalized, control_normalized, match_ratio)
     
     # Extract matched control customers
     if not matched_indices:
@@ -202,6 +197,7 @@ def _match_synthetic_control(
         "treatment_count": treatment_features.height,
         "control_pool_size": control_pool_features.height,
         "matched_control_count": len(matched_indices),
+        "matching_method": method,
         "avg_match_distance": round(avg_distance, 4),
         "max_match_distance": round(max_distance, 4),
         "match_confidence_score": round(match_confidence, 2),
@@ -212,6 +208,75 @@ def _match_synthetic_control(
     return matched_control, diagnostics
 
 
+def _assign_greedy(
+    treatment_normalized: np.ndarray,
+    control_normalized: np.ndarray,
+    match_ratio: int
+) -> Tuple[List[int], List[float]]:
+    """
+    Greedy nearest-neighbour matching without replacement.
+    
+    Each treatment unit, in order, takes its nearest unused controls. Neighbours
+    come from one KD-tree built over the control pool and are queried for a
+    chunk of treatment units at once. When all candidates of a unit were taken,
+    the number of neighbours doubles and stays doubled: the unit and the rest
+    of the chunk are re-queried with it, since later units compete for the same
+    taken controls (e.g. tied integer features). Chunks hold at most
+    MATCH_QUERY_MAX_CELLS neighbours.
+    """
+    treatment_count = treatment_normalized.shape[0]
+    control_count = control_normalized.shape[0]
+    tree = cKDTree(control_normalized)
+    used = np.zeros(control_count, dtype=bool)
+    matched_indices: List[int] = []
+    distances: List[float] = []
+    
+    k = min(control_count, match_ratio + MATCH_QUERY_NEIGHBOURS)
+    chunk_start = chunk_end = 0
+    
+    def query_chunk(start: int) -> Tuple[np.ndarray, np.ndarray, int]:
+        end = min(treatment_count, start + max(1, MATCH_QUERY_MAX_CELLS // k))
+        dists, indices = tree.query(treatment_normalized[start:end], k=k)
+        return np.asarray(dists).reshape(end - start, k), np.asarray(indices).reshape(end - start, k), end
+    
+    for i in range(treatment_count):
+        if len(matched_indices) >= control_count:
+            break
+        if i >= chunk_end:
+            chunk_start = i
+            chunk_dists, chunk_indices, chunk_end = query_chunk(i)
+        
+        matches_found = 0
+        while True:
+            dists, indices = chunk_dists[i - chunk_start], chunk_indices[i - chunk_start]
+            available = ~used[indices]
+            for j, dist in zip(indices[available][:match_ratio - matches_found], dists[available]):
+                matched_indices.append(int(j))
+                distances.append(float(dist))
+                used[j] = True
+                matches_found += 1
+            if matches_found >= match_ratio or k >= control_count:
+                break
+            
+            # Every candidate was taken: look further out for this and the following units
+            k = min(control_count, k * 2)
+            chunk_start = i
+            chunk_dists, chunk_indices, chunk_end = query_chunk(i)
+    
+    return matched_indices, distances
+
+
+def _assign_optimal(
+    treatment_normalized: np.ndarray,
+    control_normalized: np.ndarray,
+    match_ratio: int
+) -> Tuple[List[int], List[float]]:
+    """Matching without replacement that minimises the total distance over all treatment units."""
+    distance_matrix = cdist(np.repeat(treatment_normalized, match_ratio, axis=0), control_normalized)
+    rows, cols = linear_sum_assignment(distance_matrix)
+    return [int(j) for j in cols], [float(d) for d in distance_matrix[rows, cols]]
+
+
 def _calculate_lift(
     treatment_features_pre: pl.DataFrame,
     treatment_features_post: pl.DataFrame,
@@ -314,7 +379,9 @@ def execute_synthetic_control_agent(
     filename: str,
     baseline_contents: Optional[bytes] = None,
     baseline_filename: Optional[str] = None,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None,
+    baseline_dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """Execute synthetic control analysis."""
 
@@ -335,6 +402,9 @@ def execute_synthetic_control_agent(
     
     excellent_threshold = _safe_int(parameters.get("excellent_threshold"), 90, 0, 100)
     good_threshold = _safe_int(parameters.get("good_threshold"), 75, 0, 100)
+    matching_method = (parameters.get("matching_method") or "greedy").strip().lower()
+    if matching_method not in {"greedy", "optimal"}:
+        matching_method = "greedy"
 
     agent_id = "synthetic-control-agent"
     agent_name = "Synthetic Control Agent"
@@ -352,7 +422,7 @@ def execute_synthetic_control_agent(
                 "execution_time_ms": int((time.time() - start_time) * 1000),
             }
         
-        if baseline_contents is None or baseline_filename is None:
+        if (baseline_contents is None and baseline_dataset is None) or baseline_filename is None:
             return {
                 "status": "error",
                 "agent_id": agent_id,
@@ -417,7 +487,7 @@ def execute_synthetic_control_agent(
         # Load treatment (primary) CSV
         # ----------------------------
         try:
-            df_treatment = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+            df_treatment = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
         except Exception as e:
             return {
                 "status": "error",
@@ -440,7 +510,7 @@ def execute_synthetic_control_agent(
         # Load baseline (control pool) CSV
         # ----------------------------
         try:
-            df_baseline = pl.read_csv(io.BytesIO(baseline_contents), ignore_errors=True, infer_schema_length=10000)
+            df_baseline = load_dataframe(baseline_contents, baseline_dataset, ignore_errors=True, infer_schema_length=10000)
         except Exception as e:
             return {
                 "status": "error",
@@ -670,7 +740,8 @@ def execute_synthetic_control_agent(
         # ----------------------------
         matched_control_pre, match_diagnostics = _match_synthetic_control(
             treatment_pre_features,
-            baseline_pre_features
+            baseline_pre_features,
+            method=matching_method
         )
 
         if matched_control_pre.height == 0 or "error" in match_diagnostics:
@@ -968,7 +1039,8 @@ def execute_synthetic_control_agent(
             },
             "defaults": {
                 "excellent_threshold": 90,
-                "good_threshold": 75
+                "good_threshold": 75,
+                "matching_method": "greedy"
             },
             "overrides": {
                 "customer_id_column": parameters.get("customer_id_column"),
@@ -979,7 +1051,8 @@ def execute_synthetic_control_agent(
                 "treatment_start_date": parameters.get("treatment_start_date"),
                 "treatment_end_date": parameters.get("treatment_end_date"),
                 "excellent_threshold": parameters.get("excellent_threshold"),
-                "good_threshold": parameters.get("good_threshold")
+                "good_threshold": parameters.get("good_threshold"),
+                "matching_method": parameters.get("matching_method")
             },
             "parameters": {
                 "customer_id_column": customer_id_column,
@@ -990,7 +1063,8 @@ def execute_synthetic_control_agent(
                 "treatment_start_date": str(treatment_start_date) if treatment_start_date else None,
                 "treatment_end_date": str(treatment_end_date) if treatment_end_date else None,
                 "excellent_threshold": excellent_threshold,
-                "good_threshold": good_threshold
+                "good_threshold": good_threshold,
+                "matching_method": matching_method
             }
         }
 
@@ -8,17 +8,19 @@ Output: Standardized test coverage validation results
 
 import polars as pl
 import numpy as np
-import io
 import time
 import re
 from typing import Dict, Any, Optional, List
-from agents.agent_utils import safe_get_list, safe_get_dict
+from agents.agent_utils import safe_get_list, safe_get_dict, DatasetContext, scan_dataframe, collect_streaming
+
+NUMERIC_DTYPES = [pl.Int8, pl.Int16, pl.Int32, pl.Int64, pl.Float32, pl.Float64]
 
 
 def execute_test_coverage(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Check data test coverage compliance.
@@ -27,6 +29,7 @@ def execute_test_coverage(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters from tool.json
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary
@@ -53,8 +56,11 @@ def execute_test_coverage(
             }
 
         try:
-            # Read CSV with Polars
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+            # Scan CSV lazily; every check below is an aggregate or a bounded
+            # row sample, so large inputs are never fully materialized
+            lf = scan_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
+            schema = lf.collect_schema()
+            row_count = collect_streaming(lf.select(pl.len())).item()
         except Exception as e:
             return {
                 "status": "error",
@@ -64,7 +70,7 @@ def execute_test_coverage(
             }
 
         # Validate data
-        if df.height == 0:
+        if row_count == 0:
             return {
                 "status": "error",
                 "agent_id": "test-coverage-agent",
@@ -74,9 +80,10 @@ def execute_test_coverage(
             }
 
         # Perform test coverage validation
-        uniqueness_score = _test_uniqueness(df, parameters)
-        range_score = _test_ranges(df, parameters)
-        format_score = _test_formats(df, parameters)
+        test_counts = _collect_test_counts(lf, schema, parameters)
+        uniqueness_score = _test_uniqueness(test_counts, row_count, parameters)
+        range_score = _test_ranges(test_counts, schema, parameters)
+        format_score = _test_formats(test_counts, schema, parameters)
 
         # Calculate overall test coverage score
         overall_score = (
@@ -94,7 +101,7 @@ def execute_test_coverage(
             coverage_status = "needs_improvement"
 
         # Identify test coverage issues
-        test_issues = _identify_test_coverage_issues(df, parameters)
+        test_issues = _identify_test_coverage_issues(test_counts, schema, parameters)
         
         # ==================== GENERATE ROW-LEVEL-ISSUES ====================
         row_level_issues = []
@@ -102,10 +109,14 @@ def execute_test_coverage(
         # Check uniqueness constraints at row level
         unique_columns = safe_get_list(parameters, 'unique_columns', [])
         for col in unique_columns:
-            if col in df.columns:
-                # Find rows with duplicate values
-                # Polars: filter for is_duplicated
-                dups = df.with_row_index("row_index").filter(pl.col(col).is_duplicated())
+            if col in schema:
+                # Find rows with duplicate values (only the first rows still needed)
+                dups = collect_streaming(
+                    lf.with_row_index("row_index")
+                    .select(["row_index", col])
+                    .filter(pl.col(col).is_duplicated())
+                    .head(1000 - len(row_level_issues))
+                )
                 
                 # We need to iterate to add issues, limit to 1000 total
                 for row in dups.iter_rows(named=True):
@@ -128,7 +139,7 @@ def execute_test_coverage(
         range_tests = safe_get_dict(parameters, 'range_tests', {})
         for col, constraints in range_tests.items():
             if len(row_level_issues) >= 1000: break
-            if col in df.columns and df[col].dtype in [pl.Int8, pl.Int16, pl.Int32, pl.Int64, pl.Float32, pl.Float64]:
+            if col in schema and schema[col] in NUMERIC_DTYPES:
                 min_val = constraints.get('min')
                 max_val = constraints.get('max')
                 
@@ -139,7 +150,12 @@ def execute_test_coverage(
                 if max_val is not None:
                     condition = condition | (pl.col(col) > max_val)
                 
-                out_of_range_rows = df.with_row_index("row_index").filter(condition)
+                out_of_range_rows = collect_streaming(
+                    lf.with_row_index("row_index")
+                    .select(["row_index", col])
+                    .filter(condition)
+                    .head(1000 - len(row_level_issues))
+                )
                 
                 for row in out_of_range_rows.iter_rows(named=True):
                     if len(row_level_issues) >= 1000:
@@ -163,7 +179,7 @@ def execute_test_coverage(
         format_tests = safe_get_dict(parameters, 'format_tests', {})
         for col, pattern_info in format_tests.items():
             if len(row_level_issues) >= 1000: break
-            if col in df.columns:
+            if col in schema:
                 pattern = pattern_info.get('pattern') if isinstance(pattern_info, dict) else pattern_info
                 description = pattern_info.get('description', 'format') if isinstance(pattern_info, dict) else 'format'
                 
@@ -177,9 +193,14 @@ def execute_test_coverage(
                     
                     # Filter for NO match
                     # str.contains with regex
-                    non_matching = df.with_row_index("row_index").filter(
-                        pl.col(col).is_not_null() & 
-                        ~pl.col(col).cast(pl.Utf8).str.contains(regex_pattern)
+                    non_matching = collect_streaming(
+                        lf.with_row_index("row_index")
+                        .select(["row_index", col])
+                        .filter(
+                            pl.col(col).is_not_null() & 
+                            ~pl.col(col).cast(pl.Utf8).str.contains(regex_pattern)
+                        )
+                        .head(1000 - len(row_level_issues))
                     )
                     
                     for row in non_matching.iter_rows(named=True):
@@ -206,18 +227,20 @@ def execute_test_coverage(
         # "Check for rows with many null values"
         # Calculate null count per row
         if len(row_level_issues) < 1000:
-            # Polars doesn't have axis=1 null_count directly on DataFrame easily like pandas
-            # We can sum nulls across columns
-            null_counts = df.select(pl.sum_horizontal(pl.all().is_null())).to_series()
-            
-            null_counts_df = df.select(pl.sum_horizontal(pl.all().is_null()).alias("null_count"))
-            total_cols = len(df.columns)
+            # Sum nulls across columns per row
+            total_cols = len(schema)
             
             if total_cols > 0:
                 # Filter rows with > 20% nulls
-                high_null_rows = df.with_row_index("row_index").with_columns(
-                    pl.sum_horizontal(pl.all().is_null()).alias("null_count")
-                ).filter(pl.col("null_count") / total_cols > 0.2)
+                high_null_rows = collect_streaming(
+                    lf.with_row_index("row_index")
+                    .select([
+                        pl.col("row_index"),
+                        pl.sum_horizontal(pl.all().is_null()).alias("null_count")
+                    ])
+                    .filter(pl.col("null_count") / total_cols > 0.2)
+                    .head(1000 - len(row_level_issues))
+                )
                 
                 for row in high_null_rows.iter_rows(named=True):
                     if len(row_level_issues) >= 1000:
@@ -681,8 +704,8 @@ def execute_test_coverage(
             "agent_name": "Test Coverage Agent",
             "execution_time_ms": int((time.time() - start_time) * 1000),
             "summary_metrics": {
-                "total_records": len(df),
-                "total_fields": len(df.columns),
+                "total_records": row_count,
+                "total_fields": len(schema),
                 "test_coverage_score": round(overall_score, 1),
                 "coverage_status": coverage_status,
                 "issues_found": len(test_issues)
@@ -695,8 +718,8 @@ def execute_test_coverage(
                     "format": round(format_score, 1)
                 },
                 "coverage_status": coverage_status,
-                "total_records": len(df),
-                "fields_analyzed": list(df.columns),
+                "total_records": row_count,
+                "fields_analyzed": schema.names(),
                 "test_coverage_issues": test_issues,
                 "row_level_issues": row_level_issues[:100],
                 "issue_summary": issue_summary,
@@ -741,7 +764,96 @@ def execute_test_coverage(
         }
 
 
-def _test_uniqueness(df: pl.DataFrame, config: Dict[str, Any]) -> float:
+def _duplicate_count(lf: pl.LazyFrame, col: str) -> int:
+    """Count rows whose value in col occurs more than once (nulls included)."""
+    duplicates = collect_streaming(
+        lf.group_by(col)
+        .agg(pl.len().alias("occurrences"))
+        .filter(pl.col("occurrences") > 1)
+        .select(pl.col("occurrences").sum())
+    )
+    return int(duplicates.item() or 0)
+
+
+def _range_condition(col: str, constraints: Dict[str, Any]) -> pl.Expr:
+    """Build the out-of-range condition for a range test."""
+    min_val = constraints.get('min')
+    max_val = constraints.get('max')
+    
+    condition = pl.lit(False)
+    if min_val is not None:
+        condition = condition | (pl.col(col) < min_val)
+    if max_val is not None:
+        condition = condition | (pl.col(col) > max_val)
+    return condition
+
+
+def _collect_test_counts(lf: pl.LazyFrame, schema: pl.Schema, config: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Run the aggregate queries behind the uniqueness, range and format tests.
+    
+    Each configured column is evaluated once with streaming collection and
+    the counts are shared by the scoring and issue functions.
+    
+    Returns:
+        Dict with "duplicates" (col -> count), "ranges" (col -> (non_null, violations))
+        and "formats" (col -> (non_null, violations) or the regex error)
+    """
+    counts = {"duplicates": {}, "ranges": {}, "formats": {}}
+    
+    for col in config.get('unique_columns', []):
+        if col in schema:
+            counts["duplicates"][col] = _duplicate_count(lf, col)
+    
+    range_queries = [
+        pl.struct(
+            pl.col(col).is_not_null().sum().alias("non_null"),
+            _range_condition(col, constraints).fill_null(False).sum().alias("violations")
+        ).alias(col)
+        for col, constraints in config.get('range_tests', {}).items()
+        if col in schema and schema[col] in NUMERIC_DTYPES
+    ]
+    if range_queries:
+        row = collect_streaming(lf.select(range_queries)).row(0, named=True)
+        for col, result in row.items():
+            counts["ranges"][col] = (result["non_null"], result["violations"])
+    
+    # Column -> anchored regex, or the error of a pattern that cannot be used
+    format_patterns = {}
+    for col, pattern_info in config.get('format_tests', {}).items():
+        if col not in schema:
+            continue
+        pattern = pattern_info.get('pattern') if isinstance(pattern_info, dict) else pattern_info
+        try:
+            # Anchor pattern if needed
+            regex_pattern = pattern
+            if not regex_pattern.startswith('^'):
+                regex_pattern = '^' + regex_pattern
+            # Invalid patterns only fail when evaluated, which would fail the whole batch
+            pl.select(pl.lit("").str.contains(regex_pattern))
+            format_patterns[col] = regex_pattern
+        except Exception as e:
+            format_patterns[col] = e
+    
+    format_queries = []
+    for col, regex_pattern in format_patterns.items():
+        fields = [pl.col(col).is_not_null().sum().alias("non_null")]
+        if not isinstance(regex_pattern, Exception):
+            fields.append((~pl.col(col).cast(pl.Utf8).str.contains(regex_pattern)).sum().alias("violations"))
+        format_queries.append(pl.struct(fields).alias(col))
+    if format_queries:
+        row = collect_streaming(lf.select(format_queries)).row(0, named=True)
+        for col, result in row.items():
+            if isinstance(format_patterns[col], Exception):
+                # A pattern is only evaluated against non-null values
+                counts["formats"][col] = format_patterns[col] if result["non_null"] > 0 else (0, 0)
+            else:
+                counts["formats"][col] = (result["non_null"], result["violations"])
+    
+    return counts
+
+
+def _test_uniqueness(test_counts: Dict[str, Dict[str, Any]], row_count: int, config: Dict[str, Any]) -> float:
     """
     Test uniqueness constraints on specified columns.
     """
@@ -752,22 +864,21 @@ def _test_uniqueness(df: pl.DataFrame, config: Dict[str, Any]) -> float:
         return score
 
     for col in unique_columns:
-        if col not in df.columns:
+        if col not in test_counts["duplicates"]:
             score -= 20  # Deduct for missing column
             continue
 
-        # Polars: count duplicates
-        duplicate_count = df.select(pl.col(col).is_duplicated().sum()).item()
+        duplicate_count = test_counts["duplicates"][col]
         
         if duplicate_count > 0:
-            duplicate_pct = (duplicate_count / len(df)) * 100
+            duplicate_pct = (duplicate_count / row_count) * 100
             deduction = min(25, duplicate_pct)
             score -= deduction
 
     return max(0, score)
 
 
-def _test_ranges(df: pl.DataFrame, config: Dict[str, Any]) -> float:
+def _test_ranges(test_counts: Dict[str, Dict[str, Any]], schema: pl.Schema, config: Dict[str, Any]) -> float:
     """
     Test range constraints on numeric columns.
     """
@@ -778,44 +889,27 @@ def _test_ranges(df: pl.DataFrame, config: Dict[str, Any]) -> float:
         return score
 
     for col, constraints in range_tests.items():
-        if col not in df.columns:
+        if col not in schema:
             score -= 15  # Deduct for missing column
             continue
 
         # Check if numeric
-        if df[col].dtype not in [pl.Int8, pl.Int16, pl.Int32, pl.Int64, pl.Float32, pl.Float64]:
+        if schema[col] not in NUMERIC_DTYPES:
             score -= 10  # Deduct for non-numeric column
             continue
 
-        min_val = constraints.get('min')
-        max_val = constraints.get('max')
+        # Violations are counted over non-null values only
+        total_valid, violations = test_counts["ranges"][col]
 
-        # Count violations
-        # Filter non-nulls first? Polars handles nulls in comparisons usually by returning null, which counts as false in filter?
-        # Actually we should drop nulls for this check to match pandas logic
-        
-        col_data = df.select(pl.col(col)).drop_nulls()
-        violations = 0
-        
-        if col_data.height > 0:
-            condition = pl.lit(False)
-            if min_val is not None:
-                condition = condition | (pl.col(col) < min_val)
-            if max_val is not None:
-                condition = condition | (pl.col(col) > max_val)
-            
-            violations = col_data.filter(condition).height
-
-            if violations > 0:
-                total_valid = col_data.height
-                violation_pct = (violations / total_valid * 100) if total_valid > 0 else 0
-                deduction = min(20, violation_pct)
-                score -= deduction
+        if violations > 0:
+            violation_pct = (violations / total_valid * 100) if total_valid > 0 else 0
+            deduction = min(20, violation_pct)
+            score -= deduction
 
     return max(0, score)
 
 
-def _test_formats(df: pl.DataFrame, config: Dict[str, Any]) -> float:
+def _test_formats(test_counts: Dict[str, Dict[str, Any]], schema: pl.Schema, config: Dict[str, Any]) -> float:
     """
     Test format constraints using regex patterns.
     """
@@ -825,42 +919,26 @@ def _test_formats(df: pl.DataFrame, config: Dict[str, Any]) -> float:
     if not format_tests:
         return score
 
-    for col, pattern_info in format_tests.items():
-        if col not in df.columns:
+    for col in format_tests:
+        if col not in schema:
             score -= 15  # Deduct for missing column
             continue
 
-        pattern = pattern_info.get('pattern') if isinstance(pattern_info, dict) else pattern_info
-
-        try:
-            # Polars regex check
-            # Cast to string, drop nulls
-            col_data = df.select(pl.col(col)).drop_nulls().select(pl.col(col).cast(pl.Utf8))
-            
-            if col_data.height > 0:
-                # Anchor pattern if needed
-                regex_pattern = pattern
-                if not regex_pattern.startswith('^'):
-                    regex_pattern = '^' + regex_pattern
-                
-                # Count non-matches
-                # str.contains returns boolean series
-                matches = col_data.select(pl.col(col).str.contains(regex_pattern)).to_series()
-                violations = (~matches).sum()
-
-                if violations > 0:
-                    total_valid = col_data.height
-                    violation_pct = (violations / total_valid * 100) if total_valid > 0 else 0
-                    deduction = min(15, violation_pct)
-                    score -= deduction
-
-        except Exception:
+        result = test_counts["formats"][col]
+        if isinstance(result, Exception):
             score -= 5  # Deduct for invalid regex
+            continue
+
+        total_valid, violations = result
+        if violations > 0:
+            violation_pct = (violations / total_valid * 100) if total_valid > 0 else 0
+            deduction = min(15, violation_pct)
+            score -= deduction
 
     return max(0, score)
 
 
-def _identify_test_coverage_issues(df: pl.DataFrame, config: Dict[str, Any]) -> list:
+def _identify_test_coverage_issues(test_counts: Dict[str, Dict[str, Any]], schema: pl.Schema, config: Dict[str, Any]) -> list:
     """
     Identify specific test coverage issues in the data.
     """
@@ -869,7 +947,7 @@ def _identify_test_coverage_issues(df: pl.DataFrame, config: Dict[str, Any]) ->
     # Check uniqueness constraints
     unique_columns = config.get('unique_columns', [])
     for col in unique_columns:
-        if col not in df.columns:
+        if col not in schema:
             issues.append({
                 "type": "missing_unique_column",
                 "field": col,
@@ -877,7 +955,7 @@ def _identify_test_coverage_issues(df: pl.DataFrame, config: Dict[str, Any]) ->
                 "message": f"Required unique column '{col}' not found"
             })
         else:
-            duplicate_count = df.select(pl.col(col).is_duplicated().sum()).item()
+            duplicate_count = test_counts["duplicates"][col]
             if duplicate_count > 0:
                 issues.append({
                     "type": "uniqueness_violation",
@@ -890,28 +968,18 @@ def _identify_test_coverage_issues(df: pl.DataFrame, config: Dict[str, Any]) ->
     # Check range constraints
     range_tests = config.get('range_tests', {})
     for col, constraints in range_tests.items():
-        if col not in df.columns:
+        if col not in schema:
             issues.append({
                 "type": "missing_range_column",
                 "field": col,
                 "severity": "warning",
                 "message": f"Range test column '{col}' not found"
             })
-        elif df[col].dtype in [pl.Int8, pl.Int16, pl.Int32, pl.Int64, pl.Float32, pl.Float64]:
+        elif schema[col] in NUMERIC_DTYPES:
             min_val = constraints.get('min')
             max_val = constraints.get('max')
 
-            col_data = df.select(pl.col(col)).drop_nulls()
-            violations = 0
-            
-            if col_data.height > 0:
-                condition = pl.lit(False)
-                if min_val is not None:
-                    condition = condition | (pl.col(col) < min_val)
-                if max_val is not None:
-                    condition = condition | (pl.col(col) > max_val)
-                
-                violations = col_data.filter(condition).height
+            violations = test_counts["ranges"][col][1]
 
             if violations > 0:
                 issues.append({
@@ -925,7 +993,7 @@ def _identify_test_coverage_issues(df: pl.DataFrame, config: Dict[str, Any]) ->
     # Check format constraints
     format_tests = config.get('format_tests', {})
     for col, pattern_info in format_tests.items():
-        if col not in df.columns:
+        if col not in schema:
             issues.append({
                 "type": "missing_format_column",
                 "field": col,
@@ -933,35 +1001,26 @@ def _identify_test_coverage_issues(df: pl.DataFrame, config: Dict[str, Any]) ->
                 "message": f"Format test column '{col}' not found"
             })
         else:
-            pattern = pattern_info.get('pattern') if isinstance(pattern_info, dict) else pattern_info
             description = pattern_info.get('description', 'format') if isinstance(pattern_info, dict) else 'format'
 
-            try:
-                col_data = df.select(pl.col(col)).drop_nulls().select(pl.col(col).cast(pl.Utf8))
-                
-                if col_data.height > 0:
-                    regex_pattern = pattern
-                    if not regex_pattern.startswith('^'):
-                        regex_pattern = '^' + regex_pattern
-                        
-                    matches = col_data.select(pl.col(col).str.contains(regex_pattern)).to_series()
-                    violations = (~matches).sum()
-
-                    if violations > 0:
-                        issues.append({
-                            "type": "format_violation",
-                            "field": col,
-                            "severity": "warning",
-                            "message": f"Column '{col}' has {violations} values not matching {description} pattern",
-                            "violations": int(violations)
-                        })
-
-            except Exception as e:
+            result = test_counts["formats"][col]
+            if isinstance(result, Exception):
                 issues.append({
                     "type": "invalid_regex_pattern",
                     "field": col,
                     "severity": "warning",
-                    "message": f"Invalid regex pattern for column '{col}': {str(e)}"
+                    "message": f"Invalid regex pattern for column '{col}': {str(result)}"
+                })
+                continue
+
+            violations = result[1]
+            if violations > 0:
+                issues.append({
+                    "type": "format_violation",
+                    "field": col,
+                    "severity": "warning",
+                    "message": f"Column '{col}' has {violations} values not matching {description} pattern",
+                    "violations": int(violations)
                 })
 
     return issues
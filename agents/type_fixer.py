@@ -9,17 +9,28 @@ Output: Standardized type fixing results with effectiveness scores
 
 import polars as pl
 import numpy as np
-import io
 import re
 import time
-import base64
 from typing import Dict, Any, Optional, List
+from agents.agent_utils import DatasetContext, load_dataframe, build_cleaned_file, parse_dates
+
+
+# strptime formats tried (in order) when converting string columns to datetime
+DATETIME_FORMATS = [
+    "%Y-%m-%d", "%Y-%m-%d %H:%M:%S",
+    "%d-%m-%Y", "%d-%m-%Y %H:%M:%S",
+    "%d/%m/%Y", "%d/%m/%Y %H:%M:%S",
+    "%m/%d/%Y", "%m/%d/%Y %H:%M:%S",
+    "%d-%b-%y", "%d-%b-%Y",  # 02-Jan-25
+    "%Y/%m/%d", "%d.%m.%Y"
+]
 
 
 def execute_type_fixer(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Fix data types in data.
@@ -28,6 +39,7 @@ def execute_type_fixer(
         file_contents: File bytes (read as binary)
         filename: Original filename (used to detect format)
         parameters: Agent parameters from tool.json
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
 
     Returns:
         Standardized output dictionary
@@ -60,7 +72,7 @@ def execute_type_fixer(
         try:
             # Read CSV with Polars
             # infer_schema_length=10000 to get good type inference initially
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+            df = load_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
         except Exception as e:
             return {
                 "status": "error",
@@ -550,10 +562,6 @@ def execute_type_fixer(
             "timeline": "2-3 weeks"
         })
 
-        # Generate cleaned file (CSV format)
-        cleaned_file_bytes = _generate_cleaned_file(df_fixed, filename)
-        cleaned_file_base64 = base64.b64encode(cleaned_file_bytes).decode('utf-8')
-
         return {
             "status": "success",
             "agent_id": "type-fixer",
@@ -574,12 +582,7 @@ def execute_type_fixer(
             "ai_analysis_text" : ai_analysis_text,
             "row_level_issues": row_level_issues,
             "issue_summary": issue_summary,
-            "cleaned_file": {
-                "filename": f"cleaned_{filename}",
-                "content": cleaned_file_base64,
-                "size_bytes": len(cleaned_file_bytes),
-                "format": filename.split('.')[-1].lower()
-            }
+            "cleaned_file": build_cleaned_file(df_fixed, filename, "cleaned_", dataset)
         }
 
     except Exception as e:
@@ -726,40 +729,16 @@ def _apply_type_fixes(df: pl.DataFrame, fix_config: Dict[str, Any]) -> tuple:
                 fix_log.append(f"Converted '{col}' from {original_type} to integer")
                 
             elif target_type == 'datetime':
-                # Try to cast to datetime with flexible parsing
-                # We use map_elements to handle multiple formats
-                def parse_date(val):
-                    if val is None: return None
-                    val_str = str(val).strip()
-                    if not val_str: return None
-                    
-                    from datetime import datetime
-                    formats = [
-                        "%Y-%m-%d", "%Y-%m-%d %H:%M:%S",
-                        "%d-%m-%Y", "%d-%m-%Y %H:%M:%S",
-                        "%d/%m/%Y", "%d/%m/%Y %H:%M:%S",
-                        "%m/%d/%Y", "%m/%d/%Y %H:%M:%S",
-                        "%d-%b-%y", "%d-%b-%Y",  # 02-Jan-25
-                        "%Y/%m/%d", "%d.%m.%Y"
-                    ]
-                    
-                    for fmt in formats:
-                        try:
-                            return datetime.strptime(val_str, fmt)
-                        except ValueError:
-                            continue
-                    return None
-
-                # First try standard polars conversion (fast)
-                # If that fails (nulls), we might want to try custom parsing?
-                # But strict=False returns nulls.
-                # Better to just use custom parsing for the whole column if we suspect mixed formats,
-                # or just use it. map_elements is slower but safer for "fixing".
+                # Detect the formats used in the column and parse them natively
+                parsed, matched_formats = parse_dates(df_fixed[col], DATETIME_FORMATS)
+                df_fixed = df_fixed.with_columns(parsed.alias(col))
                 
-                df_fixed = df_fixed.with_columns(
-                    pl.col(col).map_elements(parse_date, return_dtype=pl.Datetime).alias(col)
+                format_counts = matched_formats.drop_nulls().value_counts(sort=True)
+                formats_used = ", ".join(f"{fmt}: {count}" for fmt, count in format_counts.iter_rows())
+                fix_log.append(
+                    f"Converted '{col}' from {original_type} to datetime"
+                    + (f" (formats: {formats_used})" if formats_used else "")
                 )
-                fix_log.append(f"Converted '{col}' from {original_type} to datetime")
                 
             elif target_type == 'string':
                 df_fixed = df_fixed.with_columns(pl.col(col).cast(pl.Utf8))
@@ -890,20 +869,3 @@ def _convert_numpy_types(obj):
         return [_convert_numpy_types(item) for item in obj]
     else:
         return obj
-
-
-def _generate_cleaned_file(df: pl.DataFrame, original_filename: str) -> bytes:
-    """
-    Generate cleaned data file in CSV format.
-    
-    Args:
-        df: Cleaned dataframe
-        original_filename: Original filename to determine format
-        
-    Returns:
-        File contents as bytes
-    """
-    # Always export as CSV for consistency and compatibility
-    output = io.BytesIO()
-    df.write_csv(output)
-    return output.getvalue()
@@ -8,17 +8,24 @@ Output: Uniform profiling structure with field-level analysis matching API speci
 
 import polars as pl
 import numpy as np
-import io
 import time
 import re
 from typing import Dict, Any, Optional, List
-from scipy import stats
+from agents.agent_utils import DatasetContext, scan_dataframe, collect_streaming, iter_dataframe_batches
+from agents.pii_scanner import pii_name_rule_for, scan_pii_samples
+from agents.sketches import ColumnSketch, sketch_columns
+
+INTEGER_DTYPES = [pl.Int8, pl.Int16, pl.Int32, pl.Int64, pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64]
+NUMERIC_DTYPES = INTEGER_DTYPES + [pl.Float32, pl.Float64]
+NUMERIC_STRING_PATTERN = r"^-?\d+(\.\d+)?$"
+SPECIAL_CHARS_PATTERN = r'[!@#$%^&*()_+=\[\]{};:\'",.<>?/\\|`~-]'
 
 
 def execute_unified_profiler(
     file_contents: bytes,
     filename: str,
-    parameters: Optional[Dict[str, Any]] = None
+    parameters: Optional[Dict[str, Any]] = None,
+    dataset: Optional[DatasetContext] = None
 ) -> Dict[str, Any]:
     """
     Profile data with comprehensive statistics.
@@ -27,6 +34,7 @@ def execute_unified_profiler(
         file_contents: File bytes
         filename: Original filename
         parameters: Agent parameters from tool.json (null_alert_threshold, categorical_threshold, etc.)
+        dataset: Optional shared DatasetContext (its parsed frame is reused)
         
     Returns:
         Uniform output structure matching API_SPECIFICATION.js response format
@@ -42,6 +50,11 @@ def execute_unified_profiler(
     top_n_values = parameters.get("top_n_values", 10)
     outlier_iqr_multiplier = parameters.get("outlier_iqr_multiplier", 1.5)
     outlier_alert_threshold = parameters.get("outlier_alert_threshold", 5)
+    # Exact statistics hold every value of every column in memory, so inputs
+    # spooled to disk (too large to hold as bytes) default to sketches
+    approximate_statistics = parameters.get(
+        "approximate_statistics", dataset is not None and dataset.is_spooled
+    )
     
     try:
         # Read file - CSV only
@@ -53,9 +66,10 @@ def execute_unified_profiler(
             }
             
         try:
-            # Read CSV with Polars
+            # Scan CSV lazily with Polars
             # infer_schema_length=10000 to get good type inference
-            df = pl.read_csv(io.BytesIO(file_contents), ignore_errors=True, infer_schema_length=10000)
+            lf = scan_dataframe(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
+            schema = lf.collect_schema()
         except Exception as e:
             return {
                 "status": "error",
@@ -63,98 +77,53 @@ def execute_unified_profiler(
                 "execution_time_ms": int((time.time() - start_time) * 1000)
             }
         
+        # Approximate mode: distinct counts, top values, quantiles and example
+        # values come from mergeable sketches built batch by batch
+        sketches = None
+        if approximate_statistics:
+            batches = iter_dataframe_batches(file_contents, dataset, ignore_errors=True, infer_schema_length=10000)
+            sketches = sketch_columns(
+                (batch.cast(dict(schema), strict=False) for batch in batches), NUMERIC_DTYPES, list(schema.names())
+            )
+        
+        # Compute every column statistic in one batched query
+        total_rows, column_stats = _compute_column_statistics(lf, schema, top_n_values, outlier_iqr_multiplier, sketches)
+        
+        # Name-based PII checks use the shared (cached) PII sample scan
+        pii_samples = scan_pii_samples(
+            lf, [col for col in schema if pii_name_rule_for(col) is not None], dataset=dataset
+        )
+        
         # Profile each field
         field_profiles = []
         critical_issues = 0
         warnings = 0
         info_messages = 0
         
-        total_rows = df.height
-        
-        for col in df.columns:
-            col_data = df[col]
-            null_count = col_data.null_count()
+        for col, dtype in schema.items():
+            col_stats = column_stats[col]
+            null_count = col_stats["null_count"]
             missing_pct = (null_count / total_rows * 100) if total_rows > 0 else 0
             
             # Determine data type
-            dtype = col_data.dtype
-            if dtype == pl.Utf8:
-                semantic_type = 'string'
-            elif dtype in [pl.Int8, pl.Int16, pl.Int32, pl.Int64, pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64]:
-                semantic_type = 'integer'
-            elif dtype in [pl.Float32, pl.Float64]:
-                semantic_type = 'float'
-            elif dtype in [pl.Date, pl.Datetime]:
-                semantic_type = 'datetime'
-            elif dtype == pl.Boolean:
-                semantic_type = 'boolean'
-            else:
-                semantic_type = str(dtype)
+            semantic_type = _semantic_type(dtype)
             
-            # Check for PII/sensitivity
+            # Check for PII/sensitivity (on a sample of 100 non-null values)
             estimated_pii_type = None
             estimated_sensitivity_level = "low"
             
-            col_lower = col.lower()
+            pii_rule = pii_name_rule_for(col)
+            pii_sample = pii_samples.get(col)
             
-            # Sample for PII detection (non-null strings)
-            if dtype == pl.Utf8:
-                non_null_sample = col_data.drop_nulls().head(100)
-            else:
-                non_null_sample = col_data.cast(pl.Utf8).drop_nulls().head(100)
-                
-            sample_len = non_null_sample.len()
-            
-            if sample_len > 0:
-                # Email detection
-                if col_lower in ['email', 'email_address', 'email_addr', 'contact_email']:
-                    email_matches = non_null_sample.str.contains('@', literal=True).sum()
-                    email_pct = (email_matches / sample_len * 100)
-                    if email_pct > 70:
-                        estimated_pii_type = "email_address"
-                        estimated_sensitivity_level = "high"
-                
-                # Phone detection
-                elif col_lower in ['phone', 'phone_number', 'contact_phone', 'mobile', 'telephone']:
-                    phone_pattern = r'^[\d\s\-\(\)\+]{10,}$'
-                    phone_matches = non_null_sample.str.contains(phone_pattern).sum()
-                    phone_pct = (phone_matches / sample_len * 100)
-                    if phone_pct > 70:
-                        estimated_pii_type = "phone_number"
-                        estimated_sensitivity_level = "high"
-                
-                # SSN detection
-                elif col_lower in ['ssn', 'social_security', 'social_security_number']:
-                    ssn_pattern = r'^\d{3}-\d{2}-\d{4}$'
-                    ssn_matches = non_null_sample.str.contains(ssn_pattern).sum()
-                    ssn_pct = (ssn_matches / sample_len * 100)
-                    if ssn_pct > 70:
-                        estimated_pii_type = "ssn"
-                        estimated_sensitivity_level = "high"
-                
-                # Name detection
-                elif col_lower in ['name', 'full_name', 'first_name', 'last_name', 'person_name', 'customer_name']:
-                    # Heuristic: contains letters and spaces, or starts with capital letter
-                    # Polars regex check
-                    name_pattern = r'[A-Z][a-z]*'
-                    name_matches = non_null_sample.str.contains(name_pattern).sum()
-                    name_pct = (name_matches / sample_len * 100)
-                    if name_pct > 80:
-                        estimated_pii_type = "name"
-                        estimated_sensitivity_level = "high"
-                
-                # Credit card detection
-                elif col_lower in ['credit_card', 'card_number', 'cc_number', 'payment_card']:
-                    cc_pattern = r'^\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}$'
-                    cc_matches = non_null_sample.str.contains(cc_pattern).sum()
-                    cc_pct = (cc_matches / sample_len * 100)
-                    if cc_pct > 70:
-                        estimated_pii_type = "credit_card"
-                        estimated_sensitivity_level = "critical"
+            if pii_rule is not None and pii_sample["sample_len"] > 0:
+                match_pct = (pii_sample[pii_rule["check"]] / pii_sample["sample_len"] * 100)
+                if match_pct > pii_rule["min_pct"]:
+                    estimated_pii_type = pii_rule["pii_type"]
+                    estimated_sensitivity_level = pii_rule["sensitivity"]
             
             # Calculate quality indicators
             completeness_score = 100 - missing_pct
-            unique_count = col_data.n_unique()
+            unique_count = col_stats["unique_count"]
             unique_percentage = (unique_count / total_rows * 100) if total_rows > 0 else 0
             
             # Validity score (basic)
@@ -164,17 +133,8 @@ def execute_unified_profiler(
             
             if semantic_type in ['integer', 'float'] and total_rows > 0:
                 # Check for outliers
-                q1 = col_data.quantile(0.25)
-                q3 = col_data.quantile(0.75)
-                
-                if q1 is not None and q3 is not None:
-                    iqr = q3 - q1
-                    lower_bound = q1 - outlier_iqr_multiplier * iqr
-                    upper_bound = q3 + outlier_iqr_multiplier * iqr
-                    
-                    # Use DataFrame filter to avoid Series.filter(expr) issues
-                    # We just need the count of outliers
-                    outlier_count = df.filter((pl.col(col) < lower_bound) | (pl.col(col) > upper_bound)).height
+                if col_stats["q1"] is not None and col_stats["q3"] is not None:
+                    outlier_count = col_stats["outlier_count"]
                     outlier_pct = (outlier_count / total_rows * 100)
                     validity_score = 100 - min(outlier_pct, 20)
             
@@ -210,79 +170,43 @@ def execute_unified_profiler(
             }
             
             # Add statistics
+            non_null_count = total_rows - null_count
             if semantic_type in ['integer', 'float']:
-                non_null_data = col_data.drop_nulls()
-                if non_null_data.len() > 0:
-                    # Calculate stats
-                    # Polars aggregations
-                    stats_df = non_null_data.to_frame("val").select([
-                        pl.min("val").alias("min"),
-                        pl.max("val").alias("max"),
-                        pl.mean("val").alias("mean"),
-                        pl.median("val").alias("median"),
-                        pl.std("val").alias("std"),
-                        pl.var("val").alias("var"),
-                        pl.col("val").quantile(0.25).alias("p25"),
-                        pl.col("val").quantile(0.50).alias("p50"),
-                        pl.col("val").quantile(0.75).alias("p75"),
-                        pl.col("val").skew().alias("skew"),
-                        pl.col("val").kurtosis().alias("kurtosis")
-                    ])
-                    
-                    stats_row = stats_df.row(0, named=True)
-                    
-                    # Entropy
-                    value_counts = non_null_data.value_counts()
-                    counts = value_counts["count"].to_numpy()
-                    entropy_val = stats.entropy(counts) if len(counts) > 0 else 0
-                    
+                if non_null_count > 0:
                     field_profile["statistics"] = {
                         "type": "numeric",
-                        "count": non_null_data.len(),
-                        "min": _safe_float(stats_row["min"]),
-                        "max": _safe_float(stats_row["max"]),
-                        "mean": _safe_float(stats_row["mean"]),
-                        "median": _safe_float(stats_row["median"]),
-                        "stddev": _safe_float(stats_row["std"]),
-                        "variance": _safe_float(stats_row["var"]),
-                        "p25": _safe_float(stats_row["p25"]),
-                        "p50": _safe_float(stats_row["p50"]),
-                        "p75": _safe_float(stats_row["p75"]),
-                        "skewness": _safe_float(stats_row["skew"]),
-                        "kurtosis": _safe_float(stats_row["kurtosis"]),
+                        "count": non_null_count,
+                        "min": _safe_float(col_stats["min"]),
+                        "max": _safe_float(col_stats["max"]),
+                        "mean": _safe_float(col_stats["mean"]),
+                        "median": _safe_float(col_stats["median"]),
+                        "stddev": _safe_float(col_stats["std"]),
+                        "variance": _safe_float(col_stats["var"]),
+                        "p25": _safe_float(col_stats["q1"]),
+                        "p50": _safe_float(col_stats["p50"]),
+                        "p75": _safe_float(col_stats["q3"]),
+                        "skewness": _safe_float(col_stats["skew"]),
+                        "kurtosis": _safe_float(col_stats["kurtosis"]),
                         "outlier_count": int(outlier_count),
                         "outlier_percentage": round(outlier_pct, 2),
-                        "entropy": float(entropy_val)
+                        "entropy": float(col_stats["entropy"])
                     }
             else:
                 # String statistics
-                non_null_data = col_data.drop_nulls().cast(pl.Utf8)
-                if non_null_data.len() > 0:
-                    lengths = non_null_data.str.len_bytes() # Approximate char length
-                    
-                    # Entropy
-                    value_counts = non_null_data.value_counts()
-                    counts = value_counts["count"].to_numpy()
-                    entropy_val = stats.entropy(counts) if len(counts) > 0 else 0
-                    
-                    # Charset diversity
-                    has_special = non_null_data.str.contains(r'[!@#$%^&*()_+=\[\]{};:\'",.<>?/\\|`~-]').any()
-                    
+                if non_null_count > 0:
                     field_profile["statistics"] = {
                         "type": "string",
-                        "min_length": int(lengths.min()) if lengths.len() > 0 else 0,
-                        "max_length": int(lengths.max()) if lengths.len() > 0 else 0,
-                        "avg_length": round(float(lengths.mean()), 2) if lengths.len() > 0 else 0,
-                        "entropy": round(float(entropy_val), 2),
-                        "charset_diversity": ["alphanumeric", "special"] if has_special else ["alphanumeric"]
+                        "min_length": int(col_stats["min_length"]),
+                        "max_length": int(col_stats["max_length"]),
+                        "avg_length": round(float(col_stats["avg_length"]), 2),
+                        "entropy": round(float(col_stats["entropy"]), 2),
+                        "charset_diversity": ["alphanumeric", "special"] if col_stats["has_special"] else ["alphanumeric"]
                     }
             
             # Add distribution (top values)
-            # Polars value_counts
-            top_vals_df = col_data.value_counts(sort=True).head(top_n_values)
             top_values_list = []
             
-            for row in top_vals_df.iter_rows(named=True):
+            for row in col_stats["top_values"]:
                 val = row[col]
                 count = row["count"]
                 top_values_list.append({
@@ -296,6 +220,10 @@ def execute_unified_profiler(
                 "top_values": top_values_list
             }
             
+            if sketches is not None:
+                field_profile["example_values"] = [str(v) for v in col_stats["example_values"]]
+                field_profile["approximation"] = col_stats["approximation"]
+            
             field_profiles.append(field_profile)
             
             # Track issues
@@ -312,46 +240,43 @@ def execute_unified_profiler(
         # ==================== GENERATE ROW-LEVEL-ISSUES ====================
         row_level_issues = []
         
-        # Limit row level issues processing to avoid performance hit on large files
-        # We can process in chunks or just limit the number of issues found
-        
-        for col in df.columns:
+        # The batched counts tell us exactly how many rows each (column, check)
+        # contributes before the 1000 cap, so only those rows are fetched
+        for col, dtype in schema.items():
             if len(row_level_issues) >= 1000: break
             
-            col_data = df[col]
-            dtype = col_data.dtype
+            col_stats = column_stats[col]
             
             # Issue 1: Null values
-            # Filter rows with nulls
-            null_rows = df.with_row_index("row_index").filter(pl.col(col).is_null())
-            
-            for row in null_rows.iter_rows(named=True):
-                if len(row_level_issues) >= 1000: break
-                row_level_issues.append({
-                    "row_index": int(row["row_index"]),
-                    "column": col,
-                    "issue_type": "null",
-                    "severity": "warning",
-                    "message": f"Null/missing value in column '{col}'",
-                    "value": None
-                })
+            take = min(col_stats["null_count"], 1000 - len(row_level_issues))
+            if take > 0:
+                null_rows = _fetch_issue_rows(lf, col, pl.col(col).is_null(), take)
+                
+                for row in null_rows.iter_rows(named=True):
+                    row_level_issues.append({
+                        "row_index": int(row["row_index"]),
+                        "column": col,
+                        "issue_type": "null",
+                        "severity": "warning",
+                        "message": f"Null/missing value in column '{col}'",
+                        "value": None
+                    })
             
             # Issue 2: Outliers (numeric fields only)
-            if dtype in [pl.Int8, pl.Int16, pl.Int32, pl.Int64, pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64, pl.Float32, pl.Float64]:
-                q1 = col_data.quantile(0.25)
-                q3 = col_data.quantile(0.75)
+            if dtype in NUMERIC_DTYPES and col_stats["q1"] is not None and col_stats["q3"] is not None:
+                q1 = col_stats["q1"]
+                q3 = col_stats["q3"]
+                iqr = q3 - q1
+                lower_bound = q1 - outlier_iqr_multiplier * iqr
+                upper_bound = q3 + outlier_iqr_multiplier * iqr
                 
-                if q1 is not None and q3 is not None:
-                    iqr = q3 - q1
-                    lower_bound = q1 - outlier_iqr_multiplier * iqr
-                    upper_bound = q3 + outlier_iqr_multiplier * iqr
-                    
-                    outlier_rows = df.with_row_index("row_index").filter(
-                        (pl.col(col) < lower_bound) | (pl.col(col) > upper_bound)
+                take = min(col_stats["outlier_count"], 1000 - len(row_level_issues))
+                if take > 0:
+                    outlier_rows = _fetch_issue_rows(
+                        lf, col, (pl.col(col) < lower_bound) | (pl.col(col) > upper_bound), take
                     )
                     
                     for row in outlier_rows.iter_rows(named=True):
-                        if len(row_level_issues) >= 1000: break
                         val = row[col]
                         row_level_issues.append({
                             "row_index": int(row["row_index"]),
@@ -366,56 +291,52 @@ def execute_unified_profiler(
                             }
                         })
             
-            # Issue 3: Type mismatches (check if non-null values don't match expected type)
+            # Issue 3: Type mismatches (numeric-looking values in string columns)
             if dtype == pl.Utf8:
-                # Try to detect numeric values in string columns
-                # Regex check for numeric
-                numeric_pattern = r"^-?\d+(\.\d+)?$"
-                numeric_rows = df.with_row_index("row_index").filter(
-                    pl.col(col).is_not_null() & pl.col(col).str.contains(numeric_pattern)
-                )
-                
-                # Only report if it's a mixed column (not fully numeric which would be handled by type inference usually, but here we are checking Utf8)
-                # If the column is Utf8, it means Polars inferred it as string. If we find numbers, it might be mixed.
-                
-                for row in numeric_rows.iter_rows(named=True):
-                    if len(row_level_issues) >= 1000: break
-                    val = row[col]
-                    row_level_issues.append({
-                        "row_index": int(row["row_index"]),
-                        "column": col,
-                        "issue_type": "type_mismatch",
-                        "severity": "info",
-                        "message": f"Value in '{col}' could be interpreted as numeric: {val}",
-                        "value": str(val)
-                    })
-            
-            # Issue 4: Distribution anomalies (z-score)
-            if dtype in [pl.Int8, pl.Int16, pl.Int32, pl.Int64, pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64, pl.Float32, pl.Float64]:
-                mean_val = col_data.mean()
-                std_val = col_data.std()
-                
-                if mean_val is not None and std_val is not None and std_val > 0:
-                    # Calculate z-scores
-                    # Filter rows with abs(z_score) > 3
-                    anomaly_rows = df.with_row_index("row_index").filter(
-                        pl.col(col).is_not_null() &
-                        (((pl.col(col) - mean_val) / std_val).abs() > 3)
+                take = min(col_stats["numeric_string_count"], 1000 - len(row_level_issues))
+                if take > 0:
+                    numeric_rows = _fetch_issue_rows(
+                        lf, col, pl.col(col).is_not_null() & pl.col(col).str.contains(NUMERIC_STRING_PATTERN), take
                     )
                     
-                    for row in anomaly_rows.iter_rows(named=True):
-                        if len(row_level_issues) >= 1000: break
+                    for row in numeric_rows.iter_rows(named=True):
                         val = row[col]
-                        z_score = (val - mean_val) / std_val
                         row_level_issues.append({
                             "row_index": int(row["row_index"]),
                             "column": col,
-                            "issue_type": "distribution_anomaly",
+                            "issue_type": "type_mismatch",
                             "severity": "info",
-                            "message": f"Value in '{col}' is statistically unusual (z-score: {abs(z_score):.2f}): {val}",
-                            "value": float(val),
-                            "z_score": float(z_score)
+                            "message": f"Value in '{col}' could be interpreted as numeric: {val}",
+                            "value": str(val)
                         })
+            
+            # Issue 4: Distribution anomalies (z-score)
+            if dtype in NUMERIC_DTYPES:
+                mean_val = col_stats["mean"]
+                std_val = col_stats["std"]
+                
+                if mean_val is not None and std_val is not None and std_val > 0:
+                    take = min(col_stats["z_anomaly_count"], 1000 - len(row_level_issues))
+                    if take > 0:
+                        # Rows with abs(z_score) > 3
+                        anomaly_rows = _fetch_issue_rows(
+                            lf, col,
+                            pl.col(col).is_not_null() & (((pl.col(col) - mean_val) / std_val).abs() > 3),
+                            take
+                        )
+                        
+                        for row in anomaly_rows.iter_rows(named=True):
+                            val = row[col]
+                            z_score = (val - mean_val) / std_val
+                            row_level_issues.append({
+                                "row_index": int(row["row_index"]),
+                                "column": col,
+                                "issue_type": "distribution_anomaly",
+                                "severity": "info",
+                                "message": f"Value in '{col}' is statistically unusual (z-score: {abs(z_score):.2f}): {val}",
+                                "value": float(val),
+                                "z_score": float(z_score)
+                            })
 
         # Cap row-level-issues at 1000
         row_level_issues = row_level_issues[:1000]
@@ -839,8 +760,8 @@ def execute_unified_profiler(
             "agent_name": "UnifiedProfiler",
             "execution_time_ms": int((time.time() - start_time) * 1000),
             "summary_metrics": {
-                "total_columns": len(df.columns),
-                "total_rows": len(df),
+                "total_columns": len(schema),
+                "total_rows": total_rows,
                 "columns_with_issues": len([f for f in field_profiles if f["quality_score"] < 80])
             },
             "data": {
@@ -852,7 +773,8 @@ def execute_unified_profiler(
                     "categorical_ratio_threshold": 0.05,
                     "top_n_values": 10,
                     "outlier_iqr_multiplier": 1.5,
-                    "outlier_alert_threshold": 5
+                    "outlier_alert_threshold": 5,
+                    "approximate_statistics": False
                 },
                 "overrides": {
                     "null_alert_threshold": parameters.get("null_alert_threshold"),
@@ -860,7 +782,8 @@ def execute_unified_profiler(
                     "categorical_ratio_threshold": parameters.get("categorical_ratio_threshold"),
                     "top_n_values": parameters.get("top_n_values"),
                     "outlier_iqr_multiplier": parameters.get("outlier_iqr_multiplier"),
-                    "outlier_alert_threshold": parameters.get("outlier_alert_threshold")
+                    "outlier_alert_threshold": parameters.get("outlier_alert_threshold"),
+                    "approximate_statistics": parameters.get("approximate_statistics")
                 },
                 "parameters": {
                     "null_alert_threshold": null_alert_threshold,
@@ -868,7 +791,8 @@ def execute_unified_profiler(
                     "categorical_ratio_threshold": categorical_ratio_threshold,
                     "top_n_values": top_n_values,
                     "outlier_iqr_multiplier": outlier_iqr_multiplier,
-                    "outlier_alert_threshold": outlier_alert_threshold
+                    "outlier_alert_threshold": outlier_alert_threshold,
+                    "approximate_statistics": approximate_statistics
                 }
             },
             "alerts": alerts,
@@ -887,6 +811,181 @@ def execute_unified_profiler(
             "execution_time_ms": int((time.time() - start_time) * 1000)
         }
 
+def _semantic_type(dtype) -> str:
+    """Map a Polars dtype to the profiler's semantic type name."""
+    if dtype == pl.Utf8:
+        return 'string'
+    elif dtype in INTEGER_DTYPES:
+        return 'integer'
+    elif dtype in [pl.Float32, pl.Float64]:
+        return 'float'
+    elif dtype in [pl.Date, pl.Datetime]:
+        return 'datetime'
+    elif dtype == pl.Boolean:
+        return 'boolean'
+    return str(dtype)
+
+
+def _column_statistics_exprs(col: str, dtype, top_n_values: int, approximate: bool = False) -> List[pl.Expr]:
+    """
+    Build the aggregate expressions for one column.
+    
+    Every expression reduces to a single value so all columns can be
+    evaluated side by side in one select. The value counts are shared by the
+    unique count, top values and entropy (Polars evaluates them once). In
+    approximate mode the value counts and quantiles are left out; they are
+    filled in from the column sketches instead.
+    """
+    c = pl.col(col)
+    exprs = [c.null_count().alias("null_count")]
+    if not approximate:
+        value_counts = c.value_counts(sort=True)
+        non_null_counts = value_counts.filter(value_counts.struct.field(col).is_not_null()).struct.field("count")
+        exprs += [
+            value_counts.len().alias("unique_count"),
+            value_counts.head(top_n_values).implode().alias("top_values"),
+            non_null_counts.entropy().alias("entropy")
+        ]
+    
+    if dtype in NUMERIC_DTYPES:
+        non_null = c.drop_nulls()
+        exprs += [
+            c.min().alias("min"),
+            c.max().alias("max"),
+            c.mean().alias("mean"),
+            c.std().alias("std"),
+            c.var().alias("var"),
+            non_null.skew().alias("skew"),
+            non_null.kurtosis().alias("kurtosis")
+        ]
+        if not approximate:
+            exprs += [
+                c.median().alias("median"),
+                c.quantile(0.25).alias("q1"),
+                c.quantile(0.50).alias("p50"),
+                c.quantile(0.75).alias("q3")
+            ]
+    else:
+        as_string = c.drop_nulls().cast(pl.Utf8)
+        lengths = as_string.str.len_bytes()  # Approximate char length
+        exprs += [
+            lengths.min().alias("min_length"),
+            lengths.max().alias("max_length"),
+            lengths.mean().alias("avg_length"),
+            as_string.str.contains(SPECIAL_CHARS_PATTERN).any().alias("has_special")
+        ]
+        if dtype == pl.Utf8:
+            exprs.append(
+                (c.is_not_null() & c.str.contains(NUMERIC_STRING_PATTERN)).sum().alias("numeric_string_count")
+            )
+    
+    return exprs
+
+
+def _column_anomaly_exprs(col: str, col_stats: Dict[str, Any], outlier_iqr_multiplier: float) -> List[pl.Expr]:
+    """
+    Build the IQR outlier and z-score count expressions for a numeric column.
+    
+    The bounds come from the first statistics pass, so these are cheap
+    comparisons rather than another quantile computation.
+    """
+    c = pl.col(col)
+    exprs = []
+    
+    q1, q3 = col_stats["q1"], col_stats["q3"]
+    if q1 is not None and q3 is not None:
+        iqr = q3 - q1
+        lower_bound = q1 - outlier_iqr_multiplier * iqr
+        upper_bound = q3 + outlier_iqr_multiplier * iqr
+        exprs.append(((c < lower_bound) | (c > upper_bound)).sum().alias("outlier_count"))
+    
+    mean_val, std_val = col_stats["mean"], col_stats["std"]
+    if mean_val is not None and std_val is not None and std_val > 0:
+        exprs.append((c.is_not_null() & (((c - mean_val) / std_val).abs() > 3)).sum().alias("z_anomaly_count"))
+    
+    return exprs
+
+
+def _compute_column_statistics(
+    lf: pl.LazyFrame,
+    schema: pl.Schema,
+    top_n_values: int,
+    outlier_iqr_multiplier: float,
+    sketches: Optional[Dict[str, ColumnSketch]] = None
+) -> tuple:
+    """
+    Compute the statistics for all columns in two batched queries.
+    
+    Each column's aggregates are packed into one struct so Polars evaluates
+    every column in parallel instead of one pass per statistic. The second
+    query counts IQR outliers and z-score anomalies against the bounds from
+    the first. The in-memory engine is used for the first query: the
+    streaming engine cannot run these aggregates natively and is much slower.
+    
+    With sketches (approximate mode) the first query only holds streamable
+    aggregates; unique counts, top values, entropy and quantiles are read
+    from the sketches and each column gets its error bounds.
+    
+    Returns:
+        Tuple of (total_rows, column -> statistics dict)
+    """
+    approximate = sketches is not None
+    exprs = [pl.len().alias("__total_rows__")]
+    exprs += [
+        pl.struct(_column_statistics_exprs(col, dtype, top_n_values, approximate)).alias(col)
+        for col, dtype in schema.items()
+    ]
+    
+    query = lf.select(exprs)
+    row = (collect_streaming(query) if approximate else query.collect()).row(0, named=True)
+    total_rows = row.pop("__total_rows__")
+    
+    anomaly_exprs = []
+    for col, dtype in schema.items():
+        col_stats = row[col]
+        if approximate:
+            col_stats.update(_sketch_statistics(col, sketches[col], top_n_values))
+        col_stats["outlier_count"] = 0
+        col_stats["z_anomaly_count"] = 0
+        
+        if dtype in NUMERIC_DTYPES:
+            col_exprs = _column_anomaly_exprs(col, col_stats, outlier_iqr_multiplier)
+            if col_exprs:
+                anomaly_exprs.append(pl.struct(col_exprs).alias(col))
+    
+    if anomaly_exprs:
+        anomalies = collect_streaming(lf.select(anomaly_exprs)).row(0, named=True)
+        for col, counts in anomalies.items():
+            row[col].update(counts)
+    
+    return total_rows, row
+
+
+def _sketch_statistics(col: str, sketch: ColumnSketch, top_n_values: int) -> Dict[str, Any]:
+    """Read the value-count and quantile statistics of a column from its sketch."""
+    stats = {
+        "unique_count": sketch.unique_count(),
+        "top_values": [{col: value, "count": count} for value, count in sketch.frequent.top(top_n_values)],
+        "entropy": sketch.entropy(),
+        "example_values": sketch.examples.values(),
+        "approximation": sketch.error_bounds()
+    }
+    if sketch.quantiles is not None:
+        q1, p50, q3 = sketch.quantiles.quantiles([0.25, 0.5, 0.75])
+        stats.update({"median": p50, "q1": q1, "p50": p50, "q3": q3})
+    return stats
+
+
+def _fetch_issue_rows(lf: pl.LazyFrame, col: str, condition: pl.Expr, limit: int) -> pl.DataFrame:
+    """Return the first `limit` rows (row_index and column value) matching condition."""
+    return collect_streaming(
+        lf.with_row_index("row_index")
+        .select(["row_index", col])
+        .filter(condition)
+        .head(limit)
+    )
+
+
 def _safe_float(val):
     """Safely convert to float, handling None/NaN."""
     if val is None:
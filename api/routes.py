@@ -19,6 +19,7 @@ from auth.dependencies import get_current_active_verified_user
 from db import models
 from db.database import get_db
 from email_services import get_email_service, EmailService
+from downloads.downloads_utils import inline_download_artifacts
 from transformers.transformers_utils import get_transformer_legacy
 
 # Create router for API routes
@@ -146,6 +147,7 @@ async def analyze(
     parameters_json: Optional[str] = Form(None),
     primary: Optional[UploadFile] = File(None),
     baseline: Optional[UploadFile] = File(None),
+    inline_downloads: bool = Form(True),
     current_user: models.User = Depends(get_current_active_verified_user)
 ):
     """
@@ -157,6 +159,7 @@ async def analyze(
         parameters_json: JSON string with agent-specific parameters
         primary: Primary data file (required for most tools)
         baseline: Optional baseline/reference file (for drift detection and comparisons)
+        inline_downloads: Embed download files as content_base64 (False returns metadata and checksums only)
         current_user: Authenticated user
         
     Returns:
@@ -182,6 +185,10 @@ async def analyze(
                 analysis_id,
                 current_user
             )
+            inline_download_artifacts(
+                final_response.get("report", {}).get("downloads", []),
+                include_content=inline_downloads
+            )
         except ValueError:
             # Unknown tool_id
             final_response = {
@@ -13,7 +13,7 @@ import uuid
 import asyncio
 import threading
 from datetime import datetime, timezone, timedelta
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Tuple
 from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
@@ -23,6 +23,14 @@ from db import models, schemas
 from db.models import TaskStatus
 from auth.dependencies import get_current_active_verified_user
 from services.s3_service import s3_service
+from services.report_index import (
+    report_index_store,
+    report_sections,
+    paginate,
+    REPORT_SECTIONS,
+    ROW_LEVEL_ISSUES_SECTION,
+    DOWNLOADS_SECTION
+)
 from transformers.transformers_utils import get_transformer
 
 
@@ -557,25 +565,40 @@ async def get_downloads(
 @router.get("/{task_id}/report", response_model=schemas.TaskReportResponse)
 async def get_task_report(
     task_id: str,
+    sections: Optional[str] = Query(
+        None,
+        description="Comma-separated report sections (e.g. alerts,issues,rowLevelIssues,downloads "
+                    "or an agent id). Defaults to all sections."
+    ),
+    page: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Page of rowLevelIssues to return (1-based). Defaults to all rows."
+    ),
     current_user: models.User = Depends(get_current_active_verified_user),
     db: Session = Depends(get_db)
 ):
     """
-    Get complete analysis report for a completed task.
+    Get the analysis report of a completed task, or selected sections of it.
     
-    This endpoint retrieves the JSON report from S3 and converts it to the 
-    format expected by the results page (ResultWrapper2). It returns the 
-    complete analysis data including alerts, issues, recommendations, 
-    executive summary, and all agent outputs.
+    The report is returned in the format expected by the results page
+    (ResultWrapper2): alerts, issues, recommendations, executive summary,
+    row-level issues, downloads and all agent outputs. Tasks with a report
+    index (written at completion, see services.report_index) are served
+    from their section objects, so only the requested sections and the
+    requested page of row-level issues are downloaded. Older tasks fall
+    back to the full JSON report. The index and the presigned download
+    URLs are cached for a few minutes.
     
     Args:
         task_id: Task ID
+        sections: Optional comma-separated sections to return
+        page: Optional page of rowLevelIssues; the response then carries
+            rowLevelIssuesPagination
         
     Returns:
-        Complete analysis report in the format expected by results page
+        Analysis report in the format expected by results page
     """
-    import json
-    
     # Get task
     task = db.query(models.Task).filter(
         models.Task.task_id == task_id,
@@ -592,8 +615,81 @@ async def get_task_report(
                    f"Task must be COMPLETED."
         )
 
+    requested = [name.strip() for name in sections.split(",") if name.strip()] if sections else None
+    
+    try:
+        index = report_index_store.get_index(current_user.id, task_id)
+        if index is not None:
+            metadata, report = _read_indexed_report(index, requested, page)
+        else:
+            metadata, report = _read_full_report(current_user.id, task_id, requested, page)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve report: {str(e)}"
+        )
+    
+    if requested is None or DOWNLOADS_SECTION in requested:
+        report[DOWNLOADS_SECTION] = report_index_store.get_cached(
+            ("downloads", current_user.id, task_id),
+            lambda: _build_report_downloads(current_user.id, task_id, task.tool_id)
+        )
+    
+    return schemas.TaskReportResponse(
+        analysis_id=task_id,
+        tool=task.tool_id,
+        status="success",
+        timestamp=metadata.get("timestamp", datetime.now(timezone.utc).isoformat()),
+        execution_time_ms=metadata.get("execution_time_ms"),
+        report=report
+    )
+
+
+def _check_sections(requested: Optional[List[str]], available: List[str]) -> List[str]:
+    """Resolve the requested sections against the report's; unknown names are a 400."""
+    if requested is None:
+        return available
+    unknown = [name for name in requested if name not in available and name != DOWNLOADS_SECTION]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown report sections: {', '.join(unknown)}. "
+                   f"Available: {', '.join(available + [DOWNLOADS_SECTION])}"
+        )
+    return [name for name in available if name in requested]
+
+
+def _read_indexed_report(
+    index: Dict[str, Any],
+    requested: Optional[List[str]],
+    page: Optional[int]
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Read the requested report sections from the task's section objects."""
+    names = _check_sections(requested, list(index["sections"]) + [ROW_LEVEL_ISSUES_SECTION])
+    
+    report = report_index_store.read_sections(index, [name for name in names if name != ROW_LEVEL_ISSUES_SECTION])
+    if ROW_LEVEL_ISSUES_SECTION in names:
+        rows, pagination = report_index_store.read_row_level_issues(index, page)
+        report[ROW_LEVEL_ISSUES_SECTION] = rows
+        if pagination is not None:
+            report["rowLevelIssuesPagination"] = pagination
+    
+    return index.get("metadata", {}), _order_sections(report, names)
+
+
+def _read_full_report(
+    user_id: int,
+    task_id: str,
+    requested: Optional[List[str]],
+    page: Optional[int]
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Read the requested report sections from the full JSON report (tasks without an index)."""
+    import json
+    
     # List output files from S3 to find the JSON report
-    output_files = s3_service.list_output_files(current_user.id, task_id)
+    output_files = s3_service.list_output_files(user_id, task_id)
     
     json_report_file = None
     for file_info in output_files:
@@ -616,11 +712,33 @@ async def get_task_report(
             status_code=500,
             detail=f"Failed to parse JSON report: {str(e)}"
         )
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to retrieve report: {str(e)}"
-        )
+    
+    all_sections = report_sections(report_data)
+    names = _check_sections(requested, list(all_sections) + [ROW_LEVEL_ISSUES_SECTION])
+    
+    report = {name: all_sections[name] for name in names if name != ROW_LEVEL_ISSUES_SECTION}
+    if ROW_LEVEL_ISSUES_SECTION in names:
+        rows = report_data.get("row_level_issues", [])
+        if page is None:
+            report[ROW_LEVEL_ISSUES_SECTION] = rows
+        else:
+            report[ROW_LEVEL_ISSUES_SECTION], report["rowLevelIssuesPagination"] = paginate(rows, page)
+    
+    return report_data.get("metadata", {}), _order_sections(report, names)
+
+
+def _order_sections(report: Dict[str, Any], names: List[str]) -> Dict[str, Any]:
+    """Put the results page sections first, in their usual order, then the agent outputs."""
+    ordered = {name: report[name] for name in REPORT_SECTIONS if name in report}
+    if "rowLevelIssuesPagination" in report:
+        ordered["rowLevelIssuesPagination"] = report["rowLevelIssuesPagination"]
+    ordered.update((name, report[name]) for name in names if name in report and name not in ordered)
+    return ordered
+
+
+def _build_report_downloads(user_id: int, task_id: str, tool_id: str) -> List[Dict[str, Any]]:
+    """List a task's output files with presigned download URLs for the report response."""
+    output_files = s3_service.list_output_files(user_id, task_id)
     
     # Generate download URLs for the response
     expires_in = 3600  # 1 hour
@@ -647,10 +765,10 @@ async def get_task_report(
 
         downloads_for_report.append({
             "download_id": filename.replace('.', '_').replace(' ', '_'),
-            "name": _get_download_name(filename, task.tool_id),
+            "name": _get_download_name(filename, tool_id),
             "format": filename.split('.')[-1] if '.' in filename else "unknown",
             "file_name": filename,
-            "description": _get_download_description(filename, task.tool_id),
+            "description": _get_download_description(filename, tool_id),
             "mimeType": mime_type,
             "url": url,
             "size_bytes": file_info['size_bytes'],
@@ -659,37 +777,7 @@ async def get_task_report(
             "expires_at": expires_at.isoformat()
         })
     
-    # Build the response in the format expected by the results page
-    # Extract data from the JSON report structure
-    metadata = report_data.get("metadata", {})
-    summary = report_data.get("summary", {})
-    
-    # Build the report object
-    report = {
-        "alerts": report_data.get("alerts", []),
-        "issues": report_data.get("issues", []),
-        "recommendations": report_data.get("recommendations", []),
-        "executiveSummary": report_data.get("executive_summary", []),
-        "analysisSummary": report_data.get("analysis_summary", {}),
-        "rowLevelIssues": report_data.get("row_level_issues", []),
-        "issueSummary": report_data.get("issue_summary", {}),
-        "routing_decisions": report_data.get("routing_decisions", []),
-        "downloads": downloads_for_report,
-    }
-    
-    # Add agent results
-    agent_results = report_data.get("agent_results", {})
-    for agent_id, agent_output in agent_results.items():
-        report[agent_id] = agent_output
-    
-    return schemas.TaskReportResponse(
-        analysis_id=task_id,
-        tool=task.tool_id,
-        status="success",
-        timestamp=metadata.get("timestamp", datetime.now(timezone.utc).isoformat()),
-        execution_time_ms=metadata.get("execution_time_ms"),
-        report=report
-    )
+    return downloads_for_report
 
 
 def _get_download_name(filename: str, tool_id: str) -> str:
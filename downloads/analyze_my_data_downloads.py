@@ -6,7 +6,7 @@ Handles downloads for analytics agents: Customer Segmentation, Market Basket, Ex
 """
 
 from typing import Dict, Any, List
-from openpyxl import Workbook
+from downloads.excel_writer import StreamingWorkbook
 from openpyxl.styles import Font, PatternFill
 from downloads.downloads_utils import BaseDownloader, load_tool_config
 
@@ -20,7 +20,7 @@ class AnalyzeMyDataDownloads(BaseDownloader):
             tool_display_name = config.get("tool", {}).get("name", tool_id)
         super().__init__(tool_id, tool_display_name)
         
-    def create_tool_specific_sheets(self, wb: Workbook, agent_results: Dict[str, Any]):
+    def create_tool_specific_sheets(self, wb: StreamingWorkbook, agent_results: Dict[str, Any]):
         """Create tool-specific analysis sheets."""
         
         # 1. CUSTOMER SEGMENTATION SHEET
@@ -51,7 +51,7 @@ class AnalyzeMyDataDownloads(BaseDownloader):
             self._create_holdout_planner_sheet(wb, holdout_output)
 
 
-    def _create_holdout_planner_sheet(self, wb: Workbook, agent_output: Dict[str, Any]):
+    def _create_holdout_planner_sheet(self, wb: StreamingWorkbook, agent_output: Dict[str, Any]):
         """Create control group holdout planner sheet."""
         ws = wb.create_sheet("Holdout Planner")
         self.styler.set_column_widths(ws, [28, 22, 22, 22, 22, 24, 22, 22, 45])
@@ -168,7 +168,7 @@ class AnalyzeMyDataDownloads(BaseDownloader):
                 ws.cell(row=row, column=col_idx).alignment = self.left_alignment
             row += 1
 
-    def _create_segmentation_sheet(self, wb: Workbook, agent_output: Dict[str, Any]):
+    def _create_segmentation_sheet(self, wb: StreamingWorkbook, agent_output: Dict[str, Any]):
         """Create customer segmentation summary sheet."""
         ws = wb.create_sheet("Customer Segmentation")
         self.styler.set_column_widths(ws, [25, 20, 18, 18, 18, 18, 20])
@@ -335,7 +335,7 @@ class AnalyzeMyDataDownloads(BaseDownloader):
                 ws.cell(row=row, column=col_idx).alignment = self.left_alignment
             row += 1
 
-    def _create_segment_customers_sheet(self, wb: Workbook, agent_output: Dict[str, Any]):
+    def _create_segment_customers_sheet(self, wb: StreamingWorkbook, agent_output: Dict[str, Any]):
         """Create detailed customer segments sample sheet."""
         ws = wb.create_sheet("Customer Details")
         self.styler.set_column_widths(ws, [20, 12, 20, 12, 18, 15, 18, 20])
@@ -393,7 +393,7 @@ class AnalyzeMyDataDownloads(BaseDownloader):
     # Future Agent Sheet Methods (Placeholder)
     # =========================================================================
     
-    def _create_market_basket_sheet(self, wb: Workbook, agent_output: Dict[str, Any]):
+    def _create_market_basket_sheet(self, wb: StreamingWorkbook, agent_output: Dict[str, Any]):
         """Create market basket & sequence analysis sheet."""
         ws = wb.create_sheet("Market Basket & Sequence")
         self.styler.set_column_widths(ws, [28, 28, 18, 18, 18, 20, 45])
@@ -579,7 +579,7 @@ class AnalyzeMyDataDownloads(BaseDownloader):
                     ws.cell(row=row, column=col_idx).alignment = self.left_alignment
                 row += 1
         
-    def _create_experiment_design_sheet(self, wb: Workbook, agent_output: Dict[str, Any]):
+    def _create_experiment_design_sheet(self, wb: StreamingWorkbook, agent_output: Dict[str, Any]):
         """Create experimental design sheet."""
         ws = wb.create_sheet("Experimental Design")
         self.styler.set_column_widths(ws, [35, 25, 25, 50])
@@ -731,7 +731,7 @@ class AnalyzeMyDataDownloads(BaseDownloader):
                 cell.alignment = self.left_alignment
             row += 1
 
-    def _create_synthetic_control_sheet(self, wb: Workbook, agent_output: Dict[str, Any]):
+    def _create_synthetic_control_sheet(self, wb: StreamingWorkbook, agent_output: Dict[str, Any]):
         """Create synthetic control analysis sheet."""
         ws = wb.create_sheet("Synthetic Control")
         self.styler.set_column_widths(ws, [35, 25, 25, 25, 40])
@@ -923,7 +923,7 @@ class AnalyzeMyDataDownloads(BaseDownloader):
             ws[f'B{row}'].border = self.border
             row += 1
 
-    def _create_synthetic_time_series_sheet(self, wb: Workbook, agent_output: Dict[str, Any]):
+    def _create_synthetic_time_series_sheet(self, wb: StreamingWorkbook, agent_output: Dict[str, Any]):
         """Create synthetic control time series data sheet."""
         ws = wb.create_sheet("Time Series Data")
         self.styler.set_column_widths(ws, [15, 18, 18, 15, 15])
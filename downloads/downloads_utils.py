@@ -10,10 +10,10 @@ from datetime import datetime
 import json
 import base64
 import os
-import io
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
+from agents.artifacts import Artifact, CSV_MIME_TYPE
+from downloads.excel_writer import StreamingWorkbook
 
 
 class ExcelStyler:
@@ -33,11 +33,31 @@ class ExcelStyler:
         )
         self.center_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
         self.left_alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
+        
+        # Named table formats: registered once per workbook and shared by every cell using them
+        self.header_style = NamedStyle(
+            name="Report Header",
+            fill=self.header_fill,
+            font=self.header_font,
+            border=self.border,
+            alignment=self.center_alignment
+        )
+        self.body_style = NamedStyle(name="Report Body", border=self.border, alignment=self.left_alignment)
     
     def set_column_widths(self, ws, widths: List[int]):
         """Set column widths for worksheet."""
         for col_idx, width in enumerate(widths, 1):
             ws.column_dimensions[get_column_letter(col_idx)].width = width
+    
+    def write_header_row(self, ws, row: int, headers: List[str]):
+        """Write a table header row in the header format."""
+        for col_idx, header in enumerate(headers, 1):
+            ws.cell(row=row, column=col_idx, value=header).style = self.header_style
+    
+    def style_body_row(self, ws, row: int, column_count: int):
+        """Apply the table body format to the first column_count cells of a row."""
+        for col_idx in range(1, column_count + 1):
+            ws.cell(row=row, column=col_idx).style = self.body_style
 
 
 class CommonSheetCreator:
@@ -47,7 +67,7 @@ class CommonSheetCreator:
         """Initialize with an ExcelStyler instance."""
         self.styler = styler
     
-    def create_ai_summary_sheet(self, wb: Workbook, analysis_summary: Dict[str, Any]):
+    def create_ai_summary_sheet(self, wb: StreamingWorkbook, analysis_summary: Dict[str, Any]):
         """Create AI-generated analysis summary sheet."""
         ws = wb.create_sheet("AI Analysis Summary")
         self.styler.set_column_widths(ws, [35, 80])
@@ -88,7 +108,7 @@ class CommonSheetCreator:
         # Set row height for wrapped text
         ws.row_dimensions[row].height = max(15 * (len(summary_text) // 100 + 1), 30)
     
-    def create_row_level_issues_sheet(self, wb: Workbook, row_level_issues: List[Dict], issue_summary: Dict[str, Any]):
+    def create_row_level_issues_sheet(self, wb: StreamingWorkbook, row_level_issues: List[Dict], issue_summary: Dict[str, Any]):
         """Create row-level issues sheet."""
         ws = wb.create_sheet("Row-Level Issues")
         self.styler.set_column_widths(ws, [15, 25, 20, 15, 15, 50, 30])
@@ -145,12 +165,7 @@ class CommonSheetCreator:
         row += 1
         
         headers = ["Row Index", "Column", "Issue Type", "Severity", "Agent ID", "Description", "Suggested Action"]
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col_idx, value=header)
-            cell.fill = self.styler.header_fill
-            cell.font = self.styler.header_font
-            cell.border = self.styler.border
-            cell.alignment = self.styler.center_alignment
+        self.styler.write_header_row(ws, row, headers)
         row += 1
         
         # Add issues (limit to first 1000)
@@ -163,12 +178,10 @@ class CommonSheetCreator:
             ws.cell(row=row, column=6, value=issue.get("description", ""))
             ws.cell(row=row, column=7, value=issue.get("suggested_action", ""))
             
-            for col_idx in range(1, 8):
-                ws.cell(row=row, column=col_idx).border = self.styler.border
-                ws.cell(row=row, column=col_idx).alignment = self.styler.left_alignment
+            self.styler.style_body_row(ws, row, 7)
             row += 1
     
-    def create_routing_decisions_sheet(self, wb: Workbook, routing_decisions: List[Dict]):
+    def create_routing_decisions_sheet(self, wb: StreamingWorkbook, routing_decisions: List[Dict]):
         """Create routing decisions sheet."""
         ws = wb.create_sheet("Routing Decisions")
         self.styler.set_column_widths(ws, [20, 15, 20, 50, 30, 15])
@@ -186,12 +199,7 @@ class CommonSheetCreator:
         row += 2
         
         headers = ["Tool ID", "Priority", "Trigger Reason", "Rationale", "Expected Benefit", "Confidence"]
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col_idx, value=header)
-            cell.fill = self.styler.header_fill
-            cell.font = self.styler.header_font
-            cell.border = self.styler.border
-            cell.alignment = self.styler.center_alignment
+        self.styler.write_header_row(ws, row, headers)
         row += 1
         
         for decision in routing_decisions:
@@ -202,24 +210,17 @@ class CommonSheetCreator:
             ws.cell(row=row, column=5, value=decision.get("expected_benefit", ""))
             ws.cell(row=row, column=6, value=decision.get("confidence", ""))
             
-            for col_idx in range(1, 7):
-                ws.cell(row=row, column=col_idx).border = self.styler.border
-                ws.cell(row=row, column=col_idx).alignment = self.styler.left_alignment
+            self.styler.style_body_row(ws, row, 6)
             row += 1
     
-    def create_alerts_sheet(self, wb: Workbook, alerts: List[Dict]):
+    def create_alerts_sheet(self, wb: StreamingWorkbook, alerts: List[Dict]):
         """Create alerts sheet."""
         ws = wb.create_sheet("Alerts")
         self.styler.set_column_widths(ws, [20, 15, 20, 50, 20, 30])
         
         row = 1
         headers = ["Alert ID", "Severity", "Category", "Message", "Affected Fields", "Recommendation"]
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col_idx, value=header)
-            cell.fill = self.styler.header_fill
-            cell.font = self.styler.header_font
-            cell.border = self.styler.border
-            cell.alignment = self.styler.center_alignment
+        self.styler.write_header_row(ws, row, headers)
         row += 1
         
         for alert in alerts:
@@ -230,24 +231,17 @@ class CommonSheetCreator:
             ws.cell(row=row, column=5, value=", ".join(alert.get("affected_fields", [])))
             ws.cell(row=row, column=6, value=alert.get("recommendation", ""))
             
-            for col_idx in range(1, 7):
-                ws.cell(row=row, column=col_idx).border = self.styler.border
-                ws.cell(row=row, column=col_idx).alignment = self.styler.left_alignment
+            self.styler.style_body_row(ws, row, 6)
             row += 1
     
-    def create_issues_sheet(self, wb: Workbook, issues: List[Dict]):
+    def create_issues_sheet(self, wb: StreamingWorkbook, issues: List[Dict]):
         """Create issues sheet."""
         ws = wb.create_sheet("Issues")
         self.styler.set_column_widths(ws, [20, 20, 20, 20, 15, 50])
         
         row = 1
         headers = ["Issue ID", "Agent", "Field", "Issue Type", "Severity", "Message"]
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col_idx, value=header)
-            cell.fill = self.styler.header_fill
-            cell.font = self.styler.header_font
-            cell.border = self.styler.border
-            cell.alignment = self.styler.center_alignment
+        self.styler.write_header_row(ws, row, headers)
         row += 1
         
         for issue in issues:
@@ -258,24 +252,17 @@ class CommonSheetCreator:
             ws.cell(row=row, column=5, value=issue.get("severity", ""))
             ws.cell(row=row, column=6, value=issue.get("message", ""))
             
-            for col_idx in range(1, 7):
-                ws.cell(row=row, column=col_idx).border = self.styler.border
-                ws.cell(row=row, column=col_idx).alignment = self.styler.left_alignment
+            self.styler.style_body_row(ws, row, 6)
             row += 1
     
-    def create_recommendations_sheet(self, wb: Workbook, recommendations: List[Dict]):
+    def create_recommendations_sheet(self, wb: StreamingWorkbook, recommendations: List[Dict]):
         """Create recommendations sheet."""
         ws = wb.create_sheet("Recommendations")
         self.styler.set_column_widths(ws, [25, 20, 20, 15, 50, 15])
         
         row = 1
         headers = ["Recommendation ID", "Agent", "Field", "Priority", "Recommendation", "Timeline"]
-        for col_idx, header in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col_idx, value=header)
-            cell.fill = self.styler.header_fill
-            cell.font = self.styler.header_font
-            cell.border = self.styler.border
-            cell.alignment = self.styler.center_alignment
+        self.styler.write_header_row(ws, row, headers)
         row += 1
         
         for rec in recommendations:
@@ -286,9 +273,7 @@ class CommonSheetCreator:
             ws.cell(row=row, column=5, value=rec.get("recommendation", ""))
             ws.cell(row=row, column=6, value=rec.get("timeline", ""))
             
-            for col_idx in range(1, 7):
-                ws.cell(row=row, column=col_idx).border = self.styler.border
-                ws.cell(row=row, column=col_idx).alignment = self.styler.left_alignment
+            self.styler.style_body_row(ws, row, 6)
             row += 1
 
 
@@ -376,8 +361,7 @@ class BaseDownloader:
     def _generate_excel_report(self, **kwargs) -> Dict[str, Any]:
         """Orchestrate Excel creation. Subclasses implement create_tool_specific_sheets."""
         try:
-            wb = Workbook()
-            wb.remove(wb.active)
+            wb = StreamingWorkbook()
             
             # 1. Summary Sheet
             self._create_analysis_summary_sheet(wb, kwargs)
@@ -399,11 +383,8 @@ class BaseDownloader:
             if kwargs.get('routing_decisions'):
                 self.common_sheets.create_routing_decisions_sheet(wb, kwargs['routing_decisions'])
             
-            # Save
-            output = io.BytesIO()
-            wb.save(output)
-            output.seek(0)
-            file_content = output.getvalue()
+            # Save to a spooled file artifact; upload_outputs_to_s3 streams it to S3
+            artifact = wb.save_artifact()
             
             tool_slug = self.tool_id.split('-')[0] # e.g. "clean" from "clean-my-data"
             return {
@@ -412,9 +393,9 @@ class BaseDownloader:
                 "format": "xlsx",
                 "file_name": f"{self.tool_id.replace('-', '_')}_analysis.xlsx",
                 "description": f"Comprehensive Excel report for {self.tool_display_name}",
-                "mimeType": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                "content_base64": base64.b64encode(file_content).decode('utf-8'),
-                "size_bytes": len(file_content),
+                "mimeType": artifact.mime_type,
+                "artifact": artifact,
+                "size_bytes": artifact.size_bytes,
                 "creation_date": datetime.utcnow().isoformat() + "Z",
                 "type": "complete_report",
                 "sheets": wb.sheetnames
@@ -532,8 +513,13 @@ class BaseDownloader:
         # The key in cleaned_files is the agent_id.
         
         for agent_id, file_data in cleaned_files.items():
-            if not file_data or not file_data.get("content"):
+            if not file_data or not (file_data.get("artifact") or file_data.get("content")):
                 continue
+            
+            # Direct agent calls still hand over base64 content
+            artifact = file_data.get("artifact") or Artifact.from_bytes(
+                base64.b64decode(file_data["content"]), CSV_MIME_TYPE
+            )
                 
             download_entry = {
                 "download_id": f"{analysis_id}_final_data_{agent_id}",
@@ -541,16 +527,16 @@ class BaseDownloader:
                 "format": file_data.get("format", "csv"),
                 "file_name": file_data.get("filename", "final_data.csv"),
                 "description": f"Final processed data file from {self.tool_display_name}",
-                "mimeType": "text/csv", # Assuming CSV for now
-                "content_base64": file_data.get("content", ""),
-                "size_bytes": file_data.get("size_bytes", 0),
+                "mimeType": artifact.mime_type,
+                "artifact": artifact,
+                "size_bytes": artifact.size_bytes,
                 "creation_date": datetime.utcnow().isoformat() + "Z",
                 "type": "cleaned_data",
                 "agent_id": agent_id
             }
             downloads.append(download_entry)
 
-    def create_tool_specific_sheets(self, wb: Workbook, agent_results: Dict[str, Any]):
+    def create_tool_specific_sheets(self, wb: StreamingWorkbook, agent_results: Dict[str, Any]):
         """Abstract method to be implemented by subclasses."""
         pass
 
@@ -675,10 +661,9 @@ def generate_json_download(
     description: str,
     report_data: Dict[str, Any]
 ) -> Dict[str, Any]:
-    """Generate JSON download metadata."""
+    """Generate JSON download metadata (the report is written straight to a spooled artifact)."""
     try:
-        json_str = json.dumps(report_data, indent=2, default=str)
-        json_bytes = json_str.encode('utf-8')
+        artifact = Artifact.from_json(report_data, indent=2, default=str)
         
         return {
             "download_id": f"{analysis_id}_{tool}_json",
@@ -686,9 +671,10 @@ def generate_json_download(
             "format": "json",
             "file_name": file_name,
             "description": description,
-            "mimeType": "application/json",
-            "content_base64": base64.b64encode(json_bytes).decode('utf-8'),
-            "size_bytes": len(json_bytes),
+            "mimeType": artifact.mime_type,
+            "artifact": artifact,
+            "report_data": report_data,
+            "size_bytes": artifact.size_bytes,
             "creation_date": datetime.utcnow().isoformat() + "Z",
             "type": "complete_report"
         }
@@ -699,3 +685,25 @@ def generate_json_download(
             "status": "error",
             "error": str(e)
         }
+
+
+def inline_download_artifacts(downloads: List[Dict[str, Any]], include_content: bool = True) -> List[Dict[str, Any]]:
+    """
+    Make downloads JSON-serializable for the legacy /analyze response.
+    
+    Each artifact is replaced by its checksum_sha256 and, when
+    include_content is set, its content_base64. The artifacts are closed.
+    The report index is not built for this path, so report_data is dropped.
+    """
+    for download in downloads:
+        download.pop("report_data", None)
+        artifact = download.pop("artifact", None)
+        if artifact is None:
+            continue
+        try:
+            download["checksum_sha256"] = artifact.checksum
+            if include_content:
+                download["content_base64"] = artifact.to_base64()
+        finally:
+            artifact.close()
+    return downloads
@@ -0,0 +1,118 @@
+"""
+Streaming Excel Writer
+
+Writes the Excel reports with openpyxl's write-only mode, so rows are
+serialized as soon as a sheet has moved past them instead of the whole
+workbook being held as cell objects. The finished workbook is saved as an
+Artifact (a spooled temporary file) that the S3 uploader streams from, so
+the report is never base64-encoded.
+
+StreamingWorkbook and StreamingWorksheet expose the part of the openpyxl
+Workbook / Worksheet API the download modules use (create_sheet, cell,
+ws["A1"], merge_cells, column_dimensions, row_dimensions, sheetnames), so
+sheet builders are written the same way as before. Sheets must be filled top
+to bottom: rows more than ROW_BUFFER_SIZE rows above the lowest row touched
+are written out and can no longer be changed. Column widths must be set
+before the first row is written out.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import column_index_from_string
+from openpyxl.utils.cell import coordinate_from_string
+from openpyxl.worksheet.cell_range import CellRange
+
+from agents.artifacts import Artifact, XLSX_MIME_TYPE, new_spool
+
+
+# Rows kept editable above the lowest row touched in a sheet
+ROW_BUFFER_SIZE = 50
+
+
+class StreamingWorksheet:
+    """Write-only worksheet that buffers the last ROW_BUFFER_SIZE rows for styling."""
+
+    def __init__(self, ws):
+        self._ws = ws
+        self._rows: Dict[int, Dict[int, Any]] = {}
+        self._written_rows = 0
+
+    @property
+    def title(self) -> str:
+        return self._ws.title
+
+    @property
+    def column_dimensions(self):
+        return self._ws.column_dimensions
+
+    @property
+    def row_dimensions(self):
+        return self._ws.row_dimensions
+
+    def cell(self, row: int, column: int, value: Any = None):
+        """Get the cell at (row, column), setting its value unless value is None."""
+        if row <= self._written_rows:
+            raise ValueError(f"Row {row} of sheet '{self.title}' has already been written")
+        cells = self._rows.setdefault(row, {})
+        cell = cells.get(column)
+        if cell is None:
+            cell = WriteOnlyCell(self._ws)
+            cells[column] = cell
+        if value is not None:
+            cell.value = value
+        self._write_rows(row - ROW_BUFFER_SIZE)
+        return cell
+
+    def __getitem__(self, coordinate: str):
+        column, row = coordinate_from_string(coordinate)
+        return self.cell(row=row, column=column_index_from_string(column))
+
+    def __setitem__(self, coordinate: str, value: Any) -> None:
+        self[coordinate].value = value
+
+    def merge_cells(self, range_string: str) -> None:
+        """Merge a range (written with the sheet; the top-left cell holds the value)."""
+        self._ws.merged_cells.add(CellRange(range_string))
+
+    def _write_rows(self, last_row: int) -> None:
+        """Write out every buffered row up to and including last_row."""
+        while self._written_rows < last_row:
+            self._written_rows += 1
+            cells = self._rows.pop(self._written_rows, {})
+            self._ws.append([cells.get(column) for column in range(1, max(cells, default=0) + 1)])
+
+    def flush(self) -> None:
+        """Write out all buffered rows."""
+        self._write_rows(max(self._rows, default=self._written_rows))
+
+
+class StreamingWorkbook:
+    """Write-only workbook whose sheets are StreamingWorksheets."""
+
+    def __init__(self):
+        self._wb = Workbook(write_only=True)
+        self._sheets: List[StreamingWorksheet] = []
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return self._wb.sheetnames
+
+    def create_sheet(self, title: Optional[str] = None, index: Optional[int] = None) -> StreamingWorksheet:
+        """Create a sheet, appended or inserted at index like Workbook.create_sheet."""
+        sheet = StreamingWorksheet(self._wb.create_sheet(title, index))
+        self._sheets.append(sheet)
+        return sheet
+
+    def save_artifact(self) -> Artifact:
+        """
+        Save the workbook to a spooled file artifact.
+
+        A write-only workbook can only be saved once.
+        """
+        for sheet in self._sheets:
+            sheet.flush()
+        output = new_spool(".xlsx")
+        self._wb.save(output)
+        return Artifact.from_file(output, XLSX_MIME_TYPE)
@@ -5,7 +5,7 @@ Uses BaseDownloader for standardized report generation.
 """
 
 from typing import Dict, Any
-from openpyxl import Workbook
+from downloads.excel_writer import StreamingWorkbook
 from openpyxl.styles import Font, PatternFill
 from downloads.downloads_utils import BaseDownloader, load_tool_config
 
@@ -18,7 +18,7 @@ class MasterMyDataDownloads(BaseDownloader):
             tool_display_name = config.get("tool", {}).get("name", tool_id)
         super().__init__(tool_id, tool_display_name)
         
-    def create_tool_specific_sheets(self, wb: Workbook, agent_results: Dict[str, Any]):
+    def create_tool_specific_sheets(self, wb: StreamingWorkbook, agent_results: Dict[str, Any]):
         """Create tool-specific analysis sheets."""
         
         # 1. KEY IDENTIFIER SHEET
@@ -4,5 +4,8 @@ Contains external service integrations.
 """
 
 from .s3_service import S3Service, s3_service
+from .result_cache import ResultCache, result_cache
+from .baseline_profile_store import BaselineProfileStore, baseline_profile_store
+from .report_index import ReportIndexStore, report_index_store
 
-__all__ = ['S3Service', 's3_service']
+__all__ = ['S3Service', 's3_service', 'ResultCache', 'result_cache', 'BaselineProfileStore', 'baseline_profile_store', 'ReportIndexStore', 'report_index_store']
@@ -0,0 +1,72 @@
+"""
+Baseline profile store for V2.1.
+
+Profile runs save a compact profile of their primary file (see
+agents.drift_kernels.build_baseline_profile). A later drift run references
+it by id with the drift-detector parameter `baseline_profile_id` and is
+compared against the stored profile, so the baseline file is neither
+uploaded nor parsed again.
+
+The profile id is the task id of the profile run that produced it.
+Profiles live outside the task folder, so deleting the task keeps them:
+
+    users/{user_id}/baseline_profiles/{profile_id}.json
+"""
+
+import re
+import json
+from typing import Optional, Dict, Any
+
+
+# Task ids are used as profile ids; anything else could escape the user prefix
+PROFILE_ID_PATTERN = re.compile(r"^[A-Za-z0-9_\-]{1,128}$")
+
+
+class BaselineProfileStore:
+    """Baseline profiles stored as JSON objects in S3, scoped per user."""
+
+    def __init__(self, s3=None):
+        self._s3 = s3
+
+    @property
+    def s3(self):
+        if self._s3 is None:
+            from services.s3_service import s3_service
+            self._s3 = s3_service
+        return self._s3
+
+    def _key(self, user_id: int, profile_id: str) -> str:
+        if not PROFILE_ID_PATTERN.match(str(profile_id)):
+            raise ValueError(f"Invalid baseline profile id: {profile_id}")
+        return f"users/{user_id}/baseline_profiles/{profile_id}.json"
+
+    def save(self, user_id: int, profile_id: str, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Save a baseline profile.
+
+        Args:
+            user_id: Owner of the profile
+            profile_id: Profile id (the task id of the profile run)
+            profile: Profile built by build_baseline_profile
+
+        Returns:
+            Dict with key and size_bytes
+        """
+        content = json.dumps({**profile, "profile_id": profile_id}, separators=(",", ":"), default=str)
+        return self.s3.upload_file(self._key(user_id, profile_id), content.encode("utf-8"), "application/json")
+
+    def get(self, user_id: int, profile_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a baseline profile.
+
+        Returns:
+            Parsed profile, or None if not found
+        """
+        key = self._key(user_id, profile_id)
+        if not self.s3.file_exists(key):
+            return None
+        return json.loads(self.s3.get_file_bytes(key).decode("utf-8"))
+
+
+# Singleton instance for easy import
+baseline_profile_store = BaselineProfileStore()
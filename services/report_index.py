@@ -0,0 +1,270 @@
+"""
+Report index for V2.1.
+
+When a task completes, its JSON report is also stored split into one
+object per section, with the row-level issues split into pages, plus an
+index of those objects:
+
+    users/{user_id}/tasks/{task_id}/report/index.json
+    users/{user_id}/tasks/{task_id}/report/sections/{section}.json
+    users/{user_id}/tasks/{task_id}/report/row_level_issues/page_{n}.json
+
+GET /tasks/{id}/report?sections=...&page=... then reads only the requested
+sections and one page of row-level issues instead of downloading and
+parsing the whole report. Section names are the keys of the results page
+report (alerts, issues, executiveSummary, ..., plus one per agent id).
+The objects live outside outputs/, so they are not listed as downloads.
+Tasks completed before the index existed have none; the endpoint falls
+back to the full JSON report.
+
+Parsed indexes and presigned download URLs are kept in a short-lived
+in-process cache (REPORT_CACHE_TTL_SECONDS).
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from typing import Optional, List, Dict, Any, Callable, Tuple
+
+
+# Bump when the index layout changes; older indexes are ignored
+REPORT_INDEX_VERSION = 1
+
+ROW_LEVEL_ISSUES_PAGE_SIZE = int(os.getenv("ROW_LEVEL_ISSUES_PAGE_SIZE", "1000"))
+
+# Must stay well below the presigned URL lifetime of the report endpoint
+REPORT_CACHE_TTL_SECONDS = int(os.getenv("REPORT_CACHE_TTL_SECONDS", "300"))
+
+# Results page report sections, in response order, and their JSON report keys
+REPORT_SECTIONS = {
+    "alerts": "alerts",
+    "issues": "issues",
+    "recommendations": "recommendations",
+    "executiveSummary": "executive_summary",
+    "analysisSummary": "analysis_summary",
+    "rowLevelIssues": "row_level_issues",
+    "issueSummary": "issue_summary",
+    "routing_decisions": "routing_decisions",
+}
+DICT_SECTIONS = {"analysisSummary", "issueSummary"}
+ROW_LEVEL_ISSUES_SECTION = "rowLevelIssues"
+DOWNLOADS_SECTION = "downloads"
+
+# Section names (agent ids included) become object names
+SECTION_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_\-]{1,128}$")
+
+
+def report_sections(report_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Split a JSON report into results page sections (row-level issues excluded).
+
+    Args:
+        report_data: Report built by build_json_report_structure
+
+    Returns:
+        Dictionary of section name -> content, agent outputs last
+    """
+    sections = {
+        name: report_data.get(key, {} if name in DICT_SECTIONS else [])
+        for name, key in REPORT_SECTIONS.items()
+        if name != ROW_LEVEL_ISSUES_SECTION
+    }
+    for agent_id, agent_output in (report_data.get("agent_results") or {}).items():
+        sections[agent_id] = agent_output
+    return sections
+
+
+def paginate(rows: List[Any], page: int, page_size: int = ROW_LEVEL_ISSUES_PAGE_SIZE) -> Tuple[List[Any], Dict[str, int]]:
+    """
+    Slice one 1-based page out of a list.
+
+    Returns:
+        Tuple of (page rows, pagination info)
+    """
+    start = (page - 1) * page_size
+    return rows[start:start + page_size], pagination_info(page, page_size, len(rows))
+
+
+def pagination_info(page: int, page_size: int, total_rows: int) -> Dict[str, int]:
+    return {
+        "page": page,
+        "page_size": page_size,
+        "total_pages": (total_rows + page_size - 1) // page_size,
+        "total_rows": total_rows
+    }
+
+
+class ReportIndexStore:
+    """Report sections and their index stored as JSON objects in S3, with a TTL cache."""
+
+    def __init__(self, s3=None, ttl_seconds: int = REPORT_CACHE_TTL_SECONDS):
+        self._s3 = s3
+        self.ttl_seconds = ttl_seconds
+        self._cache: Dict[tuple, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def s3(self):
+        if self._s3 is None:
+            from services.s3_service import s3_service
+            self._s3 = s3_service
+        return self._s3
+
+    @staticmethod
+    def _prefix(user_id: int, task_id: str) -> str:
+        return f"users/{user_id}/tasks/{task_id}/report/"
+
+    # =========================================================================
+    # WRITE (task completion)
+    # =========================================================================
+
+    def _upload_json(self, key: str, data: Any) -> Dict[str, Any]:
+        from agents.artifacts import Artifact
+        
+        artifact = Artifact.from_json(data, separators=(",", ":"), default=str)
+        try:
+            with artifact.open() as f:
+                result = self.s3.upload_fileobj(key, f, artifact.mime_type)
+            return {"key": key, "size_bytes": result["size_bytes"]}
+        finally:
+            artifact.close()
+
+    def write(
+        self,
+        user_id: int,
+        task_id: str,
+        report_data: Dict[str, Any],
+        report_key: str,
+        page_size: int = ROW_LEVEL_ISSUES_PAGE_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Store a task's report sections and their index.
+
+        The section objects are uploaded at the same time; the index is
+        uploaded last, so an existing index always refers to complete sections.
+
+        Args:
+            user_id: Task owner
+            task_id: Task ID
+            report_data: Report built by build_json_report_structure
+            report_key: S3 key of the full JSON report
+            page_size: Row-level issues per page
+
+        Returns:
+            The index
+        """
+        prefix = self._prefix(user_id, task_id)
+        sections = report_sections(report_data)
+        invalid = [name for name in sections if not SECTION_NAME_PATTERN.match(str(name))]
+        if invalid:
+            raise ValueError(f"Invalid report section names: {invalid}")
+
+        rows = report_data.get("row_level_issues") or []
+        pages = [rows[start:start + page_size] for start in range(0, len(rows), page_size)]
+
+        objects = [(f"{prefix}sections/{name}.json", content) for name, content in sections.items()]
+        objects += [(f"{prefix}row_level_issues/page_{n}.json", page) for n, page in enumerate(pages, start=1)]
+        uploaded = self.s3.run_transfers(
+            [lambda key=key, content=content: self._upload_json(key, content) for key, content in objects]
+        )
+
+        index = {
+            "version": REPORT_INDEX_VERSION,
+            "report_key": report_key,
+            "metadata": report_data.get("metadata", {}),
+            "sections": dict(zip(sections, uploaded[:len(sections)])),
+            "row_level_issues": {
+                "page_size": page_size,
+                "total_rows": len(rows),
+                "pages": uploaded[len(sections):]
+            }
+        }
+        self._upload_json(f"{prefix}index.json", index)
+        self.invalidate(user_id, task_id)
+        return index
+
+    # =========================================================================
+    # READ (report endpoint)
+    # =========================================================================
+
+    def get_index(self, user_id: int, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a task's report index (cached).
+
+        Returns:
+            Parsed index, or None if the task has no (current) index
+        """
+        def load() -> Optional[Dict[str, Any]]:
+            key = f"{self._prefix(user_id, task_id)}index.json"
+            if not self.s3.file_exists(key):
+                return None
+            index = json.loads(self.s3.get_file_bytes(key).decode("utf-8"))
+            return index if index.get("version") == REPORT_INDEX_VERSION else None
+
+        return self.get_cached(("index", user_id, task_id), load)
+
+    def _read_objects(self, entries: List[Dict[str, Any]]) -> List[Any]:
+        """Download and parse index entries at the same time, in order."""
+        return self.s3.run_transfers(
+            [lambda key=entry["key"]: json.loads(self.s3.get_file_bytes(key).decode("utf-8")) for entry in entries]
+        )
+
+    def read_sections(self, index: Dict[str, Any], names: List[str]) -> Dict[str, Any]:
+        """Read the named sections (names missing from the index are skipped)."""
+        names = [name for name in names if name in index["sections"]]
+        return dict(zip(names, self._read_objects([index["sections"][name] for name in names])))
+
+    def read_row_level_issues(
+        self,
+        index: Dict[str, Any],
+        page: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, int]]]:
+        """
+        Read one page of row-level issues, or all of them when page is None.
+
+        Returns:
+            Tuple of (rows, pagination info or None when reading all)
+        """
+        paged = index["row_level_issues"]
+        if page is None:
+            return [row for rows in self._read_objects(paged["pages"]) for row in rows], None
+
+        info = pagination_info(page, paged["page_size"], paged["total_rows"])
+        if page > len(paged["pages"]):
+            return [], info
+        return self._read_objects([paged["pages"][page - 1]])[0], info
+
+    # =========================================================================
+    # CACHE
+    # =========================================================================
+
+    def get_cached(self, key: tuple, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, loading it when missing or expired.
+
+        None results are not cached.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        value = loader()
+        if value is not None:
+            with self._lock:
+                # Drop expired entries so the cache stays bounded by recent traffic
+                self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+                self._cache[key] = (now + self.ttl_seconds, value)
+        return value
+
+    def invalidate(self, user_id: int, task_id: str) -> None:
+        """Forget everything cached for a task."""
+        with self._lock:
+            self._cache = {k: v for k, v in self._cache.items() if k[1:3] != (user_id, task_id)}
+
+
+# Singleton instance for easy import
+report_index_store = ReportIndexStore()
@@ -0,0 +1,330 @@
+"""
+Content-addressed cache of agent results for V2.1.
+
+Provides:
+- Cache keys built from input content, agent id/version, agent code and parameters
+- Local filesystem store with size-based LRU eviction
+- Redis store with size-based LRU eviction (shared between workers)
+
+A rerun of the same tool on the same file with the same parameters returns
+the stored agent outputs instead of executing the agents again. The cache
+is off unless a backend is configured. Keys include a hash of the agent
+code, so a deploy that changes it never serves results of the old code.
+
+Credits are still consumed upfront for every agent of a task, cache hits
+included: billing runs before the DAG, when the keys of chained agents are
+not known yet. The cache saves compute, not credits.
+
+Entries are JSON, with the Polars frames of cleaned files stored as Arrow
+IPC next to it, so reading an entry never runs code from the store. Results
+holding any other non-JSON value are not cached.
+
+Configuration (environment):
+    RESULT_CACHE_BACKEND: "off" (default), "filesystem" or "redis"
+    RESULT_CACHE_DIR: Directory of the filesystem store
+    RESULT_CACHE_MAX_MB: Size budget before least recently used entries are evicted
+    RESULT_CACHE_REDIS_URL: Redis URL (defaults to REDIS_URL)
+"""
+
+import io
+import os
+import json
+import time
+import struct
+import hashlib
+import tempfile
+import threading
+from typing import Optional, List, Dict, Any
+from datetime import datetime, timezone
+
+import numpy as np
+import polars as pl
+
+
+RESULT_CACHE_BACKEND = os.getenv("RESULT_CACHE_BACKEND", "off").lower()
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "agensium_result_cache")
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_MB", "512")) * 1024 * 1024
+RESULT_CACHE_REDIS_URL = os.getenv("RESULT_CACHE_REDIS_URL") or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Bump to invalidate every stored entry (e.g. when the payload format changes)
+RESULT_CACHE_FORMAT_VERSION = 2
+
+ENTRY_MAGIC = b"ARC2"
+ENTRY_SUFFIX = ".entry"
+# JSON placeholder for a frame stored as Arrow IPC after the JSON body
+FRAME_MARKER = "__result_cache_frame__"
+
+
+def build_cache_key(
+    agent_id: str,
+    agent_version: str,
+    code_version: str,
+    entrypoint: str,
+    parameters: Dict[str, Any],
+    input_fingerprints: List[tuple]
+) -> str:
+    """
+    Build the content-addressed cache key of one agent run.
+
+    Args:
+        agent_id: Agent identifier
+        agent_version: Agent version from the tool definition
+        code_version: Hash of the agent source code
+        entrypoint: Agent execute function (from the execution spec)
+        parameters: Agent parameters (canonicalized with sorted keys)
+        input_fingerprints: (file_key, filename, content fingerprint) per input file
+
+    Returns:
+        Hex sha256 key
+    """
+    payload = json.dumps(
+        {
+            "format": RESULT_CACHE_FORMAT_VERSION,
+            "agent_id": agent_id,
+            "agent_version": agent_version,
+            "code_version": code_version,
+            "entrypoint": entrypoint,
+            "parameters": parameters or {},
+            "inputs": sorted(input_fingerprints)
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def encode_entry(entry: Dict[str, Any]) -> bytes:
+    """
+    Serialize a cache entry: JSON body, then one Arrow IPC stream per frame.
+
+    Layout: magic, body length, frame count, each frame's length, body, frames.
+
+    Raises:
+        TypeError: If the entry holds a value that is neither JSON nor a frame
+    """
+    frames = []
+
+    def encode_value(value: Any) -> Any:
+        if isinstance(value, pl.DataFrame):
+            buffer = io.BytesIO()
+            value.write_ipc(buffer)
+            frames.append(buffer.getvalue())
+            return {FRAME_MARKER: len(frames) - 1}
+        if isinstance(value, np.generic):
+            return value.item()
+        raise TypeError(f"Cannot cache a value of type {type(value).__name__}")
+
+    body = json.dumps(entry, default=encode_value, separators=(",", ":")).encode("utf-8")
+    header = ENTRY_MAGIC + struct.pack(">QI", len(body), len(frames))
+    header += b"".join(struct.pack(">Q", len(frame)) for frame in frames)
+    return header + body + b"".join(frames)
+
+
+def decode_entry(payload: bytes) -> Dict[str, Any]:
+    """Deserialize a cache entry written by encode_entry."""
+    if payload[:len(ENTRY_MAGIC)] != ENTRY_MAGIC:
+        raise ValueError("Not a result cache entry")
+    offset = len(ENTRY_MAGIC)
+    body_length, frame_count = struct.unpack_from(">QI", payload, offset)
+    offset += struct.calcsize(">QI")
+    frame_lengths = struct.unpack_from(f">{frame_count}Q", payload, offset)
+    offset += 8 * frame_count
+
+    body = payload[offset:offset + body_length]
+    offset += body_length
+    frames = []
+    for length in frame_lengths:
+        frames.append(payload[offset:offset + length])
+        offset += length
+
+    def decode_object(value: Dict[str, Any]) -> Any:
+        if len(value) == 1 and FRAME_MARKER in value:
+            return pl.read_ipc(io.BytesIO(frames[value[FRAME_MARKER]]))
+        return value
+
+    return json.loads(body, object_hook=decode_object)
+
+
+class FilesystemResultStore:
+    """Cache entries as files in a local directory, evicted by modification time."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}{ENTRY_SUFFIX}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                payload = f.read()
+            # Mark as recently used
+            os.utime(path)
+            return payload
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, payload: bytes) -> None:
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the store fits max_bytes."""
+        with self._lock:
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(ENTRY_SUFFIX):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+
+class RedisResultStore:
+    """Cache entries in Redis with an access-time sorted set for LRU eviction."""
+
+    PREFIX = "agensium:result-cache:"
+
+    def __init__(self, url: str, max_bytes: int):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.max_bytes = max_bytes
+        self._lru_key = f"{self.PREFIX}lru"
+        self._sizes_key = f"{self.PREFIX}sizes"
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.PREFIX}entry:{key}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        payload = self.client.get(self._entry_key(key))
+        if payload is None:
+            return None
+        self.client.zadd(self._lru_key, {key: time.time()})
+        return payload
+
+    def put(self, key: str, payload: bytes) -> None:
+        pipe = self.client.pipeline()
+        pipe.set(self._entry_key(key), payload)
+        pipe.zadd(self._lru_key, {key: time.time()})
+        pipe.hset(self._sizes_key, key, len(payload))
+        pipe.execute()
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the store fits max_bytes."""
+        sizes = {k.decode(): int(v) for k, v in self.client.hgetall(self._sizes_key).items()}
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        for key in self.client.zrange(self._lru_key, 0, -1):
+            key = key.decode()
+            pipe = self.client.pipeline()
+            pipe.delete(self._entry_key(key))
+            pipe.zrem(self._lru_key, key)
+            pipe.hdel(self._sizes_key, key)
+            pipe.execute()
+            total -= sizes.get(key, 0)
+            if total <= self.max_bytes:
+                break
+
+
+class ResultCache:
+    """
+    Agent result cache in front of a filesystem or Redis store.
+
+    Results are stored with encode_entry (cleaned files carry Polars frames).
+    Cache failures are logged and treated as misses, so they never fail an
+    agent run.
+    """
+
+    def __init__(self, backend: str = RESULT_CACHE_BACKEND):
+        self.backend = backend
+        self._store = None
+        if backend == "off":
+            return
+        try:
+            if backend == "redis":
+                self._store = RedisResultStore(RESULT_CACHE_REDIS_URL, RESULT_CACHE_MAX_BYTES)
+            else:
+                self._store = FilesystemResultStore(RESULT_CACHE_DIR, RESULT_CACHE_MAX_BYTES)
+        except Exception as e:
+            print(f"[V2.1] Result cache disabled ({backend}): {str(e)}")
+            self._store = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._store is not None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a stored agent result.
+
+        Returns:
+            The result flagged with cache_hit and cached_at, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        try:
+            payload = self._store.get(key)
+            if payload is None:
+                return None
+            entry = decode_entry(payload)
+        except Exception as e:
+            print(f"[V2.1] Result cache read failed: {str(e)}")
+            return None
+
+        result = entry["result"]
+        result["cache_hit"] = True
+        result["cached_at"] = entry["cached_at"]
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a successful agent result (entries over the size budget are skipped)."""
+        if not self.enabled or result.get("status") != "success":
+            return
+        try:
+            payload = encode_entry({
+                "cached_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "result": result
+            })
+            if len(payload) > RESULT_CACHE_MAX_BYTES:
+                return
+            self._store.put(key, payload)
+        except Exception as e:
+            print(f"[V2.1] Result cache write failed: {str(e)}")
+
+
+# Singleton instance for easy import
+result_cache = ResultCache()
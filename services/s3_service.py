@@ -6,16 +6,34 @@ Provides:
 - File verification and retrieval
 - Parameter storage (parameters.json)
 - Output file management
+- Concurrent multipart transfers with throughput metrics
 """
 
+import io
 import boto3
 import os
 import json
-from typing import Optional, List, Dict, Any
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, BinaryIO, Callable, TypeVar
 from datetime import datetime, timedelta, timezone
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 
+T = TypeVar("T")
+
+# Multipart transfers: objects above the threshold are split into chunks
+# that are uploaded/downloaded in parallel by the boto3 transfer manager
+S3_MULTIPART_THRESHOLD_BYTES = int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "16")) * 1024 * 1024
+S3_MULTIPART_CHUNK_BYTES = int(os.getenv("S3_MULTIPART_CHUNK_MB", "16")) * 1024 * 1024
+S3_PART_CONCURRENCY = int(os.getenv("S3_PART_CONCURRENCY", "8"))
+
+# Upper bound on whole files transferred at the same time
+S3_TRANSFER_MAX_WORKERS = int(os.getenv("S3_TRANSFER_MAX_WORKERS", "4"))
+
+
 class S3Service:
     """Backblaze B2 S3-compatible storage service."""
 
@@ -43,6 +61,13 @@ class S3Service:
             aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
             aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
             region_name=os.getenv("AWS_REGION", "us-east-005"),
+            # Enough pooled connections for every part of every concurrent transfer
+            config=Config(max_pool_connections=S3_TRANSFER_MAX_WORKERS * S3_PART_CONCURRENCY),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_THRESHOLD_BYTES,
+            multipart_chunksize=S3_MULTIPART_CHUNK_BYTES,
+            max_concurrency=S3_PART_CONCURRENCY,
         )
         self.bucket = os.getenv("S3_BUCKET", "agensium-files")
         print(f"✓ S3Service initialized with bucket: {self.bucket}")
@@ -211,8 +236,45 @@ class S3Service:
         Raises:
             ClientError: If file not found or access denied
         """
-        response = self.client.get_object(Bucket=self.bucket, Key=key)
-        return response['Body'].read()
+        buffer = io.BytesIO()
+        self.download_fileobj(key, buffer)
+        return buffer.getvalue()
+
+    def download_to_file(self, key: str, path: str) -> int:
+        """
+        Stream a file to local disk without holding it in memory.
+        
+        Args:
+            key: S3 object key
+            path: Local destination path
+            
+        Returns:
+            Number of bytes written
+            
+        Raises:
+            ClientError: If file not found or access denied
+        """
+        with open(path, "wb") as f:
+            return self.download_fileobj(key, f)["size_bytes"]
+
+    def download_fileobj(self, key: str, fileobj: BinaryIO) -> Dict[str, Any]:
+        """
+        Download a file into a writable, seekable file object (multipart for large files).
+        
+        Args:
+            key: S3 object key
+            fileobj: Empty binary file object to write to
+            
+        Returns:
+            Transfer metrics (see _transfer_metrics)
+            
+        Raises:
+            ClientError: If file not found or access denied
+        """
+        started = time.perf_counter()
+        self.client.download_fileobj(self.bucket, key, fileobj, Config=self.transfer_config)
+        size_bytes = fileobj.seek(0, os.SEEK_END)
+        return self._transfer_metrics("download", key, size_bytes, started)
 
     def get_file_stream(self, key: str):
         """
@@ -269,19 +331,95 @@ class S3Service:
             content_type: MIME type
             
         Returns:
-            Dict with key and size_bytes
+            Transfer metrics, including key and size_bytes
         """
-        self.client.put_object(
-            Bucket=self.bucket,
-            Key=key,
-            Body=content,
-            ContentType=content_type
+        return self.upload_fileobj(key, io.BytesIO(content), content_type)
+
+    def upload_fileobj(
+        self,
+        key: str,
+        fileobj: BinaryIO,
+        content_type: str = "text/csv",
+        checksum_sha256: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Stream a file-like object to S3 (multipart for large files).
+        
+        Args:
+            key: S3 object key
+            fileobj: Readable binary file object, positioned at the start
+            content_type: MIME type
+            checksum_sha256: Optional sha256 hex digest stored as object metadata
+            
+        Returns:
+            Transfer metrics, including key and size_bytes
+        """
+        extra_args = {"ContentType": content_type}
+        if checksum_sha256:
+            extra_args["Metadata"] = {"sha256": checksum_sha256}
+        
+        start = fileobj.tell()
+        size_bytes = fileobj.seek(0, os.SEEK_END) - start
+        fileobj.seek(start)
+        started = time.perf_counter()
+        self.client.upload_fileobj(
+            fileobj,
+            self.bucket,
+            key,
+            ExtraArgs=extra_args,
+            Config=self.transfer_config
         )
         
-        return {
+        return self._transfer_metrics("upload", key, size_bytes, started)
+
+    # =========================================================================
+    # CONCURRENT TRANSFERS
+    # =========================================================================
+
+    @staticmethod
+    def _transfer_metrics(direction: str, key: str, size_bytes: int, started: float) -> Dict[str, Any]:
+        """Build (and log) the metrics of one finished transfer."""
+        duration = max(time.perf_counter() - started, 1e-6)
+        metrics = {
             "key": key,
-            "size_bytes": len(content)
+            "direction": direction,
+            "size_bytes": size_bytes,
+            "duration_ms": int(duration * 1000),
+            "throughput_mb_s": round(size_bytes / duration / (1024 * 1024), 2)
         }
+        print(
+            f"[S3] {direction} {key}: {size_bytes} bytes in {metrics['duration_ms']} ms "
+            f"({metrics['throughput_mb_s']} MB/s)"
+        )
+        return metrics
+
+    def run_transfers(
+        self,
+        transfers: List[Callable[[], T]],
+        max_workers: Optional[int] = None
+    ) -> List[T]:
+        """
+        Run transfer callables at the same time on a bounded thread pool.
+        
+        Each transfer is still split into parallel parts by the transfer
+        manager, so max_workers bounds whole files, not connections.
+        
+        Args:
+            transfers: Callables each performing one transfer
+            max_workers: Pool size (defaults to S3_TRANSFER_MAX_WORKERS)
+            
+        Returns:
+            Results in the order of transfers
+            
+        Raises:
+            Exception: The first exception raised by a transfer, after all have finished
+        """
+        if not transfers:
+            return []
+        workers = min(max_workers or S3_TRANSFER_MAX_WORKERS, len(transfers))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3-transfer") as executor:
+            futures = [executor.submit(transfer) for transfer in transfers]
+        return [future.result() for future in futures]
 
     def upload_json(
         self,
@@ -0,0 +1,33 @@
+"""Native date parsing agrees with datetime.strptime."""
+
+from datetime import datetime
+
+import polars as pl
+import pytest
+
+from agents.agent_utils import parse_dates
+from agents.type_fixer import DATETIME_FORMATS
+
+
+def _strptime(value: str, formats):
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+@pytest.mark.parametrize("value", [
+    "2020-01-01 23:59:59",
+    "2020-01-01 23:59:60",
+    "2020-01-01 23:59:61",
+    "31/12/2020 23:59:60",
+    "2020-02-30",
+    "02-Jan-69",
+    "5-1-202",
+])
+def test_parse_dates_matches_strptime(value):
+    parsed, _ = parse_dates(pl.Series("d", [value]), DATETIME_FORMATS)
+
+    assert parsed[0] == _strptime(value, DATETIME_FORMATS)
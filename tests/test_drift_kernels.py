@@ -0,0 +1,63 @@
+"""Drift against a baseline profile for continuous, discrete and constant columns."""
+
+import numpy as np
+import polars as pl
+import pytest
+
+from agents.drift_kernels import (
+    build_baseline_profile,
+    profile_histogram_drift,
+    profile_two_sample_tests,
+    summary_statistics,
+)
+
+pytest.importorskip("scipy")
+
+NUMERIC = [pl.Float64, pl.Int64]
+
+
+def _frame(seed: int, n: int = 20_000, shift: int = 0) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pl.DataFrame({
+        "a": rng.normal(size=n),
+        "b": rng.integers(0, 10, n) + shift,
+        "const": np.full(n, 3.0),
+        "zero_inflated": np.where(rng.random(n) < 0.3, 0.0, rng.exponential(size=n)),
+    })
+
+
+def _drift(baseline: pl.DataFrame, current: pl.DataFrame):
+    profile = build_baseline_profile(baseline.iter_slices, NUMERIC)
+    histograms = profile_histogram_drift(profile, current, current.columns, summary_statistics(current, current.columns))
+    tests = {c: profile_two_sample_tests(profile["columns"][c], current[c].to_numpy()) for c in current.columns}
+    return histograms, tests
+
+
+def test_current_equal_to_baseline_has_no_drift():
+    df = _frame(1)
+    histograms, tests = _drift(df, df)
+
+    for c in df.columns:
+        assert histograms[c]["psi"] == pytest.approx(0.0)
+        assert tests[c]["p_value"] > 0.5, c
+        # The percentile grid of continuous columns comes from a quantile sketch
+        assert tests[c]["wasserstein_distance"] < 0.01, c
+    for c in ["b", "const"]:
+        assert tests[c]["ks_statistic"] == pytest.approx(0.0)
+        assert tests[c]["wasserstein_distance"] == pytest.approx(0.0)
+        assert histograms[c]["js_divergence"] == pytest.approx(0.0)
+
+
+def test_resampled_discrete_column_has_no_drift():
+    _, tests = _drift(_frame(1), _frame(2))
+
+    assert tests["b"]["p_value"] > 0.01
+    assert tests["const"]["p_value"] == 1.0
+
+
+def test_shifted_discrete_column_drifts():
+    histograms, tests = _drift(_frame(1), _frame(2, shift=1))
+
+    assert tests["b"]["p_value"] < 1e-6
+    assert tests["b"]["wasserstein_distance"] == pytest.approx(1.0, abs=0.05)
+    assert histograms["b"]["js_divergence"] > 0.1
@@ -0,0 +1,45 @@
+"""Smoke test: the streamed Excel report is a valid workbook."""
+
+from openpyxl import load_workbook
+
+from agents.unified_profiler import execute_unified_profiler
+from downloads.profile_my_data_downloads import ProfileMyDataDownloads
+
+
+CSV = b"id,amount,city\n" + b"".join(
+    f"{i},{'' if i % 7 == 0 else i * 1.5},{'NY' if i % 2 else 'SF'}\n".encode() for i in range(200)
+)
+
+
+def test_profile_excel_report_reopens_with_openpyxl():
+    profiler_output = execute_unified_profiler(CSV, "data.csv", {})
+    assert profiler_output["status"] == "success"
+
+    downloads = ProfileMyDataDownloads("profile-my-data").generate_downloads(
+        agent_results={"unified-profiler": profiler_output},
+        analysis_id="smoke",
+        execution_time_ms=1,
+        alerts=[{"alert_id": "a1", "severity": "high", "message": "nulls"}],
+        issues=[{"issue_id": "i1", "issue_type": "null", "field": "amount"}],
+        recommendations=[],
+        row_level_issues=[
+            {"row_index": i, "column": "amount", "issue_type": "null", "severity": "low", "message": "missing"}
+            for i in range(0, 200, 7)
+        ]
+    )
+    try:
+        excel = next(d for d in downloads if d.get("format") == "xlsx")
+        assert "artifact" in excel, excel.get("error")
+
+        with excel["artifact"].open() as f:
+            wb = load_workbook(f)
+        assert wb.sheetnames[0] == "Summary"
+        assert {"Profiler", "Alerts", "Issues", "Row-Level Issues"} <= set(wb.sheetnames)
+        assert wb.sheetnames == excel["sheets"]
+        assert wb["Summary"]["A1"].value
+        assert "A1:B1" in {str(r) for r in wb["Summary"].merged_cells.ranges}
+        assert wb["Row-Level Issues"].max_row > 29
+    finally:
+        for download in downloads:
+            if "artifact" in download:
+                download["artifact"].close()
@@ -0,0 +1,30 @@
+"""Unit conversion keeps Python's float formatting."""
+
+import re
+
+import polars as pl
+
+from agents.field_standardization import _apply_unit_conversions
+
+UNITS = {"ft": {"factor": 12, "target_unit": "inches"}, "km": {"factor": 0.001, "target_unit": "m"}}
+
+
+def _convert(value: str) -> str:
+    for unit, conversion in UNITS.items():
+        match = re.search(r'(\d+(?:\.\d+)?)\s*' + re.escape(unit), value, re.IGNORECASE)
+        if match:
+            return f"{float(match.group(1)) * conversion['factor']} {conversion['target_unit']}"
+    return value
+
+
+def test_unit_conversion_matches_str_float():
+    values = pl.Series("size", [
+        "5 ft", "5.5 FT", "0.01 km", "0.5 km", "12 m", "0 ft",
+        "100000000000000000 ft", "999999999999999 ft", "1200000000000000000 km", "5e3 ft"
+    ])
+
+    converted = _apply_unit_conversions(values, UNITS)
+
+    assert converted.to_list() == [_convert(v) for v in values]
+    assert converted[2] == "1e-05 m"
+    assert converted[6] == "1.2e+18 inches"
@@ -0,0 +1,71 @@
+"""Golden record survivorship with all-null cluster columns, and fuzzy blocking recall."""
+
+import numpy as np
+import polars as pl
+import pytest
+
+from agents.golden_record_builder import _build_fuzzy_clusters, _derive_fuzzy_config, execute_golden_record_builder
+
+
+# Cluster 1 has no phone at all; cluster 2 has conflicting phones
+CSV = b"customer_id,phone,source\n1,,crm\n1,,web\n2,555,crm\n2,556,web\n"
+
+
+@pytest.mark.parametrize("rule", [
+    "most_complete", "most_frequent", "highest_quality", "longest", "source_priority", "first"
+])
+def test_all_null_cluster_column(rule):
+    result = execute_golden_record_builder(CSV, "customers.csv", {
+        "match_key_columns": ["customer_id"],
+        "default_survivorship_rule": rule,
+        "source_column": "source",
+        "source_priority": {"crm": 1, "web": 2}
+    })
+
+    assert result["status"] == "success", result.get("error")
+    records = result["data"]["golden_records"]
+    assert [r["golden_record"]["customer_id"] for r in records] == [1, 2]
+    assert records[0]["golden_record"]["phone"] is None
+    assert records[1]["golden_record"]["phone"] in (555, 556)
+
+
+def _typo(rng: np.random.Generator, value: str) -> str:
+    k = int(rng.integers(0, len(value) - 1))
+    edit = rng.integers(0, 3)
+    if edit == 0:
+        return value[:k] + value[k + 1:]
+    if edit == 1:
+        return value[:k] + value[k + 1] + value[k] + value[k + 2:]
+    return value[:k] + "x" + value[k + 1:]
+
+
+def _duplicated_customers(n_entities: int) -> pl.DataFrame:
+    """1-3 records per customer, with typos in name, email and address."""
+    rng = np.random.default_rng(0)
+    first = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "David", "Susan"]
+    last = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Wilson", "Taylor"]
+    streets = ["Oak St", "Maple Ave", "Pine Rd", "Cedar Ln", "Elm St", "Lake Dr"]
+    rows = []
+    for _ in range(n_entities):
+        f, l = rng.choice(first), rng.choice(last)
+        customer = {
+            "full_name": f"{f} {l}",
+            "email": f"{f.lower()}.{l.lower()}{rng.integers(1, 999)}@example.com",
+            "address": f"{rng.integers(1, 9999)} {rng.choice(streets)}"
+        }
+        for _ in range(rng.integers(1, 4)):
+            rows.append({c: _typo(rng, v) if rng.random() < 0.4 else v for c, v in customer.items()})
+    return pl.DataFrame([rows[i] for i in rng.permutation(len(rows))])
+
+
+def test_blocking_keeps_typo_matches():
+    pytest.importorskip("rapidfuzz")
+    pytest.importorskip("jellyfish")
+    df = _duplicated_customers(1000)
+    config = _derive_fuzzy_config(["full_name", "email", "address"], {}, df.columns)
+
+    exact = _build_fuzzy_clusters(df, config, 80.0, [], blocking_min_records=df.height)
+    blocked = _build_fuzzy_clusters(df, config, 80.0, [], blocking_min_records=0)
+
+    # Blocking may miss a few matches, but at most 1% more clusters
+    assert len(exact) <= len(blocked) <= 1.01 * len(exact), (len(exact), len(blocked))
@@ -0,0 +1,30 @@
+"""Composite key search keeps near-unique combinations open to supersets."""
+
+import polars as pl
+
+from agents.key_identifier import _analyze_composite_keys
+
+
+def test_superset_of_near_unique_key_is_reported():
+    # (a, b) repeats in its first five pairs of rows; c tells those apart
+    rows = range(1000)
+    df = pl.DataFrame({
+        "a": [i // 2 for i in rows],
+        "b": [0 if i < 10 else i % 2 for i in rows],
+        "c": [1 if i < 10 and i % 2 else 0 for i in rows],
+    })
+    column_analysis = [{"column": c, "key_type": None, "key_score": 50.0} for c in df.columns]
+
+    candidates = _analyze_composite_keys(df, column_analysis, 3, 99.0)
+
+    found = {tuple(c["columns"]): c["uniqueness_percentage"] for c in candidates}
+    assert found == {("a", "b"): 99.5, ("a", "b", "c"): 100.0}
+
+
+def test_supersets_of_fully_unique_key_are_skipped():
+    df = pl.DataFrame({"a": [i // 2 for i in range(100)], "b": [i % 2 for i in range(100)], "c": [0] * 100})
+    column_analysis = [{"column": c, "key_type": None, "key_score": 50.0} for c in df.columns]
+
+    candidates = _analyze_composite_keys(df, column_analysis, 3, 99.0)
+
+    assert [c["columns"] for c in candidates] == [["a", "b"]]
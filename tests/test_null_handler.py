@@ -0,0 +1,31 @@
+"""KNN imputation accuracy of the BallTree backend against KNNImputer."""
+
+import numpy as np
+import polars as pl
+import pytest
+
+import agents.null_handler as null_handler
+
+pytest.importorskip("sklearn")
+
+
+def _rmse(imputed: pl.DataFrame, truth: np.ndarray, missing: np.ndarray) -> float:
+    return float(np.sqrt(np.mean((imputed["y"].to_numpy()[missing] - truth[missing]) ** 2)))
+
+
+def test_balltree_matches_exact_knn(monkeypatch):
+    rng = np.random.default_rng(0)
+    n = 3000
+    x = rng.normal(size=n)
+    y = 2 * x + rng.normal(0, 0.3, n)
+    missing = rng.random(n) < 0.15
+    df = pl.DataFrame({"x": x, "y": np.where(missing, np.nan, y), "z": rng.normal(size=n)}).fill_nan(None)
+
+    exact, _ = null_handler._knn_impute(df, ["y"], 5)
+    monkeypatch.setattr(null_handler, "KNN_EXACT_MAX_ROWS", 0)
+    balltree, log = null_handler._knn_impute(df, ["y"], 5)
+
+    assert balltree["y"].null_count() == 0
+    assert log == [f"KNN imputed {missing.sum()} nulls in 'y'"]
+    # Mean imputation would be off by about std(y) = 2
+    assert _rmse(balltree, y, missing) < 1.2 * _rmse(exact, y, missing) < 0.6
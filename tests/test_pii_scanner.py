@@ -0,0 +1,63 @@
+"""PII typing samples the whole column, not its first rows."""
+
+import io
+
+import numpy as np
+import polars as pl
+
+from agents.pii_scanner import scan_pii_samples
+from agents.score_risk import execute_score_risk
+from agents.unified_profiler import execute_unified_profiler
+
+
+def _grouped_ssn_csv() -> bytes:
+    """An ssn column whose first 150 of 1000 rows hold phone numbers."""
+    rng = np.random.default_rng(3)
+    phones = [f"(555) {rng.integers(100, 999)}-{rng.integers(1000, 9999)}" for _ in range(150)]
+    ssns = [f"{rng.integers(100, 999)}-{rng.integers(10, 99)}-{rng.integers(1000, 9999)}" for _ in range(850)]
+    buffer = io.BytesIO()
+    pl.DataFrame({"id": range(1000), "ssn": phones + ssns}).write_csv(buffer)
+    return buffer.getvalue()
+
+
+def test_sample_spans_the_column():
+    lf = pl.read_csv(io.BytesIO(_grouped_ssn_csv())).lazy()
+
+    sample = scan_pii_samples(lf, ["ssn"])["ssn"]
+
+    assert sample["sample_len"] == 100
+    assert 70 < sample["ssn"] < 100
+
+
+def test_grouped_ssn_column_is_typed_as_ssn():
+    content = _grouped_ssn_csv()
+
+    risk = execute_score_risk(content, "people.csv", {})
+    profile = execute_unified_profiler(content, "people.csv", {})
+
+    risk_field = next(f for f in risk["data"]["fields"] if f["field_name"] == "ssn")
+    assert [f["pii_type"] for f in risk_field["risk_factors"] if f["factor"] == "pii_detected"] == ["ssn"]
+    profile_field = next(f for f in profile["data"]["fields"] if f["field_name"] == "ssn")
+    assert profile_field["properties"]["estimated_pii_type"] == "ssn"
+
+
+def test_ssn_and_card_values_are_not_typed_as_phone():
+    # Phone is checked after ssn and credit_card, whose values it also matches
+    rng = np.random.default_rng(0)
+    n = 200
+    df = pl.DataFrame({
+        "tax_ref": [f"{a}-{b}-{c}" for a, b, c in zip(
+            rng.integers(100, 999, n), rng.integers(10, 99, n), rng.integers(1000, 9999, n))],
+        "payment_ref": [" ".join(str(x) for x in rng.integers(1000, 9999, 4)) for _ in range(n)],
+        "contact": [f"(555) {a}-{b}" for a, b in zip(rng.integers(100, 999, n), rng.integers(1000, 9999, n))],
+    })
+    buffer = io.BytesIO()
+    df.write_csv(buffer)
+
+    risk = execute_score_risk(buffer.getvalue(), "refs.csv", {})
+
+    pii_types = {
+        f["field_name"]: [r["pii_type"] for r in f["risk_factors"] if r["factor"] == "pii_detected"]
+        for f in risk["data"]["fields"]
+    }
+    assert pii_types == {"tax_ref": ["ssn"], "payment_ref": ["credit_card"], "contact": ["phone_number"]}
@@ -0,0 +1,82 @@
+"""Result cache entries round-trip through JSON and Arrow IPC."""
+
+import importlib
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from agents.agent_utils import DatasetContext
+from agents.null_handler import execute_null_handler
+from services.result_cache import ResultCache, build_cache_key, decode_entry, encode_entry
+from transformers.transformers_utils import _agent_code_version
+
+# services re-exports the result_cache singleton under the module's name
+result_cache_module = importlib.import_module("services.result_cache")
+
+CSV = b"id,amount,city\n1,10.5,NYC\n2,,Boston\n3,7.25,\n4,,NYC\n"
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache_module, "RESULT_CACHE_DIR", str(tmp_path))
+    return ResultCache("filesystem")
+
+
+def test_cleaned_frame_round_trips(cache):
+    dataset = DatasetContext.from_bytes(CSV, "data.csv")
+    result = execute_null_handler(CSV, "data.csv", {}, dataset=dataset)
+    assert result["status"] == "success"
+    frame = result["cleaned_file"]["frame"]
+
+    cache.put("key", result)
+    cached = cache.get("key")
+
+    assert cached["cache_hit"] is True
+    assert cached["cleaned_file"]["frame"].equals(frame)
+    assert cached["cleaned_file"]["frame"].schema == frame.schema
+    cached["cleaned_file"].pop("frame")
+    result["cleaned_file"].pop("frame")
+    assert {k: v for k, v in cached.items() if k not in ("cache_hit", "cached_at")} == result
+
+
+def test_numpy_scalars_are_stored_as_json():
+    entry = decode_entry(encode_entry({"result": {"count": np.int64(3), "score": np.float64(0.5)}}))
+
+    assert entry == {"result": {"count": 3, "score": 0.5}}
+
+
+def test_results_with_other_objects_are_not_cached(cache):
+    cache.put("key", {"status": "success", "data": {"handle": object()}})
+
+    assert cache.get("key") is None
+
+
+def test_cache_is_off_by_default():
+    env = {k: v for k, v in os.environ.items() if k != "RESULT_CACHE_BACKEND"}
+    enabled = subprocess.run(
+        [sys.executable, "-c", "from services.result_cache import result_cache; print(result_cache.enabled)"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, check=True
+    ).stdout.split()
+
+    assert enabled[-1] == "False"
+
+
+def test_agent_code_changes_the_key(tmp_path, monkeypatch):
+    package = tmp_path / "cached_agents"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "agent.py").write_text("def execute(): return 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def key() -> str:
+        _agent_code_version.cache_clear()
+        return build_cache_key("agent", "1.0.0", _agent_code_version("cached_agents"), "cached_agents.agent.execute", {}, [])
+
+    before = key()
+    assert key() == before
+    (package / "agent.py").write_text("def execute(): return 2\n")
+    assert key() != before
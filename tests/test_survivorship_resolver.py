@@ -0,0 +1,30 @@
+"""Survivorship resolution with all-null cluster columns."""
+
+import pytest
+
+from agents.survivorship_resolver import execute_survivorship_resolver
+
+
+# Cluster 0 has no phone at all; cluster 1 has conflicting phones
+CSV = (
+    b"customer_id,phone,source,updated_at\n"
+    b"1,,crm,2024-01-01\n1,,web,2024-02-01\n2,555,crm,2024-01-05\n2,556,web,2024-03-01\n"
+)
+
+
+@pytest.mark.parametrize("rule", [
+    "most_frequent", "quality_score", "most_complete", "longest", "source_priority", "validation",
+    "freshness", "most_recent"
+])
+def test_all_null_cluster_column(rule):
+    result = execute_survivorship_resolver(CSV, "customers.csv", {
+        "match_key_columns": ["customer_id"],
+        "default_rule": rule,
+        "source_column": "source",
+        "timestamp_column": "updated_at"
+    })
+
+    assert result["status"] == "success", result.get("error")
+    phones = [r for r in result["data"]["resolved_fields"] if r["column"] == "phone"]
+    assert [r["cluster_id"] for r in phones] == ["cluster_1"]
+    assert phones[0]["winner"] in (555, 556)
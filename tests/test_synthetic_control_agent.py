@@ -0,0 +1,41 @@
+"""Greedy control matching against a brute-force reference."""
+
+import numpy as np
+from scipy.spatial.distance import cdist
+
+from agents.synthetic_control_agent import _assign_greedy
+
+
+def _reference_greedy(treatment: np.ndarray, control: np.ndarray, match_ratio: int):
+    distance_matrix = cdist(treatment, control)
+    used = np.zeros(len(control), dtype=bool)
+    matched, distances = [], []
+    for row in distance_matrix:
+        available = [j for j in np.argsort(row, kind="stable") if not used[j]][:match_ratio]
+        used[available] = True
+        matched.extend(int(j) for j in available)
+        distances.extend(float(row[j]) for j in available)
+    return matched, distances
+
+
+def test_greedy_matches_reference():
+    rng = np.random.default_rng(0)
+    treatment, control = rng.normal(size=(200, 3)), rng.normal(size=(1000, 3))
+
+    matched, distances = _assign_greedy(treatment, control, 2)
+
+    expected_matched, expected_distances = _reference_greedy(treatment, control, 2)
+    assert matched == expected_matched
+    assert np.allclose(distances, expected_distances)
+
+
+def test_greedy_with_tied_features():
+    rng = np.random.default_rng(0)
+    treatment = rng.integers(0, 3, size=(500, 2)).astype(float)
+    control = rng.integers(0, 3, size=(3000, 2)).astype(float)
+
+    matched, distances = _assign_greedy(treatment, control, 3)
+
+    assert len(matched) == 1500
+    assert len(set(matched)) == 1500
+    assert np.allclose(distances, _reference_greedy(treatment, control, 3)[1])
@@ -16,15 +16,17 @@ from fastapi import UploadFile, HTTPException
 
 from ai.analysis_summary_ai import AnalysisSummaryAI
 from downloads.analyze_my_data_downloads import AnalyzeMyDataDownloads
-from agents import customer_segmentation_agent, market_basket_sequence_agent, experimental_design_agent, synthetic_control_agent, control_group_holdout_planner_agent
 from transformers.transformers_utils import (
     get_required_files,
     validate_files,
     read_uploaded_files,
     convert_files_to_csv,
-    determine_file_key,
     upload_outputs_to_s3,
-    build_agent_input
+    create_spool_dir,
+    remove_spool_dir,
+    load_s3_input_files,
+    build_dataset_contexts,
+    execute_agent_dag
 )
 from billing import BillingContext, InsufficientCreditsError, UserWalletNotFoundError, AgentCostNotFoundError
 from services.s3_service import s3_service
@@ -97,6 +99,9 @@ async def run_analyze_my_data_analysis(
         # Convert files to CSV format
         files_map = convert_files_to_csv(files_map)
         
+        # Parse each file once and share the frame across all agents
+        datasets = build_dataset_contexts(files_map)
+        
         # Parse parameters
         parameters = {}
         if parameters_json:
@@ -105,8 +110,6 @@ async def run_analyze_my_data_analysis(
             except json.JSONDecodeError:
                 raise HTTPException(status_code=400, detail="Invalid parameters JSON")
         
-        agent_results = {}
-        
         # ========== UPFRONT BILLING: Check and consume ALL credits before execution ==========
         with BillingContext(current_user) as billing:
             try:
@@ -125,23 +128,15 @@ async def run_analyze_my_data_analysis(
                 )
         # ========== END UPFRONT BILLING ==========
         
-        # Execute agents (billing already handled)
-        for agent_id in agents_to_run:
-            try:
-                # Build agent-specific input
-                agent_input = build_agent_input(agent_id, files_map, parameters, tool_def)
-                
-                # Execute agent
-                result = _execute_agent(agent_id, agent_input)
-                
-                agent_results[agent_id] = result
-                
-            except Exception as e:
-                agent_results[agent_id] = {
-                    "status": "error",
-                    "error": str(e),
-                    "execution_time_ms": 0
-                }
+        # Execute agents as a DAG built from the tool definition (billing already handled)
+        # Analytics agents are read-only, so they run concurrently
+        agent_results = execute_agent_dag(
+            agents_to_run,
+            tool_def,
+            files_map,
+            parameters,
+            datasets
+        )
         
         # Transform results
         return transform_analyze_my_data_response(
@@ -192,6 +187,7 @@ async def run_analyze_my_data_analysis_v2_1(
     import base64
     
     start_time = time.time()
+    spool_dir = create_spool_dir(task.task_id)
     
     try:
         tool_def = TOOL_DEFINITIONS[task.tool_id]
@@ -211,30 +207,19 @@ async def run_analyze_my_data_analysis_v2_1(
                 "error_code": "NO_INPUT_FILES"
             }
 
-        # Build files_map from S3 files (may be empty)
-        files_map = {}
-        for file_info in input_files or []:
-            filename = file_info['filename']
-
-            # Determine file key (primary, baseline)
-            file_key = determine_file_key(filename)
-
-            # Download file content
-            content = s3_service.get_file_bytes(file_info['key'])
-            files_map[file_key] = (content, filename)
-            print(f"[V2.1] Loaded {file_key}: {filename} ({len(content)} bytes)")
+        # Build files_map from S3 files (large CSVs are streamed to the spool dir)
+        files_map, spool_paths = load_s3_input_files(input_files, spool_dir)
 
         # Convert files to CSV if needed
         files_map = convert_files_to_csv(files_map)
         
+        # Parse each file once and share the frame across all agents
+        datasets = build_dataset_contexts(files_map, spool_paths)
+        
         # Read parameters from S3
         parameters = s3_service.get_parameters(task.user_id, task.task_id) or {}
         print(f"[V2.1] Parameters loaded: {list(parameters.keys())}")
         
-        agent_results = {}
-        agents_completed = 0
-        total_agents = len(task.agents)
-        
         # ========== UPFRONT BILLING: Check and consume ALL credits before execution ==========
         with BillingContext(current_user) as billing:
             try:
@@ -253,30 +238,22 @@ async def run_analyze_my_data_analysis_v2_1(
                 )
         # ========== END UPFRONT BILLING ==========
         
-        # Execute agents (billing already handled)
-        for agent_id in task.agents:
-            try:
-                # Update task progress
-                task.current_agent = agent_id
-                task.progress = 15 + int((agents_completed / total_agents) * 80)
-                db.commit()
-                
-                # Build agent input
-                agent_input = build_agent_input(agent_id, files_map, parameters, tool_def)
-                
-                # Execute agent
-                result = _execute_agent(agent_id, agent_input)
-                agent_results[agent_id] = result
-                
-                agents_completed += 1
-                print(f"[V2.1] Agent {agent_id} completed ({agents_completed}/{total_agents})")
-                
-            except Exception as e:
-                agent_results[agent_id] = {
-                    "status": "error",
-                    "error": str(e),
-                    "execution_time_ms": 0
-                }
+        def update_progress(agents_completed: int, total_agents: int, running_agents: List[str]) -> None:
+            # Called from this thread only, so the DB session is never shared
+            task.current_agent = running_agents[0] if running_agents else None
+            task.progress = 15 + int((agents_completed / total_agents) * 80)
+            db.commit()
+        
+        # Execute agents as a DAG built from the tool definition (billing already handled)
+        # Analytics agents are read-only, so they run concurrently
+        agent_results = execute_agent_dag(
+            task.agents,
+            tool_def,
+            files_map,
+            parameters,
+            datasets,
+            on_progress=update_progress
+        )
         
         # Transform results
         final_result = transform_analyze_my_data_response(
@@ -303,104 +280,8 @@ async def run_analyze_my_data_analysis_v2_1(
             "error": str(e),
             "error_code": "PROCESSING_ERROR"
         }
-
-
-def _execute_agent(
-    agent_id: str,
-    agent_input: Dict[str, Any]
-) -> Dict[str, Any]:
-    """Execute specific agent."""
-    files_map = agent_input.get("files", {})
-    parameters = agent_input.get("parameters", {})
-    
-    if agent_id == "customer-segmentation-agent":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Customer segmentation agent requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return customer_segmentation_agent.execute_customer_segmentation_agent(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "market-basket-sequence-agent":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Market basket agent requires 'primary' file",
-                "execution_time_ms": 0
-            }
-
-        primary_bytes, primary_filename = files_map["primary"]
-
-        return market_basket_sequence_agent.execute_market_basket_sequence_agent(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-
-    elif agent_id == "experimental-design-agent":
-        # Experimental design can work with or without a file
-        # If file is provided, it uses population data; otherwise uses parameter-based calculation
-        primary_bytes = None
-        primary_filename = None
-        
-        if "primary" in files_map:
-            primary_bytes, primary_filename = files_map["primary"]
-        
-        return experimental_design_agent.execute_experimental_design_agent(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "synthetic-control-agent":
-        # Synthetic control requires both primary (treatment) and baseline (control pool) files
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Synthetic control agent requires 'primary' file (treatment group data)",
-                "execution_time_ms": 0
-            }
-        
-        if "baseline" not in files_map:
-            return {
-                "status": "error",
-                "error": "Synthetic control agent requires 'baseline' file (control pool data)",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        baseline_bytes, baseline_filename = files_map["baseline"]
-        
-        return synthetic_control_agent.execute_synthetic_control_agent(
-            primary_bytes,
-            primary_filename,
-            baseline_bytes,
-            baseline_filename,
-            parameters
-        )
-
-    elif agent_id == "control-group-holdout-planner-agent":
-        # Form-only planner (no files required)
-        return control_group_holdout_planner_agent.execute_control_group_holdout_planner_agent(
-            None,
-            None,
-            parameters
-        )
-    
-    else:
-        return {
-            "status": "error",
-            "error": f"Unknown agent for analyze-my-data: {agent_id}",
-            "execution_time_ms": 0
-        }
+    finally:
+        remove_spool_dir(spool_dir)
 
 
 def transform_analyze_my_data_response(
@@ -16,16 +16,18 @@ from fastapi import UploadFile, HTTPException
 
 from ai.analysis_summary_ai import AnalysisSummaryAI
 from downloads.clean_my_data_downloads import CleanMyDataDownloads
-from agents import null_handler, outlier_remover, type_fixer, duplicate_resolver, quarantine_agent, cleanse_writeback, field_standardization, cleanse_previewer
 from transformers.transformers_utils import (
     get_required_files,
     validate_files,
     read_uploaded_files,
     convert_files_to_csv,
-    determine_file_key,
     upload_outputs_to_s3,
-    build_agent_input,
-    update_files_from_result
+    create_spool_dir,
+    remove_spool_dir,
+    load_s3_input_files,
+    build_dataset_contexts,
+    execute_agent_dag,
+    materialize_cleaned_file
 )
 from billing import BillingContext, InsufficientCreditsError, UserWalletNotFoundError, AgentCostNotFoundError
 from services.s3_service import s3_service
@@ -98,6 +100,9 @@ async def run_clean_my_data_analysis(
         # Convert files to CSV format
         files_map = convert_files_to_csv(files_map)
         
+        # Parse each file once and share the frame across all agents
+        datasets = build_dataset_contexts(files_map)
+        
         # Parse parameters
         parameters = {}
         if parameters_json:
@@ -106,8 +111,6 @@ async def run_clean_my_data_analysis(
             except json.JSONDecodeError:
                 raise HTTPException(status_code=400, detail="Invalid parameters JSON")
         
-        agent_results = {}
-        
         # ========== UPFRONT BILLING: Check and consume ALL credits before execution ==========
         with BillingContext(current_user) as billing:
             try:
@@ -126,26 +129,15 @@ async def run_clean_my_data_analysis(
                 )
         # ========== END UPFRONT BILLING ==========
         
-        # Execute agents (billing already handled)
-        for agent_id in agents_to_run:
-            try:
-                # Build agent-specific input
-                agent_input = build_agent_input(agent_id, files_map, parameters, tool_def)
-                
-                # Execute agent
-                result = _execute_agent(agent_id, agent_input)
-                
-                agent_results[agent_id] = result
-                
-                # Update files map for next agent (chaining)
-                update_files_from_result(files_map, result)
-                
-            except Exception as e:
-                agent_results[agent_id] = {
-                    "status": "error",
-                    "error": str(e),
-                    "execution_time_ms": 0
-                }
+        # Execute agents as a DAG built from the tool definition (billing already handled)
+        # Read-only agents (e.g. cleanse-previewer) run alongside the mutating chain
+        agent_results = execute_agent_dag(
+            agents_to_run,
+            tool_def,
+            files_map,
+            parameters,
+            datasets
+        )
         
         # Transform results
         return transform_clean_my_data_response(
@@ -195,6 +187,7 @@ async def run_clean_my_data_analysis_v2_1(
     from db.models import TaskStatus
     
     start_time = time.time()
+    spool_dir = create_spool_dir(task.task_id)
     
     try:
         tool_def = TOOL_DEFINITIONS[task.tool_id]
@@ -210,26 +203,19 @@ async def run_clean_my_data_analysis_v2_1(
                 "error_code": "NO_INPUT_FILES"
             }
         
-        # Build files_map from S3 files
-        files_map = {}
-        for file_info in input_files:
-            filename = file_info['filename']
-            file_key = determine_file_key(filename)
-            content = s3_service.get_file_bytes(file_info['key'])
-            files_map[file_key] = (content, filename)
-            print(f"[V2.1] Loaded {file_key}: {filename} ({len(content)} bytes)")
+        # Build files_map from S3 files (large CSVs are streamed to the spool dir)
+        files_map, spool_paths = load_s3_input_files(input_files, spool_dir)
         
         # Convert files to CSV if needed
         files_map = convert_files_to_csv(files_map)
         
+        # Parse each file once and share the frame across all agents
+        datasets = build_dataset_contexts(files_map, spool_paths)
+        
         # Read parameters from S3
         parameters = s3_service.get_parameters(task.user_id, task.task_id) or {}
         print(f"[V2.1] Parameters loaded: {list(parameters.keys())}")
         
-        agent_results = {}
-        agents_completed = 0
-        total_agents = len(task.agents)
-        
         # ========== UPFRONT BILLING: Check and consume ALL credits before execution ==========
         with BillingContext(current_user) as billing:
             try:
@@ -248,33 +234,22 @@ async def run_clean_my_data_analysis_v2_1(
                 )
         # ========== END UPFRONT BILLING ==========
         
-        # Execute agents (billing already handled)
-        for agent_id in task.agents:
-            try:
-                # Update task progress
-                task.current_agent = agent_id
-                task.progress = 15 + int((agents_completed / total_agents) * 80)
-                db.commit()
-                
-                # Build agent input
-                agent_input = build_agent_input(agent_id, files_map, parameters, tool_def)
-                
-                # Execute agent
-                result = _execute_agent(agent_id, agent_input)
-                agent_results[agent_id] = result
-                
-                # Update files map for next agent (chaining)
-                update_files_from_result(files_map, result)
-                
-                agents_completed += 1
-                print(f"[V2.1] Agent {agent_id} completed ({agents_completed}/{total_agents})")
-                
-            except Exception as e:
-                agent_results[agent_id] = {
-                    "status": "error",
-                    "error": str(e),
-                    "execution_time_ms": 0
-                }
+        def update_progress(agents_completed: int, total_agents: int, running_agents: List[str]) -> None:
+            # Called from this thread only, so the DB session is never shared
+            task.current_agent = running_agents[0] if running_agents else None
+            task.progress = 15 + int((agents_completed / total_agents) * 80)
+            db.commit()
+        
+        # Execute agents as a DAG built from the tool definition (billing already handled)
+        # Read-only agents (e.g. cleanse-previewer) run alongside the mutating chain
+        agent_results = execute_agent_dag(
+            task.agents,
+            tool_def,
+            files_map,
+            parameters,
+            datasets,
+            on_progress=update_progress
+        )
         
         # Transform results
         final_result = transform_clean_my_data_response(
@@ -301,149 +276,8 @@ async def run_clean_my_data_analysis_v2_1(
             "error": str(e),
             "error_code": "PROCESSING_ERROR"
         }
-
-def _execute_agent(
-    agent_id: str,
-    agent_input: Dict[str, Any]
-) -> Dict[str, Any]:
-    """Execute specific agent."""
-    files_map = agent_input.get("files", {})
-    parameters = agent_input.get("parameters", {})
-    
-    if agent_id == "quarantine-agent":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Quarantine agent requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return quarantine_agent.execute_quarantine_agent(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "null-handler":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Null handler requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return null_handler.execute_null_handler(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "outlier-remover":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Outlier remover requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return outlier_remover.execute_outlier_remover(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "type-fixer":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Type fixer requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return type_fixer.execute_type_fixer(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "duplicate-resolver":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Duplicate resolver requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return duplicate_resolver.execute_duplicate_resolver(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "field-standardization":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Field standardization requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return field_standardization.execute_field_standardization(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "cleanse-writeback":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Cleanse writeback requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return cleanse_writeback.execute_cleanse_writeback(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "cleanse-previewer":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Cleanse previewer requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return cleanse_previewer.execute_cleanse_previewer(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    else:
-        return {
-            "status": "error",
-            "error": f"Unknown agent for clean-my-data: {agent_id}",
-            "execution_time_ms": 0
-        }
+    finally:
+        remove_spool_dir(spool_dir)
 
 def transform_clean_my_data_response(
     agent_results: Dict[str, Any],
@@ -655,7 +489,7 @@ def transform_clean_my_data_response(
     cleaned_files = {}
     if cleaned_files_list:
         most_cleaned_item = cleaned_files_list[-1]  # Last item after sorting (highest count)
-        cleaned_file_data = most_cleaned_item["cleaned_file"]
+        cleaned_file_data = materialize_cleaned_file(most_cleaned_item["cleaned_file"])
         
         # Extract base filename and remove all "cleaned_" prefixes
         original_filename = most_cleaned_item["filename"]
@@ -16,16 +16,18 @@ from fastapi import UploadFile, HTTPException
 
 from ai.analysis_summary_ai import AnalysisSummaryAI
 from downloads.master_my_data_downloads import MasterMyDataDownloads
-from agents import key_identifier, contract_enforcer, semantic_mapper, lineage_tracer, golden_record_builder, survivorship_resolver, master_writeback_agent, stewardship_flagger
 from transformers.transformers_utils import (
     get_required_files,
     validate_files,
     read_uploaded_files,
     convert_files_to_csv,
-    determine_file_key,
     upload_outputs_to_s3,
-    build_agent_input,
-    update_files_from_result
+    create_spool_dir,
+    remove_spool_dir,
+    load_s3_input_files,
+    build_dataset_contexts,
+    execute_agent_dag,
+    materialize_cleaned_file
 )
 from billing import BillingContext, InsufficientCreditsError, UserWalletNotFoundError, AgentCostNotFoundError
 from services.s3_service import s3_service
@@ -98,6 +100,9 @@ async def run_master_my_data_analysis(
         # Convert files to CSV format
         files_map = convert_files_to_csv(files_map)
         
+        # Parse each file once and share the frame across all agents
+        datasets = build_dataset_contexts(files_map)
+        
         # Parse parameters
         parameters = {}
         if parameters_json:
@@ -106,8 +111,6 @@ async def run_master_my_data_analysis(
             except json.JSONDecodeError:
                 raise HTTPException(status_code=400, detail="Invalid parameters JSON")
         
-        agent_results = {}
-        
         # ========== UPFRONT BILLING: Check and consume ALL credits before execution ==========
         with BillingContext(current_user) as billing:
             try:
@@ -126,26 +129,15 @@ async def run_master_my_data_analysis(
                 )
         # ========== END UPFRONT BILLING ==========
         
-        # Execute agents (billing already handled)
-        for agent_id in agents_to_run:
-            try:
-                # Build agent-specific input
-                agent_input = build_agent_input(agent_id, files_map, parameters, tool_def)
-                
-                # Execute agent
-                result = _execute_agent(agent_id, agent_input)
-                
-                agent_results[agent_id] = result
-                
-                # Update files map for next agent (chaining)
-                update_files_from_result(files_map, result)
-                
-            except Exception as e:
-                agent_results[agent_id] = {
-                    "status": "error",
-                    "error": str(e),
-                    "execution_time_ms": 0
-                }
+        # Execute agents as a DAG built from the tool definition (billing already handled)
+        # Read-only agents (e.g. key-identifier) run alongside the mutating chain
+        agent_results = execute_agent_dag(
+            agents_to_run,
+            tool_def,
+            files_map,
+            parameters,
+            datasets
+        )
         
         # Transform results
         return transform_master_my_data_response(
@@ -195,6 +187,7 @@ async def run_master_my_data_analysis_v2_1(
     from db.models import TaskStatus
     
     start_time = time.time()
+    spool_dir = create_spool_dir(task.task_id)
     
     try:
         tool_def = TOOL_DEFINITIONS[task.tool_id]
@@ -210,26 +203,19 @@ async def run_master_my_data_analysis_v2_1(
                 "error_code": "NO_INPUT_FILES"
             }
         
-        # Build files_map from S3 files
-        files_map = {}
-        for file_info in input_files:
-            filename = file_info['filename']
-            file_key = determine_file_key(filename)
-            content = s3_service.get_file_bytes(file_info['key'])
-            files_map[file_key] = (content, filename)
-            print(f"[V2.1] Loaded {file_key}: {filename} ({len(content)} bytes)")
+        # Build files_map from S3 files (large CSVs are streamed to the spool dir)
+        files_map, spool_paths = load_s3_input_files(input_files, spool_dir)
         
         # Convert files to CSV if needed
         files_map = convert_files_to_csv(files_map)
         
+        # Parse each file once and share the frame across all agents
+        datasets = build_dataset_contexts(files_map, spool_paths)
+        
         # Read parameters from S3
         parameters = s3_service.get_parameters(task.user_id, task.task_id) or {}
         print(f"[V2.1] Parameters loaded: {list(parameters.keys())}")
         
-        agent_results = {}
-        agents_completed = 0
-        total_agents = len(task.agents)
-        
         # ========== UPFRONT BILLING: Check and consume ALL credits before execution ==========
         with BillingContext(current_user) as billing:
             try:
@@ -248,33 +234,22 @@ async def run_master_my_data_analysis_v2_1(
                 )
         # ========== END UPFRONT BILLING ==========
         
-        # Execute agents (billing already handled)
-        for agent_id in task.agents:
-            try:
-                # Update task progress
-                task.current_agent = agent_id
-                task.progress = 15 + int((agents_completed / total_agents) * 80)
-                db.commit()
-                
-                # Build agent input
-                agent_input = build_agent_input(agent_id, files_map, parameters, tool_def)
-                
-                # Execute agent
-                result = _execute_agent(agent_id, agent_input)
-                agent_results[agent_id] = result
-                
-                # Update files map for next agent (chaining)
-                update_files_from_result(files_map, result)
-                
-                agents_completed += 1
-                print(f"[V2.1] Agent {agent_id} completed ({agents_completed}/{total_agents})")
-                
-            except Exception as e:
-                agent_results[agent_id] = {
-                    "status": "error",
-                    "error": str(e),
-                    "execution_time_ms": 0
-                }
+        def update_progress(agents_completed: int, total_agents: int, running_agents: List[str]) -> None:
+            # Called from this thread only, so the DB session is never shared
+            task.current_agent = running_agents[0] if running_agents else None
+            task.progress = 15 + int((agents_completed / total_agents) * 80)
+            db.commit()
+        
+        # Execute agents as a DAG built from the tool definition (billing already handled)
+        # Read-only agents (e.g. key-identifier) run alongside the mutating chain
+        agent_results = execute_agent_dag(
+            task.agents,
+            tool_def,
+            files_map,
+            parameters,
+            datasets,
+            on_progress=update_progress
+        )
         
         # Transform results
         final_result = transform_master_my_data_response(
@@ -301,149 +276,8 @@ async def run_master_my_data_analysis_v2_1(
             "error": str(e),
             "error_code": "PROCESSING_ERROR"
         }
-
-def _execute_agent(
-    agent_id: str,
-    agent_input: Dict[str, Any]
-) -> Dict[str, Any]:
-    """Execute specific agent."""
-    files_map = agent_input.get("files", {})
-    parameters = agent_input.get("parameters", {})
-    
-    if agent_id == "key-identifier":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Key identifier requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return key_identifier.execute_key_identifier(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "contract-enforcer":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Contract enforcer requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return contract_enforcer.execute_contract_enforcer(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "semantic-mapper":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Semantic mapper requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return semantic_mapper.execute_semantic_mapper(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "lineage-tracer":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Lineage tracer requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return lineage_tracer.execute_lineage_tracer(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "golden-record-builder":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Golden record builder requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return golden_record_builder.execute_golden_record_builder(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "survivorship-resolver":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Survivorship resolver requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return survivorship_resolver.execute_survivorship_resolver(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "master-writeback-agent":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Master writeback agent requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return master_writeback_agent.execute_master_writeback_agent(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "stewardship-flagger":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Stewardship flagger requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return stewardship_flagger.execute_stewardship_flagger(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    else:
-        return {
-            "status": "error",
-            "error": f"Unknown agent for master-my-data: {agent_id}",
-            "execution_time_ms": 0
-        }
+    finally:
+        remove_spool_dir(spool_dir)
 
 def transform_master_my_data_response(
     agent_results: Dict[str, Any],
@@ -650,7 +484,7 @@ def transform_master_my_data_response(
     cleaned_files = {}
     if mastered_files_list:
         most_mastered_item = mastered_files_list[-1]  # Last item after sorting (highest count)
-        mastered_file_data = most_mastered_item["cleaned_file"]
+        mastered_file_data = materialize_cleaned_file(most_mastered_item["cleaned_file"])
         
         # Extract base filename and remove all "mastered_" prefixes
         original_filename = most_mastered_item["filename"]
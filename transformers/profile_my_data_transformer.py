@@ -14,15 +14,20 @@ from fastapi import UploadFile, HTTPException
 
 from ai.analysis_summary_ai import AnalysisSummaryAI
 from downloads.profile_my_data_downloads import ProfileMyDataDownloads
-from agents import readiness_rater, unified_profiler, drift_detector, score_risk, governance_checker, test_coverage_agent
 from transformers.transformers_utils import (
     get_required_files,
     validate_files,
     read_uploaded_files,
     convert_files_to_csv,
-    determine_file_key,
     upload_outputs_to_s3,
-    build_agent_input
+    create_spool_dir,
+    remove_spool_dir,
+    load_s3_input_files,
+    build_dataset_contexts,
+    execute_agent_dag,
+    resolve_baseline_profiles,
+    build_baseline_profile,
+    save_baseline_profile
 )
 from billing import BillingContext, InsufficientCreditsError, UserWalletNotFoundError, AgentCostNotFoundError
 from services.s3_service import s3_service
@@ -95,6 +100,9 @@ async def run_profile_my_data_analysis(
         # Convert files to CSV format
         files_map = convert_files_to_csv(files_map)
         
+        # Parse each file once and share the frame across all agents
+        datasets = build_dataset_contexts(files_map)
+        
         # Parse parameters
         parameters = {}
         if parameters_json:
@@ -103,8 +111,6 @@ async def run_profile_my_data_analysis(
             except json.JSONDecodeError:
                 raise HTTPException(status_code=400, detail="Invalid parameters JSON")
         
-        agent_results = {}
-        
         # ========== UPFRONT BILLING: Check and consume ALL credits before execution ==========
         with BillingContext(current_user) as billing:
             try:
@@ -123,26 +129,25 @@ async def run_profile_my_data_analysis(
                 )
         # ========== END UPFRONT BILLING ==========
         
-        # Execute agents (billing already handled)
-        for agent_id in agents_to_run:
-            try:
-                # Build agent-specific input
-                agent_input = build_agent_input(agent_id, files_map, parameters, tool_def)
-                
-                # Execute agent
-                result = _execute_agent(agent_id, agent_input)
-                
-                agent_results[agent_id] = result
-                
-            except Exception as e:
-                agent_results[agent_id] = {
-                    "status": "error",
-                    "error": str(e),
-                    "execution_time_ms": 0
-                }
+        # Drift runs may compare against a stored baseline profile instead of a baseline file
+        user_id = current_user.id if current_user else None
+        parameters = resolve_baseline_profiles(parameters, user_id)
+        
+        # Profile the primary file for later drift runs (before the DAG releases it)
+        baseline_profile = build_baseline_profile(datasets.get("primary")) if user_id is not None else None
+        
+        # Execute agents as a DAG built from the tool definition (billing already handled)
+        # Profiling agents are read-only, so the DAG has no edges and they all run concurrently
+        agent_results = execute_agent_dag(
+            agents_to_run,
+            tool_def,
+            files_map,
+            parameters,
+            datasets
+        )
         
         # Transform results
-        return transform_profile_my_data_response(
+        response = transform_profile_my_data_response(
             agent_results,
             int((time.time() - start_time) * 1000),
             analysis_id,
@@ -150,6 +155,8 @@ async def run_profile_my_data_analysis(
             tool_def["tool"]["name"],
             current_user
         )
+        response["baseline_profile_id"] = save_baseline_profile(user_id, analysis_id, baseline_profile)
+        return response
         
     except HTTPException:
         raise
@@ -190,6 +197,7 @@ async def run_profile_my_data_analysis_v2_1(
     import base64
     
     start_time = time.time()
+    spool_dir = create_spool_dir(task.task_id)
     
     try:
         tool_def = TOOL_DEFINITIONS[task.tool_id]
@@ -205,30 +213,19 @@ async def run_profile_my_data_analysis_v2_1(
                 "error_code": "NO_INPUT_FILES"
             }
         
-        # Build files_map from S3 files
-        files_map = {}
-        for file_info in input_files:
-            filename = file_info['filename']
-            
-            # Determine file key (primary, baseline)
-            file_key = determine_file_key(filename)
-            
-            # Download file content
-            content = s3_service.get_file_bytes(file_info['key'])
-            files_map[file_key] = (content, filename)
-            print(f"[V2.1] Loaded {file_key}: {filename} ({len(content)} bytes)")
+        # Build files_map from S3 files (large CSVs are streamed to the spool dir)
+        files_map, spool_paths = load_s3_input_files(input_files, spool_dir)
         
         # Convert files to CSV if needed
         files_map = convert_files_to_csv(files_map)
         
+        # Parse each file once and share the frame across all agents
+        datasets = build_dataset_contexts(files_map, spool_paths)
+        
         # Read parameters from S3
         parameters = s3_service.get_parameters(task.user_id, task.task_id) or {}
         print(f"[V2.1] Parameters loaded: {list(parameters.keys())}")
         
-        agent_results = {}
-        agents_completed = 0
-        total_agents = len(task.agents)
-        
         # ========== UPFRONT BILLING: Check and consume ALL credits before execution ==========
         with BillingContext(current_user) as billing:
             try:
@@ -247,30 +244,28 @@ async def run_profile_my_data_analysis_v2_1(
                 )
         # ========== END UPFRONT BILLING ==========
         
-        # Execute agents (billing already handled)
-        for agent_id in task.agents:
-            try:
-                # Update task progress
-                task.current_agent = agent_id
-                task.progress = 15 + int((agents_completed / total_agents) * 80)
-                db.commit()
-                
-                # Build agent input
-                agent_input = build_agent_input(agent_id, files_map, parameters, tool_def)
-                
-                # Execute agent
-                result = _execute_agent(agent_id, agent_input)
-                agent_results[agent_id] = result
-                
-                agents_completed += 1
-                print(f"[V2.1] Agent {agent_id} completed ({agents_completed}/{total_agents})")
-                
-            except Exception as e:
-                agent_results[agent_id] = {
-                    "status": "error",
-                    "error": str(e),
-                    "execution_time_ms": 0
-                }
+        # Drift runs may compare against a stored baseline profile instead of a baseline file
+        parameters = resolve_baseline_profiles(parameters, task.user_id)
+        
+        # Profile the primary file for later drift runs (before the DAG releases it)
+        baseline_profile = build_baseline_profile(datasets.get("primary"))
+        
+        def update_progress(agents_completed: int, total_agents: int, running_agents: List[str]) -> None:
+            # Called from this thread only, so the DB session is never shared
+            task.current_agent = running_agents[0] if running_agents else None
+            task.progress = 15 + int((agents_completed / total_agents) * 80)
+            db.commit()
+        
+        # Execute agents as a DAG built from the tool definition (billing already handled)
+        # Profiling agents are read-only, so the DAG has no edges and they all run concurrently
+        agent_results = execute_agent_dag(
+            task.agents,
+            tool_def,
+            files_map,
+            parameters,
+            datasets,
+            on_progress=update_progress
+        )
         
         # Transform results
         final_result = transform_profile_my_data_response(
@@ -288,7 +283,10 @@ async def run_profile_my_data_analysis_v2_1(
             downloads=final_result.get("report", {}).get("downloads", [])
         )
         
-        return {"status": "success"}
+        # The task id doubles as the profile id referenced by later drift runs
+        baseline_profile_id = save_baseline_profile(task.user_id, task.task_id, baseline_profile)
+        
+        return {"status": "success", "baseline_profile_id": baseline_profile_id}
         
     except Exception as e:
         print(f"[V2.1] Error in profile analysis: {str(e)}")
@@ -297,120 +295,8 @@ async def run_profile_my_data_analysis_v2_1(
             "error": str(e),
             "error_code": "PROCESSING_ERROR"
         }
-
-def _execute_agent(
-    agent_id: str,
-    agent_input: Dict[str, Any]
-) -> Dict[str, Any]:
-    """Execute specific agent."""
-    files_map = agent_input.get("files", {})
-    parameters = agent_input.get("parameters", {})
-    
-    if agent_id == "drift-detector":
-        if "primary" not in files_map or "baseline" not in files_map:
-            return {
-                "status": "error",
-                "error": "Drift detector requires 'primary' and 'baseline' files",
-                "execution_time_ms": 0
-            }
-        
-        baseline_bytes, baseline_filename = files_map["baseline"]
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return drift_detector.execute_drift_detector(
-            baseline_bytes,
-            baseline_filename,
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "readiness-rater":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Readiness rater requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return readiness_rater.execute_readiness_rater(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "unified-profiler":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Unified profiler requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return unified_profiler.execute_unified_profiler(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "score-risk":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Risk scorer requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return score_risk.execute_score_risk(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "governance-checker":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Governance checker requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return governance_checker.execute_governance(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    elif agent_id == "test-coverage-agent":
-        if "primary" not in files_map:
-            return {
-                "status": "error",
-                "error": "Test coverage agent requires 'primary' file",
-                "execution_time_ms": 0
-            }
-        
-        primary_bytes, primary_filename = files_map["primary"]
-        
-        return test_coverage_agent.execute_test_coverage(
-            primary_bytes,
-            primary_filename,
-            parameters
-        )
-    
-    else:
-        return {
-            "status": "error",
-            "error": f"Unknown agent for profile-my-data: {agent_id}",
-            "execution_time_ms": 0
-        }
+    finally:
+        remove_spool_dir(spool_dir)
 
 def transform_profile_my_data_response(
     agent_results: Dict[str, Any],
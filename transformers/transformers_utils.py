@@ -4,11 +4,22 @@ import json
 import os
 import sys
 import base64
+import hashlib
+import importlib
+import importlib.util
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from functools import lru_cache
 from pathlib import Path
 import pandas as pd
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Callable, Tuple
 from fastapi import UploadFile, HTTPException
 
+from agents.agent_utils import DatasetContext
+from agents.artifacts import Artifact, CSV_MIME_TYPE
+
 
 # =============================================================================
 # TRANSFORMER MAPPING
@@ -151,65 +162,303 @@ async def upload_outputs_to_s3(
     """
     Upload download files to S3.
     
+    The files are uploaded at the same time on the S3 transfer pool, each
+    as a multipart upload when large. Artifacts are streamed (with their
+    sha256 checksum as object metadata) and closed. Downloads built outside
+    the download modules may still carry content_base64.
+    
+    The JSON report download carries its report_data; the report index
+    (services.report_index) is written from it alongside the uploads.
+    
     Args:
         task: Task model
-        downloads: List of download dicts with content_base64 and file_name
+        downloads: List of download dicts with artifact or content_base64, and file_name
         
     Returns:
         Number of files uploaded
     """
     from services.s3_service import s3_service
     
-    uploaded_count = 0
-    
+    uploads = [
+        lambda download=download: _upload_download(task, download)
+        for download in downloads
+    ]
+    index_writes = []
     for download in downloads:
-        content_b64 = download.get("content_base64")
-        filename = download.get("file_name")
+        report_data = download.pop("report_data", None)
+        if report_data is not None and download.get("file_name"):
+            report_key = f"{task.get_output_prefix()}{download['file_name']}"
+            index_writes.append(
+                lambda report_data=report_data, report_key=report_key: _write_report_index(task, report_data, report_key)
+            )
+    
+    results = s3_service.run_transfers(uploads + index_writes)
+    return sum(results[:len(uploads)])
+
+
+def _write_report_index(task: Any, report_data: Dict[str, Any], report_key: str) -> None:
+    """
+    Write the task's report index (see services.report_index).
+    
+    Failures are logged only: without an index the report endpoint falls
+    back to the full JSON report.
+    """
+    from services.report_index import report_index_store
+    
+    try:
+        index = report_index_store.write(task.user_id, task.task_id, report_data, report_key)
+        print(f"[V2.1] Wrote report index: {len(index['sections'])} sections, "
+              f"{len(index['row_level_issues']['pages'])} row-level issue pages")
+    except Exception as e:
+        print(f"[V2.1] Error writing report index: {str(e)}")
+
+
+def _upload_download(task: Any, download: Dict) -> bool:
+    """Upload one download to the task's output prefix; True if uploaded."""
+    from services.s3_service import s3_service
+    
+    artifact = download.pop("artifact", None)
+    content_b64 = download.get("content_base64")
+    filename = download.get("file_name")
+    
+    try:
+        if (artifact is None and not content_b64) or not filename:
+            return False
         
-        if not content_b64 or not filename:
-            continue
+        # Determine content type
+        if artifact is not None:
+            content_type = artifact.mime_type
+        elif filename.endswith('.xlsx'):
+            content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        elif filename.endswith('.json'):
+            content_type = "application/json"
+        else:
+            content_type = "text/csv"
+        
+        # Build S3 key
+        key = f"{task.get_output_prefix()}{filename}"
+        
+        # Upload
+        if artifact is not None:
+            download["checksum_sha256"] = artifact.checksum
+            with artifact.open() as f:
+                result = s3_service.upload_fileobj(
+                    key, f, content_type, checksum_sha256=download["checksum_sha256"]
+                )
+        else:
+            result = s3_service.upload_file(key, base64.b64decode(content_b64), content_type)
+        print(f"[V2.1] Uploaded output: {filename} ({result['size_bytes']} bytes, {result['throughput_mb_s']} MB/s)")
+        return True
+        
+    except Exception as e:
+        print(f"[V2.1] Error uploading {filename}: {str(e)}")
+        return False
+    finally:
+        if artifact is not None:
+            artifact.close()
+
+
+# CSV inputs larger than this are streamed from S3 to a local spool file
+# instead of being read into worker memory. Excel/JSON inputs are always
+# read fully because they have to be converted to CSV first.
+INPUT_SPOOL_THRESHOLD_BYTES = int(os.getenv("INPUT_SPOOL_THRESHOLD_MB", "32")) * 1024 * 1024
+INPUT_SPOOL_DIR = os.getenv("INPUT_SPOOL_DIR") or None
+
+
+def create_spool_dir(task_id: str) -> str:
+    """Create the local spool directory for a task's large input files."""
+    return tempfile.mkdtemp(prefix=f"agensium_{task_id}_", dir=INPUT_SPOOL_DIR)
+
+
+def remove_spool_dir(spool_dir: str) -> None:
+    """Delete a task's spool directory and everything in it."""
+    shutil.rmtree(spool_dir, ignore_errors=True)
+
+
+def load_s3_input_files(
+    input_files: List[Dict[str, Any]],
+    spool_dir: str
+) -> Tuple[Dict[str, tuple], Dict[str, str]]:
+    """
+    Load a task's input files from S3.
+    
+    The files are downloaded at the same time on the S3 transfer pool.
+    Small files are read into memory. Large CSVs are streamed to spool_dir
+    and appear in files_map with content None; their local path is
+    returned separately so build_dataset_contexts() can scan them lazily.
+    
+    Args:
+        input_files: File infos from s3_service.list_input_files()
+        spool_dir: Local directory for spooled files (see create_spool_dir)
+        
+    Returns:
+        Tuple of (files_map of file_key -> (content, filename),
+                  spool_paths of file_key -> local path)
+    """
+    from services.s3_service import s3_service
+    
+    def load(file_info: Dict[str, Any]) -> Tuple[str, Optional[bytes], str, Optional[str]]:
+        filename = file_info['filename']
+        
+        # Determine file key (primary, baseline)
+        file_key = determine_file_key(filename)
+        
+        size_bytes = file_info.get('size_bytes') or 0
+        if filename.lower().endswith('.csv') and size_bytes > INPUT_SPOOL_THRESHOLD_BYTES:
+            path = os.path.join(spool_dir, f"{file_key}_{os.path.basename(filename)}")
+            written = s3_service.download_to_file(file_info['key'], path)
+            print(f"[V2.1] Spooled {file_key}: {filename} ({written} bytes) to disk")
+            return file_key, None, filename, path
+        
+        content = s3_service.get_file_bytes(file_info['key'])
+        print(f"[V2.1] Loaded {file_key}: {filename} ({len(content)} bytes)")
+        return file_key, content, filename, None
+    
+    # All inputs are fetched at the same time (multipart for large files)
+    loaded = s3_service.run_transfers(
+        [lambda file_info=file_info: load(file_info) for file_info in input_files or []]
+    )
+    
+    files_map = {}
+    spool_paths = {}
+    for file_key, content, filename, path in loaded:
+        files_map[file_key] = (content, filename)
+        if path is not None:
+            spool_paths[file_key] = path
+    
+    return files_map, spool_paths
+
+
+def build_dataset_contexts(
+    files_map: Dict[str, tuple],
+    spool_paths: Optional[Dict[str, str]] = None
+) -> Dict[str, DatasetContext]:
+    """
+    Build one shared DatasetContext per input file.
+    
+    Contexts parse lazily and cache the parsed frame, so every agent in the
+    tool run reuses the same Polars DataFrame instead of re-reading the CSV.
+    Spooled files get a path-backed context that agents can scan lazily.
+    
+    Args:
+        files_map: Dictionary of file_key -> (content, filename)
+        spool_paths: Optional dictionary of file_key -> local spool file path
         
+    Returns:
+        Dictionary of file_key -> DatasetContext
+    """
+    spool_paths = spool_paths or {}
+    return {
+        file_key: (
+            DatasetContext.from_path(spool_paths[file_key], filename)
+            if file_key in spool_paths
+            else DatasetContext.from_bytes(content, filename)
+        )
+        for file_key, (content, filename) in files_map.items()
+    }
+
+
+def resolve_baseline_profiles(
+    parameters: Dict[str, Any],
+    user_id: Optional[int]
+) -> Dict[str, Any]:
+    """
+    Load the stored baseline profiles referenced by agent parameters.
+    
+    An agent given `baseline_profile_id` receives the stored profile as
+    `baseline_profile`. Profiles that cannot be loaded are left out, so the
+    agent reports the missing baseline itself.
+    
+    Args:
+        parameters: Agent-specific parameters keyed by agent_id
+        user_id: Owner of the profiles
+        
+    Returns:
+        Parameters with the referenced profiles attached
+    """
+    from services.baseline_profile_store import baseline_profile_store
+    
+    resolved = dict(parameters)
+    for agent_id, agent_params in parameters.items():
+        if not isinstance(agent_params, dict) or not agent_params.get("baseline_profile_id"):
+            continue
+        profile_id = agent_params["baseline_profile_id"]
         try:
-            # Decode content
-            content = base64.b64decode(content_b64)
-            
-            # Determine content type
-            if filename.endswith('.xlsx'):
-                content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            elif filename.endswith('.json'):
-                content_type = "application/json"
-            else:
-                content_type = "text/csv"
-            
-            # Build S3 key
-            key = f"{task.get_output_prefix()}{filename}"
-            
-            # Upload
-            s3_service.upload_file(key, content, content_type)
-            uploaded_count += 1
-            print(f"[V2.1] Uploaded output: {filename} ({len(content)} bytes)")
-            
+            profile = baseline_profile_store.get(user_id, profile_id) if user_id is not None else None
         except Exception as e:
-            print(f"[V2.1] Error uploading {filename}: {str(e)}")
+            print(f"[V2.1] Could not load baseline profile {profile_id}: {str(e)}")
+            profile = None
+        if profile is not None:
+            resolved[agent_id] = {**agent_params, "baseline_profile": profile}
+            print(f"[V2.1] Loaded baseline profile {profile_id} for {agent_id}")
+    
+    return resolved
+
+
+def build_baseline_profile(dataset: Optional[DatasetContext]) -> Optional[Dict[str, Any]]:
+    """
+    Build the baseline profile of a dataset for later drift runs.
     
-    return uploaded_count
+    The profile is built from the dataset's row batches, so spooled files
+    are never read into memory whole. Failures are logged and return None;
+    profiles never fail a tool run.
+    """
+    from agents.drift_kernels import build_baseline_profile as build_profile
+    from agents.drift_detector import NUMERIC_DTYPES
+    
+    if dataset is None:
+        return None
+    try:
+        return build_profile(dataset.iter_batches, NUMERIC_DTYPES, source={"filename": dataset.filename})
+    except Exception as e:
+        print(f"[V2.1] Could not build baseline profile: {str(e)}")
+        return None
+
+
+def save_baseline_profile(
+    user_id: Optional[int],
+    profile_id: str,
+    profile: Optional[Dict[str, Any]]
+) -> Optional[str]:
+    """
+    Save a baseline profile under the user's profile store.
+    
+    Returns:
+        The profile id, or None if nothing was saved
+    """
+    from services.baseline_profile_store import baseline_profile_store
+    
+    if user_id is None or profile is None:
+        return None
+    try:
+        baseline_profile_store.save(user_id, profile_id, profile)
+        print(f"[V2.1] Saved baseline profile {profile_id} ({len(profile.get('columns', {}))} columns)")
+        return profile_id
+    except Exception as e:
+        print(f"[V2.1] Could not save baseline profile {profile_id}: {str(e)}")
+        return None
 
 
 def build_agent_input(
     agent_id: str,
     files_map: Dict[str, tuple],
     parameters: Dict[str, Any],
-    tool_def: Dict[str, Any]
+    tool_def: Dict[str, Any],
+    datasets: Optional[Dict[str, DatasetContext]] = None
 ) -> Dict[str, Any]:
     """Build agent-specific input based on tool definition."""
     agent_def = tool_def.get("agents", {}).get(agent_id, {})
     required_files = agent_def.get("required_files", [])
+    datasets = datasets or {}
     
-    # Build files dictionary for agent
+    # Build files and shared dataset dictionaries for agent
     agent_files = {}
+    agent_datasets = {}
     for file_key in required_files:
         if file_key in files_map:
             agent_files[file_key] = files_map[file_key]
+        if file_key in datasets:
+            agent_datasets[file_key] = datasets[file_key]
     
     # Get agent parameters
     agent_params = parameters.get(agent_id, {})
@@ -217,28 +466,63 @@ def build_agent_input(
     return {
         "agent_id": agent_id,
         "files": agent_files,
+        "datasets": agent_datasets,
         "parameters": agent_params
     }
 
 
 def update_files_from_result(
     files_map: Dict[str, tuple],
-    result: Dict[str, Any]
+    result: Dict[str, Any],
+    datasets: Optional[Dict[str, DatasetContext]] = None,
+    file_key: str = "primary",
+    release_previous: bool = True
 ) -> None:
-    """Update files map with cleaned file from agent result."""
+    """
+    Update files map (and shared dataset context) with cleaned file from agent result.
+    
+    Agents running with a shared DatasetContext hand back the output frame
+    itself (`cleaned_file["frame"]`). The frame becomes the next agent's
+    primary dataset without a CSV/base64 round-trip. The original input
+    dataset (bytes plus parsed frame) is released once superseded; handed-off
+    frames are kept because the transformer may pick any of them as the
+    final file, and unchanged columns share Arrow buffers between steps.
+    The cleaned_file keeps a reference to its context so the chosen file
+    is serialized once via materialize_cleaned_file().
+    
+    The DAG scheduler passes release_previous=False because other branches
+    may still be reading the superseded dataset; it releases it itself.
+    """
     agent_id = result.get("agent_id", "unknown_agent")
     
     if result.get("status") == "success" and "cleaned_file" in result:
         cleaned_file = result["cleaned_file"]
-        if cleaned_file and "content" in cleaned_file:
+        if cleaned_file and "frame" in cleaned_file:
+            new_filename = cleaned_file.get("filename", "cleaned_data.csv")
+            new_dataset = DatasetContext.from_frame(cleaned_file.pop("frame"), new_filename)
+            cleaned_file["dataset"] = new_dataset
+            
+            if datasets is None:
+                # No shared contexts in this run: fall back to bytes chaining
+                files_map[file_key] = (new_dataset.content, new_filename)
+            else:
+                previous = datasets.get(file_key)
+                datasets[file_key] = new_dataset
+                files_map[file_key] = (None, new_filename)
+                if release_previous and previous is not None and not previous.is_frame_backed:
+                    previous.release()
+            print(f"[{agent_id}] Handed off in-memory frame as {file_key} dataset: {new_filename}")
+        elif cleaned_file and "content" in cleaned_file:
             try:
                 # Decode base64 content
                 new_content = base64.b64decode(cleaned_file["content"])
                 new_filename = cleaned_file.get("filename", "cleaned_data.csv")
                 
-                # Update primary file for next agent
-                files_map["primary"] = (new_content, new_filename)
-                print(f"[{agent_id}] Successfully updated primary file: {new_filename}. New size: {len(new_content)} bytes")
+                # Update file for next agent
+                files_map[file_key] = (new_content, new_filename)
+                if datasets is not None:
+                    datasets[file_key] = DatasetContext.from_bytes(new_content, new_filename)
+                print(f"[{agent_id}] Successfully updated {file_key} file: {new_filename}. New size: {len(new_content)} bytes")
             except Exception as e:
                 print(f"[{agent_id}] Error updating file from result: {str(e)}")
                 pass
@@ -246,6 +530,444 @@ def update_files_from_result(
         print(f"[{agent_id}] No cleaned file produced. Continuing with previous file.")
 
 
+def materialize_cleaned_file(cleaned_file: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn a handed-off cleaned file into a CSV artifact for download.
+    
+    Only the final cleaned/mastered file is materialized, so CSV encoding
+    happens once per run instead of once per chained agent. Frames are
+    written straight into a spooled file and spooled inputs are referenced
+    in place (the spool directory outlives the upload).
+    
+    Args:
+        cleaned_file: cleaned_file payload from an agent result
+        
+    Returns:
+        The same dict with artifact and size_bytes set
+    """
+    dataset = cleaned_file.pop("dataset", None)
+    frame = cleaned_file.pop("frame", None)
+    if "content" in cleaned_file:
+        return cleaned_file
+    
+    if frame is not None:
+        dataset = DatasetContext.from_frame(frame, cleaned_file.get("filename", "cleaned_data.csv"))
+    if dataset is None:
+        return cleaned_file
+    
+    if dataset.is_frame_backed:
+        artifact = Artifact.from_frame(dataset.frame)
+    elif dataset.is_spooled:
+        artifact = Artifact.from_path(dataset.path, CSV_MIME_TYPE)
+    else:
+        artifact = Artifact.from_bytes(dataset.content, CSV_MIME_TYPE)
+    cleaned_file["artifact"] = artifact
+    cleaned_file["size_bytes"] = artifact.size_bytes
+    return cleaned_file
+
+
+# =============================================================================
+# AGENT EXECUTION
+# =============================================================================
+
+# Upper bound on agents running at the same time within one task.
+# Agents are Polars/numpy heavy and release the GIL, so threads give real
+# parallelism while still sharing one parsed DatasetContext.
+MAX_PARALLEL_AGENTS = int(os.getenv("MAX_PARALLEL_AGENTS", "4"))
+
+
+def execute_agents_concurrently(
+    agent_ids: List[str],
+    run_agent: Callable[[str], Dict[str, Any]],
+    dependencies: Optional[Dict[str, List[str]]] = None,
+    on_progress: Optional[Callable[[int, int, List[str]], None]] = None,
+    max_workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run independent agents at the same time on a thread pool.
+    
+    An agent is started as soon as every agent it depends on has finished
+    (successfully or not). Results are returned keyed in the order of
+    agent_ids regardless of completion order, so downstream response
+    building is deterministic.
+    
+    Args:
+        agent_ids: Agents to run, in the task's requested order
+        run_agent: Callable executing one agent and returning its result dict
+        dependencies: Optional agent_id -> list of agent_ids it must wait for
+        on_progress: Optional callback(completed, total, running_agent_ids),
+            always invoked from the calling thread (safe for DB session use)
+        max_workers: Pool size (defaults to MAX_PARALLEL_AGENTS)
+        
+    Returns:
+        Dictionary of agent_id -> result, ordered like agent_ids
+    """
+    dependencies = dependencies or {}
+    total = len(agent_ids)
+    results: Dict[str, Any] = {}
+    if total == 0:
+        return results
+    
+    pending = list(agent_ids)
+    running: Dict[Any, str] = {}
+    finished = set()
+    workers = max(1, min(max_workers or MAX_PARALLEL_AGENTS, total))
+    
+    def _is_ready(agent_id: str) -> bool:
+        # Dependencies outside this run never block
+        return all(dep in finished or dep not in agent_ids for dep in dependencies.get(agent_id, []))
+    
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agent") as executor:
+        while pending or running:
+            for agent_id in [a for a in pending if _is_ready(a)]:
+                pending.remove(agent_id)
+                running[executor.submit(run_agent, agent_id)] = agent_id
+            
+            if on_progress:
+                on_progress(len(finished), total, [running[f] for f in running])
+            
+            if not running:
+                # Remaining agents wait on each other (cycle); run them in order
+                agent_id = pending.pop(0)
+                running[executor.submit(run_agent, agent_id)] = agent_id
+            
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                agent_id = running.pop(future)
+                try:
+                    results[agent_id] = future.result()
+                except Exception as e:
+                    results[agent_id] = {
+                        "status": "error",
+                        "error": str(e),
+                        "execution_time_ms": 0
+                    }
+                finished.add(agent_id)
+                print(f"[Executor] Agent {agent_id} completed ({len(finished)}/{total})")
+    
+    if on_progress:
+        on_progress(total, total, [])
+    
+    return {agent_id: results[agent_id] for agent_id in agent_ids if agent_id in results}
+
+
+def get_agent_execution_spec(
+    tool_def: Dict[str, Any],
+    agent_id: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Get the declarative execution spec of an agent from its tool definition.
+    
+    Each agent entry in tools/*_tool.json declares:
+        entrypoint: Dotted path of the agent's execute function
+        inputs: Files passed positionally as (bytes, filename), each with the
+            keyword its DatasetContext is passed as ("dataset_arg"), and
+            optionally "optional" and a "label" used in error messages
+        outputs: File keys replaced by the agent's cleaned_file
+        mutates: Whether the agent produces a new version of the dataset
+    
+    Returns:
+        The spec dict, or None if the agent is not declared for the tool
+    """
+    agent_def = tool_def.get("agents", {}).get(agent_id)
+    if not agent_def:
+        return None
+    return agent_def.get("execution")
+
+
+@lru_cache(maxsize=None)
+def _resolve_entrypoint(entrypoint: str) -> Callable[..., Dict[str, Any]]:
+    """Import and return an agent execute function from its dotted path."""
+    module_path, function_name = entrypoint.rsplit(".", 1)
+    return getattr(importlib.import_module(module_path), function_name)
+
+
+def dispatch_agent(
+    agent_id: str,
+    agent_input: Dict[str, Any],
+    tool_def: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Execute one agent using the execution spec from its tool definition.
+    
+    Args:
+        agent_id: Agent identifier
+        agent_input: Input built by build_agent_input()
+        tool_def: Tool definition the agent belongs to
+        
+    Returns:
+        Agent result dict
+    """
+    files_map = agent_input.get("files", {})
+    datasets = agent_input.get("datasets", {})
+    parameters = agent_input.get("parameters", {})
+    
+    agent_def = tool_def.get("agents", {}).get(agent_id, {})
+    spec = get_agent_execution_spec(tool_def, agent_id)
+    if not spec:
+        return {
+            "status": "error",
+            "error": f"Unknown agent for {tool_def.get('tool', {}).get('id', 'tool')}: {agent_id}",
+            "execution_time_ms": 0
+        }
+    
+    args = []
+    kwargs = {"parameters": parameters}
+    for file_input in spec.get("inputs", []):
+        file_key = file_input["file"]
+        if file_key in files_map:
+            args.extend(files_map[file_key])
+        elif file_input.get("optional"):
+            args.extend([None, None])
+        else:
+            label = f" ({file_input['label']})" if file_input.get("label") else ""
+            return {
+                "status": "error",
+                "error": f"{agent_def.get('name', agent_id)} requires '{file_key}' file{label}",
+                "execution_time_ms": 0
+            }
+        if file_input.get("dataset_arg"):
+            kwargs[file_input["dataset_arg"]] = datasets.get(file_key)
+    
+    return _resolve_entrypoint(spec["entrypoint"])(*args, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def _agent_code_version(package: str) -> str:
+    """
+    Hash of the source of every module in an agent package.
+    
+    Agents share helper modules (agent_utils, pii_scanner, ...), so the
+    whole package is hashed rather than the agent's own module. Computed
+    once per process, i.e. once per deploy.
+    """
+    digest = hashlib.sha256()
+    spec = importlib.util.find_spec(package)
+    for location in (spec.submodule_search_locations or []) if spec else []:
+        root = Path(location)
+        for path in sorted(root.rglob("*.py")):
+            digest.update(path.relative_to(root).as_posix().encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def build_agent_cache_key(
+    agent_id: str,
+    agent_input: Dict[str, Any],
+    tool_def: Dict[str, Any]
+) -> Optional[str]:
+    """
+    Build the result cache key of one agent run.
+    
+    The key covers the content of every input file (via its DatasetContext
+    fingerprint, or a hash of the bytes), the agent id, its version and
+    entrypoint from the tool definition, a hash of the source of the
+    entrypoint's package, and the canonicalized parameters.
+    
+    Args:
+        agent_id: Agent identifier
+        agent_input: Input built by build_agent_input()
+        tool_def: Tool definition the agent belongs to
+        
+    Returns:
+        Cache key, or None if the run cannot be cached
+    """
+    from services.result_cache import build_cache_key
+    
+    spec = get_agent_execution_spec(tool_def, agent_id)
+    if not spec:
+        return None
+    agent_def = tool_def.get("agents", {}).get(agent_id, {})
+    datasets = agent_input.get("datasets", {})
+    
+    try:
+        fingerprints = []
+        for file_key, (content, filename) in agent_input.get("files", {}).items():
+            dataset = datasets.get(file_key)
+            if dataset is not None:
+                fingerprint = dataset.fingerprint
+            elif content is not None:
+                fingerprint = hashlib.sha256(content).hexdigest()
+            else:
+                return None
+            fingerprints.append((file_key, filename, fingerprint))
+    except Exception as e:
+        print(f"[V2.1] Could not fingerprint inputs of {agent_id}: {str(e)}")
+        return None
+    
+    return build_cache_key(
+        agent_id,
+        agent_def.get("version", ""),
+        _agent_code_version(spec["entrypoint"].split(".", 1)[0]),
+        spec["entrypoint"],
+        agent_input.get("parameters", {}),
+        fingerprints
+    )
+
+
+def build_agent_dag(
+    agent_ids: List[str],
+    tool_def: Dict[str, Any]
+) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    Build the data-flow DAG for a task from the agents' execution specs.
+    
+    Agents keep the semantics of the requested order: each input of an
+    agent is wired to the closest earlier agent that outputs that file
+    (None means the uploaded file). Read-only agents never create edges,
+    so they run alongside the mutating chain instead of waiting for it.
+    
+    Args:
+        agent_ids: Agents in the task's requested order
+        tool_def: Tool definition with execution specs
+        
+    Returns:
+        Dictionary of agent_id -> {file_key: producing agent_id or None}
+    """
+    last_writer: Dict[str, Optional[str]] = {}
+    edges: Dict[str, Dict[str, Optional[str]]] = {}
+    
+    for agent_id in agent_ids:
+        spec = get_agent_execution_spec(tool_def, agent_id) or {}
+        edges[agent_id] = {
+            file_input["file"]: last_writer.get(file_input["file"])
+            for file_input in spec.get("inputs", [])
+        }
+        if spec.get("mutates"):
+            for file_key in spec.get("outputs", []):
+                last_writer[file_key] = agent_id
+    
+    return edges
+
+
+def execute_agent_dag(
+    agent_ids: List[str],
+    tool_def: Dict[str, Any],
+    files_map: Dict[str, tuple],
+    parameters: Dict[str, Any],
+    datasets: Dict[str, DatasetContext],
+    on_progress: Optional[Callable[[int, int, List[str]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Run a task's agents as a DAG built from their declared inputs/outputs.
+    
+    Independent branches run concurrently. Each agent receives the file
+    versions produced along its incoming edges; an agent that fails or
+    produces no cleaned_file passes its input through unchanged. Uploaded
+    datasets are released once no remaining agent can still read them.
+    
+    Successful results are stored in the result cache; a rerun with the
+    same inputs, parameters and agent code returns the stored result
+    (flagged with cache_hit) without executing the agent. Hits are billed
+    like executions, since credits are consumed before the DAG runs. Datasets produced by an agent
+    are fingerprinted from its cache key, so chained agents hit too.
+    
+    Args:
+        agent_ids: Agents in the task's requested order
+        tool_def: Tool definition with execution specs
+        files_map: Dictionary of file_key -> (content, filename)
+        parameters: Agent-specific parameters keyed by agent_id
+        datasets: Shared DatasetContext per file key
+        on_progress: Optional callback(completed, total, running_agent_ids)
+        
+    Returns:
+        Dictionary of agent_id -> result, ordered like agent_ids
+    """
+    from services.result_cache import result_cache
+    
+    agent_ids = list(dict.fromkeys(agent_ids))
+    edges = build_agent_dag(agent_ids, tool_def)
+    dependencies = {
+        agent_id: sorted({source for source in sources.values() if source})
+        for agent_id, sources in edges.items()
+    }
+    
+    # Output file versions of every finished agent
+    versions: Dict[str, tuple] = {}
+    finished = set()
+    releasable = [dataset for dataset in datasets.values() if not dataset.is_frame_backed]
+    lock = threading.Lock()
+    
+    def _input_version(agent_id: str, file_key: str) -> tuple:
+        # Skip unfinished producers: if they fail, their input passes through
+        source = edges[agent_id].get(file_key)
+        while source is not None and source not in versions:
+            source = edges[source].get(file_key)
+        if source is None:
+            return files_map.get(file_key), datasets.get(file_key)
+        source_files, source_datasets = versions[source]
+        return source_files.get(file_key), source_datasets.get(file_key)
+    
+    def _release_unreachable() -> None:
+        for dataset in list(releasable):
+            still_needed = any(
+                _input_version(agent_id, file_key)[1] is dataset
+                for agent_id in agent_ids if agent_id not in finished
+                for file_key in edges[agent_id]
+            )
+            if not still_needed:
+                releasable.remove(dataset)
+                dataset.release()
+    
+    def _run(agent_id: str) -> Dict[str, Any]:
+        agent_files = {}
+        agent_datasets = {}
+        with lock:
+            for file_key in edges[agent_id]:
+                file_entry, dataset = _input_version(agent_id, file_key)
+                if file_entry is not None:
+                    agent_files[file_key] = file_entry
+                if dataset is not None:
+                    agent_datasets[file_key] = dataset
+        
+        cache_key = None
+        try:
+            agent_input = build_agent_input(agent_id, agent_files, parameters, tool_def, agent_datasets)
+            if result_cache.enabled:
+                cache_key = build_agent_cache_key(agent_id, agent_input, tool_def)
+            result = result_cache.get(cache_key) if cache_key else None
+            if result is not None:
+                print(f"[V2.1] Cache hit for {agent_id} (cached at {result.get('cached_at')})")
+            else:
+                result = dispatch_agent(agent_id, agent_input, tool_def)
+                if cache_key:
+                    result_cache.put(cache_key, result)
+        except Exception as e:
+            result = {
+                "status": "error",
+                "error": str(e),
+                "execution_time_ms": 0
+            }
+        
+        spec = get_agent_execution_spec(tool_def, agent_id) or {}
+        output_files = dict(agent_files)
+        output_datasets = dict(agent_datasets)
+        if spec.get("mutates"):
+            for file_key in spec.get("outputs", []):
+                update_files_from_result(output_files, result, output_datasets, file_key, release_previous=False)
+                dataset = output_datasets.get(file_key)
+                if cache_key and dataset is not None and dataset is not agent_datasets.get(file_key):
+                    dataset.fingerprint = hashlib.sha256(f"{cache_key}:{file_key}".encode("utf-8")).hexdigest()
+        
+        with lock:
+            versions[agent_id] = (output_files, output_datasets)
+            releasable.extend(
+                dataset for dataset in output_datasets.values()
+                if not dataset.is_frame_backed and dataset not in releasable and dataset not in agent_datasets.values()
+            )
+            finished.add(agent_id)
+            _release_unreachable()
+        
+        return result
+    
+    return execute_agents_concurrently(
+        agent_ids,
+        _run,
+        dependencies=dependencies,
+        on_progress=on_progress
+    )
+
+
 def validate_files(
     uploaded_files: Dict[str, Optional[UploadFile]],
     required_files: Dict[str, Dict[str, Any]]